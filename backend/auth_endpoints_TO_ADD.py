@@ -25,8 +25,9 @@ async def get_current_user_id(authorization: str = Header(None)) -> int:
     
     token = authorization.split(' ')[1]
     from checkout_ai.auth import AuthService
+    from checkout_ai.db import async_db
     
-    user = AuthService.get_current_user(token)
+    user = await async_db.run(AuthService.get_current_user, token)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
@@ -40,8 +41,9 @@ async def register(request: RegisterRequest):
     """Register a new user"""
     try:
         from checkout_ai.auth import AuthService
+        from checkout_ai.db import async_db
         
-        user_id = AuthService.register_user(
+        user_id = await async_db.run(AuthService.register_user,
             email=request.email,
             password=request.password,
             full_name=request.fullName,
@@ -49,7 +51,7 @@ async def register(request: RegisterRequest):
         )
         
         # Auto-login after registration
-        auth_result = AuthService.authenticate_user(
+        auth_result = await async_db.run(AuthService.authenticate_user,
             email=request.email,
             password=request.password
         )
@@ -64,8 +66,9 @@ async def login(request: LoginRequest):
     """Login user and return JWT token"""
     try:
         from checkout_ai.auth import AuthService
+        from checkout_ai.db import async_db
         
-        auth_result = AuthService.authenticate_user(
+        auth_result = await async_db.run(AuthService.authenticate_user,
             email=request.email,
             password=request.password
         )
@@ -79,9 +82,9 @@ async def login(request: LoginRequest):
 async def get_current_user(authorization: str = Header(None)):
     """Get current user profile"""
     user_id = await get_current_user_id(authorization)
-    from checkout_ai.db import db
+    from checkout_ai.db import async_db
     
-    user = db.fetch_one("""
+    user = await async_db.fetch_one("""
         SELECT id, email, full_name, country, phone
         FROM users
         WHERE id = ?
@@ -31,8 +31,8 @@ from backend.services.address_service import address_service
 from backend.services.wallet_service import wallet_service
 from backend.models.address import AddressCreate, AddressUpdate
 from backend.models.wallet import CardCreate, UPICreate
-from main_orchestrator import run_full_flow
 from backend.services.screenshot_service import screenshot_service
+from backend.services.product_info_service import product_info_service, MAX_BATCH_SIZE
 # from backend.services.conversation_agent_legacy import LLMClient # DELETED
 
 app = FastAPI(title="CARTMIND-AI API", version="1.0.0")
@@ -55,6 +55,9 @@ active_websockets: List[WebSocket] = []
 class AutomationRequest(BaseModel):
     json_data: Dict[str, Any]
 
+class ProductInfoBatchRequest(BaseModel):
+    urls: List[str]
+
 class AutomationStatus(BaseModel):
     status: str
     phase: Optional[str] = None
@@ -126,9 +129,7 @@ async def get_pending_otp(session_id: str):
 async def get_product_info(url: str):
     """Get product thumbnail and info from URL"""
     try:
-        from backend.services.product_scraper import extract_product_info
-        info = extract_product_info(url)
-        return info
+        return await product_info_service.get(url)
     except Exception as e:
         return {
             "thumbnail": None,
@@ -137,6 +138,14 @@ async def get_product_info(url: str):
             "error": str(e)
         }
 
+@app.post("/api/product/info/batch")
+async def get_product_info_batch(request: ProductInfoBatchRequest):
+    """Get product info for several URLs at once (results in request order)"""
+    if len(request.urls) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_SIZE} URLs per batch request")
+    results = await product_info_service.get_many(request.urls)
+    return {"results": results}
+
 
 
 # LLM Config endpoint removed
@@ -152,8 +161,21 @@ async def start_automation(request: AutomationRequest):
         screenshot_service.lock_browser()
         
         try:
-            # Run automation in background
-            result = await run_full_flow(request.json_data)
+            # Orchestrator (Playwright, agents) is imported on the first run, not at API startup
+            from main_orchestrator import run_full_flow, PROGRESS_PHASES
+
+            session_id = request.json_data.get('session_id', 'default')
+            await progress_tracker.start_automation(total_steps=len(PROGRESS_PHASES), session_id=session_id)
+            try:
+                # Run automation in background
+                result = await run_full_flow(request.json_data)
+            except Exception as e:
+                await progress_tracker.report_error(str(e), session_id=session_id)
+                raise
+            if result.get("success"):
+                await progress_tracker.complete_automation(True, result.get("final_url"), session_id=session_id)
+            else:
+                await progress_tracker.report_error(result.get("error") or "Automation failed", session_id=session_id)
         finally:
             # Always unlock browser after automation (even if it fails)
             screenshot_service.unlock_browser()
@@ -184,16 +206,8 @@ async def start_automation(request: AutomationRequest):
 @app.websocket("/ws/live-browser")
 async def live_browser_websocket(websocket: WebSocket):
     """WebSocket endpoint for live browser screenshot streaming"""
-    await screenshot_service.connect_client(websocket)
-    try:
-        # Keep connection alive and let screenshot service broadcast
-        while True:
-            await asyncio.sleep(1)
-    except WebSocketDisconnect:
-        screenshot_service.disconnect_client(websocket)
-    except Exception as e:
-        print(f"Live browser WebSocket error: {e}")
-        screenshot_service.disconnect_client(websocket)
+    # Frames are pushed by the screenshot service; this holds the connection until disconnect
+    await screenshot_service.serve_client(websocket)
 
 # ============================================
 # DATA MANAGEMENT ENDPOINTS
@@ -288,13 +302,8 @@ async def set_default_payment(method_id: str):
 @app.websocket("/ws/progress")
 async def websocket_progress(websocket: WebSocket):
     """WebSocket endpoint for real-time automation progress updates"""
-    await progress_tracker.connect(websocket)
-    try:
-        while True:
-            # Keep connection alive
-            await websocket.receive_text()
-    except WebSocketDisconnect:
-        progress_tracker.disconnect(websocket)
+    session_id = websocket.query_params.get("session_id", "default")
+    await progress_tracker.serve_client(websocket, session_id)
 
 @app.websocket("/ws/screenshots")
 async def websocket_screenshots(websocket: WebSocket):
@@ -324,6 +333,7 @@ async def startup_event():
     print("📦 Initializing databases...")
     await address_service.initialize()
     await wallet_service.initialize()
+    await product_info_service.initialize()
     print("✅ Databases initialized")
     
     # Verify LLM configuration
@@ -342,6 +352,16 @@ async def shutdown_event():
     # Close all WebSocket connections
     for ws in active_websockets:
         await ws.close()
+    
+    # Close shared HTTP session and pooled database connections
+    await product_info_service.close()
+    await address_service.close()
+    await wallet_service.close()
+
+    # Headless variant-detection browser - only loaded (and started) if it was used
+    variant_detector = sys.modules.get('backend.services.variant_detector')
+    if variant_detector:
+        await variant_detector.shutdown()
 
 if __name__ == "__main__":
     import uvicorn
@@ -44,7 +44,8 @@ async def get_profile(authorization: str = Header(None)):
     user_id = await get_current_user_id(authorization)
     
     from src.checkout_ai.users.profile_service_enhanced import ProfileService
-    profile = ProfileService.get_user_profile(user_id)
+    from src.checkout_ai.db import async_db
+    profile = await async_db.run(ProfileService.get_user_profile, user_id)
     
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
@@ -57,7 +58,8 @@ async def update_profile(request: UpdateProfileRequest, authorization: str = Hea
     user_id = await get_current_user_id(authorization)
     
     from src.checkout_ai.users.profile_service_enhanced import ProfileService
-    success = ProfileService.update_user_profile(
+    from src.checkout_ai.db import async_db
+    success = await async_db.run(ProfileService.update_user_profile,
         user_id=user_id,
         full_name=request.full_name,
         phone=request.phone,
@@ -74,7 +76,8 @@ async def get_shipping_addresses(authorization: str = Header(None)):
     user_id = await get_current_user_id(authorization)
     
     from src.checkout_ai.users.profile_service_enhanced import ProfileService
-    addresses = ProfileService.get_shipping_addresses(user_id)
+    from src.checkout_ai.db import async_db
+    addresses = await async_db.run(ProfileService.get_shipping_addresses, user_id)
     
     return addresses
 
@@ -84,7 +87,8 @@ async def add_shipping_address(request: AddShippingAddressRequest, authorization
     user_id = await get_current_user_id(authorization)
     
     from src.checkout_ai.users.profile_service_enhanced import ProfileService
-    address_id = ProfileService.add_shipping_address(
+    from src.checkout_ai.db import async_db
+    address_id = await async_db.run(ProfileService.add_shipping_address,
         user_id=user_id,
         label=request.label,
         recipient_name=request.recipient_name,
@@ -105,7 +109,8 @@ async def set_default_shipping(address_id: int, authorization: str = Header(None
     user_id = await get_current_user_id(authorization)
     
     from src.checkout_ai.users.profile_service_enhanced import ProfileService
-    success = ProfileService.set_default_shipping_address(address_id, user_id)
+    from src.checkout_ai.db import async_db
+    success = await async_db.run(ProfileService.set_default_shipping_address, address_id, user_id)
     
     return {"success": success}
 
@@ -115,7 +120,8 @@ async def delete_shipping_address(address_id: int, authorization: str = Header(N
     user_id = await get_current_user_id(authorization)
     
     from src.checkout_ai.users.profile_service_enhanced import ProfileService
-    success = ProfileService.delete_shipping_address(address_id, user_id)
+    from src.checkout_ai.db import async_db
+    success = await async_db.run(ProfileService.delete_shipping_address, address_id, user_id)
     
     return {"success": success}
 
@@ -127,7 +133,8 @@ async def get_billing_addresses(authorization: str = Header(None)):
     user_id = await get_current_user_id(authorization)
     
     from src.checkout_ai.users.profile_service_enhanced import ProfileService
-    addresses = ProfileService.get_billing_addresses(user_id)
+    from src.checkout_ai.db import async_db
+    addresses = await async_db.run(ProfileService.get_billing_addresses, user_id)
     
     return addresses
 
@@ -137,7 +144,8 @@ async def add_billing_address(request: AddBillingAddressRequest, authorization:
     user_id = await get_current_user_id(authorization)
     
     from src.checkout_ai.users.profile_service_enhanced import ProfileService
-    address_id = ProfileService.add_billing_address(
+    from src.checkout_ai.db import async_db
+    address_id = await async_db.run(ProfileService.add_billing_address,
         user_id=user_id,
         label=request.label,
         full_name=request.full_name,
@@ -158,7 +166,8 @@ async def set_default_billing(address_id: int, authorization: str = Header(None)
     user_id = await get_current_user_id(authorization)
     
     from src.checkout_ai.users.profile_service_enhanced import ProfileService
-    success = ProfileService.set_default_billing_address(address_id, user_id)
+    from src.checkout_ai.db import async_db
+    success = await async_db.run(ProfileService.set_default_billing_address, address_id, user_id)
     
     return {"success": success}
 
@@ -168,6 +177,7 @@ async def delete_billing_address(address_id: int, authorization: str = Header(No
     user_id = await get_current_user_id(authorization)
     
     from src.checkout_ai.users.profile_service_enhanced import ProfileService
-    success = ProfileService.delete_billing_address(address_id, user_id)
+    from src.checkout_ai.db import async_db
+    success = await async_db.run(ProfileService.delete_billing_address, address_id, user_id)
     
     return {"success": success}
@@ -0,0 +1,211 @@
+"""
+Product Info Service
+Non-blocking product info lookups for the UI product cards
+- Shared aiohttp session with per-host connection limits
+- In-memory + SQLite result cache with TTL and stale-while-revalidate
+- Request coalescing: concurrent lookups of the same URL share one fetch
+"""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+import aiosqlite
+
+from backend.services.product_scraper import (
+    ProductScraper, StreamingProductExtractor, STREAM_CHUNK_SIZE, _empty_result
+)
+
+# Most URLs one batch request may look up (each one can mean a fetch)
+MAX_BATCH_SIZE = 50
+
+
+class ProductInfoService:
+    """Async, cached product info lookups"""
+
+    def __init__(
+        self,
+        db_path: str = "backend/storage/product_cache.db",
+        ttl: float = 6 * 3600,
+        stale_ttl: float = 7 * 24 * 3600,
+        memory_size: int = 512,
+        total_connections: int = 32,
+        connections_per_host: int = 4,
+    ):
+        """
+        Args:
+            db_path: SQLite cache location
+            ttl: Seconds a cached result is fresh
+            stale_ttl: Seconds a cached result may be served while it is refreshed in the background
+            memory_size: Max results kept in the in-memory LRU
+            total_connections: Connection pool size
+            connections_per_host: Max concurrent connections per store
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.memory_size = memory_size
+        self.total_connections = total_connections
+        self.connections_per_host = connections_per_host
+
+        self._memory: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._initialized = False
+
+    async def initialize(self):
+        """Initialize cache schema"""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS product_cache (
+                    url TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+            await db.commit()
+        self._initialized = True
+
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            headers = dict(ProductScraper.HEADERS)
+            # aiohttp only decodes brotli when the optional brotli package is installed
+            headers['Accept-Encoding'] = 'gzip, deflate'
+            connector = aiohttp.TCPConnector(
+                limit=self.total_connections,
+                limit_per_host=self.connections_per_host,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(headers=headers, connector=connector)
+        return self._session
+
+    async def get(self, url: str, timeout: int = 10) -> Dict:
+        """
+        Get product info for a URL.
+        Fresh cache hits return immediately; stale hits return immediately and refresh
+        in the background; misses fetch once even when requested concurrently.
+        """
+        cached = await self._get_cached(url)
+        if cached:
+            fetched_at, info = cached
+            age = time.time() - fetched_at
+            if age < self.ttl:
+                return info
+            if age < self.stale_ttl:
+                self._fetch_coalesced(url, timeout)
+                return info
+
+        return await self._fetch_coalesced(url, timeout)
+
+    async def get_many(self, urls: List[str], timeout: int = 10) -> List[Dict]:
+        """Get product info for several URLs concurrently, in input order"""
+        results = await asyncio.gather(*[self.get(url, timeout) for url in urls], return_exceptions=True)
+        return [
+            result if not isinstance(result, Exception) else _empty_result()
+            for result in results
+        ]
+
+    def _fetch_coalesced(self, url: str, timeout: int) -> asyncio.Future:
+        """Start (or join) the single in-flight fetch for a URL"""
+        future = self._inflight.get(url)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch_and_store(url, timeout))
+            self._inflight[url] = future
+            future.add_done_callback(lambda done: self._fetch_done(url, done))
+        # Shield so a cancelled caller does not cancel the fetch for everyone else
+        return asyncio.shield(future)
+
+    def _fetch_done(self, url: str, future: asyncio.Future):
+        """Drop the in-flight entry and retrieve the error of fetches nobody awaits (background refreshes)"""
+        self._inflight.pop(url, None)
+        if not future.cancelled() and future.exception() is not None:
+            print(f"[Product Info] ❌ Fetch failed for {url}: {future.exception()!r}")
+
+    async def _fetch_and_store(self, url: str, timeout: int) -> Dict:
+        print(f"[Product Info] Fetching: {url}")
+        try:
+            session = self._get_session()
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout), allow_redirects=True) as response:
+                response.raise_for_status()
+                # Head-first: stop reading once title/thumbnail/price are known
+                extractor = StreamingProductExtractor(url, encoding=response.charset)
+                async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    if extractor.feed(chunk):
+                        break
+        except asyncio.TimeoutError:
+            print(f"[Product Info] ⏱️ Timeout after {timeout}s: {url}")
+            return _empty_result()
+        except aiohttp.ClientError as e:
+            print(f"[Product Info] ❌ Request error: {e}")
+            return _empty_result()
+
+        try:
+            # Full-tree fallback (BeautifulSoup) is CPU-bound - keep it off the event loop
+            info = await asyncio.to_thread(extractor.finish)
+        except Exception as e:
+            print(f"[Product Info] ❌ Parse error: {e}")
+            return _empty_result()
+
+        # Only cache useful results so transient failures are retried
+        if any(info.values()):
+            await self._store(url, info)
+        return info
+
+    async def _get_cached(self, url: str) -> Optional[Tuple[float, Dict]]:
+        entry = self._memory.get(url)
+        if entry:
+            self._memory.move_to_end(url)
+            return entry
+
+        try:
+            if not self._initialized:
+                await self.initialize()
+            async with aiosqlite.connect(self.db_path) as db:
+                async with db.execute(
+                    "SELECT data, fetched_at FROM product_cache WHERE url = ?", (url,)
+                ) as cursor:
+                    row = await cursor.fetchone()
+        except Exception as e:
+            print(f"[Product Info] Cache read error: {e}")
+            return None
+
+        if not row:
+            return None
+        entry = (row[1], json.loads(row[0]))
+        self._remember(url, entry)
+        return entry
+
+    async def _store(self, url: str, info: Dict):
+        entry = (time.time(), info)
+        self._remember(url, entry)
+        try:
+            if not self._initialized:
+                await self.initialize()
+            async with aiosqlite.connect(self.db_path) as db:
+                await db.execute(
+                    "INSERT OR REPLACE INTO product_cache (url, data, fetched_at) VALUES (?, ?, ?)",
+                    (url, json.dumps(info), entry[0])
+                )
+                await db.commit()
+        except Exception as e:
+            print(f"[Product Info] Cache write error: {e}")
+
+    def _remember(self, url: str, entry: Tuple[float, Dict]):
+        self._memory[url] = entry
+        self._memory.move_to_end(url)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+
+# Global instance
+product_info_service = ProductInfoService()
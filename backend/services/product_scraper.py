@@ -9,8 +9,20 @@ from typing import Optional, Dict, List
 import re
 import json
 from urllib.parse import urlparse
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
+
+# lxml gives a fast incremental tokenizer (HTMLPullParser) and a faster BeautifulSoup backend
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Fields that must be known before the streaming extractor stops reading the response
+REQUIRED_FIELDS = ('title', 'thumbnail', 'price')
+
+RESULT_FIELDS = ('thumbnail', 'title', 'price', 'rating', 'review_count', 'brand', 'in_stock')
+
+STREAM_CHUNK_SIZE = 16 * 1024
 
 
 class ProductScraper:
@@ -302,6 +314,204 @@ class ProductScraper:
         return result
 
 
+def _make_soup(content, parser: Optional[str] = None) -> BeautifulSoup:
+    """BeautifulSoup tree using lxml when available (html.parser is several times slower)"""
+    return BeautifulSoup(content, parser or ('lxml' if LXML_AVAILABLE else 'html.parser'))
+
+
+def _charset_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    """Explicit charset from a Content-Type header, if any"""
+    match = re.search(r'charset=([\w-]+)', content_type or '', re.I)
+    return match.group(1) if match else None
+
+
+class StreamingProductExtractor:
+    """
+    Head-first product extraction over response chunks.
+    JSON-LD and OpenGraph/meta data are collected as soon as the tokenizer reaches
+    them; feed() returns True once all REQUIRED_FIELDS are known so the caller can
+    stop reading. finish() runs the full-tree strategies only for fields still
+    missing after the whole page was read.
+    """
+    
+    def __init__(self, url: str, encoding: Optional[str] = None):
+        self.url = url
+        self.bytes_read = 0
+        self.done = False
+        self._chunks: List[bytes] = []
+        self._json_ld: Dict = {}
+        self._meta: Dict = {}
+        self._og_price: Optional[str] = None
+        self._og_currency: Optional[str] = None
+        self._twitter_image: Optional[str] = None
+        self._parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding) if LXML_AVAILABLE else None
+    
+    def feed(self, chunk: bytes) -> bool:
+        """Feed the next response chunk. Returns True when reading can stop."""
+        if self.done:
+            return True
+        self.bytes_read += len(chunk)
+        self._chunks.append(chunk)
+        
+        if self._parser is None:
+            return False
+        try:
+            self._parser.feed(chunk)
+            self._drain_events()
+        except Exception as e:
+            # Tokenizer gave up - keep buffering, finish() falls back to the full tree
+            print(f"[Product Scraper] Streaming parser error, using full-tree fallback: {e}")
+            self._parser = None
+            return False
+        
+        partial = self.partial()
+        self.done = all(partial.get(field) for field in REQUIRED_FIELDS)
+        return self.done
+    
+    def _drain_events(self):
+        for event, element in self._parser.read_events():
+            tag = element.tag.lower() if isinstance(element.tag, str) else ''
+            if event == 'start':
+                if tag == 'meta':
+                    self._handle_meta(element)
+                continue
+            
+            if tag == 'script' and (element.get('type') or '').lower() == 'application/ld+json':
+                self._handle_json_ld(element.text)
+            
+            # Drop finished subtrees so memory stays flat on multi-megabyte pages
+            if tag not in ('html', 'head', 'body'):
+                element.clear(keep_tail=True)
+    
+    def _handle_meta(self, element):
+        """Same tags as ProductScraper._extract_from_meta_tags (first occurrence wins)"""
+        content = element.get('content')
+        if not content:
+            return
+        prop = (element.get('property') or '').lower()
+        name = (element.get('name') or '').lower()
+        
+        if prop == 'og:image':
+            self._meta.setdefault('thumbnail', content)
+        elif prop == 'og:title':
+            self._meta.setdefault('title', content)
+        elif prop == 'og:price:amount' and self._og_price is None:
+            self._og_price = content
+        elif prop == 'og:price:currency' and self._og_currency is None:
+            self._og_currency = content
+        elif name == 'twitter:image' and self._twitter_image is None:
+            self._twitter_image = content
+    
+    def _handle_json_ld(self, text: Optional[str]):
+        """Same parsing as ProductScraper._extract_from_json_ld, one script at a time"""
+        if not text:
+            return
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            return
+        for item in (data if isinstance(data, list) else [data]):
+            if isinstance(item, dict):
+                self._json_ld.update(ProductScraper._parse_json_ld_item(item))
+    
+    def partial(self) -> Dict:
+        """Fields found so far (JSON-LD takes precedence over meta tags)"""
+        meta = dict(self._meta)
+        if self._og_price:
+            meta['price'] = f"{self._og_currency or ''} {self._og_price}".strip()
+        if not meta.get('thumbnail') and self._twitter_image:
+            meta['thumbnail'] = self._twitter_image
+        
+        result = dict(self._json_ld)
+        for key, value in meta.items():
+            if value and not result.get(key):
+                result[key] = value
+        return result
+    
+    def finish(self) -> Dict[str, Optional[str]]:
+        """Return the product info, running full-tree strategies only if the page was read to the end"""
+        if self._parser is not None and not self.done:
+            try:
+                self._parser.close()
+                self._drain_events()
+            except Exception:
+                self._parser = None
+        
+        result = self.partial()
+        
+        if not self.done:
+            missing = [field for field in RESULT_FIELDS if not result.get(field)]
+            if missing:
+                print(f"[Product Scraper] Full-tree fallback for: {missing}")
+                content = b''.join(self._chunks)
+                soup = _make_soup(content)
+                strategies = []
+                if self._parser is None:
+                    # Streaming never ran (no lxml / tokenizer error) - structured data too
+                    strategies += [
+                        lambda: ProductScraper._extract_from_json_ld(soup),
+                        lambda: ProductScraper._extract_from_meta_tags(soup),
+                    ]
+                strategies += [
+                    lambda: ProductScraper._extract_platform_specific(soup, self.url),
+                    lambda: ProductScraper._extract_from_html(soup, self.url),
+                ]
+                for strategy in strategies:
+                    for key, value in strategy().items():
+                        if value and not result.get(key):
+                            result[key] = value
+        
+        self._chunks = []
+        return {field: result.get(field) for field in RESULT_FIELDS}
+
+
+def parse_product_html(content, url: str, parser: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """
+    Extract product info from already-fetched HTML (bytes or str) with all strategies
+    on the full tree. Used when the response body is already in memory.
+    """
+    # Parse HTML
+    soup = _make_soup(content, parser)
+    
+    # Strategy 1: JSON-LD (most reliable)
+    print("[Product Scraper] Trying JSON-LD extraction...")
+    result = ProductScraper._extract_from_json_ld(soup)
+    
+    # Strategy 2: Meta tags (Open Graph)
+    print("[Product Scraper] Trying meta tags extraction...")
+    meta_data = ProductScraper._extract_from_meta_tags(soup)
+    for key, value in meta_data.items():
+        if value and not result.get(key):
+            result[key] = value
+    
+    # Strategy 3: Platform-specific extraction
+    print("[Product Scraper] Trying platform-specific extraction...")
+    platform_data = ProductScraper._extract_platform_specific(soup, url)
+    for key, value in platform_data.items():
+        if value and not result.get(key):
+            result[key] = value
+    
+    # Strategy 4: Generic HTML patterns (fallback)
+    print("[Product Scraper] Trying HTML pattern extraction...")
+    html_data = ProductScraper._extract_from_html(soup, url)
+    for key, value in html_data.items():
+        if value and not result.get(key):
+            result[key] = value
+    
+    # Ensure all expected keys exist
+    final_result = {
+        "thumbnail": result.get("thumbnail"),
+        "title": result.get("title"),
+        "price": result.get("price"),
+        "rating": result.get("rating"),
+        "review_count": result.get("review_count"),
+        "brand": result.get("brand"),
+        "in_stock": result.get("in_stock")
+    }
+    
+    return final_result
+
+
 def extract_product_info(url: str, timeout: int = 10) -> Dict[str, Optional[str]]:
     """
     Extract product thumbnail, price, rating, and metadata from product URL
@@ -321,53 +531,28 @@ def extract_product_info(url: str, timeout: int = 10) -> Dict[str, Optional[str]
     print(f"[Product Scraper] Extracting info from: {url}")
     
     try:
-        # Make request
+        # Stream the response - most pages expose everything in <head>
         response = requests.get(
             url,
             headers=ProductScraper.HEADERS,
             timeout=timeout,
-            allow_redirects=True
+            allow_redirects=True,
+            stream=True
         )
-        response.raise_for_status()
-        
-        # Parse HTML
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Strategy 1: JSON-LD (most reliable)
-        print("[Product Scraper] Trying JSON-LD extraction...")
-        result = ProductScraper._extract_from_json_ld(soup)
-        
-        # Strategy 2: Meta tags (Open Graph)
-        print("[Product Scraper] Trying meta tags extraction...")
-        meta_data = ProductScraper._extract_from_meta_tags(soup)
-        for key, value in meta_data.items():
-            if value and not result.get(key):
-                result[key] = value
-        
-        # Strategy 3: Platform-specific extraction
-        print("[Product Scraper] Trying platform-specific extraction...")
-        platform_data = ProductScraper._extract_platform_specific(soup, url)
-        for key, value in platform_data.items():
-            if value and not result.get(key):
-                result[key] = value
-        
-        # Strategy 4: Generic HTML patterns (fallback)
-        print("[Product Scraper] Trying HTML pattern extraction...")
-        html_data = ProductScraper._extract_from_html(soup, url)
-        for key, value in html_data.items():
-            if value and not result.get(key):
-                result[key] = value
-        
-        # Ensure all expected keys exist
-        final_result = {
-            "thumbnail": result.get("thumbnail"),
-            "title": result.get("title"),
-            "price": result.get("price"),
-            "rating": result.get("rating"),
-            "review_count": result.get("review_count"),
-            "brand": result.get("brand"),
-            "in_stock": result.get("in_stock")
-        }
+        try:
+            response.raise_for_status()
+            
+            extractor = StreamingProductExtractor(
+                url, encoding=_charset_from_content_type(response.headers.get('Content-Type'))
+            )
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                if extractor.feed(chunk):
+                    break
+        finally:
+            response.close()
+        
+        final_result = extractor.finish()
+        print(f"[Product Scraper] Read {extractor.bytes_read} bytes (stopped early: {extractor.done})")
         
         print(f"[Product Scraper] ✓ Extracted: {list(k for k, v in final_result.items() if v)}")
         return final_result
@@ -420,16 +605,10 @@ def get_product_price(url: str) -> Optional[str]:
 async def extract_product_info_async(url: str, timeout: int = 10) -> Dict[str, Optional[str]]:
     """
     Async version of extract_product_info for use in async contexts
+    Uses the shared, cached product info service (no thread per URL)
     """
-    loop = asyncio.get_event_loop()
-    with ThreadPoolExecutor() as executor:
-        result = await loop.run_in_executor(
-            executor,
-            extract_product_info,
-            url,
-            timeout
-        )
-    return result
+    from backend.services.product_info_service import product_info_service
+    return await product_info_service.get(url, timeout=timeout)
 
 
 # Batch extraction for multiple URLs
@@ -440,14 +619,8 @@ async def extract_multiple_products(urls: List[str], timeout: int = 10) -> List[
     Returns:
         List of product info dicts in the same order as input URLs
     """
-    tasks = [extract_product_info_async(url, timeout) for url in urls]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    # Convert exceptions to empty results
-    return [
-        result if not isinstance(result, Exception) else _empty_result()
-        for result in results
-    ]
+    from backend.services.product_info_service import product_info_service
+    return await product_info_service.get_many(urls, timeout=timeout)
 
 
 # CLI testing
@@ -1,75 +1,176 @@
 """
 Progress Tracking Service
 Manages real-time automation progress updates via WebSocket
+- Per-session channels: concurrent runs keep separate state and subscribers
+- Publishing never awaits a client: messages go to bounded per-client queues
+  drained by one sender task per client
+- A client that falls behind gets intermediate progress messages coalesced
+  (latest wins); if it still can't keep up it is resynced with a state snapshot
 """
-from typing import List, Optional
-from fastapi import WebSocket
+from typing import Dict, List, Optional
+from fastapi import WebSocket, WebSocketDisconnect
 import asyncio
-import json
+import logging
 from datetime import datetime
 
-class ProgressTracker:
-    """Singleton service for tracking automation progress"""
-    
-    def __init__(self):
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION = "default"
+
+# Messages buffered per client before coalescing kicks in
+CLIENT_QUEUE_SIZE = 32
+
+# Intermediate messages that may be collapsed to the latest one for a slow client
+COALESCIBLE_TYPES = {"progress"}
+
+
+class SessionProgress:
+    """Progress state of one automation run"""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
         self.current_phase: Optional[str] = None
         self.current_step: int = 0
         self.total_steps: int = 0
         self.steps_completed: List[str] = []
         self.is_running: bool = False
         self.error: Optional[str] = None
-        self.websockets: List[WebSocket] = []
-    
-    async def connect(self, websocket: WebSocket):
-        """Add a WebSocket connection"""
-        await websocket.accept()
-        self.websockets.append(websocket)
-        
-        # Send current state immediately
-        await self.send_current_state(websocket)
-    
-    def disconnect(self, websocket: WebSocket):
-        """Remove a WebSocket connection"""
-        if websocket in self.websockets:
-            self.websockets.remove(websocket)
-    
-    async def send_current_state(self, websocket: WebSocket):
-        """Send current progress state to a specific client"""
-        state = {
+
+    def snapshot(self) -> dict:
+        return {
             "type": "state",
+            "session_id": self.session_id,
             "current_phase": self.current_phase,
             "current_step": self.current_step,
             "total_steps": self.total_steps,
-            "steps_completed": self.steps_completed,
+            "steps_completed": list(self.steps_completed),
             "is_running": self.is_running,
             "error": self.error,
             "timestamp": datetime.now().isoformat()
         }
+
+
+class ProgressTracker:
+    """Singleton service for tracking automation progress"""
+
+    def __init__(self):
+        self.sessions: Dict[str, SessionProgress] = {}
+        self.websockets: Dict[WebSocket, str] = {}
+        self._queues: Dict[WebSocket, asyncio.Queue] = {}
+        self._senders: Dict[WebSocket, asyncio.Task] = {}
+        self.coalesced = 0
+        self.resyncs = 0
+
+    def session(self, session_id: str = DEFAULT_SESSION) -> SessionProgress:
+        """Get (or create) the state of a session"""
+        state = self.sessions.get(session_id)
+        if state is None:
+            state = self.sessions[session_id] = SessionProgress(session_id)
+        return state
+
+    # ---------------- Clients ----------------
+
+    async def connect(self, websocket: WebSocket, session_id: str = DEFAULT_SESSION):
+        """Add a WebSocket connection subscribed to one session"""
+        await websocket.accept()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.websockets[websocket] = session_id
+        self._queues[websocket] = queue
+
+        # Send current state immediately
+        queue.put_nowait(self.session(session_id).snapshot())
+        self._senders[websocket] = asyncio.create_task(self._client_sender(websocket, queue))
+        logger.info(f"Progress client connected to '{session_id}'. Total clients: {len(self.websockets)}")
+
+    async def serve_client(self, websocket: WebSocket, session_id: str = DEFAULT_SESSION):
+        """Connect a client and hold the connection until it disconnects"""
+        await self.connect(websocket, session_id)
         try:
-            await websocket.send_json(state)
-        except:
+            while True:
+                # Keep connection alive
+                await websocket.receive_text()
+        except WebSocketDisconnect:
             pass
-    
-    async def broadcast(self, message: dict):
-        """Broadcast message to all connected clients"""
-        disconnected = []
-        for ws in self.websockets:
-            try:
-                await ws.send_json(message)
-            except:
-                disconnected.append(ws)
-        
-        # Clean up disconnected clients
-        for ws in disconnected:
-            self.disconnect(ws)
-    
-    async def update_phase(self, phase: str, step: int, total: int, message: str, details: dict = None):
-        """Update current phase and broadcast to clients"""
-        self.current_phase = phase
-        self.current_step = step
-        self.total_steps = total
-        
-        update = {
+        except Exception as e:
+            logger.debug(f"Progress WebSocket error: {e}")
+        finally:
+            self.disconnect(websocket)
+
+    def disconnect(self, websocket: WebSocket):
+        """Remove a WebSocket connection"""
+        if websocket in self.websockets:
+            del self.websockets[websocket]
+            self._queues.pop(websocket, None)
+            sender = self._senders.pop(websocket, None)
+            if sender and sender is not asyncio.current_task():
+                sender.cancel()
+            logger.info(f"Progress client disconnected. Total clients: {len(self.websockets)}")
+
+    async def send_current_state(self, websocket: WebSocket):
+        """Queue current progress state for a specific client"""
+        session_id = self.websockets.get(websocket)
+        queue = self._queues.get(websocket)
+        if queue is not None:
+            self._offer(queue, self.session(session_id).snapshot(), session_id)
+
+    async def _client_sender(self, websocket: WebSocket, queue: asyncio.Queue):
+        """Drain one client's queue; a slow client only delays itself"""
+        try:
+            while True:
+                message = await queue.get()
+                await websocket.send_json(message)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.debug(f"Failed to send progress to client: {e}")
+            self.disconnect(websocket)
+
+    # ---------------- Publishing ----------------
+
+    def publish(self, message: dict, session_id: str = DEFAULT_SESSION):
+        """Queue a message for every client of a session. Never blocks."""
+        message.setdefault("session_id", session_id)
+        for websocket, subscribed in list(self.websockets.items()):
+            if subscribed == session_id:
+                self._offer(self._queues[websocket], message, session_id)
+
+    async def broadcast(self, message: dict, session_id: str = DEFAULT_SESSION):
+        """Broadcast message to all clients of a session (non-blocking, kept for compatibility)"""
+        self.publish(message, session_id)
+
+    def _offer(self, queue: asyncio.Queue, message: dict, session_id: str):
+        """Put a message in a client queue, coalescing or resyncing when the client is behind"""
+        if queue.full():
+            pending = []
+            while not queue.empty():
+                pending.append(queue.get_nowait())
+
+            if message.get("type") in COALESCIBLE_TYPES:
+                # The new progress message supersedes queued ones
+                keep = [m for m in pending if m.get("type") not in COALESCIBLE_TYPES]
+            else:
+                # Keep only the newest of the queued progress messages
+                last_progress = next((m for m in reversed(pending) if m.get("type") in COALESCIBLE_TYPES), None)
+                keep = [m for m in pending if m.get("type") not in COALESCIBLE_TYPES or m is last_progress]
+            self.coalesced += len(pending) - len(keep)
+
+            if len(keep) >= CLIENT_QUEUE_SIZE:
+                # Only important messages queued - replace the backlog with one state snapshot
+                self.resyncs += 1
+                keep = [self.session(session_id).snapshot()]
+            for m in keep:
+                queue.put_nowait(m)
+        queue.put_nowait(message)
+
+    def publish_phase(self, phase: str, step: int, total: int, message: str,
+                      details: dict = None, session_id: str = DEFAULT_SESSION):
+        """Update current phase and publish to clients (sync, for the orchestrator)"""
+        state = self.session(session_id)
+        state.current_phase = phase
+        state.current_step = step
+        state.total_steps = total
+
+        self.publish({
             "type": "progress",
             "phase": phase,
             "step": step,
@@ -77,68 +178,76 @@ class ProgressTracker:
             "message": message,
             "details": details or {},
             "timestamp": datetime.now().isoformat()
-        }
-        
-        await self.broadcast(update)
-    
-    async def complete_step(self, step_name: str):
+        }, session_id)
+
+    # ---------------- Run lifecycle ----------------
+
+    async def update_phase(self, phase: str, step: int, total: int, message: str,
+                           details: dict = None, session_id: str = DEFAULT_SESSION):
+        """Update current phase and broadcast to clients"""
+        self.publish_phase(phase, step, total, message, details, session_id)
+
+    async def complete_step(self, step_name: str, session_id: str = DEFAULT_SESSION):
         """Mark a step as completed"""
-        if step_name not in self.steps_completed:
-            self.steps_completed.append(step_name)
-            self.current_step += 1
-            
-            await self.broadcast({
+        state = self.session(session_id)
+        if step_name not in state.steps_completed:
+            state.steps_completed.append(step_name)
+            state.current_step += 1
+
+            self.publish({
                 "type": "step_completed",
                 "step": step_name,
-                "total_completed": len(self.steps_completed),
+                "total_completed": len(state.steps_completed),
                 "timestamp": datetime.now().isoformat()
-            })
-    
-    async def start_automation(self, total_steps: int = 10):
+            }, session_id)
+
+    async def start_automation(self, total_steps: int = 10, session_id: str = DEFAULT_SESSION):
         """Mark automation as started"""
-        self.is_running = True
-        self.current_step = 0
-        self.total_steps = total_steps
-        self.steps_completed = []
-        self.error = None
-        
-        await self.broadcast({
+        state = self.session(session_id)
+        state.is_running = True
+        state.current_step = 0
+        state.total_steps = total_steps
+        state.steps_completed = []
+        state.error = None
+
+        self.publish({
             "type": "automation_started",
             "total_steps": total_steps,
             "timestamp": datetime.now().isoformat()
-        })
-    
-    async def complete_automation(self, success: bool = True, final_url: str = None):
+        }, session_id)
+
+    async def complete_automation(self, success: bool = True, final_url: str = None,
+                                  session_id: str = DEFAULT_SESSION):
         """Mark automation as completed"""
-        self.is_running = False
-        
-        await self.broadcast({
+        state = self.session(session_id)
+        state.is_running = False
+
+        self.publish({
             "type": "automation_completed",
             "success": success,
             "final_url": final_url,
-            "steps_completed": len(self.steps_completed),
+            "steps_completed": len(state.steps_completed),
             "timestamp": datetime.now().isoformat()
-        })
-    
-    async def report_error(self, error: str):
+        }, session_id)
+
+    async def report_error(self, error: str, session_id: str = DEFAULT_SESSION):
         """Report an error"""
-        self.error = error
-        self.is_running = False
-        
-        await self.broadcast({
+        state = self.session(session_id)
+        state.error = error
+        state.is_running = False
+
+        self.publish({
             "type": "error",
             "error": error,
             "timestamp": datetime.now().isoformat()
-        })
-    
-    def reset(self):
-        """Reset progress state"""
-        self.current_phase = None
-        self.current_step = 0
-        self.total_steps = 0
-        self.steps_completed = []
-        self.is_running = False
-        self.error = None
+        }, session_id)
+
+    def reset(self, session_id: str = DEFAULT_SESSION):
+        """Reset progress state (drops the session once nobody is watching it)"""
+        if session_id in self.websockets.values():
+            self.sessions[session_id] = SessionProgress(session_id)
+        else:
+            self.sessions.pop(session_id, None)
 
 # Global instance
 progress_tracker = ProgressTracker()
@@ -1,173 +1,253 @@
 """
 Screenshot Service - Live Browser Screenshot Streaming
-Captures screenshots every 2 seconds during automation
-Streams to frontend via WebSocket
-Auto-cleanup when automation stops
+Streams the automation page to the frontend via WebSocket using CDP
+Page.startScreencast (in-memory JPEG frames, sent only when the page changes).
+Falls back to in-memory JPEG polling when CDP is not available (non-Chromium).
+Each client has a small bounded queue; stale frames are dropped, never buffered.
 """
 import asyncio
 import base64
+import hashlib
 import logging
-import shutil
 import time
-from pathlib import Path
-from typing import List, Optional
-from fastapi import WebSocket
+from typing import Dict, Optional
+from fastapi import WebSocket, WebSocketDisconnect
 
 logger = logging.getLogger(__name__)
 
+# (JPEG quality, everyNthFrame) from best to cheapest; stepped by client backlog
+QUALITY_LEVELS = [(80, 1), (65, 2), (50, 3), (35, 4)]
+
+# Frames buffered per client - older frames are dropped when a client falls behind
+CLIENT_QUEUE_SIZE = 2
+
+# Screencast frame size cap
+MAX_FRAME_WIDTH = 1280
+MAX_FRAME_HEIGHT = 800
+
+# Polling fallback interval (seconds)
+POLL_INTERVAL = 1.0
+
+# How often the adaptive quality is re-evaluated (seconds)
+ADAPT_INTERVAL = 3.0
+
 
 class ScreenshotService:
     """Service for capturing and streaming browser screenshots"""
-    
+
     def __init__(self):
-        # Use absolute path in backend directory for consistent location
-        backend_dir = Path(__file__).parent.parent
-        self.screenshot_dir = backend_dir / "temp_screenshots"
         self.is_capturing = False
-        self.current_screenshot_path: Optional[Path] = None
-        self.websockets: List[WebSocket] = []
+        self.latest_frame: Optional[Dict] = None
+        self.websockets: Dict[WebSocket, asyncio.Queue] = {}
+        self._senders: Dict[WebSocket, asyncio.Task] = {}
         self.is_locked = False
+        self._level = 0
+        self._dropped = 0
+        self._last_digest: Optional[str] = None
+
 
-        
     async def start_capture(self, page):
-        """Start capturing screenshots every 2 seconds"""
+        """Start streaming the page (CDP screencast, polling fallback)"""
         self.is_capturing = True
-        self.screenshot_dir.mkdir(exist_ok=True)
-        logger.info("Screenshot capture started (2s interval)")
-        
+        self._level = 0
+        self._dropped = 0
+
         try:
-            while self.is_capturing:
-                try:
-                    # Generate unique filename
-                    screenshot_path = self.screenshot_dir / f"screen_{int(time.time() * 1000)}.png"
-                    
-                    # Capture screenshot
-                    await page.screenshot(path=str(screenshot_path))
-                    self.current_screenshot_path = screenshot_path
-                    
-                    # Broadcast to all connected clients
-                    await self._broadcast_screenshot()
-                    
-                    # Wait 2 seconds before next capture
-                    await asyncio.sleep(2)
-                    
-                except Exception as e:
-                    logger.debug(f"Screenshot capture error: {e}")
-                    await asyncio.sleep(2)
-                    
+            cdp = None
+            try:
+                cdp = await page.context.new_cdp_session(page)
+            except Exception as e:
+                logger.info(f"CDP screencast not available ({e}) - using polling fallback")
+
+            if cdp:
+                await self._run_screencast(cdp)
+            else:
+                await self._run_polling(page)
+
         except asyncio.CancelledError:
             logger.info("Screenshot capture cancelled")
             self.stop_capture()
-    
-    def stop_capture(self):
-        """Stop capturing and cleanup all screenshots"""
-        self.is_capturing = False
-        self._cleanup_screenshots()
-        logger.info("Screenshot capture stopped and cleaned up")
-    
-    def _cleanup_screenshots(self):
-        """Delete all screenshots"""
+
+    async def _run_screencast(self, cdp):
+        """Stream frames pushed by Page.startScreencast, adapting quality to client backlog"""
+
+        def on_frame(params):
+            # Ack first so Chrome keeps sending, then fan out
+            asyncio.create_task(self._ack_frame(cdp, params.get('sessionId')))
+            self._publish(params.get('data'), params.get('metadata', {}).get('timestamp'))
+
+        cdp.on('Page.screencastFrame', on_frame)
+        await self._start_screencast(cdp)
+        logger.info("Screenshot capture started (CDP screencast)")
+
+        try:
+            while self.is_capturing:
+                await asyncio.sleep(ADAPT_INTERVAL)
+                if self._adapt_level():
+                    await cdp.send('Page.stopScreencast')
+                    await self._start_screencast(cdp)
+        finally:
+            try:
+                await cdp.send('Page.stopScreencast')
+                await cdp.detach()
+            except Exception:
+                pass
+
+    async def _start_screencast(self, cdp):
+        quality, every_nth = QUALITY_LEVELS[self._level]
+        await cdp.send('Page.startScreencast', {
+            'format': 'jpeg',
+            'quality': quality,
+            'maxWidth': MAX_FRAME_WIDTH,
+            'maxHeight': MAX_FRAME_HEIGHT,
+            'everyNthFrame': every_nth
+        })
+        logger.debug(f"Screencast started (quality {quality}, every {every_nth} frame(s))")
+
+    async def _ack_frame(self, cdp, session_id):
         try:
-            if self.screenshot_dir.exists():
-                shutil.rmtree(self.screenshot_dir)
-                logger.info(f"Deleted screenshot directory: {self.screenshot_dir}")
+            await cdp.send('Page.screencastFrameAck', {'sessionId': session_id})
         except Exception as e:
-            logger.error(f"Failed to cleanup screenshots: {e}")
-    
+            logger.debug(f"Screencast ack error: {e}")
+
+    async def _run_polling(self, page):
+        """Fallback: in-memory JPEG screenshots, published only when the image changed"""
+        logger.info(f"Screenshot capture started (polling every {POLL_INTERVAL}s)")
+        while self.is_capturing:
+            try:
+                quality, _ = QUALITY_LEVELS[self._level]
+                image = await page.screenshot(type='jpeg', quality=quality)
+                self._publish(base64.b64encode(image).decode('utf-8'))
+                self._adapt_level()
+            except Exception as e:
+                logger.debug(f"Screenshot capture error: {e}")
+            await asyncio.sleep(POLL_INTERVAL)
+
+    def _publish(self, data: Optional[str], timestamp: Optional[float] = None):
+        """Store the latest frame and queue it for every client (skips unchanged frames)"""
+        if not data:
+            return
+        digest = hashlib.md5(data.encode('ascii')).hexdigest()
+        if digest == self._last_digest:
+            return
+        self._last_digest = digest
+
+        self.latest_frame = {
+            "type": "screenshot",
+            "image": f"data:image/jpeg;base64,{data}",
+            "timestamp": timestamp or time.time()
+        }
+        for queue in self.websockets.values():
+            self._offer(queue, self.latest_frame)
+
+    def _offer(self, queue: asyncio.Queue, message: Dict):
+        """Put a message in a client queue; when full, stale frames are dropped (control messages kept)"""
+        if queue.full():
+            pending = []
+            while not queue.empty():
+                pending.append(queue.get_nowait())
+            keep = [m for m in pending if m.get("type") != "screenshot"][-(CLIENT_QUEUE_SIZE - 1):]
+            if message.get("type") == "screenshot":
+                self._dropped += len(pending) - len(keep)
+            for m in keep:
+                queue.put_nowait(m)
+        queue.put_nowait(message)
+
+    def _adapt_level(self) -> bool:
+        """Step quality down when clients drop frames, back up when they keep up. Returns True if changed."""
+        dropped, self._dropped = self._dropped, 0
+        old_level = self._level
+        if dropped > 0 and self._level < len(QUALITY_LEVELS) - 1:
+            self._level += 1
+        elif dropped == 0 and self._level > 0:
+            self._level -= 1
+        if self._level != old_level:
+            logger.debug(f"Live view quality level {old_level} -> {self._level} ({dropped} dropped)")
+        return self._level != old_level
+
+    def stop_capture(self):
+        """Stop capturing and release the last frame"""
+        self.is_capturing = False
+        self.latest_frame = None
+        self._last_digest = None
+        logger.info("Screenshot capture stopped")
+
     async def connect_client(self, websocket: WebSocket):
         """Add a WebSocket connection from frontend"""
         await websocket.accept()
-        self.websockets.append(websocket)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.websockets[websocket] = queue
         logger.info(f"Live browser client connected. Total clients: {len(self.websockets)}")
-        
+
         # Send current state immediately
         await websocket.send_json({
             "type": "connected",
             "locked": self.is_locked
         })
-        
-        # Send current screenshot if available
-        if self.current_screenshot_path and self.current_screenshot_path.exists():
-            await self._send_screenshot(websocket, self.current_screenshot_path)
-    
+
+        # Send current frame if available
+        if self.latest_frame:
+            self._offer(queue, self.latest_frame)
+
+        self._senders[websocket] = asyncio.create_task(self._client_sender(websocket, queue))
+
+    async def serve_client(self, websocket: WebSocket):
+        """Connect a client and hold the connection until it disconnects (no polling loop)"""
+        await self.connect_client(websocket)
+        try:
+            while True:
+                # Frontend never sends; this only returns/raises on disconnect
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+        except Exception as e:
+            logger.debug(f"Live browser WebSocket error: {e}")
+        finally:
+            self.disconnect_client(websocket)
+
+    async def _client_sender(self, websocket: WebSocket, queue: asyncio.Queue):
+        """Drain one client's queue; a slow client only delays itself"""
+        try:
+            while True:
+                message = await queue.get()
+                await websocket.send_json(message)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.debug(f"Failed to send screenshot to client: {e}")
+            self.disconnect_client(websocket)
+
     def disconnect_client(self, websocket: WebSocket):
         """Remove a WebSocket connection"""
         if websocket in self.websockets:
-            self.websockets.remove(websocket)
+            del self.websockets[websocket]
+            sender = self._senders.pop(websocket, None)
+            if sender and sender is not asyncio.current_task():
+                sender.cancel()
             logger.info(f"Live browser client disconnected. Total clients: {len(self.websockets)}")
-    
-    async def _broadcast_screenshot(self):
-        """Broadcast current screenshot to all connected clients"""
-        if not self.current_screenshot_path or not self.current_screenshot_path.exists():
-            return
-        
-        disconnected = []
-        for ws in self.websockets:
-            try:
-                await self._send_screenshot(ws, self.current_screenshot_path)
-            except Exception as e:
-                logger.debug(f"Failed to send screenshot to client: {e}")
-                disconnected.append(ws)
-        
-        # Clean up disconnected clients
-        for ws in disconnected:
-            self.disconnect_client(ws)
-    
-    async def _send_screenshot(self, websocket: WebSocket, screenshot_path: Path):
-        """Send screenshot as base64 to a specific client"""
-        try:
-            # Read and encode screenshot
-            with open(screenshot_path, "rb") as f:
-                image_data = base64.b64encode(f.read()).decode("utf-8")
-            
-            # Send to client
-            await websocket.send_json({
-                "type": "screenshot",
-                "image": f"data:image/png;base64,{image_data}",
-                "timestamp": time.time()
-            })
-        except Exception as e:
-            logger.debug(f"Error sending screenshot: {e}")
-            raise
-    
+
     def lock_browser(self):
         """Lock browser to prevent user interaction during automation"""
         self.is_locked = True
         logger.info("Browser locked - automation running")
         # Broadcast lock state
-        try:
-            asyncio.create_task(self._broadcast_lock_state())
-        except RuntimeError:
-            pass
-    
+        self._broadcast_lock_state()
+
     def unlock_browser(self):
         """Unlock browser to allow user interaction"""
         self.is_locked = False
         logger.info("Browser unlocked - user can interact")
         # Broadcast unlock state
-        try:
-            asyncio.create_task(self._broadcast_lock_state())
-        except RuntimeError:
-            pass
-    
-    async def _broadcast_lock_state(self):
-        """Broadcast current lock state to all connected clients"""
+        self._broadcast_lock_state()
+
+    def _broadcast_lock_state(self):
+        """Queue current lock state for all connected clients"""
         message = {
             "type": "lock_state",
             "locked": self.is_locked
         }
-        
-        disconnected = []
-        for ws in self.websockets:
-            try:
-                await ws.send_json(message)
-            except Exception as e:
-                logger.debug(f"Failed to send lock state to client: {e}")
-                disconnected.append(ws)
-        
-        # Clean up disconnected clients
-        for ws in disconnected:
-            self.disconnect_client(ws)
+        for queue in self.websockets.values():
+            self._offer(queue, message)
 
 
 # Global instance
@@ -0,0 +1,121 @@
+"""
+SQLite Connection Pool
+Shared async storage layer for the backend SQLite stores (addresses, wallet)
+- Long-lived aiosqlite connections (no connect/PRAGMA setup per request)
+- WAL journal mode so reads never wait for the writer
+- Per-connection prepared statement cache (constant SQL strings are compiled once)
+- Writes serialized in-process and run as IMMEDIATE transactions
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Iterable, List, Optional
+
+import aiosqlite
+
+# Applied to every pooled connection
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",     # Durable across app crashes in WAL mode, fewer fsyncs
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",       # ~8 MB page cache per connection
+)
+
+DEFAULT_POOL_SIZE = 4
+
+# sqlite3 keeps this many compiled statements per connection
+STATEMENT_CACHE_SIZE = 256
+
+
+class SQLitePool:
+    """Pool of long-lived aiosqlite connections for one database file"""
+
+    def __init__(self, db_path, size: int = DEFAULT_POOL_SIZE):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.size = max(1, size)
+        self._connections: Optional[asyncio.Queue] = None
+        self._all: List[aiosqlite.Connection] = []
+        self._open_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+
+    async def _open_connection(self) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(
+            self.db_path, cached_statements=STATEMENT_CACHE_SIZE, isolation_level=None
+        )
+        db.row_factory = aiosqlite.Row
+        for pragma in PRAGMAS:
+            await db.execute(pragma)
+        return db
+
+    async def open(self):
+        """Open all pooled connections (idempotent)"""
+        if self._connections is not None:
+            return
+        async with self._open_lock:
+            if self._connections is not None:
+                return
+            connections = asyncio.Queue()
+            for _ in range(self.size):
+                db = await self._open_connection()
+                self._all.append(db)
+                connections.put_nowait(db)
+            self._connections = connections
+
+    async def close(self):
+        """Close all pooled connections"""
+        for db in self._all:
+            try:
+                await db.close()
+            except Exception:
+                pass
+        self._all = []
+        self._connections = None
+
+    @asynccontextmanager
+    async def connection(self):
+        """Borrow a connection (autocommit mode - use transaction() for writes)"""
+        await self.open()
+        db = await self._connections.get()
+        try:
+            yield db
+        finally:
+            self._connections.put_nowait(db)
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Borrow a connection inside BEGIN IMMEDIATE ... COMMIT (rolled back on error)"""
+        async with self._write_lock:
+            async with self.connection() as db:
+                await db.execute("BEGIN IMMEDIATE")
+                try:
+                    yield db
+                except BaseException:
+                    await db.execute("ROLLBACK")
+                    raise
+                else:
+                    await db.execute("COMMIT")
+
+    async def fetchone(self, sql: str, params: Iterable[Any] = ()) -> Optional[aiosqlite.Row]:
+        async with self.connection() as db:
+            async with db.execute(sql, tuple(params)) as cursor:
+                return await cursor.fetchone()
+
+    async def fetchall(self, sql: str, params: Iterable[Any] = ()) -> List[aiosqlite.Row]:
+        async with self.connection() as db:
+            async with db.execute(sql, tuple(params)) as cursor:
+                return await cursor.fetchall()
+
+    async def execute(self, sql: str, params: Iterable[Any] = ()) -> int:
+        """Run a single write statement in its own transaction. Returns rowcount."""
+        async with self.transaction() as db:
+            async with db.execute(sql, tuple(params)) as cursor:
+                return cursor.rowcount
+
+    async def executescript(self, script: str):
+        """Run schema DDL (CREATE TABLE/INDEX IF NOT EXISTS ...)"""
+        async with self._write_lock:
+            async with self.connection() as db:
+                await db.executescript(script)
@@ -1,120 +1,241 @@
 """Automatic Variant Detection from Product Pages"""
 
 import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
 from playwright.async_api import async_playwright
 
 
-async def detect_variants(url):
+# Resource types that are never needed to read variant controls
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font'}
+
+# Analytics/ads hosts blocked for speed
+BLOCKED_HOSTS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'facebook.net',
+    'connect.facebook.com', 'hotjar.com', 'clarity.ms', 'segment.io', 'criteo.com',
+    'taboola.com', 'outbrain.com', 'tiktok.com', 'snapchat.com', 'bing.com/bat',
+)
+
+# Pages kept open in the shared browser
+DEFAULT_POOL_SIZE = 3
+
+# Seconds a detection result is reused
+RESULT_TTL = 15 * 60
+# Detection results kept (least recently used are dropped first)
+RESULT_CACHE_SIZE = 256
+
+# Any of these means variant controls have rendered
+VARIANT_CONTROLS_SELECTOR = (
+    'select[name*="size" i], select[id*="size" i], [class*="size"] button, [data-testid*="size"] button, '
+    'select[name*="color" i], [class*="color"] button, [data-testid*="color"] button'
+)
+
+_DETECT_VARIANTS_JS = """
+    () => {
+        const variants = {};
+        
+        // Detect size options
+        const sizeSelectors = [
+            'select[name*="size" i]',
+            'select[id*="size" i]',
+            '[class*="size"] button',
+            '[data-testid*="size"] button'
+        ];
+        
+        for (const selector of sizeSelectors) {
+            const elements = document.querySelectorAll(selector);
+            if (elements.length > 0) {
+                const sizes = [];
+                elements.forEach(el => {
+                    const text = el.textContent?.trim() || el.value;
+                    if (text && text.length < 10) sizes.push(text);
+                });
+                if (sizes.length > 0) {
+                    variants.size = {required: true, options: sizes};
+                    break;
+                }
+            }
+        }
+        
+        // Detect color options
+        const colorSelectors = [
+            'select[name*="color" i]',
+            '[class*="color"] button',
+            '[data-testid*="color"] button'
+        ];
+        
+        for (const selector of colorSelectors) {
+            const elements = document.querySelectorAll(selector);
+            if (elements.length > 0) {
+                const colors = [];
+                elements.forEach(el => {
+                    const text = el.textContent?.trim() || el.getAttribute('aria-label') || el.value;
+                    if (text && text.length < 30) colors.push(text);
+                });
+                if (colors.length > 0) {
+                    variants.color = {required: true, options: colors};
+                    break;
+                }
+            }
+        }
+        
+        // Get product name
+        const nameSelectors = ['h1', '[class*="product-name"]', '[class*="product-title"]'];
+        let productName = '';
+        for (const selector of nameSelectors) {
+            const el = document.querySelector(selector);
+            if (el) {
+                productName = el.textContent?.trim();
+                break;
+            }
+        }
+        
+        // Get price
+        const priceSelectors = ['[class*="price"]', '[data-testid*="price"]'];
+        let price = '';
+        for (const selector of priceSelectors) {
+            const el = document.querySelector(selector);
+            if (el && el.textContent?.includes('$')) {
+                price = el.textContent?.trim();
+                break;
+            }
+        }
+        
+        return {
+            variants: variants,
+            product_name: productName,
+            price: price
+        };
+    }
+"""
+
+
+class HeadlessBrowserPool:
+    """Long-lived headless Chromium with a bounded pool of reusable pages"""
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE):
+        self.pool_size = pool_size
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._pages: Optional[asyncio.Queue] = None
+        self._start_lock = asyncio.Lock()
+
+    async def _ensure_started(self):
+        if self._browser and self._browser.is_connected():
+            return
+        async with self._start_lock:
+            if self._browser and self._browser.is_connected():
+                return
+            await self.close()
+
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=True)
+            self._context = await self._browser.new_context()
+            await self._context.route('**/*', self._block_resources)
+
+            self._pages = asyncio.Queue()
+            for _ in range(self.pool_size):
+                self._pages.put_nowait(await self._context.new_page())
+            print(f"[Variant Detector] Headless browser started ({self.pool_size} pages)")
+
+    @staticmethod
+    async def _block_resources(route):
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES or any(host in request.url for host in BLOCKED_HOSTS):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a page from the pool (waits when all pages are busy)"""
+        await self._ensure_started()
+        pages = self._pages
+        page = await pages.get()
+        try:
+            yield page
+        finally:
+            if page.is_closed():
+                # Page crashed - replace it so the pool keeps its size
+                try:
+                    page = await self._context.new_page()
+                except Exception:
+                    page = None
+            else:
+                try:
+                    await page.goto('about:blank')
+                except Exception:
+                    pass
+            if page is not None and pages is self._pages:
+                pages.put_nowait(page)
+
+    async def close(self):
+        """Shut down the shared browser"""
+        try:
+            if self._browser:
+                await self._browser.close()
+            if self._playwright:
+                await self._playwright.stop()
+        except Exception:
+            pass
+        self._playwright = self._browser = self._context = self._pages = None
+
+
+browser_pool = HeadlessBrowserPool()
+
+_results: 'OrderedDict[str, Tuple[float, Dict]]' = OrderedDict()
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+async def detect_variants(url, use_cache: bool = True):
     """
     Detect available variants from product page
     Returns: {'variants': {...}, 'product_name': str, 'price': str}
     """
-    
+    if use_cache:
+        cached = _results.get(url)
+        if cached and time.time() - cached[0] < RESULT_TTL:
+            _results.move_to_end(url)
+            return cached[1]
+
+    # Concurrent requests for the same URL share one page load
+    future = _inflight.get(url)
+    if future is None:
+        future = asyncio.ensure_future(_detect_variants_uncached(url))
+        _inflight[url] = future
+        future.add_done_callback(lambda _: _inflight.pop(url, None))
+    result = await asyncio.shield(future)
+
+    if not result.get('error'):
+        _results[url] = (time.time(), result)
+        _results.move_to_end(url)
+        while len(_results) > RESULT_CACHE_SIZE:
+            _results.popitem(last=False)
+    return result
+
+
+async def shutdown():
+    """Close the shared headless browser and drop cached results (app shutdown)"""
+    _results.clear()
+    await browser_pool.close()
+
+
+async def _detect_variants_uncached(url):
     try:
-        async with async_playwright() as p:
-            try:
-                browser = await p.chromium.launch(headless=True)
-            except Exception as e:
-                print(f"Playwright launch failed: {e}")
-                return {'variants': {}, 'product_name': '', 'price': '', 'error': f"Browser launch failed: {e}"}
-                
-            page = await browser.new_page()
-            
+        async with browser_pool.page() as page:
+            await page.goto(url, wait_until='domcontentloaded', timeout=15000)
+
+            # Wait for variant controls instead of a fixed sleep
             try:
-                await page.goto(url, wait_until='domcontentloaded', timeout=15000)
-                await asyncio.sleep(2)
-                
-                # Extract variants using JavaScript
-                result = await page.evaluate("""
-                    () => {
-                        const variants = {};
-                        
-                        // Detect size options
-                        const sizeSelectors = [
-                            'select[name*="size" i]',
-                            'select[id*="size" i]',
-                            '[class*="size"] button',
-                            '[data-testid*="size"] button'
-                        ];
-                        
-                        for (const selector of sizeSelectors) {
-                            const elements = document.querySelectorAll(selector);
-                            if (elements.length > 0) {
-                                const sizes = [];
-                                elements.forEach(el => {
-                                    const text = el.textContent?.trim() || el.value;
-                                    if (text && text.length < 10) sizes.push(text);
-                                });
-                                if (sizes.length > 0) {
-                                    variants.size = {required: true, options: sizes};
-                                    break;
-                                }
-                            }
-                        }
-                        
-                        // Detect color options
-                        const colorSelectors = [
-                            'select[name*="color" i]',
-                            '[class*="color"] button',
-                            '[data-testid*="color"] button'
-                        ];
-                        
-                        for (const selector of colorSelectors) {
-                            const elements = document.querySelectorAll(selector);
-                            if (elements.length > 0) {
-                                const colors = [];
-                                elements.forEach(el => {
-                                    const text = el.textContent?.trim() || el.getAttribute('aria-label') || el.value;
-                                    if (text && text.length < 30) colors.push(text);
-                                });
-                                if (colors.length > 0) {
-                                    variants.color = {required: true, options: colors};
-                                    break;
-                                }
-                            }
-                        }
-                        
-                        // Get product name
-                        const nameSelectors = ['h1', '[class*="product-name"]', '[class*="product-title"]'];
-                        let productName = '';
-                        for (const selector of nameSelectors) {
-                            const el = document.querySelector(selector);
-                            if (el) {
-                                productName = el.textContent?.trim();
-                                break;
-                            }
-                        }
-                        
-                        // Get price
-                        const priceSelectors = ['[class*="price"]', '[data-testid*="price"]'];
-                        let price = '';
-                        for (const selector of priceSelectors) {
-                            const el = document.querySelector(selector);
-                            if (el && el.textContent?.includes('$')) {
-                                price = el.textContent?.trim();
-                                break;
-                            }
-                        }
-                        
-                        return {
-                            variants: variants,
-                            product_name: productName,
-                            price: price
-                        };
-                    }
-                """)
-                
-                await browser.close()
-                return result
-                
-            except Exception as e:
-                await browser.close()
-                return {
-                    'variants': {},
-                    'product_name': '',
-                    'price': '',
-                    'error': str(e)
-                }
+                await page.wait_for_selector(VARIANT_CONTROLS_SELECTOR, state='attached', timeout=5000)
+            except Exception:
+                pass  # Product without variants (or unknown markup) - read what is there
+
+            return await page.evaluate(_DETECT_VARIANTS_JS)
+
     except Exception as e:
         return {
             'variants': {},
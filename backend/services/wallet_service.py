@@ -2,7 +2,6 @@
 Wallet Service
 Manages encrypted payment methods with SQLite storage
 """
-import aiosqlite
 import uuid
 import json
 from pathlib import Path
@@ -15,6 +14,7 @@ import base64
 from backend.models.wallet import (
     PaymentMethod, CardCreate, UPICreate, EncryptedPaymentData
 )
+from backend.services.sqlite_pool import SQLitePool
 
 class WalletService:
     """Service for managing encrypted payment methods"""
@@ -22,6 +22,7 @@ class WalletService:
     def __init__(self, db_path: str = "backend/storage/wallet.db", encryption_key: str = None):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.pool = SQLitePool(self.db_path)
         
         # Use provided key or generate a default one (in production, user should provide)
         if encryption_key:
@@ -44,19 +45,36 @@ class WalletService:
     
     async def initialize(self):
         """Initialize database schema"""
-        async with aiosqlite.connect(self.db_path) as db:
+        await self.pool.executescript("""
+            CREATE TABLE IF NOT EXISTS payment_methods (
+                id TEXT PRIMARY KEY,
+                type TEXT NOT NULL,
+                encrypted_data TEXT NOT NULL,
+                label TEXT NOT NULL,
+                masked_data TEXT NOT NULL,
+                is_default INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            -- Only the (at most one) default row is indexed
+            CREATE INDEX IF NOT EXISTS idx_payment_methods_default ON payment_methods(is_default) WHERE is_default = 1;
+        """)
+    
+    async def close(self):
+        """Close pooled connections"""
+        await self.pool.close()
+    
+    async def _insert_method(self, method_id: str, method_type: str, encrypted: str,
+                             label: str, masked: str, is_default: bool):
+        """Insert a payment method, clearing the previous default in the same transaction"""
+        async with self.pool.transaction() as db:
+            if is_default:
+                await db.execute("UPDATE payment_methods SET is_default = 0 WHERE is_default = 1")
+            
             await db.execute("""
-                CREATE TABLE IF NOT EXISTS payment_methods (
-                    id TEXT PRIMARY KEY,
-                    type TEXT NOT NULL,
-                    encrypted_data TEXT NOT NULL,
-                    label TEXT NOT NULL,
-                    masked_data TEXT NOT NULL,
-                    is_default INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            await db.commit()
+                INSERT INTO payment_methods (
+                    id, type, encrypted_data, label, masked_data, is_default
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            """, (method_id, method_type, encrypted, label, masked, 1 if is_default else 0))
     
     def _mask_card(self, card_number: str) -> str:
         """Mask card number for display"""
@@ -91,17 +109,7 @@ class WalletService:
         masked = self._mask_card(card.cardNumber)
         label = card.label or f"Card ending in {card.cardNumber[-4:]}"
         
-        async with aiosqlite.connect(self.db_path) as db:
-            # If this is set as default, unset other defaults
-            if card.isDefault:
-                await db.execute("UPDATE payment_methods SET is_default = 0")
-            
-            await db.execute("""
-                INSERT INTO payment_methods (
-                    id, type, encrypted_data, label, masked_data, is_default
-                ) VALUES (?, ?, ?, ?, ?, ?)
-            """, (card_id, "card", encrypted, label, masked, 1 if card.isDefault else 0))
-            await db.commit()
+        await self._insert_method(card_id, "card", encrypted, label, masked, card.isDefault)
         
         return PaymentMethod(
             id=card_id,
@@ -119,16 +127,7 @@ class WalletService:
         encrypted = self._encrypt_data(upi_data)
         label = upi.label or upi.upiId
         
-        async with aiosqlite.connect(self.db_path) as db:
-            if upi.isDefault:
-                await db.execute("UPDATE payment_methods SET is_default = 0")
-            
-            await db.execute("""
-                INSERT INTO payment_methods (
-                    id, type, encrypted_data, label, masked_data, is_default
-                ) VALUES (?, ?, ?, ?, ?, ?)
-            """, (upi_id, "upi", encrypted, label, upi.upiId, 1 if upi.isDefault else 0))
-            await db.commit()
+        await self._insert_method(upi_id, "upi", encrypted, label, upi.upiId, upi.isDefault)
         
         return PaymentMethod(
             id=upi_id,
@@ -140,63 +139,64 @@ class WalletService:
     
     async def list_payment_methods(self) -> List[PaymentMethod]:
         """List all payment methods (masked)"""
-        methods = []
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            async with db.execute(
-                "SELECT id, type, label, masked_data, is_default FROM payment_methods ORDER BY is_default DESC, created_at DESC"
-            ) as cursor:
-                async for row in cursor:
-                    methods.append(PaymentMethod(
-                        id=row['id'],
-                        type=row['type'],
-                        label=row['label'],
-                        maskedData=row['masked_data'],
-                        isDefault=bool(row['is_default'])
-                    ))
-        return methods
+        rows = await self.pool.fetchall(
+            "SELECT id, type, label, masked_data, is_default FROM payment_methods ORDER BY is_default DESC, created_at DESC"
+        )
+        return [
+            PaymentMethod(
+                id=row['id'],
+                type=row['type'],
+                label=row['label'],
+                maskedData=row['masked_data'],
+                isDefault=bool(row['is_default'])
+            )
+            for row in rows
+        ]
     
     async def get_payment_method(self, method_id: str, decrypt: bool = False) -> Optional[dict]:
         """Get payment method (optionally decrypted)"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            async with db.execute(
-                "SELECT * FROM payment_methods WHERE id = ?", (method_id,)
-            ) as cursor:
-                row = await cursor.fetchone()
-                if row:
-                    result = {
-                        "id": row['id'],
-                        "type": row['type'],
-                        "label": row['label'],
-                        "maskedData": row['masked_data'],
-                        "isDefault": bool(row['is_default'])
-                    }
-                    
-                    if decrypt:
-                        decrypted = self._decrypt_data(row['encrypted_data'])
-                        result["decryptedData"] = decrypted
-                    
-                    return result
+        row = await self.pool.fetchone("SELECT * FROM payment_methods WHERE id = ?", (method_id,))
+        if row:
+            result = {
+                "id": row['id'],
+                "type": row['type'],
+                "label": row['label'],
+                "maskedData": row['masked_data'],
+                "isDefault": bool(row['is_default'])
+            }
+            
+            if decrypt:
+                decrypted = self._decrypt_data(row['encrypted_data'])
+                result["decryptedData"] = decrypted
+            
+            return result
         return None
     
     async def delete_payment_method(self, method_id: str) -> bool:
         """Delete a payment method"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("DELETE FROM payment_methods WHERE id = ?", (method_id,))
-            await db.commit()
-            return True
+        await self.pool.execute("DELETE FROM payment_methods WHERE id = ?", (method_id,))
+        return True
     
     async def set_default(self, method_id: str) -> Optional[PaymentMethod]:
         """Set a payment method as default"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("UPDATE payment_methods SET is_default = 0")
-            await db.execute("UPDATE payment_methods SET is_default = 1 WHERE id = ?", (method_id,))
-            await db.commit()
+        async with self.pool.transaction() as db:
+            await db.execute(
+                "UPDATE payment_methods SET is_default = 0 WHERE is_default = 1 AND id != ?", (method_id,)
+            )
+            async with db.execute(
+                "UPDATE payment_methods SET is_default = 1 WHERE id = ? RETURNING id, type, label, masked_data, is_default",
+                (method_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
         
-        method = await self.get_payment_method(method_id)
-        if method:
-            return PaymentMethod(**method)
+        if row:
+            return PaymentMethod(
+                id=row['id'],
+                type=row['type'],
+                label=row['label'],
+                maskedData=row['masked_data'],
+                isDefault=bool(row['is_default'])
+            )
         return None
 
 # Global instance (in production, create per-user with their encryption key)
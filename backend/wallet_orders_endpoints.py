@@ -9,7 +9,8 @@ Add this to backend/main.py after existing endpoints
 async def get_payment_methods(user_id: int = 1):  # TODO: Get from JWT token
     """Get all payment methods for user"""
     from checkout_ai.users import ProfileService
-    methods = ProfileService.get_payment_methods(user_id)
+    from checkout_ai.db import async_db
+    methods = await async_db.run(ProfileService.get_payment_methods, user_id)
     return methods
 
 @app.post("/api/wallet/add-card")
@@ -25,8 +26,9 @@ async def add_card(
 ):
     """Add credit/debit card to wallet"""
     from checkout_ai.users import ProfileService
+    from checkout_ai.db import async_db
     
-    card_id = ProfileService.add_card(
+    card_id = await async_db.run(ProfileService.add_card,
         user_id=user_id,
         label=label,
         card_number=card_number,
@@ -43,8 +45,9 @@ async def add_card(
 async def add_upi(user_id: int = 1, label: str = "", upi_id: str = ""):
     """Add UPI ID to wallet"""
     from checkout_ai.users import ProfileService
+    from checkout_ai.db import async_db
     
-    payment_id = ProfileService.add_upi(
+    payment_id = await async_db.run(ProfileService.add_upi,
         user_id=user_id,
         label=label,
         upi_id=upi_id
@@ -56,8 +59,9 @@ async def add_upi(user_id: int = 1, label: str = "", upi_id: str = ""):
 async def delete_payment_method(payment_id: int, user_id: int = 1):
     """Delete a payment method"""
     from checkout_ai.users import ProfileService
+    from checkout_ai.db import async_db
     
-    success = ProfileService.delete_payment_method(payment_id, user_id)
+    success = await async_db.run(ProfileService.delete_payment_method, payment_id, user_id)
     
     if not success:
         raise HTTPException(status_code=404, detail="Payment method not found")
@@ -69,9 +73,9 @@ async def delete_payment_method(payment_id: int, user_id: int = 1):
 @app.get("/api/orders")
 async def get_orders(user_id: int = 1):
     """Get order history for user"""
-    from checkout_ai.db import db
+    from checkout_ai.db import async_db
     
-    orders = db.execute_query("""
+    orders = await async_db.execute_query("""
         SELECT id, order_number, site_domain, site_name, order_url,
                total_amount, currency, status, category, ordered_at
         FROM orders
@@ -84,9 +88,9 @@ async def get_orders(user_id: int = 1):
 @app.get("/api/orders/{order_id}")
 async def get_order_details(order_id: int, user_id: int = 1):
     """Get detailed order information"""
-    from checkout_ai.db import db
+    from checkout_ai.db import async_db
     
-    order = db.fetch_one("""
+    order = await async_db.fetch_one("""
         SELECT * FROM orders WHERE id = ? AND user_id = ?
     """, (order_id, user_id))
     
@@ -94,7 +98,7 @@ async def get_order_details(order_id: int, user_id: int = 1):
         raise HTTPException(status_code=404, detail="Order not found")
     
     # Get order items
-    items = db.execute_query("""
+    items = await async_db.execute_query("""
         SELECT * FROM order_items WHERE order_id = ?
     """, (order_id,))
     
@@ -105,10 +109,10 @@ async def get_order_details(order_id: int, user_id: int = 1):
 @app.get("/api/analytics/spending")
 async def get_spending_analytics(user_id: int = 1):
     """Get spending analytics by category"""
-    from checkout_ai.db import db
+    from checkout_ai.db import async_db
     
     # Category breakdown
-    category_spending = db.execute_query("""
+    category_spending = await async_db.execute_query("""
         SELECT category, COUNT(*) as count, SUM(total_amount) as total
         FROM orders
         WHERE user_id = ? AND status = 'completed' AND category IS NOT NULL
@@ -117,7 +121,7 @@ async def get_spending_analytics(user_id: int = 1):
     """, (user_id,))
     
     # Monthly trend
-    monthly_spending = db.execute_query("""
+    monthly_spending = await async_db.execute_query("""
         SELECT 
             strftime('%Y-%m', ordered_at) as month,
             COUNT(*) as order_count,
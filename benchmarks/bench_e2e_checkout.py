@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+End-to-End Checkout Benchmark
+Drives the real checkout flows against local fixture storefronts with a stub
+LLM, so runs are offline, repeatable and comparable between commits.
+
+Usage:
+    python benchmarks/bench_e2e_checkout.py [--flow FLOW ...] [--store STORE ...] [--repeat N]
+                                            [--output FILE] [--baseline FILE] [--save-baseline]
+                                            [--tolerance PCT] [--headed]
+
+Flows:
+    full     main_orchestrator.run_full_flow_core (browser launch to payment step)
+    legacy   rule-based path: DOM variant selection, add_to_cart_robust, run_checkout_flow
+    agentic  main_orchestrator.run_agentic_flow (AgentOrchestrator with stub agents)
+Stores (benchmarks/e2e/fixtures): shopify, magento, spa (shadow DOM + nested
+iframes), india (OTP login, COD). Checkouts embed a cross-site card iframe.
+
+Each scenario runs in a fresh interpreter. Reported per run:
+    wall_s               scenario wall time
+    phases               seconds per log prefix (ORCHESTRATOR, ADD TO CART, CHECKOUT FLOW, ...)
+    tools                calls and seconds per unified tool
+    driver_calls         Playwright client -> driver roundtrips
+    cdp_commands         CDP commands sent to the browser (DEBUG=pw:protocol)
+    python_peak_rss_mb   peak RSS of the automation process
+    browser_peak_rss_mb  peak RSS of browser + driver processes (psutil; largest child otherwise)
+    agent_calls          stub planner/browser/critique invocations
+The best run (lowest wall time) of each scenario is compared with the baseline;
+the run fails (exit code 1) when a metric regresses by more than --tolerance
+or a scenario that passed in the baseline now fails.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.e2e.server import FixtureServer
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+FLOWS = ['full', 'legacy', 'agentic']
+
+# Store -> product page and the variant to buy
+STORES = {
+    'shopify': {'path': '/products/trail-bottle', 'variant': {'Color': 'Blue', 'Size': 'M'}},
+    'magento': {'path': '/trail-jacket.html', 'variant': {'Color': 'Blue', 'Size': 'M'}},
+    'spa': {'path': '/product/city-sneaker', 'variant': {'Color': 'Black', 'Size': '9'}},
+    'india': {'path': '/cotton-kurta', 'variant': {'Size': 'M'}},
+}
+
+CUSTOMERS = {
+    'US': {
+        'contact': {'firstName': 'Jordan', 'lastName': 'Fixture', 'email': 'jordan@example.com', 'phone': '2065550142'},
+        'shippingAddress': {'addressLine1': '500 Pine St', 'addressLine2': 'Apt 4', 'city': 'Seattle',
+                            'province': 'Washington', 'postalCode': '98101', 'country': 'United States'},
+        'wallet': {'preferredPaymentMethod': 'credit_card', 'cardNumber': '4242424242424242',
+                   'cardExpiry': '12/30', 'cardCVV': '123'},
+    },
+    'IN': {
+        'contact': {'firstName': 'Asha', 'lastName': 'Fixture', 'email': 'asha@example.com', 'phone': '9820132767'},
+        'shippingAddress': {'addressLine1': '45, Barhi Toli', 'addressLine2': 'Purulia Road', 'city': 'Ranchi',
+                            'province': 'Jharkhand', 'postalCode': '834001', 'country': 'India'},
+    },
+}
+
+DEFAULT_BASELINE = project_root / 'benchmarks' / 'e2e' / 'baseline.json'
+
+# Allowed relative regression per metric before the run fails
+DEFAULT_TOLERANCE = 0.25
+
+# Lower is better for all of these
+COMPARED_METRICS = ['wall_s', 'driver_calls', 'cdp_commands', 'python_peak_rss_mb', 'browser_peak_rss_mb']
+
+SCENARIO_TIMEOUT = 600
+
+_PHASE_PREFIX = re.compile(r'^([A-Z][A-Z0-9 _-]{2,40}):')
+_CDP_SEND = re.compile(r'pw:protocol SEND ► (\{.*)')
+_CDP_METHOD = re.compile(r'"method":"([\w.]+)"')
+
+
+# ============= CHILD: one scenario in this interpreter =============
+
+class PhaseTimer(logging.Handler):
+    """Attributes time between log records to the prefix of the earlier record ('ORCHESTRATOR: ...')"""
+
+    def __init__(self):
+        super().__init__(level=logging.DEBUG)
+        self.phases = Counter()
+        self._current = 'startup'
+        self._since = time.perf_counter()
+
+    def emit(self, record):
+        try:
+            match = _PHASE_PREFIX.match(record.getMessage())
+        except Exception:
+            return
+        if match:
+            self._switch(match.group(1).strip())
+
+    def _switch(self, phase: str):
+        now = time.perf_counter()
+        self.phases[self._current] += now - self._since
+        self._current, self._since = phase, now
+
+    def finish(self):
+        self._switch('done')
+        return {phase: round(seconds, 3) for phase, seconds in self.phases.most_common()}
+
+
+def _instrument_tools():
+    """Wrap every unified tool to count calls and time; returns the stats dict"""
+    from src.checkout_ai.agents import unified_tools
+
+    stats = {}
+
+    def wrap(name, tool):
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await tool(*args, **kwargs)
+            finally:
+                entry = stats.setdefault(name, {'calls': 0, 'seconds': 0.0})
+                entry['calls'] += 1
+                entry['seconds'] = round(entry['seconds'] + time.perf_counter() - start, 3)
+        return timed
+
+    for name, tool in list(unified_tools.TOOLS.items()):
+        unified_tools.TOOLS[name] = wrap(name, tool)
+    return stats
+
+
+def _instrument_driver():
+    """Count Playwright client -> driver messages by method (None if the internals moved)"""
+    try:
+        from playwright._impl._connection import Connection
+    except ImportError:
+        return None
+    send = getattr(Connection, '_send_message_to_server', None)
+    if send is None:
+        return None
+
+    counts = Counter()
+
+    def counted(self, object, method, *args, **kwargs):
+        counts[method] += 1
+        return send(self, object, method, *args, **kwargs)
+
+    Connection._send_message_to_server = counted
+    return counts
+
+
+async def _sample_browser_rss(peak: dict, interval: float = 0.2):
+    """Peak summed RSS of all child processes (driver + browser tree)"""
+    me = psutil.Process()
+    while True:
+        total = 0
+        for child in me.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        peak['bytes'] = max(peak.get('bytes', 0), total)
+        await asyncio.sleep(interval)
+
+
+def _rss_mb(usage_maxrss: int) -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(usage_maxrss / divisor, 1)
+
+
+async def _launch_page(playwright, headless: bool):
+    browser = await playwright.chromium.launch(headless=headless)
+    context = await browser.new_context(viewport={'width': 1366, 'height': 900})
+    return browser, await context.new_page()
+
+
+async def _run_legacy(spec: dict):
+    from playwright.async_api import async_playwright
+    from src.checkout_ai.dom.service import UniversalDOMFinder
+    from src.checkout_ai.legacy.phase1.add_to_cart_robust import add_to_cart_robust
+    from src.checkout_ai.legacy.phase1.cart_navigator import navigate_to_cart
+    from src.checkout_ai.legacy.phase2.checkout_flow import run_checkout_flow
+
+    playwright = await async_playwright().start()
+    browser = None
+    try:
+        browser, page = await _launch_page(playwright, spec['headless'])
+        task = spec['task']
+        await page.goto(task['url'], wait_until='domcontentloaded', timeout=30000)
+
+        finder = UniversalDOMFinder(page)
+        for variant_type, variant_value in task['selectedVariant'].items():
+            result = await finder.find_variant(variant_type, variant_value)
+            if not result.get('success'):
+                return {'success': False, 'phase': 'variant_selection', 'error': f"{variant_type}={variant_value} not selected"}
+
+        cart_result = await add_to_cart_robust(page)
+        if not cart_result.get('success'):
+            return {'success': False, 'phase': 'add_to_cart', 'error': 'Failed to add to cart'}
+
+        nav_result = await navigate_to_cart(page)
+        if not nav_result.get('success'):
+            return {'success': False, 'phase': 'navigate_to_cart', 'error': 'Failed to open cart'}
+
+        result = await run_checkout_flow(page, spec['customer'], use_ai_flow=False)
+        return dict(result, final_url=page.url)
+    finally:
+        if browser:
+            await browser.close()
+        await playwright.stop()
+
+
+async def _run_agentic(spec: dict):
+    from playwright.async_api import async_playwright
+    from main_orchestrator import run_agentic_flow
+
+    playwright = await async_playwright().start()
+    browser = None
+    try:
+        browser, page = await _launch_page(playwright, spec['headless'])
+        task = dict(spec['task'], customer_data=spec['customer'])
+        result = await run_agentic_flow(page, task)
+        return {key: value for key, value in dict(result, final_url=page.url).items() if key != 'history'}
+    finally:
+        if browser:
+            await browser.close()
+        await playwright.stop()
+
+
+async def _run_full(spec: dict):
+    from main_orchestrator import run_full_flow_core
+
+    json_data = {
+        'customer': spec['customer'],
+        'tasks': [spec['task']],
+        'headless': spec['headless'],
+        'homeWaitSeconds': 0,
+        'keepBrowserOpenSeconds': 0,
+    }
+    return await run_full_flow_core(json_data)
+
+
+async def _run_child(spec: dict) -> dict:
+    from benchmarks.e2e import stub_llm
+
+    timer = PhaseTimer()
+    root_logger = logging.getLogger()
+    root_logger.addHandler(timer)
+    if root_logger.level > logging.INFO:
+        # Phase prefixes are logged at INFO
+        root_logger.setLevel(logging.INFO)
+    stub_llm.install()
+    tool_stats = _instrument_tools()
+    driver_counts = _instrument_driver()
+
+    peak = {}
+    sampler = asyncio.create_task(_sample_browser_rss(peak)) if PSUTIL_AVAILABLE else None
+
+    runner = {'full': _run_full, 'legacy': _run_legacy, 'agentic': _run_agentic}[spec['flow']]
+    start = time.perf_counter()
+    try:
+        result = await runner(spec)
+    except Exception as e:
+        result = {'success': False, 'phase': 'exception', 'error': f"{type(e).__name__}: {e}"}
+    wall = time.perf_counter() - start
+
+    if sampler:
+        sampler.cancel()
+
+    report = {
+        'success': bool(result.get('success')),
+        'result_phase': result.get('phase'),
+        'error': result.get('error'),
+        'final_url': result.get('final_url'),
+        'wall_s': round(wall, 3),
+        'phases': timer.finish(),
+        'tools': tool_stats,
+        'agent_calls': dict(stub_llm.calls),
+        'driver_calls': sum(driver_counts.values()) if driver_counts is not None else None,
+        'driver_top_methods': dict(driver_counts.most_common(10)) if driver_counts else {},
+    }
+    if resource:
+        report['python_peak_rss_mb'] = _rss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    if peak:
+        report['browser_peak_rss_mb'] = round(peak['bytes'] / (1024 * 1024), 1)
+    elif resource:
+        report['browser_peak_rss_mb'] = _rss_mb(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return report
+
+
+def child_main(spec_json: str, result_file: str):
+    spec = json.loads(spec_json)
+    report = asyncio.run(_run_child(spec))
+    Path(result_file).write_text(json.dumps(report), encoding='utf-8')
+
+
+# ============= PARENT: server, scenarios, report =============
+
+def _scenario_spec(server: FixtureServer, flow: str, store: str, headless: bool) -> dict:
+    config = STORES[store]
+    customer = CUSTOMERS['IN' if store == 'india' else 'US']
+    return {
+        'flow': flow,
+        'store': store,
+        'headless': headless,
+        'customer': json.loads(json.dumps(customer)),
+        'task': {'url': server.url(store, config['path']), 'quantity': 1, 'selectedVariant': config['variant']},
+    }
+
+
+def _count_cdp(stderr: str):
+    """CDP commands (and their top methods) from the driver's pw:protocol log"""
+    methods = Counter()
+    for line in stderr.splitlines():
+        match = _CDP_SEND.search(line)
+        if match:
+            method = _CDP_METHOD.search(match.group(1))
+            methods[method.group(1) if method else '?'] += 1
+    return sum(methods.values()), dict(methods.most_common(10))
+
+
+def run_scenario(server: FixtureServer, flow: str, store: str, headless: bool) -> dict:
+    """One scenario in a fresh interpreter with protocol logging on"""
+    server.reset()
+    spec = _scenario_spec(server, flow, store, headless)
+
+    with tempfile.TemporaryDirectory(prefix='checkout_bench_') as workdir:
+        result_file = os.path.join(workdir, 'result.json')
+        env = dict(os.environ, DEBUG='pw:protocol', PYTHONUNBUFFERED='1')
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(project_root), env.get('PYTHONPATH')]))
+        try:
+            proc = subprocess.run(
+                [sys.executable, str(Path(__file__).resolve()), '--child', json.dumps(spec), '--result-file', result_file],
+                cwd=workdir, env=env, capture_output=True, text=True, encoding='utf-8', errors='replace',
+                timeout=SCENARIO_TIMEOUT
+            )
+        except subprocess.TimeoutExpired:
+            return {'success': False, 'error': f'Timed out after {SCENARIO_TIMEOUT}s'}
+
+        if not os.path.exists(result_file):
+            tail = [line for line in proc.stderr.splitlines() if 'pw:protocol' not in line][-5:]
+            return {'success': False, 'error': f'Scenario process exited with code {proc.returncode}', 'stderr_tail': tail}
+
+        report = json.loads(Path(result_file).read_text(encoding='utf-8'))
+
+    report['cdp_commands'], report['cdp_top_methods'] = _count_cdp(proc.stderr)
+    return report
+
+
+def compare(current: dict, baseline: dict, tolerance: float):
+    """List of regression messages (scenario metric vs baseline)"""
+    regressions = []
+    for key, now in current.items():
+        before = baseline.get(key)
+        if not before:
+            continue
+        if before.get('success') and not now.get('success'):
+            regressions.append(f"{key}: passed in baseline, now fails ({now.get('error')})")
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = before.get(metric), now.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if change > tolerance:
+                regressions.append(f"{key}: {metric} {old} -> {new} (+{change:.0%})")
+    return regressions
+
+
+def _print_row(key: str, run: dict, baseline: dict):
+    status = '✅' if run.get('success') else '❌'
+    parts = [f"{run.get('wall_s', 0):7.2f} s"]
+    for metric, label in (('cdp_commands', 'cdp'), ('driver_calls', 'calls'), ('browser_peak_rss_mb', 'browser MB')):
+        value = run.get(metric)
+        if value is None:
+            continue
+        old = (baseline.get(key) or {}).get(metric)
+        delta = f" ({(value - old) / old:+.0%})" if old else ''
+        parts.append(f"{label} {value}{delta}")
+    print(f"{status} {key:<18} " + ' | '.join(parts))
+    if not run.get('success'):
+        print(f"      {run.get('result_phase') or ''} {run.get('error')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--flow', action='append', choices=FLOWS, help='Flow to run (repeatable, default: all)')
+    parser.add_argument('--store', action='append', choices=list(STORES), help='Storefront (repeatable, default: all)')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per scenario (best wall time is compared)')
+    parser.add_argument('--output', help='Write the JSON report here (default: stdout summary only)')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='Baseline report to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE * 100, help='Allowed regression in percent')
+    parser.add_argument('--headed', action='store_true', help='Show the browser')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_main(args.child, args.result_file)
+        return
+
+    baseline_path = Path(args.baseline)
+    baseline = {}
+    if baseline_path.exists() and not args.save_baseline:
+        baseline = json.loads(baseline_path.read_text(encoding='utf-8')).get('scenarios', {})
+
+    scenarios, runs = {}, {}
+    with FixtureServer() as server:
+        for flow in args.flow or FLOWS:
+            for store in args.store or list(STORES):
+                key = f"{flow}/{store}"
+                runs[key] = [run_scenario(server, flow, store, headless=not args.headed) for _ in range(max(1, args.repeat))]
+                passing = [run for run in runs[key] if run.get('success')] or runs[key]
+                scenarios[key] = min(passing, key=lambda run: run.get('wall_s') or float('inf'))
+                _print_row(key, scenarios[key], baseline)
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'repeat': args.repeat,
+        'scenarios': scenarios,
+        'runs': runs,
+    }
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding='utf-8')
+        print(f"\nReport written to {args.output}")
+
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(dict(report, runs={}), indent=2), encoding='utf-8')
+        print(f"Baseline saved to {baseline_path}")
+        sys.exit(0)
+
+    if not baseline:
+        print(f"\nNo baseline at {baseline_path} (create one with --save-baseline)")
+        sys.exit(0 if all(run.get('success') for run in scenarios.values()) else 1)
+
+    regressions = compare(scenarios, baseline, args.tolerance / 100)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) vs baseline (tolerance {args.tolerance:.0f}%):")
+        for line in regressions:
+            print(f"    {line}")
+        sys.exit(1)
+    print(f"\n✅ No regressions vs baseline (tolerance {args.tolerance:.0f}%)")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
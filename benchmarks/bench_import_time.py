@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Import-Time Benchmark
+Measures cold-start import cost of the API and CLI entry points with
+`python -X importtime`, lists the most expensive imports and checks a budget.
+
+Usage:
+    python benchmarks/bench_import_time.py [--module MOD ...] [--budget-ms MS] [--repeat N] [--top N]
+
+Each module is imported in a fresh interpreter (best of --repeat runs). The run
+fails (exit code 1) when a module exceeds the budget or when it pulls in a
+subsystem that should only load on first use (Playwright, pydantic_ai, OCR, ...).
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+DEFAULT_MODULES = ['backend.main', 'main_orchestrator']
+
+# Cumulative import time allowed per entry point
+DEFAULT_BUDGET_MS = 1500
+
+# Heavy subsystems that must not be imported at module load
+LAZY_MODULES = ['playwright', 'playwright_stealth', 'pydantic_ai', 'PIL', 'pytesseract', 'special_sites']
+
+
+def _measure(module: str):
+    """Import a module in a fresh interpreter; returns (total_us, {package: (self_us, cumulative_us)})"""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=project_root, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ['unknown error']
+        raise RuntimeError(f"import {module} failed: {tail[0]}")
+
+    imports = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        imports[name.strip()] = (int(self_us), int(cumulative_us))
+    total = imports.get(module, (0, 0))[1]
+    return total, imports
+
+
+def _top_level(imports):
+    """Root package name -> largest cumulative time among its modules"""
+    roots = {}
+    for name, (_, cumulative) in imports.items():
+        root = name.split('.')[0]
+        roots[root] = max(roots.get(root, 0), cumulative)
+    return roots
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', action='append', help='Module to import (repeatable)')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help='Max cumulative import time per module')
+    parser.add_argument('--repeat', type=int, default=3, help='Fresh-interpreter runs per module (best is reported)')
+    parser.add_argument('--top', type=int, default=10, help='Most expensive packages to list')
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.module or DEFAULT_MODULES:
+        try:
+            runs = [_measure(module) for _ in range(max(1, args.repeat))]
+        except RuntimeError as e:
+            print(f"❌ {e}\n")
+            failed = True
+            continue
+        total, imports = min(runs, key=lambda run: run[0])
+
+        over_budget = total / 1000 > args.budget_ms
+        eager = [name for name in LAZY_MODULES if name in imports]
+        status = '❌' if over_budget or eager else '✅'
+        print(f"{status} {module}: {total / 1000:.1f} ms (budget {args.budget_ms:.0f} ms, {len(imports)} modules)")
+
+        for root, cumulative in sorted(_top_level(imports).items(), key=lambda item: -item[1])[:args.top]:
+            if root != module.split('.')[0]:
+                print(f"    {cumulative / 1000:>8.1f} ms  {root}")
+        if eager:
+            print(f"    Imported at load (should be lazy): {', '.join(eager)}")
+        print()
+        failed = failed or over_budget or bool(eager)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Compiled Keyword Matcher Benchmark
+Classifies button/label texts against every registered keyword set (ecommerce_keywords +
+checkout_keywords, all languages) two ways: the per-keyword `keyword in text` loops
+the finders used, and one scan of the compiled Aho-Corasick automaton
+(utils/keyword_matcher.py).
+
+Usage:
+    python benchmarks/bench_keyword_matcher.py [--texts N] [--repeat N]
+
+Reported: keyword/category counts, automaton size, time per text for both methods
+and whether both find the same categories for every text. Exit code 1 on a mismatch.
+No browser needed.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+FILLER = ['free shipping', 'new arrivals', 'slim fit chino', 'size guide', 'reviews (124)', 'wishlist',
+          'store locator', 'sold by acme', 'ships in 2 days', 'easy returns', 'gift wrap', '4.5 stars']
+
+
+def _texts(matcher, count: int, seed: int = 7):
+    """Mix of filler text and keywords embedded in surrounding words"""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        parts = rng.sample(FILLER, 2)
+        if rng.random() < 0.6:
+            parts.insert(1, rng.choice(matcher.keywords))
+        texts.append(' - '.join(parts).title())
+    return texts
+
+
+def _legacy_categories(text, by_category, normalize):
+    normalized = normalize(text)
+    return {category for category, keywords in by_category.items() if any(k in normalized for k in keywords)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--texts', type=int, default=5000, help='Number of synthetic texts to classify')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per method (median is reported)')
+    args = parser.parse_args()
+
+    from src.checkout_ai.utils.keyword_matcher import get_keyword_matcher, normalize_text
+
+    started = time.perf_counter()
+    matcher = get_keyword_matcher()
+    build_ms = (time.perf_counter() - started) * 1000
+
+    by_category = {}
+    for keyword, tags in zip(matcher.keywords, matcher.tags):
+        for category, _, _ in tags:
+            by_category.setdefault(category, []).append(keyword)
+
+    texts = _texts(matcher, args.texts)
+    print(f"Keywords: {len(matcher.keywords)} in {len(matcher.categories)} categories, "
+          f"automaton {len(matcher._spaced.goto)} states, built in {build_ms:.1f} ms")
+    print(f"Texts: {len(texts)}\n")
+
+    def run(fn):
+        timings, results = [], None
+        for _ in range(max(1, args.repeat)):
+            started = time.perf_counter()
+            results = [fn(text) for text in texts]
+            timings.append((time.perf_counter() - started) * 1e6 / len(texts))
+        return statistics.median(timings), results
+
+    legacy_us, legacy = run(lambda text: _legacy_categories(text, by_category, normalize_text))
+    compiled_us, compiled = run(lambda text: {hit['category'] for hit in matcher.scan(text)})
+
+    mismatches = sum(1 for a, b in zip(legacy, compiled) if a != b)
+    print(f"{'method':<22} {'µs/text':>10}")
+    print(f"{'keyword loops':<22} {legacy_us:>10.1f}")
+    print(f"{'compiled automaton':<22} {compiled_us:>10.1f}   ({legacy_us / max(compiled_us, 1e-9):.1f}x)")
+    print(f"\n{'✅' if not mismatches else '❌'} Same categories for {len(texts) - mismatches}/{len(texts)} texts")
+    sys.exit(0 if not mismatches else 1)
+
+
+if __name__ == '__main__':
+    main()
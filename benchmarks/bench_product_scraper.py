@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Product Scraper Benchmark
+Compares full-page parsing (BeautifulSoup html.parser, all strategies) against the
+head-first StreamingProductExtractor on saved product pages: CPU time and bytes read.
+
+Usage:
+    python benchmarks/bench_product_scraper.py [--fixtures DIR] [--repeat N] [--save-synthetic]
+
+Fixture pages are *.html files saved from real product pages (e.g. "Save page as,
+HTML only") and named '<label>.<host>.html' (e.g. kurta.myntra.com.html) so the
+store host drives platform-specific extraction. When the directory is empty,
+synthetic pages of realistic size are generated in memory.
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.services.product_scraper import (
+    StreamingProductExtractor, parse_product_html, STREAM_CHUNK_SIZE, REQUIRED_FIELDS
+)
+
+DEFAULT_FIXTURES = Path(__file__).parent / "fixtures" / "product_pages"
+
+
+def _synthetic_pages():
+    """Pages shaped like large storefront PDPs: structured data in <head>, megabytes of body"""
+    body_block = ''.join(
+        f'<div class="product-tile"><a href="/p/{i}"><img src="/img/{i}.jpg" width="200" height="200">'
+        f'<span class="price">₹{i * 10}</span><span class="title">Recommended item {i}</span></a></div>'
+        for i in range(12000)
+    )
+    json_ld = (
+        '<script type="application/ld+json">{"@context":"https://schema.org","@type":"Product",'
+        '"name":"Ethnic Motifs Kurta","image":"https://cdn.example.com/kurta.jpg",'
+        '"brand":{"@type":"Brand","name":"Varanga"},'
+        '"aggregateRating":{"ratingValue":"4.3","reviewCount":"1289"},'
+        '"offers":{"@type":"Offer","price":"1299","priceCurrency":"INR","availability":"https://schema.org/InStock"}}'
+        '</script>'
+    )
+    og = (
+        '<meta property="og:title" content="Ethnic Motifs Kurta">'
+        '<meta property="og:image" content="https://cdn.example.com/kurta.jpg">'
+        '<meta property="og:price:amount" content="1299"><meta property="og:price:currency" content="INR">'
+    )
+    return {
+        'jsonld_head.myntra.com.html': f'<html><head><title>Kurta</title>{json_ld}</head><body>{body_block}</body></html>',
+        'og_head.shop.example.com.html': f'<html><head><title>Kurta</title>{og}</head><body>{body_block}</body></html>',
+        'body_only.amazon.in.html': (
+            f'<html><head><title>Kurta</title></head><body>{body_block}'
+            f'<h1>Ethnic Motifs Kurta</h1><span class="a-price-whole">1,299</span></body></html>'
+        ),
+    }
+
+
+def _load_fixtures(directory: Path, save_synthetic: bool):
+    pages = {p.name: p.read_bytes() for p in sorted(directory.glob('*.html'))} if directory.exists() else {}
+    if pages:
+        return pages, False
+
+    synthetic = {name: html.encode('utf-8') for name, html in _synthetic_pages().items()}
+    if save_synthetic:
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, content in synthetic.items():
+            (directory / name).write_bytes(content)
+    return synthetic, True
+
+
+def _url_for(name: str) -> str:
+    """'<label>.<host>.html' -> https://<host>/product (host drives platform-specific extraction)"""
+    stem = name[:-len('.html')] if name.endswith('.html') else name
+    host = stem.split('.', 1)[1] if '.' in stem else 'shop.example.com'
+    return f"https://{host}/product"
+
+
+def _run_full(content: bytes, url: str):
+    return parse_product_html(content, url, parser='html.parser'), len(content)
+
+
+def _run_streaming(content: bytes, url: str):
+    extractor = StreamingProductExtractor(url)
+    for offset in range(0, len(content), STREAM_CHUNK_SIZE):
+        if extractor.feed(content[offset:offset + STREAM_CHUNK_SIZE]):
+            break
+    return extractor.finish(), extractor.bytes_read
+
+
+def _measure(func, content, url, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.process_time()
+        result, bytes_read = func(content, url)
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, bytes_read, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', type=Path, default=DEFAULT_FIXTURES, help='Directory of saved *.html pages')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per page (best CPU time is reported)')
+    parser.add_argument('--save-synthetic', action='store_true', help='Write synthetic pages to the fixtures directory')
+    args = parser.parse_args()
+
+    pages, synthetic = _load_fixtures(args.fixtures, args.save_synthetic)
+    print(f"Fixtures: {'synthetic' if synthetic else args.fixtures} ({len(pages)} page(s))\n")
+    print(f"{'page':<36} {'size KB':>8} | {'full ms':>8} {'read KB':>8} | {'stream ms':>9} {'read KB':>8} | {'speedup':>7}  fields")
+    print('-' * 110)
+
+    total_full = total_stream = 0.0
+    for name, content in pages.items():
+        url = _url_for(name)
+        # Scraper prints progress per strategy - keep the table readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            full_result, full_bytes, full_cpu = _measure(_run_full, content, url, args.repeat)
+            stream_result, stream_bytes, stream_cpu = _measure(_run_streaming, content, url, args.repeat)
+        total_full += full_cpu
+        total_stream += stream_cpu
+
+        same = all(full_result.get(f) == stream_result.get(f) for f in REQUIRED_FIELDS)
+        speedup = full_cpu / stream_cpu if stream_cpu else float('inf')
+        print(f"{name[:36]:<36} {len(content) / 1024:>8.0f} | {full_cpu * 1000:>8.1f} {full_bytes / 1024:>8.0f} | "
+              f"{stream_cpu * 1000:>9.1f} {stream_bytes / 1024:>8.0f} | {speedup:>6.1f}x  "
+              f"{'same' if same else 'DIFF'}")
+
+    print('-' * 110)
+    print(f"{'total':<36} {'':>8} | {total_full * 1000:>8.1f} {'':>8} | {total_stream * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+SQLite Storage Micro-benchmark
+Concurrent reads and writes against an addresses-shaped table, comparing the old
+connect-per-operation pattern with the pooled WAL SQLitePool.
+
+Usage:
+    python benchmarks/bench_sqlite_pool.py [--rows N] [--readers N] [--writers N] [--ops N]
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import aiosqlite
+
+from backend.services.sqlite_pool import SQLitePool
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS addresses (
+        id TEXT PRIMARY KEY,
+        full_name TEXT NOT NULL,
+        city TEXT NOT NULL,
+        is_default INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_addresses_default ON addresses(is_default) WHERE is_default = 1;
+"""
+
+
+async def _seed(db_path: Path, rows: int):
+    async with aiosqlite.connect(db_path) as db:
+        await db.executescript(SCHEMA)
+        await db.executemany(
+            "INSERT INTO addresses (id, full_name, city) VALUES (?, ?, ?)",
+            [(str(uuid.uuid4()), f"Customer {i}", "Pune") for i in range(rows)]
+        )
+        await db.commit()
+        async with db.execute("SELECT id FROM addresses") as cursor:
+            return [row[0] for row in await cursor.fetchall()]
+
+
+# --- connect-per-operation (previous AddressService pattern) ---
+
+async def _naive_read(db_path, address_id):
+    async with aiosqlite.connect(db_path) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute("SELECT * FROM addresses WHERE id = ?", (address_id,)) as cursor:
+            return await cursor.fetchone()
+
+
+async def _naive_set_default(db_path, address_id):
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute("UPDATE addresses SET is_default = 0")
+        await db.execute("UPDATE addresses SET is_default = 1 WHERE id = ?", (address_id,))
+        await db.commit()
+    return await _naive_read(db_path, address_id)
+
+
+# --- pooled ---
+
+async def _pooled_read(pool, address_id):
+    return await pool.fetchone("SELECT * FROM addresses WHERE id = ?", (address_id,))
+
+
+async def _pooled_set_default(pool, address_id):
+    async with pool.transaction() as db:
+        await db.execute("UPDATE addresses SET is_default = 0 WHERE is_default = 1 AND id != ?", (address_id,))
+        async with db.execute("UPDATE addresses SET is_default = 1 WHERE id = ? RETURNING *", (address_id,)) as cursor:
+            return await cursor.fetchone()
+
+
+async def _run(label, read, write, ids, readers, writers, ops):
+    async def reader(n):
+        for i in range(ops):
+            await read(ids[(n * ops + i) % len(ids)])
+
+    async def writer(n):
+        for i in range(ops):
+            await write(ids[(n * 7919 + i) % len(ids)])
+
+    start = time.perf_counter()
+    await asyncio.gather(*[reader(n) for n in range(readers)], *[writer(n) for n in range(writers)])
+    elapsed = time.perf_counter() - start
+    total = (readers + writers) * ops
+    print(f"{label:<22} {total:>7} ops  {elapsed * 1000:>9.1f} ms  {total / elapsed:>9.0f} ops/s")
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--readers', type=int, default=16)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--ops', type=int, default=100, help='Operations per reader/writer')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        naive_path = Path(tmp) / "naive.db"
+        pooled_path = Path(tmp) / "pooled.db"
+        ids = await _seed(naive_path, args.rows)
+        await _seed(pooled_path, 0)
+        async with aiosqlite.connect(pooled_path) as db:
+            await db.executemany("INSERT INTO addresses (id, full_name, city) VALUES (?, ?, ?)",
+                                 [(i, "Customer", "Pune") for i in ids])
+            await db.commit()
+
+        print(f"{args.readers} readers + {args.writers} writers x {args.ops} ops, {args.rows} rows\n")
+        naive = await _run(
+            "connect per operation",
+            lambda i: _naive_read(naive_path, i),
+            lambda i: _naive_set_default(naive_path, i),
+            ids, args.readers, args.writers, args.ops
+        )
+
+        pool = SQLitePool(pooled_path)
+        await pool.open()
+        try:
+            pooled = await _run(
+                "pooled WAL",
+                lambda i: _pooled_read(pool, i),
+                lambda i: _pooled_set_default(pool, i),
+                ids, args.readers, args.writers, args.ops
+            )
+        finally:
+            await pool.close()
+
+        print(f"\nspeedup: {naive / pooled:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+In-Page Text Index Benchmark
+Compares the per-node scan the DOM matchers used to run (normalize every element's
+text, aria-label, title, alt and value with regexes, then word-by-word matching)
+against queries on the shared in-page text index (js_assets/text_index.js) on a
+synthetic product page of ~20k nodes.
+
+Usage:
+    python benchmarks/bench_text_index.py [--nodes N] [--repeat N] [--headed]
+
+Reported per query: legacy scan time, index query time (exact/phrase/all-words/
+fuzzy) and whether the index matcher selects exactly the elements the legacy scan
+did. Also reports the one-off index build and the wall time of the shipped
+matcher scripts (dom_tree_search, verification) on a cold and a warm index.
+Exit code 1 when a query's matches differ from the legacy scan.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+QUERIES = ['Navy Blue', 'M', 'XL', 'Slim Fit', 'forest green', 'Recommended item 1234', 'Heather', 'Add to Cart']
+
+COLORS = ['Navy Blue', 'Forest Green', 'Black', 'Heather Grey', 'Burnt Orange']
+SIZES = ['XS', 'S', 'M', 'L', 'XL', 'XXL']
+
+# The matching rule pattern_match.js / overlay_search.js applied to every node before the index
+LEGACY_SCAN_JS = """
+(query) => {
+    const normalize = (text) => text ? String(text).toLowerCase().trim().replace(/[^a-z0-9\\s]/g, '') : '';
+    const normalizedVal = normalize(query);
+    const match = (text) => {
+        if (!text) return false;
+        const t = normalize(text);
+        if (t === normalizedVal) return true;
+        const searchWords = normalizedVal.split(/\\s+/).filter(w => w.length > 0);
+        const textWords = t.split(/\\s+/).filter(w => w.length > 0);
+        if (searchWords.length >= 2) {
+            if (t.includes(normalizedVal)) return true;
+            return searchWords.every(word =>
+                textWords.some(textWord => textWord === word || textWord.includes(word) || word.includes(textWord)));
+        }
+        return false;
+    };
+    const started = performance.now();
+    const matched = [];
+    for (const el of document.querySelectorAll('body *')) {
+        if (match(el.textContent) || match(el.getAttribute('aria-label')) || match(el.getAttribute('title')) ||
+            match(el.getAttribute('alt')) || match(el.getAttribute('value'))) matched.push(el);
+    }
+    return { ms: performance.now() - started, count: matched.length };
+}
+"""
+
+INDEX_QUERY_JS = """
+(query) => {
+    const index = window.__checkoutTextIndex.ensure();
+    const timed = (fn) => {
+        const started = performance.now();
+        const result = fn();
+        return [performance.now() - started, result];
+    };
+    const [exactMs] = timed(() => index.lookup(query, 'exact'));
+    const [phraseMs] = timed(() => index.lookup(query, 'phrase'));
+    const [allWordsMs] = timed(() => index.lookup(query, 'allWords'));
+    const [fuzzyMs] = timed(() => index.lookup(query, 'fuzzy'));
+    const [matchMs, count] = timed(() => {
+        const isMatch = index.matcher(query);
+        let matched = 0;
+        for (const el of document.querySelectorAll('body *')) {
+            if (['text', 'aria', 'title', 'alt', 'value'].some(field => isMatch(el, field))) matched++;
+        }
+        return matched;
+    });
+    return { exactMs, phraseMs, allWordsMs, fuzzyMs, matchMs, count };
+}
+"""
+
+
+def _synthetic_page(nodes: int) -> str:
+    """Product detail page: variant pickers up top, recommendation tiles filling the node budget"""
+    swatches = ''.join(
+        f'<label for="color-{i}"><input type="radio" id="color-{i}" name="color" value="{color}">'
+        f'<span class="swatch" title="{color}">{color}</span></label>'
+        for i, color in enumerate(COLORS)
+    )
+    sizes = ''.join(f'<button class="size" aria-label="Size {size}">{size}</button>' for size in SIZES)
+    fits = '<select name="fit"><option value="regular">Regular Fit</option><option value="slim">Slim Fit</option></select>'
+    main = (
+        '<main class="product-main"><h1>Trail Jacket</h1>'
+        f'<div class="swatches">{swatches}</div><div class="sizes">{sizes}</div>{fits}'
+        '<button class="add-to-cart" style="width:200px;height:44px">Add to Cart</button></main>'
+    )
+
+    # 9 elements per tile
+    tiles = []
+    for i in range(max(1, nodes // 9)):
+        color = COLORS[i % len(COLORS)]
+        tiles.append(
+            f'<div class="tile"><a href="/p/{i}"><img alt="Product {i} in {color}" width="40" height="40">'
+            f'<span class="title">Recommended item {i} {color}</span><span class="price">${i % 300}.99</span></a>'
+            f'<div class="tile-sizes"><button>{SIZES[i % len(SIZES)]}</button><button>{SIZES[(i + 1) % len(SIZES)]}</button></div>'
+            f'<button class="quick-add">Quick add</button></div>'
+        )
+    return f'<html><head><title>Trail Jacket</title></head><body>{main}<section class="recs">{"".join(tiles)}</section></body></html>'
+
+
+async def _run(args) -> bool:
+    from playwright.async_api import async_playwright
+    from src.checkout_ai.dom.service import UniversalDOMFinder, text_index_js, with_text_index
+
+    html = _synthetic_page(args.nodes)
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=not args.headed)
+        page = await browser.new_page()
+        await page.set_content(html)
+        node_count = await page.evaluate("document.querySelectorAll('*').length")
+        print(f"Synthetic page: {node_count} elements, {len(html) // 1024} KB\n")
+
+        # Shipped matcher scripts, cold (builds the index) then warm
+        finder = UniversalDOMFinder(page, debug_dir=tempfile.mkdtemp(prefix='variant_debug_'))
+        scripts = {
+            'dom_tree_search': (finder._wrap_js_with_sanitization(finder._load_js('dom_tree_search.js')),
+                                {'variantValue': 'Slim Fit', 'containerSelector': None}),
+            'verification': (with_text_index(finder._load_js('verification.js')),
+                             {'variantType': 'color', 'variantValue': 'Navy Blue'}),
+        }
+        script_times = {}
+        for name, (script, script_args) in scripts.items():
+            await page.evaluate("delete window.__checkoutTextIndex")
+            started = time.perf_counter()
+            await page.evaluate(script, script_args)
+            cold = (time.perf_counter() - started) * 1000
+            started = time.perf_counter()
+            await page.evaluate(script, script_args)
+            script_times[name] = (cold, (time.perf_counter() - started) * 1000)
+
+        await page.evaluate("delete window.__checkoutTextIndex")
+        await page.evaluate(f"() => {{ {text_index_js()} }}")
+        stats = await page.evaluate("window.__checkoutTextIndex.ensure().stats")
+        print(f"Index build: {stats['buildMs']:.1f} ms "
+              f"({stats['elements']} elements, {stats['strings']} distinct strings, {stats['tokens']} tokens)\n")
+
+        header = f"{'query':<24} {'legacy ms':>10} {'exact':>8} {'phrase':>8} {'allWords':>9} {'fuzzy':>8} {'speedup':>8}  match"
+        print(header)
+        print('-' * len(header))
+
+        ok = True
+        for query in QUERIES:
+            legacy_runs, index_runs = [], []
+            for _ in range(max(1, args.repeat)):
+                legacy_runs.append(await page.evaluate(LEGACY_SCAN_JS, query))
+                index_runs.append(await page.evaluate(INDEX_QUERY_JS, query))
+
+            legacy_ms = statistics.median(run['ms'] for run in legacy_runs)
+            median = {key: statistics.median(run[key] for run in index_runs)
+                      for key in ('exactMs', 'phraseMs', 'allWordsMs', 'fuzzyMs')}
+            slowest_query = max(median.values())
+            same = legacy_runs[0]['count'] == index_runs[0]['count']
+            ok = ok and same
+            print(f"{query:<24} {legacy_ms:>10.2f} {median['exactMs']:>8.3f} {median['phraseMs']:>8.3f} "
+                  f"{median['allWordsMs']:>9.3f} {median['fuzzyMs']:>8.3f} "
+                  f"{legacy_ms / max(slowest_query, 0.001):>7.0f}x  "
+                  f"{'✅' if same else '❌'} {index_runs[0]['count']}/{legacy_runs[0]['count']}")
+
+        print("\nShipped matchers (wall time incl. round trip):")
+        for name, (cold, warm) in script_times.items():
+            print(f"  {name:<18} cold {cold:>8.1f} ms   warm {warm:>8.1f} ms")
+
+        await browser.close()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--nodes', type=int, default=20000, help='Approximate element count of the synthetic page')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per query (median is reported)')
+    parser.add_argument('--headed', action='store_true', help='Show the browser window')
+    args = parser.parse_args()
+
+    ok = asyncio.run(_run(args))
+    if not ok:
+        print("\n❌ Index matches differ from the legacy scan")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
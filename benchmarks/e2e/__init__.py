@@ -0,0 +1,5 @@
+"""
+Offline end-to-end checkout benchmark
+Local fixture storefronts (server.py) and a stub LLM (stub_llm.py) used by
+benchmarks/bench_e2e_checkout.py
+"""
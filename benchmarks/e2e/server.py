@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Fixture Storefront Server
+Serves the storefronts in benchmarks/e2e/fixtures over local HTTP, one port per
+store so each has its own origin (the payment stand-in is served on 'localhost'
+instead of 127.0.0.1, making its iframe cross-site like a real PSP).
+
+Usage:
+    python benchmarks/e2e/server.py [--host HOST]
+
+Pages are static HTML with a few placeholders filled per request:
+    {{CART_ROWS}}  {{CART_COUNT}}  {{CART_TOTAL}}  {{PAYMENT_ORIGIN}}
+Stateful endpoints (every store):
+    GET  /cart.js                  Shopify-style cart JSON
+    POST /cart/add.js, /cart/add   add by variant id (JSON, form or multipart body)
+    POST /checkout/cart/add[/...]  Magento-style add (super_attribute[...] fields)
+    POST /cart/clear.js            empty the cart
+    GET  /products/<handle>.js     product JSON from <store>/products.json
+    POST /api/login/otp            start an OTP login ({"phone": ...})
+    POST /api/login/verify         finish it ({"otp": FIXTURE_OTP}), sets the session cookie
+    POST /api/order                place the order, returns {"order_number": ...}
+    POST /__reset                  clear carts, logins and orders
+Pages listed in LOGIN_REQUIRED redirect to /login until the OTP login is done.
+"""
+
+import argparse
+import email.parser
+import email.policy
+import json
+import sys
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+STOREFRONTS = ['shopify', 'magento', 'spa', 'india', 'payments']
+
+# Served on 'localhost' so its iframe is cross-site for the 127.0.0.1 stores
+PAYMENT_STORE = 'payments'
+
+# OTP accepted by the India-style login
+FIXTURE_OTP = '123456'
+
+# Pages that need a logged-in session (store -> path prefixes)
+LOGIN_REQUIRED = {'india': ['/checkout']}
+
+FIRST_ORDER_NUMBER = 1001
+
+
+class Storefront:
+    """Per-store state: cart, OTP logins and orders"""
+
+    def __init__(self, name: str, root: Path):
+        self.name = name
+        self.root = root
+        self.lock = threading.Lock()
+        self.products = self._load_products()
+        self.reset()
+
+    def _load_products(self) -> Dict[str, Dict[str, Any]]:
+        path = self.root / 'products.json'
+        if not path.exists():
+            return {}
+        return json.loads(path.read_text(encoding='utf-8'))
+
+    def reset(self):
+        with self.lock:
+            self.cart: List[Dict[str, Any]] = []
+            self.sessions: set = set()
+            self.pending_otp: Optional[str] = None
+            self.orders: List[Dict[str, Any]] = []
+
+    @property
+    def cookie_name(self) -> str:
+        # Cookies ignore ports, so every store gets its own name
+        return f'{self.name}_sid'
+
+    def find_variant(self, variant_id: Any = None, attributes: Optional[Dict[str, str]] = None):
+        """(product, variant) by Shopify variant id or by Magento super_attribute values"""
+        for product in self.products.values():
+            for variant in product.get('variants', []):
+                if variant_id is not None and str(variant['id']) == str(variant_id):
+                    return product, variant
+                if attributes and all(str(variant.get('attributes', {}).get(k)) == str(v) for k, v in attributes.items()):
+                    return product, variant
+        return None, None
+
+    def add(self, product: Dict[str, Any], variant: Dict[str, Any], quantity: int) -> Dict[str, Any]:
+        with self.lock:
+            for line in self.cart:
+                if line['id'] == variant['id']:
+                    line['quantity'] += quantity
+                    return line
+            line = {
+                'id': variant['id'],
+                'product_title': product['title'],
+                'variant_title': variant['title'],
+                'title': f"{product['title']} - {variant['title']}",
+                'price': variant['price'],
+                'quantity': quantity,
+                'handle': product['handle'],
+                'url': product.get('url', f"/products/{product['handle']}"),
+            }
+            self.cart.append(line)
+            return line
+
+    def cart_json(self) -> Dict[str, Any]:
+        with self.lock:
+            items = [dict(line, line_price=line['price'] * line['quantity']) for line in self.cart]
+        return {
+            'item_count': sum(item['quantity'] for item in items),
+            'total_price': sum(item['line_price'] for item in items),
+            'items': items,
+        }
+
+
+class StorefrontHandler(SimpleHTTPRequestHandler):
+    """Static fixture pages plus the stateful cart/login/order endpoints"""
+
+    store: Storefront = None
+    payment_origin: str = ''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=str(self.store.root), **kwargs)
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+    # ---------- helpers ----------
+
+    def _send_json(self, payload: Any, status: int = 200, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _redirect(self, location: str, headers: Optional[Dict[str, str]] = None):
+        self.send_response(302)
+        self.send_header('Location', location)
+        self.send_header('Content-Length', '0')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def _read_body(self) -> Dict[str, Any]:
+        """JSON, urlencoded or multipart body -> flat dict"""
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        content_type = self.headers.get('Content-Type', '')
+        if not raw:
+            return {}
+        if 'application/json' in content_type:
+            try:
+                return json.loads(raw.decode('utf-8'))
+            except ValueError:
+                return {}
+        if 'multipart/form-data' in content_type:
+            message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+                b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n' + raw
+            )
+            fields = {}
+            for part in message.iter_parts():
+                name = part.get_param('name', header='content-disposition')
+                if name:
+                    fields[name] = part.get_content().strip() if part.get_content_maintype() == 'text' else part.get_payload(decode=True)
+            return fields
+        return {key: values[-1] for key, values in parse_qs(raw.decode('utf-8')).items()}
+
+    def _logged_in(self) -> bool:
+        cookies = self.headers.get('Cookie', '')
+        for cookie in cookies.split(';'):
+            name, _, value = cookie.strip().partition('=')
+            if name == self.store.cookie_name and value in self.store.sessions:
+                return True
+        return False
+
+    def _resolve(self, path: str) -> Optional[Path]:
+        """URL path -> fixture file ('/cart' -> cart.html, '/checkout/' -> checkout/index.html)"""
+        root = self.store.root.resolve()
+        relative = path.strip('/')
+        candidates = [relative + '.html', relative + '/index.html', relative] if relative else ['index.html']
+        for candidate in candidates:
+            file_path = (root / candidate).resolve()
+            if root in file_path.parents and file_path.is_file():
+                return file_path
+        # Client-side routed SPA: unknown page paths fall back to the shell
+        shell = root / 'index.html'
+        if self.store.name == 'spa' and '.' not in relative.rsplit('/', 1)[-1] and shell.is_file():
+            return shell
+        return None
+
+    def _cart_rows(self) -> str:
+        rows = []
+        for item in self.store.cart_json()['items']:
+            rows.append(
+                '<tr class="cart-item" data-variant-id="{id}">'
+                '<td class="cart-item__name"><a href="{url}">{product_title}</a>'
+                '<div class="cart-item__variant">{variant_title}</div></td>'
+                '<td class="cart-item__quantity"><input type="number" name="updates[]" value="{quantity}" min="0"></td>'
+                '<td class="cart-item__price">${line_price:.2f}</td></tr>'.format(
+                    **dict(item, line_price=item['line_price'] / 100)
+                )
+            )
+        return '\n'.join(rows) or '<tr class="cart-empty"><td colspan="3">Your cart is empty</td></tr>'
+
+    def _render(self, file_path: Path) -> bytes:
+        text = file_path.read_text(encoding='utf-8')
+        if '{{' in text:
+            cart = self.store.cart_json()
+            text = (text.replace('{{CART_ROWS}}', self._cart_rows())
+                        .replace('{{CART_COUNT}}', str(cart['item_count']))
+                        .replace('{{CART_TOTAL}}', f"{cart['total_price'] / 100:.2f}")
+                        .replace('{{PAYMENT_ORIGIN}}', self.payment_origin))
+        return text.encode('utf-8')
+
+    # ---------- routes ----------
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        path = url.path
+
+        if path == '/cart.js':
+            return self._send_json(self.store.cart_json())
+        if path.startswith('/products/') and path.endswith('.js'):
+            product = self.store.products.get(path[len('/products/'):-len('.js')])
+            if not product:
+                return self._send_json({'status': 404, 'description': 'Not found'}, status=404)
+            return self._send_json(product)
+
+        for prefix in LOGIN_REQUIRED.get(self.store.name, []):
+            if path.startswith(prefix) and not self._logged_in():
+                return self._redirect(f'/login?next={path}')
+
+        file_path = self._resolve(path)
+        if file_path is None:
+            return self.send_error(404)
+        if file_path.suffix != '.html':
+            self.path = '/' + str(file_path.relative_to(self.store.root.resolve())).replace('\\', '/')
+            return super().do_GET()
+
+        body = self._render(file_path)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        data = self._read_body()
+        is_xhr = path.endswith('.js') or self.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+        if path == '/__reset':
+            self.store.reset()
+            return self._send_json({'success': True})
+
+        if path in ('/cart/add.js', '/cart/add'):
+            items = data.get('items') or [{'id': data.get('id'), 'quantity': data.get('quantity', 1)}]
+            added = []
+            for item in items:
+                product, variant = self.store.find_variant(variant_id=item.get('id'))
+                if not variant:
+                    return self._send_json({'status': 422, 'description': 'Cannot find variant'}, status=422)
+                added.append(self.store.add(product, variant, int(item.get('quantity') or 1)))
+            if is_xhr:
+                return self._send_json(added[0] if len(added) == 1 else {'items': added})
+            return self._redirect('/cart')
+
+        if path.startswith('/checkout/cart/add'):
+            attributes = {key[len('super_attribute['):-1]: value for key, value in data.items()
+                          if key.startswith('super_attribute[')}
+            product, variant = self.store.find_variant(attributes=attributes)
+            if not variant:
+                return self._send_json({'success': False, 'error': 'Choose options'}, status=400)
+            self.store.add(product, variant, int(data.get('qty') or 1))
+            if is_xhr:
+                return self._send_json({'success': True, 'cart': self.store.cart_json()})
+            return self._redirect('/checkout/cart/')
+
+        if path == '/cart/clear.js':
+            with self.store.lock:
+                self.store.cart.clear()
+            return self._send_json(self.store.cart_json())
+
+        if path == '/api/login/otp':
+            if not str(data.get('phone') or data.get('email') or '').strip():
+                return self._send_json({'success': False, 'error': 'Enter mobile number'}, status=400)
+            self.store.pending_otp = FIXTURE_OTP
+            return self._send_json({'success': True, 'otp_length': len(FIXTURE_OTP)})
+
+        if path == '/api/login/verify':
+            if not self.store.pending_otp or str(data.get('otp', '')).strip() != self.store.pending_otp:
+                return self._send_json({'success': False, 'error': 'Invalid OTP'}, status=401)
+            session_id = f'{self.store.name}-{len(self.store.sessions) + 1}'
+            self.store.sessions.add(session_id)
+            self.store.pending_otp = None
+            cookie = f'{self.store.cookie_name}={session_id}; Path=/; HttpOnly; SameSite=Lax'
+            return self._send_json({'success': True}, headers={'Set-Cookie': cookie})
+
+        if path == '/api/order':
+            cart = self.store.cart_json()
+            if not cart['items']:
+                return self._send_json({'success': False, 'error': 'Cart is empty'}, status=400)
+            with self.store.lock:
+                order_number = FIRST_ORDER_NUMBER + len(self.store.orders)
+                self.store.orders.append({'order_number': order_number, 'cart': cart, 'details': data})
+                self.store.cart.clear()
+            return self._send_json({'success': True, 'order_number': order_number})
+
+        self.send_error(404)
+
+
+class FixtureServer:
+    """All fixture storefronts, each on its own port, served from daemon threads"""
+
+    def __init__(self, host: str = '127.0.0.1', fixtures_dir: Path = FIXTURES_DIR):
+        self.host = host
+        self.fixtures_dir = Path(fixtures_dir)
+        self.stores: Dict[str, Storefront] = {}
+        self._servers: Dict[str, ThreadingHTTPServer] = {}
+        self._threads: List[threading.Thread] = []
+
+    def _host_for(self, name: str) -> str:
+        if name == PAYMENT_STORE and self.host == '127.0.0.1':
+            return 'localhost'
+        return self.host
+
+    def start(self) -> 'FixtureServer':
+        for name in STOREFRONTS:
+            self.stores[name] = Storefront(name, self.fixtures_dir / name)
+            self._servers[name] = ThreadingHTTPServer((self.host, 0), StorefrontHandler)
+        payment_origin = self.origin(PAYMENT_STORE)
+
+        for name, server in self._servers.items():
+            # Each server gets its own handler class bound to its store
+            server.RequestHandlerClass = type(
+                f'{name.title()}Handler', (StorefrontHandler,),
+                {'store': self.stores[name], 'payment_origin': payment_origin}
+            )
+            server.daemon_threads = True
+            thread = threading.Thread(target=server.serve_forever, name=f'fixture-{name}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def origin(self, store: str) -> str:
+        return f'http://{self._host_for(store)}:{self._servers[store].server_address[1]}'
+
+    def url(self, store: str, path: str = '/') -> str:
+        return self.origin(store) + path
+
+    def reset(self):
+        for store in self.stores.values():
+            store.reset()
+
+    def stop(self):
+        for server in self._servers.values():
+            server.shutdown()
+            server.server_close()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._servers.clear()
+        self._threads.clear()
+
+    def __enter__(self) -> 'FixtureServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    args = parser.parse_args()
+
+    with FixtureServer(host=args.host) as server:
+        for name in STOREFRONTS:
+            print(f"{name:>10}: {server.url(name)}")
+        print("\nServing fixture storefronts (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+    sys.exit(0)
+
+
+# Export for use in other modules
+__all__ = ['FixtureServer', 'Storefront', 'STOREFRONTS', 'FIXTURE_OTP', 'FIXTURES_DIR']
+
+
+if __name__ == "__main__":
+    main()
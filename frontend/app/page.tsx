@@ -8,6 +8,8 @@ import { useState } from "react";
 
 export default function Home() {
   const [isAutomationRunning, setIsAutomationRunning] = useState(false);
+  // Progress for this run is published under this id (ws/progress?session_id=...)
+  const [sessionId] = useState(() => crypto.randomUUID());
 
   const startAutomation = async () => {
     // try {
@@ -21,7 +23,10 @@ export default function Home() {
     //   await fetch("http://localhost:8000/api/automation/start", {
     //     method: "POST",
     //     headers: { "Content-Type": "application/json" },
-    //     body: JSON.stringify(data.checkout_data),
+    //     body: JSON.stringify({
+    //       ...data.checkout_data,
+    //       json_data: { ...data.checkout_data.json_data, session_id: sessionId },
+    //     }),
     //   });
     // } catch (error) {
     //   console.error("Error starting automation:", error);
@@ -45,7 +50,7 @@ export default function Home() {
         <ProductDetailsPreview />
 
         {/* Progress Timeline */}
-        <ProgressTimeline />
+        <ProgressTimeline sessionId={sessionId} />
 
         {/* Product Card */}
         <ProductCard />
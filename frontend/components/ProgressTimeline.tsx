@@ -8,7 +8,12 @@ interface Step {
     status: "completed" | "in-progress" | "pending";
 }
 
-export default function ProgressTimeline() {
+interface ProgressTimelineProps {
+    // Same session_id the automation request sends in json_data
+    sessionId?: string;
+}
+
+export default function ProgressTimeline({ sessionId = "default" }: ProgressTimelineProps) {
     const [steps, setSteps] = useState<Step[]>([
         { name: "Navigate to Product", status: "pending" },
         { name: "Select Variants", status: "pending" },
@@ -20,7 +25,7 @@ export default function ProgressTimeline() {
 
     useEffect(() => {
         // Connect to WebSocket for real-time updates
-        const ws = new WebSocket("ws://localhost:8000/ws/progress");
+        const ws = new WebSocket(`ws://localhost:8000/ws/progress?session_id=${encodeURIComponent(sessionId)}`);
 
         ws.onmessage = (event) => {
             const data = JSON.parse(event.data);
@@ -38,7 +43,7 @@ export default function ProgressTimeline() {
         };
 
         return () => ws.close();
-    }, []);
+    }, [sessionId]);
 
     return (
         <div className="glass rounded-xl p-6">
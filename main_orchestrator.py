@@ -27,54 +27,75 @@ if sys.platform == 'win32':
     if hasattr(sys.stderr, 'buffer'):
         sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'replace')
 
+import asyncio
 import json
 import logging
 import shutil
 import tempfile
 from datetime import datetime
-from playwright.async_api import async_playwright, Page
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, TYPE_CHECKING
 from dotenv import load_dotenv
 
-# Phase 1 imports
-from src.checkout_ai.dom.service import UniversalDOMFinder as find_variant_dom
-from src.checkout_ai.legacy.phase1.add_to_cart_robust import add_to_cart_robust
-from src.checkout_ai.legacy.phase1.cart_navigator import navigate_to_cart
-
-# Phase 2 imports
-from src.checkout_ai.legacy.phase2.checkout_flow import run_checkout_flow
-
-# Site-specific handlers (using registry system)
-from special_sites import get_site_specific_variant_handler, get_site_specific_checkout_handler
-
-# LLM for cart validation
+# Heavy subsystems (Playwright, phase 1/2 helpers, agents, live browser, stealth)
+# are imported on first run, not at module load - API restarts stay fast
+if TYPE_CHECKING:
+    from playwright.async_api import Page
 
 
-# Agent Imports
-from src.checkout_ai.agents.planner_agent import PA_agent, PLANNER_AGENT_OP
-from src.checkout_ai.agents.browser_agent import BA_agent, current_step_class
-from src.checkout_ai.agents.critique_agent import CA_agent, CritiqueInput, CritiqueOutput
-from src.checkout_ai.agents.unified_tools import set_page
+@lru_cache(maxsize=None)
+def _get_screenshot_service():
+    """Live browser screenshot service, or None when unavailable (loaded on first run)"""
+    try:
+        from backend.services.screenshot_service import screenshot_service
+        return screenshot_service
+    except ImportError:
+        logger.warning("Screenshot service not available - live browser disabled")
+        return None
 
-# Screenshot Service for live browser
-try:
-    from backend.services.screenshot_service import screenshot_service
-    SCREENSHOT_SERVICE_AVAILABLE = True
-except ImportError:
-    SCREENSHOT_SERVICE_AVAILABLE = False
-    logger.warning("Screenshot service not available - live browser disabled")
 
-# Stealth mode
-try:
-    from playwright_stealth import stealth_async
-    STEALTH_AVAILABLE = True
-except ImportError:
-    STEALTH_AVAILABLE = False
-    print("WARNING: playwright-stealth not installed. Run: pip install playwright-stealth")
-    async def stealth_async(page):
-        pass
-
-async def run_agentic_flow(page: Page, task: Dict[str, Any]) -> Dict[str, Any]:
+@lru_cache(maxsize=None)
+def _get_stealth():
+    """playwright-stealth's stealth_async, or None when not installed (loaded on first run)"""
+    try:
+        from playwright_stealth import stealth_async
+        return stealth_async
+    except ImportError:
+        print("WARNING: playwright-stealth not installed. Run: pip install playwright-stealth")
+        return None
+
+# Progress phases in the order of the UI timeline, with the plan-step words that belong to each
+PROGRESS_PHASES = [
+    ('navigate', ['navigate', 'go to', 'open']),
+    ('variants', ['variant', 'size', 'color', 'colour', 'quantity']),
+    ('cart', ['add to cart', 'cart', 'bag']),
+    ('checkout', ['checkout', 'email', 'address', 'shipping', 'contact', 'login', 'guest']),
+    ('payment', ['payment', 'card', 'upi', 'place order', 'order']),
+]
+
+
+def report_progress(phase: str, message: str, session_id: str = 'default', details: Dict[str, Any] = None):
+    """Publish a stage update to /ws/progress subscribers (only inside the API process)"""
+    tracker = sys.modules.get('backend.services.progress_tracker')
+    if not tracker:
+        return
+    step = [name for name, _ in PROGRESS_PHASES].index(phase) + 1
+    tracker.progress_tracker.publish_phase(phase, step, len(PROGRESS_PHASES), message, details, session_id)
+
+
+def step_progress_reporter(session_id: str = 'default'):
+    """on_step callback for AgentOrchestrator: maps each plan step to its progress phase"""
+    def on_step(step_text: str, index: int, total: int):
+        text = step_text.lower()
+        # Most specific phase first: "Navigate to cart" is cart, "add to cart with quantity 2" is cart
+        for phase, words in reversed(PROGRESS_PHASES):
+            if any(word in text for word in words):
+                report_progress(phase, step_text[:120], session_id, {'plan_step': index + 1, 'plan_steps': total})
+                return
+    return on_step
+
+
+async def run_agentic_flow(page: 'Page', task: Dict[str, Any], session_id: str = 'default') -> Dict[str, Any]:
     """
     Executes the task using the Planner -> Browser -> Critique agent loop.
     """
@@ -89,7 +110,8 @@ async def run_agentic_flow(page: Page, task: Dict[str, Any]) -> Dict[str, Any]:
     customer_data = task.get('customer_data')
     
     # Create orchestrator with customer data
-    orchestrator = AgentOrchestrator(page, max_iterations=20, customer_data=customer_data)
+    orchestrator = AgentOrchestrator(page, max_iterations=20, customer_data=customer_data,
+                                     on_step=step_progress_reporter(session_id))
     
     # Execute checkout flow using autonomous agent
     variant_str = ", ".join([f"{k}={v}" for k, v in variants.items()])
@@ -105,25 +127,61 @@ async def run_agentic_flow(page: Page, task: Dict[str, Any]) -> Dict[str, Any]:
     
     return result
 
+
+async def run_agentic_checkout(page: 'Page', customer_data: Dict[str, Any], session_id: str = 'default') -> Dict[str, Any]:
+    """
+    Runs only the checkout part of the agent loop, for carts that were already
+    built (multi-item mode).
+    """
+    from src.checkout_ai.agents.orchestrator import AgentOrchestrator
+    
+    logger.info("ORCHESTRATOR: Starting Agentic Checkout (cart already built)")
+    
+    orchestrator = AgentOrchestrator(page, max_iterations=20, customer_data=customer_data,
+                                     on_step=step_progress_reporter(session_id))
+    task_desc = ("The cart already contains all items. Navigate to cart, then proceed to checkout "
+                 "and fill all information (email, shipping, payment) to place the order.")
+    return await orchestrator.execute_task(task_desc, customer_data=customer_data)
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
-# Debug File Logging
-try:
-    fh = logging.FileHandler('orchestrator_debug.log', encoding='utf-8')
-    fh.setLevel(logging.DEBUG)
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-    fh.setFormatter(formatter)
-    logger.addHandler(fh)
-    logger.info("DEBUG LOGGING STARTED")
-except Exception as e:
-    print(f"Failed to setup file logging: {e}")
+
+
+@lru_cache(maxsize=None)
+def _setup_debug_logging():
+    """Debug File Logging - attached on first run so importing this module creates no files"""
+    try:
+        fh = logging.FileHandler('orchestrator_debug.log', encoding='utf-8')
+        fh.setLevel(logging.DEBUG)
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        fh.setFormatter(formatter)
+        logger.addHandler(fh)
+        logger.info("DEBUG LOGGING STARTED")
+    except Exception as e:
+        print(f"Failed to setup file logging: {e}")
 
 # Screenshot capture is now handled by screenshot_service
 
 
 async def validate_cart_items(page, tasks):
+    """Validate cart items match requested variants (structured extraction, LLM only when unsure)"""
+    from src.checkout_ai.legacy.phase1.cart_validator import validate_cart, MIN_CONFIDENCE
+
+    try:
+        result = await validate_cart(page, tasks)
+        if result['confidence'] >= MIN_CONFIDENCE:
+            logger.info(f"ORCHESTRATOR: Cart validation ({result['source']}) - Valid: {result['valid']}, Reason: {result['reason']}")
+            return result['valid']
+        logger.info(f"ORCHESTRATOR: Cart validation confidence {result['confidence']} too low - asking LLM")
+    except Exception as e:
+        logger.warning(f"ORCHESTRATOR: Structured cart validation error: {e}")
+
+    return await validate_cart_items_llm(page, tasks)
+
+
+async def validate_cart_items_llm(page, tasks):
     """Use LLM to validate cart items match requested variants"""
     try:
         # Extract cart items from page
@@ -326,6 +384,8 @@ async def run_phase1(page, task):
     Phase 1: Product selection and add to cart
     Returns: {'success': bool, 'error': str}
     """
+    from src.checkout_ai.legacy.phase1.add_to_cart_robust import add_to_cart_robust
+
     logger.info(f"ORCHESTRATOR: [{datetime.now().strftime('%H:%M:%S')}] Starting Phase 1 for {task['url']}")
     
     try:
@@ -537,6 +597,12 @@ async def run_full_flow_core(json_data: dict) -> dict:
     Core automation logic - renamed from run_full_flow
     This is the actual implementation that runs Playwright
     """
+    from playwright.async_api import async_playwright
+    from src.checkout_ai.legacy.phase1.multi_item_cart import build_multi_item_cart, DEFAULT_MAX_TABS
+
+    _setup_debug_logging()
+    screenshot_service = _get_screenshot_service()
+    stealth_async = _get_stealth()
     logger.info("[%s] Starting full checkout flow", datetime.now().strftime('%H:%M:%S'))
     
     playwright = None
@@ -546,6 +612,7 @@ async def run_full_flow_core(json_data: dict) -> dict:
         # Parse input
         customer = json_data['customer']
         tasks = json_data['tasks']
+        session_id = json_data.get('session_id', 'default')
         
         # Extract base URL from first task for fallback
         from urllib.parse import urlparse
@@ -570,12 +637,15 @@ async def run_full_flow_core(json_data: dict) -> dict:
         if not os.path.exists(chrome_path):
              # Fallback for some systems, though we verified it exists
              chrome_path = r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe"
+        if not os.path.exists(chrome_path):
+             # No system Chrome (Linux/macOS, CI): use Playwright's bundled Chromium
+             chrome_path = None
 
         context = await playwright.chromium.launch_persistent_context(
             user_data_dir=profile_path,
             executable_path=chrome_path, # FORCE EXPLICIT BINARY
             # No manual user_agent - Let Chrome set it
-            headless=False,
+            headless=json_data.get('headless', False),
             slow_mo=50, 
             # No extra_http_headers - Let Chrome set them naturally
             args=[
@@ -603,6 +673,21 @@ async def run_full_flow_core(json_data: dict) -> dict:
             logger.info("ORCHESTRATOR: Session cleared")
         except:
             pass
+        
+        # Pre-authenticated session: seed cookies/localStorage before the first navigation
+        # so logged-in checkouts (e.g. India OTP logins) skip login entirely
+        try:
+            # Imported here: the auth package needs passlib/jose/keyring (see requirements.txt)
+            from src.checkout_ai.auth.session_pool import get_session_pool, session_user_key
+            session_pool = get_session_pool()
+            user_key = session_user_key(customer)
+            if user_key and await session_pool.seed_context(context, playwright, user_key, base_url):
+                logger.info("ORCHESTRATOR: Restored stored login session")
+            session_pool.start_refresher(playwright)
+        except ImportError as e:
+            logger.info(f"ORCHESTRATOR: Session pool unavailable ({e}) - running without stored sessions")
+        except Exception as e:
+            logger.warning(f"ORCHESTRATOR: Session restore failed: {e}")
             
         # NO STEALTH - Let Chrome be Chrome
         # if STEALTH_AVAILABLE: ... removed ...
@@ -610,10 +695,12 @@ async def run_full_flow_core(json_data: dict) -> dict:
         # HUMAN NAVIGATION FLOW: Home -> Wait -> Product
         # This confirms we are "real" to Akamai by loading the full site first
         logger.info("ORCHESTRATOR: Navigating to Home Page first to establish session...")
+        report_progress('navigate', f"Opening {base_url}", session_id)
         try:
             await page.goto(base_url, timeout=60000, wait_until='domcontentloaded')
-            logger.info("ORCHESTRATOR: Home page loaded. Waiting 5 seconds...")
-            await asyncio.sleep(5)
+            home_wait = json_data.get('homeWaitSeconds', 5)
+            logger.info(f"ORCHESTRATOR: Home page loaded. Waiting {home_wait} seconds...")
+            await asyncio.sleep(home_wait)
         except Exception as e:
             logger.warning(f"Failed to load home page (might be okay if product loads): {e}")
 
@@ -831,54 +918,103 @@ async def run_full_flow_core(json_data: dict) -> dict:
             });
         """)
         
-        if STEALTH_AVAILABLE:
+        if stealth_async:
             await stealth_async(page)
         
-        # Start screenshot capture service (2-second intervals)
+        # Start live browser stream (CDP screencast)
 
-        if SCREENSHOT_SERVICE_AVAILABLE:
+        if screenshot_service:
             screenshot_task = asyncio.create_task(screenshot_service.start_capture(page))
             screenshot_service.lock_browser()
-            logger.info(f"ORCHESTRATOR: [{datetime.now().strftime('%H:%M:%S')}] Screenshot service started (2s interval)")
+            logger.info(f"ORCHESTRATOR: [{datetime.now().strftime('%H:%M:%S')}] Screenshot service started (screencast)")
         else:
             logger.warning("Screenshot service not available")
 
 
-        # Agentic flow: process each task using Planner -> Browser -> Critique loop
-        for i, task in enumerate(tasks):
-            logger.info(f"ORCHESTRATOR: [{datetime.now().strftime('%H:%M:%S')}] Processing task {i + 1}/{len(tasks)} with agentic flow")
+        # Multi-item mode: build the cart in parallel tabs, then checkout once
+        multi_item = json_data.get('multiItemMode', False) and len(tasks) > 1
+        
+        if multi_item:
+            max_tabs = json_data.get('maxConcurrentTabs', DEFAULT_MAX_TABS)
+            logger.info(f"ORCHESTRATOR: [{datetime.now().strftime('%H:%M:%S')}] Multi-item mode: {len(tasks)} items, up to {max_tabs} tabs")
             
-            # Add customer data to task
-            task['customer_data'] = customer
+            report_progress('cart', f"Adding {len(tasks)} items to cart", session_id)
+            cart_result = await build_multi_item_cart(
+                context, page, tasks,
+                max_tabs=max_tabs,
+                serialize_cart=json_data.get('serializeCart')
+            )
             
-            result = await run_agentic_flow(page, task)
+            if not cart_result.get('success'):
+                logger.error(f"ORCHESTRATOR: Multi-item cart build failed: {cart_result.get('error')}")
+                return {
+                    'success': False,
+                    'phase': 'multi_item_cart',
+                    'error': cart_result.get('error', 'Multi-item cart build failed'),
+                    'failed_tasks': cart_result['reconciliation']['failed']
+                }
+
+            # Check the cart lines against the requested variants before paying for them
+            from src.checkout_ai.legacy.phase1.cart_navigator import navigate_to_cart
+            nav_result = await navigate_to_cart(page)
+            if nav_result.get('success'):
+                if not await validate_cart_items(page, tasks):
+                    logger.error("ORCHESTRATOR: Cart contents do not match the requested items")
+                    return {
+                        'success': False,
+                        'phase': 'cart_validation',
+                        'error': 'Cart contents do not match the requested variants'
+                    }
+            else:
+                logger.warning("ORCHESTRATOR: Could not open cart page - skipping cart validation")
+
+            result = await run_agentic_checkout(page, customer, session_id)
             
             if not result.get('success'):
-                logger.error(f"ORCHESTRATOR: Task {i + 1} failed: {result.get('error')}")
-                logger.info(f"ORCHESTRATOR: Iterations completed: {result.get('iterations', 0)}")
-                
-                # Log history for debugging
-                if 'history' in result:
-                    logger.info(f"ORCHESTRATOR: Agent history:")
-                    for h in result['history'][-3:]:  # Last 3 iterations
-                        logger.info(f"  Step: {h['step'][:100]}")
-                        logger.info(f"  Result: {h.get('result', h.get('feedback', 'No result'))[:100]}")
-                
+                logger.error(f"ORCHESTRATOR: Checkout failed: {result.get('error')}")
                 return {
                     'success': False,
                     'phase': 'agentic_flow',
-                    'task_index': i,
-                    'error': result.get('error', 'Agentic flow failed'),
+                    'error': result.get('error', 'Agentic checkout failed'),
                     'iterations': result.get('iterations', 0)
                 }
+        else:
+            # Agentic flow: process each task using Planner -> Browser -> Critique loop
+            for i, task in enumerate(tasks):
+                logger.info(f"ORCHESTRATOR: [{datetime.now().strftime('%H:%M:%S')}] Processing task {i + 1}/{len(tasks)} with agentic flow")
             
-            logger.info(f"ORCHESTRATOR: Task {i + 1} completed in {result.get('iterations', 0)} iterations")
-            await asyncio.sleep(2)
+                # Add customer data to task
+                task['customer_data'] = customer
+            
+                result = await run_agentic_flow(page, task, session_id)
+            
+                if not result.get('success'):
+                    logger.error(f"ORCHESTRATOR: Task {i + 1} failed: {result.get('error')}")
+                    logger.info(f"ORCHESTRATOR: Iterations completed: {result.get('iterations', 0)}")
+                
+                    # Log history for debugging
+                    if 'history' in result:
+                        logger.info(f"ORCHESTRATOR: Agent history:")
+                        for h in result['history'][-3:]:  # Last 3 iterations
+                            logger.info(f"  Step: {h['step'][:100]}")
+                            logger.info(f"  Result: {h.get('result', h.get('feedback', 'No result'))[:100]}")
+                
+                    return {
+                        'success': False,
+                        'phase': 'agentic_flow',
+                        'task_index': i,
+                        'error': result.get('error', 'Agentic flow failed'),
+                        'iterations': result.get('iterations', 0)
+                    }
+            
+                logger.info(f"ORCHESTRATOR: Task {i + 1} completed in {result.get('iterations', 0)} iterations")
+                await asyncio.sleep(2)
 
         logger.info(f"ORCHESTRATOR: [{datetime.now().strftime('%H:%M:%S')}] All tasks completed via agentic flow")
         
         # ========== PAYMENT AUTOMATION PHASE ==========
         logger.info("ORCHESTRATOR: Starting payment automation phase")
+        report_progress('payment', "Starting payment", session_id)
         
         try:
             from src.checkout_ai.payments import PaymentAutomationService
@@ -991,14 +1127,16 @@ async def run_full_flow_core(json_data: dict) -> dict:
 
     finally:
         # Stop screenshot capture and cleanup
-        if SCREENSHOT_SERVICE_AVAILABLE:
+        if screenshot_service:
             screenshot_service.stop_capture()
             screenshot_service.unlock_browser()
             logger.info(f"ORCHESTRATOR: Screenshot service stopped and cleaned up")
 
-        logger.info(f"ORCHESTRATOR: Automation complete! Browser will stay open for 1 hour for inspection...")
-
-        await asyncio.sleep(3600)
+        # Browser stays open for inspection (benchmarks and CI pass 0)
+        keep_open = json_data.get('keepBrowserOpenSeconds', 3600)
+        if keep_open:
+            logger.info(f"ORCHESTRATOR: Automation complete! Browser will stay open for {keep_open}s for inspection...")
+            await asyncio.sleep(keep_open)
 
         # CLEANUP: Browser and Profile
         if context:
@@ -1009,6 +1147,13 @@ async def run_full_flow_core(json_data: dict) -> dict:
                 logger.error(f"Error closing context: {e}")
 
         if playwright:
+            # Refresher probes through this Playwright instance
+            session_pool_module = sys.modules.get('src.checkout_ai.auth.session_pool')
+            if session_pool_module:
+                try:
+                    await session_pool_module.get_session_pool().stop_refresher(playwright)
+                except Exception:
+                    pass
             try:
                 await playwright.stop()
                 logger.info("Playwright stopped")
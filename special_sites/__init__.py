@@ -1,86 +1,57 @@
 """
 Special Sites Module
 Site-specific handlers for e-commerce sites with unique checkout flows
+
+Handlers are registered in special_sites.registry (or via entry points) and
+imported only when a page on their site is first handled.
 """
 
-from .dillards_automator import handle_dillards_checkout, select_dillards_variant
-from .farfetch_automator import handle_farfetch_checkout
-from .patagonia_automator import select_patagonia_variant
-from .heydude_automator import select_heydude_variant
-from .karllagerfeld_automator import select_karllagerfeld_variant, navigate_to_checkout as kl_navigate_to_checkout
-from .amazon_automator import handle_amazon_login
-from .amazon_automator import select_amazon_variant, add_amazon_to_cart
+import importlib
+
+from .registry import registry, CHECKOUT_HANDLER, VARIANT_HANDLER, LOGIN_HANDLER
 
-# Site detection registry
-SITE_HANDLERS = {
-    'dillards.com': {
-        'checkout_handler': handle_dillards_checkout,
-        'variant_handler': select_dillards_variant
-    },
-    'farfetch.com': {
-        'checkout_handler': handle_farfetch_checkout
-    },
-    'patagonia.com': {
-        'variant_handler': select_patagonia_variant
-    },
-    'heydude.com': {
-        'variant_handler': select_heydude_variant
-    },
-    'karllagerfeld.com': {
-        'variant_handler': select_karllagerfeld_variant,
-        'checkout_handler': kl_navigate_to_checkout
-    },
-    'amazon.com': {
-        'variant_handler': select_amazon_variant,
-        'login_handler': handle_amazon_login
-    },
-    'amazon.in': {
-        'variant_handler': select_amazon_variant,
-        'login_handler': handle_amazon_login
-    },
-    'amazon.co.uk': {
-        'variant_handler': select_amazon_variant,
-        'login_handler': handle_amazon_login
-    },
-    'amazon.de': {
-        'variant_handler': select_amazon_variant,
-        'login_handler': handle_amazon_login
-    },
-    'amazon.fr': {
-        'variant_handler': select_amazon_variant,
-        'login_handler': handle_amazon_login
-    },
-    'amazon.ca': {
-        'variant_handler': select_amazon_variant,
-        'login_handler': handle_amazon_login
-    }
+# Handler functions previously imported here - resolved lazily on attribute access
+_LAZY_EXPORTS = {
+    'handle_dillards_checkout': ('.dillards_automator', 'handle_dillards_checkout'),
+    'select_dillards_variant': ('.dillards_automator', 'select_dillards_variant'),
+    'handle_farfetch_checkout': ('.farfetch_automator', 'handle_farfetch_checkout'),
+    'select_patagonia_variant': ('.patagonia_automator', 'select_patagonia_variant'),
+    'select_heydude_variant': ('.heydude_automator', 'select_heydude_variant'),
+    'select_karllagerfeld_variant': ('.karllagerfeld_automator', 'select_karllagerfeld_variant'),
+    'kl_navigate_to_checkout': ('.karllagerfeld_automator', 'navigate_to_checkout'),
+    'handle_amazon_login': ('.amazon_automator', 'handle_amazon_login'),
+    'select_amazon_variant': ('.amazon_automator', 'select_amazon_variant'),
+    'add_amazon_to_cart': ('.amazon_automator', 'add_amazon_to_cart'),
 }
 
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module, attribute = _LAZY_EXPORTS[name]
+        return getattr(importlib.import_module(module, __name__), attribute)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_site_handler(url: str, kind: str):
+    """
+    Handler of the given kind ('checkout_handler', 'variant_handler', 'login_handler') for a URL
+    Returns: handler function or None
+    """
+    return registry.get_handler(url, kind)
+
 async def get_site_specific_checkout_handler(page):
     """
     Detect site and return appropriate checkout handler
     Returns: handler function or None
     """
-    url = page.url.lower()
-    
-    for domain, handlers in SITE_HANDLERS.items():
-        if domain in url:
-            return handlers.get('checkout_handler')
-    
-    return None
+    return registry.get_handler(page.url, CHECKOUT_HANDLER)
 
 async def get_site_specific_variant_handler(page):
     """
     Detect site and return appropriate variant handler
     Returns: handler function or None
     """
-    url = page.url.lower()
-    
-    for domain, handlers in SITE_HANDLERS.items():
-        if domain in url:
-            return handlers.get('variant_handler')
-    
-    return None
+    return registry.get_handler(page.url, VARIANT_HANDLER)
 
 
 async def get_site_specific_login_handler(page):
@@ -88,10 +59,4 @@ async def get_site_specific_login_handler(page):
     Detect site and return appropriate login handler
     Returns: handler function or None
     """
-    url = page.url.lower()
-    
-    for domain, handlers in SITE_HANDLERS.items():
-        if domain in url:
-            return handlers.get('login_handler')
-    
-    return None
+    return registry.get_handler(page.url, LOGIN_HANDLER)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Site Handler Registry
+Maps store domains to site-specific handlers without importing them up front
+- Handlers are declared as (module, attribute) names and imported on first match
+- Lookups walk a reversed-domain trie: cost is O(labels in the host), not O(sites),
+  'www.dillards.com' matches 'dillards.com' and 'amazon.com' never matches 'amazon.com.au'
+- Site modules outside this package register through the 'checkout_ai.special_sites'
+  entry point group; each entry point is a callable taking the registry:
+
+      [project.entry-points."checkout_ai.special_sites"]
+      acme = "acme_sites.register:register"
+
+      def register(registry):
+          registry.register(['acme.com', 'acme.co.uk'], 'acme_sites.automator',
+                            variant_handler='select_acme_variant')
+"""
+
+import importlib
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = 'checkout_ai.special_sites'
+
+# Handler kinds used by the automation flow
+CHECKOUT_HANDLER = 'checkout_handler'
+VARIANT_HANDLER = 'variant_handler'
+LOGIN_HANDLER = 'login_handler'
+
+
+def host_of(url: str) -> str:
+    """Lowercased host of a URL or bare hostname (no port, no trailing dot)"""
+    url = (url or '').strip().lower()
+    if '//' not in url:
+        url = '//' + url
+    host = urlparse(url).hostname or ''
+    return host.rstrip('.')
+
+
+class DomainTrie:
+    """Reversed-label trie: longest registered domain suffix of a host wins"""
+
+    _VALUE = object()
+
+    def __init__(self, items: Optional[Dict[str, Any]] = None):
+        self._root: Dict = {}
+        for domain, value in (items or {}).items():
+            self.insert(domain, value)
+
+    def insert(self, domain: str, value: Any):
+        node = self._root
+        for label in reversed(host_of(domain).split('.')):
+            node = node.setdefault(label, {})
+        node[self._VALUE] = value
+
+    def lookup(self, url: str, default: Any = None) -> Any:
+        """Value of the most specific domain matching the URL's host (subdomains included)"""
+        node = self._root
+        found = default
+        for label in reversed(host_of(url).split('.')):
+            node = node.get(label)
+            if node is None:
+                break
+            if self._VALUE in node:
+                found = node[self._VALUE]
+        return found
+
+    def __contains__(self, url: str) -> bool:
+        return self.lookup(url, self._VALUE) is not self._VALUE
+
+
+class SiteEntry:
+    """Handlers of one site module, imported on first use"""
+
+    def __init__(self, module: str, handlers: Dict[str, str]):
+        self.module = module
+        self.handlers = handlers
+        self._loaded: Optional[Any] = None
+
+    def get(self, kind: str) -> Optional[Callable]:
+        attribute = self.handlers.get(kind)
+        if not attribute:
+            return None
+        if self._loaded is None:
+            self._loaded = importlib.import_module(self.module)
+            logger.debug(f"SITE REGISTRY: Loaded {self.module}")
+        return getattr(self._loaded, attribute)
+
+
+class SiteRegistry:
+    """Domain -> site handlers, with lazy imports and entry point plugins"""
+
+    def __init__(self, entry_point_group: Optional[str] = ENTRY_POINT_GROUP):
+        self._trie = DomainTrie()
+        self._domains: Dict[str, SiteEntry] = {}
+        self._entry_point_group = entry_point_group
+        self._plugins_loaded = entry_point_group is None
+
+    def register(self, domains: Iterable[str], module: str, **handlers: str):
+        """
+        Register handlers for one or more domains.
+
+        Args:
+            domains: Store domains ('amazon.co.uk'); subdomains match automatically
+            module: Module holding the handlers, imported on first match
+            **handlers: kind -> attribute name (checkout_handler='handle_x_checkout', ...)
+        """
+        entry = SiteEntry(module, handlers)
+        for domain in [domains] if isinstance(domains, str) else domains:
+            domain = host_of(domain)
+            self._domains[domain] = entry
+            self._trie.insert(domain, entry)
+
+    def _load_plugins(self):
+        """Run entry point registrations once, on the first lookup"""
+        self._plugins_loaded = True
+        try:
+            from importlib.metadata import entry_points
+            eps = entry_points()
+            group = eps.select(group=self._entry_point_group) if hasattr(eps, 'select') else eps.get(self._entry_point_group, [])
+        except Exception as e:
+            logger.debug(f"SITE REGISTRY: Entry points unavailable: {e}")
+            return
+        for ep in group:
+            try:
+                ep.load()(self)
+                logger.info(f"SITE REGISTRY: Registered plugin '{ep.name}'")
+            except Exception as e:
+                logger.warning(f"SITE REGISTRY: Plugin '{ep.name}' failed to register: {e}")
+
+    def entry_for(self, url: str) -> Optional[SiteEntry]:
+        if not self._plugins_loaded:
+            self._load_plugins()
+        return self._trie.lookup(url)
+
+    def get_handler(self, url: str, kind: str) -> Optional[Callable]:
+        """Handler of the given kind for the URL's site, or None"""
+        entry = self.entry_for(url)
+        if entry is None:
+            return None
+        try:
+            return entry.get(kind)
+        except (ImportError, AttributeError) as e:
+            logger.warning(f"SITE REGISTRY: Could not load {kind} from {entry.module}: {e}")
+            return None
+
+    def domains(self):
+        if not self._plugins_loaded:
+            self._load_plugins()
+        return list(self._domains)
+
+
+# Built-in sites (modules in this package)
+_AMAZON_DOMAINS = ['amazon.com', 'amazon.in', 'amazon.co.uk', 'amazon.de', 'amazon.fr', 'amazon.ca']
+
+registry = SiteRegistry()
+registry.register('dillards.com', 'special_sites.dillards_automator',
+                  checkout_handler='handle_dillards_checkout', variant_handler='select_dillards_variant')
+registry.register('farfetch.com', 'special_sites.farfetch_automator',
+                  checkout_handler='handle_farfetch_checkout')
+registry.register('patagonia.com', 'special_sites.patagonia_automator',
+                  variant_handler='select_patagonia_variant')
+registry.register('heydude.com', 'special_sites.heydude_automator',
+                  variant_handler='select_heydude_variant')
+registry.register('karllagerfeld.com', 'special_sites.karllagerfeld_automator',
+                  variant_handler='select_karllagerfeld_variant', checkout_handler='navigate_to_checkout')
+registry.register(_AMAZON_DOMAINS, 'special_sites.amazon_automator',
+                  variant_handler='select_amazon_variant', login_handler='handle_amazon_login')
+
+
+# Export for use in other modules
+__all__ = [
+    'registry', 'SiteRegistry', 'DomainTrie', 'host_of', 'ENTRY_POINT_GROUP',
+    'CHECKOUT_HANDLER', 'VARIANT_HANDLER', 'LOGIN_HANDLER'
+]
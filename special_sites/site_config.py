@@ -4,6 +4,8 @@ Site-specific configuration
 Centralized place for site-specific behaviors and quirks
 """
 
+from .registry import DomainTrie
+
 # Sites that require double-click on Add to Cart button
 DOUBLE_CLICK_SITES = [
     'karllagerfeld.com',
@@ -43,15 +45,14 @@ CUSTOM_VARIANT_SITES = {
     }
 }
 
+# Domain tries built once - lookups cost O(labels in the host) however many sites are listed
+_DOUBLE_CLICK_TRIE = DomainTrie({domain: True for domain in DOUBLE_CLICK_SITES})
+_CUSTOM_VARIANT_TRIE = DomainTrie(CUSTOM_VARIANT_SITES)
+
 def needs_double_click(url: str) -> bool:
     """Check if site requires double-click for add to cart"""
-    url_lower = url.lower()
-    return any(domain in url_lower for domain in DOUBLE_CLICK_SITES)
+    return _DOUBLE_CLICK_TRIE.lookup(url, False)
 
 def get_custom_variant_config(url: str) -> dict:
     """Get custom variant selector config for site"""
-    url_lower = url.lower()
-    for domain, config in CUSTOM_VARIANT_SITES.items():
-        if domain in url_lower:
-            return config
-    return None
+    return _CUSTOM_VARIANT_TRIE.lookup(url)
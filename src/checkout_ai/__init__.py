@@ -1 +1,12 @@
-from .agents.orchestrator import AgentOrchestrator
+# AgentOrchestrator pulls in pydantic_ai and Playwright - load it on first access
+# so importing any checkout_ai submodule stays cheap
+
+
+def __getattr__(name):
+    if name == 'AgentOrchestrator':
+        from .agents.orchestrator import AgentOrchestrator
+        return AgentOrchestrator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ['AgentOrchestrator']
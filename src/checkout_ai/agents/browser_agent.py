@@ -1,8 +1,8 @@
 from pydantic_ai import RunContext
 from src.checkout_ai.dom.service import UniversalDOMFinder
 import json
-import os
 import asyncio
+from typing import Dict
 from dotenv import load_dotenv
 from pydantic import BaseModel
 try:
@@ -34,14 +34,7 @@ async def _all_required_fields_filled(required_labels: List[str]) -> bool:
     return True
 load_dotenv()
 
-# API key loaded from backend config (reads .env)
-try:
-    from backend.api.llm_config_api import get_session_llm_config
-    config = get_session_llm_config()
-    if config and config.get('api_key'):
-        os.environ['OPENAI_API_KEY'] = config['api_key']
-except:
-    pass
+# API key is loaded from backend config on first run (planner_agent._ensure_api_key)
 
 
 class current_step_class(BaseModel):
@@ -105,17 +98,17 @@ You always:
 3. Do NOT try to be smart by executing multiple steps at once.
 4. Trust that the orchestrator will give you the next step when needed.
 5. If the current step is "Navigate to URL", ONLY navigate - do not select variants or add to cart.
-6. If the current step is "Select variant: color=Blue", ONLY select that variant - do not add to cart.
+6. If the current step is "Select variants: color=Blue, size=M", ONLY select those variants - do not add to cart.
 
 **Examples of CORRECT single-step execution:**
 - Step: "Navigate to product page" → Call `navigate()` only, return
-- Step: "Select variant: size=M" → Call `select_variant()` only, return  
+- Step: "Select variants: color=Blue, size=M" → Call `select_variants()` once, return
 - Step: "Add to Cart" → Call `add_to_cart()` only, return
 - Step: "Fill email" → Call `fill_email()` only, return
 
 **Examples of WRONG multi-step execution:**
 - Step: "Navigate to product page" → ❌ Do NOT call navigate() + select_variant() + add_to_cart()
-- Step: "Select variant: size=M" → ❌ Do NOT call select_variant() + add_to_cart()
+- Step: "Select variants: color=Blue, size=M" → ❌ Do NOT call select_variant() per variant, and do NOT call add_to_cart()
 </single_step_execution>
 
 <mental_model_of_checkout>
@@ -171,7 +164,7 @@ Note: Cookie banners, newsletters, chat widgets are handled automatically. Only
 2. **Identify the ONE action required** by this step.
 3. Use `validate_page` ONLY if needed to understand where you are.
 4. **Choose the ONE tool** that matches the step:
-   - Variants: `select_variant` (parses from step text automatically).
+   - Variants: `select_variants` - one call selects every type=value pair in the step (parsed from step text automatically). `select_variant` only for a single "Select variant: type=value" step.
    - Quantity: Skip if quantity=1 (default), otherwise use `select_variant`.
    - Add to cart: `add_to_cart` or `click_add_to_cart`.
    - **Navigate to cart: `navigate_to_cart`** - Automatically clicks cart modal "Checkout"/"View Cart" button OR mini cart icon in header. No manual clicking needed.
@@ -179,7 +172,7 @@ Note: Cookie banners, newsletters, chat widgets are handled automatically. Only
    - Contact & address: `fill_email`, `fill_contact`, `fill_address`.
    - Shipping: `select_shipping_method`, `click_continue_to_payment`.
    - Generic forward: `click_continue` or `finalize_checkout`.
-   - Low-level: `click`, `fill_text`, `select_dropdown` only if no high-level tool fits.
+   - Low-level: `click`, `fill_text`, `select_dropdown` only if no high-level tool fits - pass the `ref` shown by `validate_page` (e.g. `click(ref="e812")`).
 5. **Execute the ONE tool and return** - let the orchestrator give you the next step.
 6. If stuck or confused, use `call_planner(reason, current_state)` to request help.
 7. If unsure about a critical action, use `call_critique(concern, step_result)`.
@@ -228,27 +221,8 @@ On failure, return: "ERROR: [what went wrong]"
 """
 
 # Setup BA - model from UI config ONLY
-# Allow import to succeed even if no API key configured yet
+# Built on first run by get_or_create_browser_agent() so importing this module never builds a model
 BA_agent = None
-try:
-    BA_model = get_pydantic_model()
-    
-    # Only create agent if we have a model
-    if BA_model:
-        BA_agent = Agent(
-            model=BA_model, 
-            system_prompt=BA_SYS_PROMPT,
-            deps_type=current_step_class,
-            name="Browser Agent",
-            retries=3,
-            model_settings={'temperature': 0.5},
-        )
-        print("[Browser Agent] Initialized successfully")
-    else:
-        print("[Browser Agent] Skipping initialization - no model configured yet")
-except Exception as e:
-    print(f"[Browser Agent] Could not initialize at import time: {e}")
-    print("[Browser Agent] Agent will be initialized when model is configured")
 
 def get_or_create_browser_agent():
     """Get existing agent or create new one if model is now available"""
@@ -270,6 +244,7 @@ def get_or_create_browser_agent():
                 retries=3,
                 model_settings={'temperature': 0.5},
             )
+            _register_tools(BA_agent)
             print("[Browser Agent] Initialized successfully (lazy)")
             return BA_agent
     except Exception as e:
@@ -280,14 +255,43 @@ def get_or_create_browser_agent():
 
 
 
-# Register high-level tools - only if agent was successfully created
-if BA_agent is not None:
+def _parse_variant_pairs(step: str) -> Dict[str, str]:
+    """
+    All type=value pairs of a step ('Select variants: color=Slate Grey, Band Size=34B').
+    Types may contain spaces; a comma or semicolon only starts a new pair when the
+    next type= follows, so values may contain commas ('color=Red, White & Blue').
+    """
+    import re
+    step = step or ''
+    head = step.split('=', 1)[0]
+    # Pairs start after 'Select variants:' / '(' - without either, the type is the word before '='
+    start = max(head.rfind(':'), head.rfind('('))
+    spec = step[start + 1:]
+
+    pairs = {}
+    for part in re.split(r'[,;]\s*(?=[\w ]+?\s*=)', spec):
+        match = re.match(r'\s*([\w ]+?)\s*=\s*(.*)', part, re.DOTALL)
+        if not match:
+            continue
+        variant_type, variant_value = match.group(1), match.group(2).strip()
+        if start < 0 and not pairs:
+            variant_type = variant_type.split()[-1]
+        # Drop the ')' closing 'Select variants (color=Blue)' but keep 'M (Regular)'
+        if variant_value.endswith(')') and variant_value.count(')') > variant_value.count('('):
+            variant_value = variant_value[:-1].strip()
+        variant_value = variant_value.rstrip('.').strip()
+        if variant_value:
+            pairs[variant_type.strip()] = variant_value
+    return pairs
+
+
+# Register high-level tools on the agent when it is built
+def _register_tools(BA_agent):
     @BA_agent.tool
     async def select_variant(ctx: RunContext) -> str:
         """Select product variant by parsing the current step description.
         The step format should be: 'Select variant: color=Slate Grey' or 'Select variant: size=L'
         """
-        import re
         import logging
         logger = logging.getLogger(__name__)
         
@@ -295,21 +299,45 @@ if BA_agent is not None:
         current_step = ctx.deps.current_step
         logger.info(f"🔍 [SELECT_VARIANT] Received step: '{current_step}'")
         
+        # Several type=value pairs in one step: select them together
+        pairs = _parse_variant_pairs(current_step)
+        if len(pairs) > 1:
+            logger.info(f"✅ [SELECT_VARIANT] Step has {len(pairs)} variants, selecting as a batch")
+            result = await execute_tool("select_variants", variants=pairs)
+            return str(result)
+
         # Extract variant_type and variant_value from step description
-        match = re.search(r'(\w+)\s*=\s*([^,]+)', current_step)
-        if not match:
+        if not pairs:
             logger.error(f"❌ [SELECT_VARIANT] Could not parse variant from: '{current_step}'")
             logger.error(f"   Expected format: 'Select variant: type=value' (e.g., 'Select variant: color=Blue')")
             return "ERROR: Could not parse variant from step. Expected format: 'Select variant: type=value'"
         
-        variant_type = match.group(1).strip()
-        variant_value = match.group(2).strip()
+        variant_type, variant_value = next(iter(pairs.items()))
         
         logger.info(f"✅ [SELECT_VARIANT] Parsed successfully: {variant_type}={variant_value}")
         
         result = await execute_tool("select_variant", variant_type=variant_type, variant_value=variant_value)
         return str(result)
 
+    @BA_agent.tool
+    async def select_variants(ctx: RunContext) -> str:
+        """Select ALL product variants of the current step in one call.
+        The step format should be: 'Select variants: color=Blue, size=M, fit=Slim'
+        Order, re-render waits and verification are handled by the tool.
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+
+        current_step = ctx.deps.current_step
+        pairs = _parse_variant_pairs(current_step)
+        if not pairs:
+            logger.error(f"❌ [SELECT_VARIANTS] Could not parse variants from: '{current_step}'")
+            return "ERROR: Could not parse variants from step. Expected format: 'Select variants: color=Blue, size=M'"
+
+        logger.info(f"✅ [SELECT_VARIANTS] Parsed: {pairs}")
+        result = await execute_tool("select_variants", variants=pairs)
+        return str(result)
+
     @BA_agent.tool_plain
     async def add_to_cart() -> str:
         """Add product to cart"""
@@ -494,9 +522,9 @@ if BA_agent is not None:
 
     @BA_agent.tool_plain
     async def validate_page() -> str:
-        """Get current page state"""
+        """Get current page state: ranked list of fields, buttons and messages, each with a [ref] usable by click/fill_text/select_dropdown"""
         result = await execute_tool("validate_page")
-        return str(result)
+        return result.get("page") or str(result)
 
     @BA_agent.tool_plain
     async def finalize_checkout() -> str:
@@ -601,21 +629,21 @@ if BA_agent is not None:
 
     # Low-level actions
     @BA_agent.tool_plain
-    async def click(selector: str = None, text: str = None, x: int = None, y: int = None) -> str:
-        """Click element"""
-        result = await execute_tool("click", selector=selector, text=text, x=x, y=y)
+    async def click(selector: str = None, text: str = None, x: int = None, y: int = None, ref: str = None) -> str:
+        """Click element (ref from validate_page, e.g. "e812")"""
+        result = await execute_tool("click", selector=selector, text=text, x=x, y=y, ref=ref)
         return str(result)
 
     @BA_agent.tool_plain
-    async def fill_text(selector: str = None, text_content: str = "", label: str = None) -> str:
-        """Fill text field"""
-        result = await execute_tool("fill_text", selector=selector, text_content=text_content, label=label)
+    async def fill_text(selector: str = None, text_content: str = "", label: str = None, ref: str = None) -> str:
+        """Fill text field (ref from validate_page)"""
+        result = await execute_tool("fill_text", selector=selector, text_content=text_content, label=label, ref=ref)
         return str(result)
 
     @BA_agent.tool_plain
-    async def select_dropdown(selector: str = None, value: str = "", label: str = None) -> str:
-        """Select dropdown option"""
-        result = await execute_tool("select_dropdown", selector=selector, value=value, label=label)
+    async def select_dropdown(selector: str = None, value: str = "", label: str = None, ref: str = None) -> str:
+        """Select dropdown option (ref from validate_page)"""
+        result = await execute_tool("select_dropdown", selector=selector, value=value, label=label, ref=ref)
         return str(result)
 
     @BA_agent.tool_plain
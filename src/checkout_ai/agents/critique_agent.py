@@ -1,21 +1,13 @@
 from pydantic_ai import Agent
 from pydantic import BaseModel
 from pydantic_ai.settings import ModelSettings
-import os
 from dotenv import load_dotenv
 
 from src.checkout_ai.core.utils.openai_client import get_client, get_model, get_pydantic_model
 
 load_dotenv()
 
-# API key loaded from backend config (reads .env)
-try:
-    from backend.api.llm_config_api import get_session_llm_config
-    config = get_session_llm_config()
-    if config and config.get('api_key'):
-        os.environ['OPENAI_API_KEY'] = config['api_key']
-except:
-    pass
+# API key is loaded from backend config on first run (planner_agent._ensure_api_key)
 
 class CritiqueOutput(BaseModel):
     feedback: str
@@ -28,6 +20,7 @@ class CritiqueInput(BaseModel):
     current_step: str
     action_result: str
     gate_name: str = None
+    page_context: str = None # Ranked accessibility view of the current page (refs, roles, names, states)
 
 #System prompt for Critique agent
 CA_SYS_PROMPT = """
@@ -42,6 +35,7 @@ You have two distinct roles:
 **IF request_type is "VERIFICATION"**:
 - You are checking a "Gate" (e.g., "cart_addition", "payment_info").
 - Analyze the `action_result` to see if the criteria for the gate are met.
+- When `page_context` is provided, use it as the current state of the page (visible fields with values/states, buttons, cart totals, error messages).
 - If met, set `approved=True`.
 - If NOT met, set `approved=False` and provide specific `feedback` on what is missing.
 - **CRITICAL**: For the FINAL Gate (Order Verification), if successful, set `terminate=True` and put the final summary in `final_response`.
@@ -69,27 +63,8 @@ You have two distinct roles:
 """
 
 # Setup CA - model from UI config ONLY
-# Allow import to succeed even if no model configured yet
+# Built on first run by get_or_create_critique_agent() so importing this module never builds a model
 CA_agent = None
-try:
-    CA_model = get_pydantic_model()
-    
-    # Only create agent if we have a model
-    if CA_model:
-        CA_agent = Agent(
-            model=CA_model, 
-            name="Critique Agent",
-            system_prompt=CA_SYS_PROMPT,
-            retries=3,
-            model_settings={'temperature': 0.5},
-            output_type=CritiqueOutput,
-        )
-        print("[Critique Agent] Initialized successfully")
-    else:
-        print("[Critique Agent] Skipping initialization - no model configured yet")
-except Exception as e:
-    print(f"[Critique Agent] Could not initialize at import time: {e}")
-    print("[Critique Agent] Agent will be initialized when model is configured")
 
 def get_or_create_critique_agent():
     """Get existing agent or create new one if model is now available"""
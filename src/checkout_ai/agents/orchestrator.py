@@ -1,7 +1,7 @@
 """Agent Orchestrator - Manages Planner→Browser→Critique loop"""
 import asyncio
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Callable, Optional
 from playwright.async_api import Page
 
 from src.checkout_ai.agents.llm_factory import LLMFactory
@@ -10,6 +10,7 @@ from src.checkout_ai.core.config import LoadConfig
 from src.checkout_ai.utils.logger_config import setup_logger
 from src.checkout_ai.agents.critique_agent import CritiqueInput
 from src.checkout_ai.agents.unified_tools import set_page, set_customer_data
+from src.checkout_ai.dom.page_representation import build_page_representation
 from src.checkout_ai.utils.country_detector import (
     detect_country_from_url, 
     get_country_config
@@ -20,9 +21,12 @@ logger = logging.getLogger(__name__)
 class AgentOrchestrator:
     """Orchestrates the agent loop for ecommerce automation"""
     
-    def __init__(self, page: Page, max_iterations: int = 20, customer_data: Dict = None):
+    def __init__(self, page: Page, max_iterations: int = 20, customer_data: Dict = None,
+                 on_step: Optional[Callable[[str, int, int], None]] = None):
         self.page = page
         self.max_iterations = max_iterations
+        # Called with (step_text, step_index, total_steps) before each plan step runs
+        self.on_step = on_step
         self.history = []
         self.customer_data = customer_data
         self.detected_country = None
@@ -203,6 +207,11 @@ class AgentOrchestrator:
             logger.info(f"ORCHESTRATOR: Executing Step {current_step_idx + 1}/{len(plan_steps)}")
             logger.info(f"ORCHESTRATOR: Step Text: '{step_text}'")
             logger.info(f"ORCHESTRATOR: ============================================")
+            if self.on_step:
+                try:
+                    self.on_step(step_text, current_step_idx, len(plan_steps))
+                except Exception as e:
+                    logger.debug(f"ORCHESTRATOR: Step callback error: {e}")
             
             # Execute Step
             step_success = False
@@ -348,10 +357,12 @@ Consider:
                     elif "SIGNAL_CALL_CRITIQUE" in result_str:
                         logger.info("ORCHESTRATOR: Browser requested Assistance")
                         # Call Critique for Assistance
+                        page_view = await build_page_representation(self.page)
                         c_input = CritiqueInput(
                             request_type="ASSISTANCE", 
                             current_step=step_text, 
-                            action_result=result_str
+                            action_result=result_str,
+                            page_context=page_view.get('text') or None
                         )
                         c_res = await critique.run(c_input)
                         advice = c_res.output.feedback
@@ -406,11 +417,13 @@ Consider:
             
             if current_gate:
                 logger.info(f"ORCHESTRATOR: Verifying Gate: {current_gate}")
+                page_view = await build_page_representation(self.page)
                 c_input = CritiqueInput(
                     request_type="VERIFICATION",
                     current_step=step_text,
                     action_result=result_str, # Provide last result
-                    gate_name=current_gate
+                    gate_name=current_gate,
+                    page_context=page_view.get('text') or None
                 )
                 try:
                     c_res = await critique.run(c_input)
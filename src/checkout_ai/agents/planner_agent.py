@@ -174,16 +174,16 @@ Do not fabricate country-specific details if the request does not give them.
    - Do not fabricate payment details; keep those steps generic.
 
 4. VARIANT HANDLING:
-   - If the user specifies size, color, or other variants, include dedicated steps like:
-     - “Select variant: size=M”
-     - “Select variant: color=Blue”
+   - If the user specifies size, color, or other variants, include ONE step that lists all of them:
+     - “Select variants: color=Blue, size=M”
+   - A single variant uses the same form: “Select variants: size=M”
 
 5. GATE AWARENESS:
    - Your plan should naturally include points where progress can be checked:
    - **VARIANT SELECTION**: Always required BEFORE adding to cart:
-  * Color/Style/Size → "Select variant: [type]=[value]" (e.g., "Select variant: color=Blue")
+  * Color/Style/Size → "Select variants: [type]=[value], [type]=[value]" (e.g., "Select variants: color=Blue, size=M")
   * **Quantity**: ONLY create step if quantity > 1 (1 is default, skip "Set quantity: 1" step entirely)
-  * If multiple variants exist (e.g., color + size), create separate sequential steps for each.
+  * If multiple variants exist (e.g., color + size), put them ALL in that one step - the tool orders them (color before size) and verifies them together.
   * CRITICAL: Ensure variant selections are BEFORE "Click 'Add to Cart'" in the plan.
   
 - **ADD TO CART**: After all variants selected → "Click 'Add to Cart'" (NOT before variants!)
@@ -204,9 +204,7 @@ Return ONLY a list of strings, where each string is one step.
 Example:
 [
   "Navigate to https://example.com/product/123",
-  "Select variant: size=M",
-  "Select variant: color=Blue",
-  "select quantity: 1",
+  "Select variants: color=Blue, size=M",
   "Click 'Add to Cart'",
   "Navigate to Cart by clicking 'View Cart' or clicking on mini-cart icon on top-right",
   "Click 'Checkout'",
@@ -225,27 +223,8 @@ Example:
 """
 
 # Setup PA - model from UI config ONLY
-# Allow import to succeed even if no model configured yet
+# Built on first run by get_or_create_planner_agent() so importing this module never builds a model
 PA_agent = None
-try:
-    PA_model = get_pydantic_model()
-    
-    # Only create agent if we have a model
-    if PA_model:
-        PA_agent = Agent(
-            model=PA_model, 
-            system_prompt=PA_SYS_PROMPT,
-            name="Planner Agent",
-            retries=3, 
-            model_settings={'temperature': 0.5},
-            output_type=PLANNER_AGENT_OP
-        )
-        print("[Planner Agent] Initialized successfully")
-    else:
-        print("[Planner Agent] Skipping initialization - no model configured yet")
-except Exception as e:
-    print(f"[Planner Agent] Could not initialize at import time: {e}")
-    print("[Planner Agent] Agent will be initialized when model is configured")
 
 def get_or_create_planner_agent():
     """Get existing agent or create new one if model is now available"""
@@ -33,7 +33,20 @@ async def select_variant_tool(variant_type: str, variant_value: str) -> Dict[str
     from src.checkout_ai.dom.service import find_variant_dom
     page = get_page()
     result = await find_variant_dom(page, variant_type, variant_value)
-    return {"success": result.get('success', False), "message": result.get('content', '')}
+    response = {"success": result.get('success', False), "message": result.get('content', '')}
+    if result.get('warning'):
+        response["warning"] = result['warning']
+    return response
+
+async def select_variants_tool(variants: Dict[str, str]) -> Dict[str, Any]:
+    """Select all product variants at once (dependency order, one verification read)"""
+    from src.checkout_ai.dom.service import select_variants_dom
+    page = get_page()
+    result = await select_variants_dom(page, variants)
+    response = {"success": result.get('success', False), "message": result.get('content', '')}
+    if result.get('failed'):
+        response["failed"] = result['failed']
+    return response
 
 async def add_to_cart_tool() -> Dict[str, Any]:
     """Add product to cart"""
@@ -103,8 +116,21 @@ async def smart_login_tool(email: str = None, phone: str = None, password: str =
     if not email: email = ""
     if not phone: phone = ""
     
-    handler = SmartLoginHandler(page)
+    # Stored sessions are keyed by the customer, so a seeded context skips login + OTP
+    try:
+        from src.checkout_ai.auth.session_pool import session_user_key
+        user_id = session_user_key(customer_data)
+    except ImportError:
+        user_id = None  # auth dependencies missing - log in without stored sessions
+    handler = SmartLoginHandler(page, user_id=user_id)
     result = await handler.login(email=email, phone=phone, password=password)
+    
+    # Store the new session once the site shows the user logged in
+    if result.get('success') and not result.get('skipped_login'):
+        if result.get('has_password'):
+            await handler.capture_session()
+        else:
+            handler.capture_session_after_otp()
     return result
 
 async def select_checkbox_tool(label_text: str, check: bool = True) -> Dict[str, Any]:
@@ -232,7 +258,6 @@ async def fill_address_tool(address: str = None, city: str = None, state: str =
             result = await find_and_select_dropdown(page, COUNTRY_LABELS, country, max_retries=2)
             if result.get('success'):
                 success_count += 1
-                await asyncio.sleep(0.5)
         except:
             pass
     
@@ -245,7 +270,6 @@ async def fill_address_tool(address: str = None, city: str = None, state: str =
                 success_count += 1
         except:
             pass
-        await asyncio.sleep(0.3)
     
     # 3. Address
     if address:
@@ -323,56 +347,38 @@ async def take_screenshot_tool(path: str = "/tmp/agent_screenshot.png") -> Dict[
     return {"success": True, "path": path}
 
 async def validate_page_state_tool() -> Dict[str, Any]:
-    """Get current page state with detailed context"""
-    page = get_page()
-    url = page.url
-    title = await page.title()
-    
-    state = await page.evaluate("""
-        () => {
-            // Get visible form fields
-            const fields = Array.from(document.querySelectorAll('input:not([type="hidden"]), select, textarea'))
-                .filter(el => el.offsetParent)
-                .slice(0, 8)
-                .map(el => {
-                    const label = el.closest('label') || document.querySelector(`label[for="${el.id}"]`);
-                    return {
-                        type: el.type || el.tagName.toLowerCase(),
-                        name: el.name || el.id || '',
-                        placeholder: el.placeholder || '',
-                        label: label?.textContent?.trim().substring(0, 50) || '',
-                        value: el.value ? '(filled)' : '(empty)'
-                    };
-                });
-            
-            // Get visible buttons
-            const buttons = Array.from(document.querySelectorAll('button, a[role="button"], input[type="submit"]'))
-                .filter(el => el.offsetParent)
-                .slice(0, 8)
-                .map(el => ({
-                    text: (el.textContent || el.value || '').trim().substring(0, 50),
-                    type: el.tagName.toLowerCase()
-                }));
-            
-            // Detect page type
-            const urlLower = window.location.href.toLowerCase();
-            let pageType = 'unknown';
-            if (urlLower.includes('checkout') || urlLower.includes('payment')) pageType = 'checkout';
-            else if (urlLower.includes('cart') || urlLower.includes('bag')) pageType = 'cart';
-            else if (urlLower.includes('product') || urlLower.includes('/p/')) pageType = 'product';
-            
-            return {fields, buttons, pageType};
-        }
-    """)
+    """Get current page state as a ranked accessibility view the agent can act on by ref"""
+    from src.checkout_ai.dom.page_representation import build_page_representation, page_state_lists
+    page = get_page()
+    representation = await build_page_representation(page)
+    lists = page_state_lists(representation)
+    
+    fields = [{
+        "ref": f['ref'],
+        "type": f['type'],
+        "name": f['name'] or f['id'],
+        "placeholder": f['placeholder'],
+        "label": f['label'][:50],
+        "value": '(filled)' if f['value'] else '(empty)'
+    } for f in lists['fields']]
+    buttons = [{"ref": b['ref'], "text": b['text'][:50], "type": b['tag']} for b in lists['buttons']]
+    
+    # Detect page type
+    url_lower = representation['url'].lower()
+    page_type = 'unknown'
+    if 'checkout' in url_lower or 'payment' in url_lower: page_type = 'checkout'
+    elif 'cart' in url_lower or 'bag' in url_lower: page_type = 'cart'
+    elif 'product' in url_lower or '/p/' in url_lower: page_type = 'product'
     
     return {
-        "success": True, 
-        "url": url, 
-        "title": title, 
-        "page_type": state['pageType'],
-        "fields": state['fields'],
-        "buttons": state['buttons'],
-        "summary": f"Page: {state['pageType']}, {len(state['fields'])} fields, {len(state['buttons'])} buttons"
+        "success": representation['success'],
+        "url": representation['url'],
+        "title": representation['title'],
+        "page_type": page_type,
+        "page": representation['text'],
+        "fields": fields,
+        "buttons": buttons,
+        "summary": f"Page: {page_type}, {len(fields)} fields, {len(buttons)} buttons"
     }
 
 async def web_search_tool(query: str) -> Dict[str, Any]:
@@ -384,8 +390,9 @@ async def web_search_tool(query: str) -> Dict[str, Any]:
 
 # ============= LOW-LEVEL ACTIONS =============
 
-async def click_element_tool(selector: str = None, text: str = None, x: int = None, y: int = None) -> Dict[str, Any]:
-    """Click element by selector, text, or coordinates"""
+async def click_element_tool(selector: str = None, text: str = None, x: int = None, y: int = None, ref: str = None) -> Dict[str, Any]:
+    """Click element by ref (from validate_page), selector, text, or coordinates"""
+    from src.checkout_ai.dom.page_representation import resolve_ref
     page = get_page()
     
     try:
@@ -398,7 +405,12 @@ async def click_element_tool(selector: str = None, text: str = None, x: int = No
                  print(f"⚠️ Bypass: Trying to click '{text}' but already on Login page. Marking success.")
                  return {"success": True, "message": "Automatically bypassed click because already on login page"}
 
-        if x is not None and y is not None:
+        if ref:
+            locator = await resolve_ref(page, ref)
+            if locator is None:
+                return {"success": False, "error": f"Unknown ref {ref} - call validate_page again"}
+            await locator.click(timeout=5000)
+        elif x is not None and y is not None:
             await page.mouse.click(x, y)
         elif selector:
             await page.click(selector, timeout=5000)
@@ -411,12 +423,18 @@ async def click_element_tool(selector: str = None, text: str = None, x: int = No
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-async def fill_text_tool(selector: str = None, text_content: str = "", label: str = None) -> Dict[str, Any]:
+async def fill_text_tool(selector: str = None, text_content: str = "", label: str = None, ref: str = None) -> Dict[str, Any]:
     """Fill text in input field"""
+    from src.checkout_ai.dom.page_representation import resolve_ref
     page = get_page()
     
     try:
-        if label:
+        if ref:
+            locator = await resolve_ref(page, ref)
+            if locator is None:
+                return {"success": False, "error": f"Unknown ref {ref} - call validate_page again"}
+            await locator.fill(text_content)
+        elif label:
             # Find by label
             element = await page.query_selector(f"label:has-text('{label}') input, label:has-text('{label}') + input")
             if element:
@@ -432,12 +450,18 @@ async def fill_text_tool(selector: str = None, text_content: str = "", label: st
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-async def select_dropdown_tool(selector: str = None, value: str = "", label: str = None) -> Dict[str, Any]:
+async def select_dropdown_tool(selector: str = None, value: str = "", label: str = None, ref: str = None) -> Dict[str, Any]:
     """Select dropdown option"""
+    from src.checkout_ai.dom.page_representation import resolve_ref
     page = get_page()
     
     try:
-        if label:
+        if ref:
+            locator = await resolve_ref(page, ref)
+            if locator is None:
+                return {"success": False, "error": f"Unknown ref {ref} - call validate_page again"}
+            await locator.select_option(value)
+        elif label:
             element = await page.query_selector(f"label:has-text('{label}') select, label:has-text('{label}') + select")
             if element:
                 await element.select_option(value)
@@ -868,6 +892,7 @@ TOOLS = {
     "verify_address": verify_address_selection_tool,
     # High-level tools
     "select_variant": select_variant_tool,
+    "select_variants": select_variants_tool,
     "add_to_cart": add_to_cart_tool,
     "navigate_to_cart": navigate_to_cart_tool,
     "smart_login": smart_login_tool,
@@ -1,5 +1,6 @@
 # Auth package
 from .service import AuthService
 from .local_vault import LocalCredentialManager, get_credential_manager
+from .session_pool import SessionStatePool, get_session_pool
 
-__all__ = ['AuthService', 'LocalCredentialManager', 'get_credential_manager']
+__all__ = ['AuthService', 'LocalCredentialManager', 'get_credential_manager', 'SessionStatePool', 'get_session_pool']
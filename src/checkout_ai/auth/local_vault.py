@@ -181,6 +181,12 @@ class LocalCredentialManager:
                 'expires_at': (datetime.now() + timedelta(days=30)).isoformat()
             }
             
+            # Encrypted storage_state is the primary copy; the JSON file is kept
+            # only when the session pool is unavailable (no cryptography)
+            from .session_pool import get_session_pool
+            if await get_session_pool().capture(page.context, user_id, site):
+                return True
+            
             session_file = self.session_dir / f"{site}_{user_id}.json"
             with open(session_file, 'w') as f:
                 json.dump(session_data, f, indent=2)
@@ -205,6 +211,11 @@ class LocalCredentialManager:
             True if session restored successfully
         """
         try:
+            # Prefer the encrypted storage_state (cookies + localStorage for every origin)
+            from .session_pool import get_session_pool
+            if await get_session_pool().seed_context(page.context, None, user_id, site):
+                return True
+            
             session_file = self.session_dir / f"{site}_{user_id}.json"
             
             if not session_file.exists():
@@ -240,6 +251,9 @@ class LocalCredentialManager:
     def delete_session(self, user_id: str, site: str) -> bool:
         """Delete saved session"""
         try:
+            from .session_pool import get_session_pool
+            get_session_pool().delete(user_id, site)
+            
             session_file = self.session_dir / f"{site}_{user_id}.json"
             if session_file.exists():
                 session_file.unlink()
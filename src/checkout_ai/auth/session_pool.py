@@ -0,0 +1,396 @@
+"""
+Session State Pool for Checkout AI
+Keeps logged-in Playwright storage_state (cookies + localStorage) per site and user
+- Encrypted at rest (Fernet key kept in the OS Keychain)
+- Validated in bulk with lightweight authenticated HTTP probes (no browser page)
+- Seeds new contexts before the first navigation, so sites open already logged in
+- Refreshes sessions in the background ahead of expiry
+"""
+import asyncio
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Optional encryption dependency
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+    CRYPTO_AVAILABLE = True
+except ImportError:
+    CRYPTO_AVAILABLE = False
+    logger.warning("cryptography not installed. Session pool disabled. Install with: pip install cryptography")
+
+# Upper bound on a stored session's lifetime (seconds)
+DEFAULT_TTL = 30 * 24 * 3600
+
+# Re-probe a session before use when its last validation is older than this
+VALIDATE_MAX_AGE = 6 * 3600
+
+# Background refresher: scan interval and how far ahead of expiry to refresh
+REFRESH_INTERVAL = 10 * 60
+REFRESH_MARGIN = 24 * 3600
+
+# Concurrent probes during bulk validation
+PROBE_CONCURRENCY = 8
+PROBE_TIMEOUT_MS = 10000
+
+# Authenticated page per site: logged-out sessions get redirected to a login page or 401/403.
+# Any other failing status (404 on a guessed path, 5xx, rate limits) proves nothing.
+SESSION_PROBES = {
+    'myntra.com': '/my/profile',
+    'flipkart.com': '/account/',
+    'ajio.com': '/my-account',
+    'nykaa.com': '/my-account',
+    'amazon.in': '/gp/css/homepage.html',
+    'amazon.com': '/gp/css/homepage.html',
+}
+DEFAULT_PROBE_PATH = '/account'
+LOGGED_OUT_STATUSES = (401, 403)
+
+LOGIN_URL_PATTERN = re.compile(r'log-?in|sign-?in|/auth|otp', re.IGNORECASE)
+
+KEYCHAIN_SERVICE = "checkout_ai_sessions"
+KEYCHAIN_KEY_NAME = "storage_state_key"
+
+
+def site_key(url_or_host: str) -> str:
+    """'https://www.myntra.com/x' -> 'myntra.com'"""
+    value = (url_or_host or '').strip().lower()
+    host = urlparse(value if '//' in value else '//' + value).hostname or ''
+    return host[4:] if host.startswith('www.') else host
+
+
+def session_user_key(customer: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Stable user identifier for a customer JSON block (email, else phone)"""
+    contact = (customer or {}).get('contact', {}) or {}
+    key = contact.get('email') or contact.get('phone')
+    return key.strip().lower() if key else None
+
+
+def _expiry_from_state(state: Dict[str, Any], now: float) -> float:
+    """Earliest expiry among persistent auth (httpOnly) cookies, capped at DEFAULT_TTL"""
+    expiries = [
+        c['expires'] for c in state.get('cookies', [])
+        if c.get('httpOnly') and c.get('expires', -1) > now
+    ]
+    return min(expiries + [now + DEFAULT_TTL])
+
+
+class SessionStateStore:
+    """Encrypted storage_state files under ~/.checkout_ai/sessions/state"""
+
+    def __init__(self, state_dir: Path):
+        self.state_dir = state_dir
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self._cipher = None
+
+    def _get_cipher(self):
+        if self._cipher is None:
+            self._cipher = Fernet(self._load_key())
+        return self._cipher
+
+    def _load_key(self) -> bytes:
+        """Encryption key from the OS Keychain (generated on first use); key file as fallback"""
+        try:
+            import keyring
+            key = keyring.get_password(KEYCHAIN_SERVICE, KEYCHAIN_KEY_NAME)
+            if not key:
+                key = Fernet.generate_key().decode()
+                keyring.set_password(KEYCHAIN_SERVICE, KEYCHAIN_KEY_NAME, key)
+            return key.encode()
+        except Exception as e:
+            logger.warning(f"Keychain unavailable for session key ({e}) - using key file")
+        key_file = self.state_dir / '.key'
+        if not key_file.exists():
+            key_file.write_bytes(Fernet.generate_key())
+            key_file.chmod(0o600)
+        return key_file.read_bytes()
+
+    def _path(self, user_id: str, site: str) -> Path:
+        safe_user = re.sub(r'[^a-z0-9@._+-]', '_', user_id.lower())
+        return self.state_dir / f"{site}_{safe_user}.state"
+
+    def save(self, user_id: str, site: str, record: Dict[str, Any]):
+        path = self._path(user_id, site)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_bytes(self._get_cipher().encrypt(json.dumps(record).encode('utf-8')))
+        tmp.chmod(0o600)
+        tmp.replace(path)
+
+    def load(self, user_id: str, site: str) -> Optional[Dict[str, Any]]:
+        path = self._path(user_id, site)
+        if not path.exists():
+            return None
+        try:
+            return json.loads(self._get_cipher().decrypt(path.read_bytes()))
+        except (InvalidToken, ValueError) as e:
+            logger.warning(f"Unreadable session state for {site} ({e}) - discarding")
+            path.unlink(missing_ok=True)
+            return None
+
+    def delete(self, user_id: str, site: str) -> bool:
+        path = self._path(user_id, site)
+        if path.exists():
+            path.unlink()
+            return True
+        return False
+
+    def records(self) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """All stored sessions as (user_id, site, record)"""
+        result = []
+        for path in self.state_dir.glob('*.state'):
+            try:
+                record = json.loads(self._get_cipher().decrypt(path.read_bytes()))
+                result.append((record['user_id'], record['site'], record))
+            except Exception:
+                continue
+        return result
+
+
+class SessionStatePool:
+    """Pre-authenticated storage_state per (site, user) with validation and background refresh"""
+
+    def __init__(self, session_dir: Optional[Path] = None):
+        session_dir = session_dir or Path.home() / '.checkout_ai' / 'sessions'
+        self.store = SessionStateStore(session_dir / 'state') if CRYPTO_AVAILABLE else None
+        self._refresher: Optional[asyncio.Task] = None
+        # Playwright instances of the runs using the refresher (one entry per start_refresher call)
+        self._refresher_users: List[Any] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.store is not None
+
+    # === STORAGE ===
+
+    def save_state(self, user_id: str, site: str, state: Dict[str, Any]) -> bool:
+        """Persist a storage_state blob (encrypted)"""
+        if not self.enabled or not user_id:
+            return False
+        now = time.time()
+        site = site_key(site)
+        self.store.save(user_id, site, {
+            'user_id': user_id,
+            'site': site,
+            'storage_state': state,
+            'saved_at': now,
+            'validated_at': now,
+            'expires_at': _expiry_from_state(state, now),
+        })
+        return True
+
+    def get_record(self, user_id: str, site: str) -> Optional[Dict[str, Any]]:
+        """Stored session if not expired (expired ones are deleted)"""
+        if not self.enabled or not user_id:
+            return None
+        site = site_key(site)
+        record = self.store.load(user_id, site)
+        if record and record['expires_at'] <= time.time():
+            logger.info(f"Session expired for {site} (user: {user_id})")
+            self.store.delete(user_id, site)
+            return None
+        return record
+
+    def has_session(self, user_id: str, site: str) -> bool:
+        return self.get_record(user_id, site) is not None
+
+    def delete(self, user_id: str, site: str) -> bool:
+        return bool(self.enabled and user_id and self.store.delete(user_id, site_key(site)))
+
+    async def capture(self, context, user_id: str, site: str) -> bool:
+        """Save the context's current cookies + localStorage after a successful login"""
+        if not self.enabled or not user_id:
+            return False
+        try:
+            state = await context.storage_state()
+            self.save_state(user_id, site, state)
+            logger.info(f"💾 Captured session state for {site_key(site)} (user: {user_id})")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to capture session state for {site}: {e}")
+            return False
+
+    # === VALIDATION ===
+
+    async def _probe(self, playwright, record: Dict[str, Any]) -> bool:
+        """
+        Authenticated HTTP probe with the stored state. Valid sessions are re-saved
+        with the refreshed cookies the server returned; logged-out ones (401/403 or a
+        login redirect) are deleted. Inconclusive responses keep the session as is.
+        """
+        site = record['site']
+        path = SESSION_PROBES.get(site, DEFAULT_PROBE_PATH)
+        # Probe the origin the session was captured on (falls back to www.<site>)
+        origin = next(
+            (o['origin'] for o in record['storage_state'].get('origins', [])
+             if site_key(o.get('origin', '')) == site),
+            f"https://www.{site}"
+        )
+        request = await playwright.request.new_context(
+            storage_state=record['storage_state'], base_url=origin
+        )
+        try:
+            response = await request.get(path, max_redirects=5, timeout=PROBE_TIMEOUT_MS)
+            if (response.status in LOGGED_OUT_STATUSES
+                    or LOGIN_URL_PATTERN.search(urlparse(response.url).path)):
+                logger.info(f"Session for {site} (user: {record['user_id']}) is logged out - discarding")
+                self.store.delete(record['user_id'], site)
+                return False
+            if response.status >= 400:
+                logger.debug(f"Session probe for {site} inconclusive ({response.status} on {path}) - keeping session")
+                return True
+            self.save_state(record['user_id'], site, await request.storage_state())
+            return True
+        except Exception as e:
+            # Network trouble is not proof of logout - keep the session
+            logger.debug(f"Session probe error for {site}: {e}")
+            return True
+        finally:
+            await request.dispose()
+
+    async def validate_many(self, playwright, keys: Optional[Iterable[Tuple[str, str]]] = None,
+                            max_age: float = VALIDATE_MAX_AGE) -> Dict[Tuple[str, str], bool]:
+        """
+        Validate sessions in bulk (all stored sessions when keys is None).
+        Sessions validated within max_age are trusted without a probe.
+        Returns: {(user_id, site): valid}
+        """
+        if not self.enabled:
+            return {}
+        if keys is None:
+            records = [record for _, _, record in self.store.records()]
+        else:
+            records = [r for r in (self.get_record(user, site) for user, site in keys) if r]
+
+        semaphore = asyncio.Semaphore(PROBE_CONCURRENCY)
+        now = time.time()
+
+        async def check(record):
+            if now - record.get('validated_at', 0) < max_age:
+                return True
+            async with semaphore:
+                return await self._probe(playwright, record)
+
+        results = await asyncio.gather(*[check(r) for r in records])
+        return {(r['user_id'], r['site']): valid for r, valid in zip(records, results)}
+
+    async def get_valid_state(self, playwright, user_id: str, site: str) -> Optional[Dict[str, Any]]:
+        """
+        Stored storage_state if the session is still logged in, else None.
+        Without a playwright instance stale sessions are not re-probed.
+        """
+        record = self.get_record(user_id, site)
+        if not record:
+            return None
+        if playwright is not None and time.time() - record.get('validated_at', 0) >= VALIDATE_MAX_AGE:
+            if not await self._probe(playwright, record):
+                return None
+            record = self.get_record(user_id, site) or record
+        return record['storage_state']
+
+    # === CONTEXT SEEDING ===
+
+    async def new_context(self, browser, playwright, user_id: str, site: str, **context_kwargs):
+        """
+        Create a browser context pre-seeded with the session (before any navigation).
+        Returns: (context, restored)
+        """
+        state = await self.get_valid_state(playwright, user_id, site) if user_id else None
+        if state:
+            context_kwargs['storage_state'] = state
+        context = await browser.new_context(**context_kwargs)
+        if state:
+            logger.info(f"✅ Context seeded with session for {site_key(site)} (user: {user_id})")
+        return context, bool(state)
+
+    async def seed_context(self, context, playwright, user_id: str, site: str) -> bool:
+        """
+        Seed an existing (e.g. persistent) context before its first navigation:
+        cookies are added directly, localStorage is written by an init script on
+        the first document of each stored origin.
+        """
+        state = await self.get_valid_state(playwright, user_id, site) if user_id else None
+        if not state:
+            return False
+        if state.get('cookies'):
+            await context.add_cookies(state['cookies'])
+        origins = {
+            o['origin']: {item['name']: item['value'] for item in o.get('localStorage', [])}
+            for o in state.get('origins', []) if o.get('localStorage')
+        }
+        if origins:
+            await context.add_init_script(f"""
+                (() => {{
+                    const items = {json.dumps(origins)}[location.origin];
+                    if (!items || sessionStorage.getItem('__checkout_ai_seeded')) return;
+                    for (const [name, value] of Object.entries(items)) localStorage.setItem(name, value);
+                    sessionStorage.setItem('__checkout_ai_seeded', '1');
+                }})();
+            """)
+        logger.info(f"✅ Context seeded with session for {site_key(site)} (user: {user_id})")
+        return True
+
+    # === BACKGROUND REFRESH ===
+
+    def start_refresher(self, playwright, interval: float = REFRESH_INTERVAL):
+        """
+        Refresh sessions nearing expiry in the background.
+        Reference-counted: each call needs a matching stop_refresher(playwright), and the
+        loop runs until the last concurrent run has stopped it.
+        """
+        if not self.enabled:
+            return
+        self._refresher_users.append(playwright)
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._refresh_loop(interval))
+
+    async def stop_refresher(self, playwright=None):
+        """Release one run's use of the refresher; playwright=None stops it for everyone"""
+        if playwright is None:
+            self._refresher_users.clear()
+        elif playwright in self._refresher_users:
+            self._refresher_users.remove(playwright)
+        if self._refresher_users:
+            return
+        if self._refresher and not self._refresher.done():
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+        self._refresher = None
+
+    async def _refresh_loop(self, interval: float):
+        while True:
+            try:
+                # Probe through the most recent run's Playwright - earlier runs may have stopped theirs
+                playwright = self._refresher_users[-1]
+                now = time.time()
+                due = [
+                    (user_id, site) for user_id, site, record in self.store.records()
+                    if record['expires_at'] - now < REFRESH_MARGIN
+                    or now - record.get('validated_at', 0) >= VALIDATE_MAX_AGE
+                ]
+                if due:
+                    # max_age=0 forces a probe, which re-saves refreshed cookies
+                    results = await self.validate_many(playwright, due, max_age=0)
+                    logger.info(f"Refreshed {sum(results.values())}/{len(results)} session(s)")
+            except Exception as e:
+                logger.debug(f"Session refresh error: {e}")
+            await asyncio.sleep(interval)
+
+
+# Singleton instance
+_session_pool = None
+
+def get_session_pool() -> SessionStatePool:
+    """Get or create singleton session state pool"""
+    global _session_pool
+    if _session_pool is None:
+        _session_pool = SessionStatePool()
+    return _session_pool
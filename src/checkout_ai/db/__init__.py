@@ -1,5 +1,5 @@
 # Database package
 from .schema import create_database
-from .connection import Database, db
+from .connection import Database, AsyncDatabase, db, async_db
 
-__all__ = ['create_database', 'Database', 'db']
+__all__ = ['create_database', 'Database', 'AsyncDatabase', 'db', 'async_db']
@@ -1,57 +1,172 @@
 """
 Database connection and helper functions for SQLite
+- One long-lived connection per thread (no connect/PRAGMA setup per query)
+- WAL journal mode so readers never wait for the writer
+- AsyncDatabase runs queries on a dedicated DB thread for async callers
 """
 
+import asyncio
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Callable, Iterable
 from contextlib import contextmanager
 
 DATABASE_PATH = Path(__file__).parent.parent.parent.parent.parent / "data" / "checkout_ai.db"
 
+# Applied to every pooled connection
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",     # Durable across app crashes in WAL mode, fewer fsyncs
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+)
+
+# sqlite3 keeps this many compiled statements per connection
+STATEMENT_CACHE_SIZE = 256
+
 class Database:
     def __init__(self, db_path: Optional[Path] = None):
         self.db_path = db_path or DATABASE_PATH
-        
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _thread_connection(self) -> sqlite3.Connection:
+        """This thread's pooled connection (opened on first use)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Only ever used by the owning thread; check_same_thread=False lets close() run anywhere
+            conn = sqlite3.connect(
+                self.db_path, cached_statements=STATEMENT_CACHE_SIZE, check_same_thread=False
+            )
+            conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            self._local.depth = 0
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        """
+        Context manager for database connections.
+        Yields this thread's pooled connection; the outermost block commits
+        (or rolls back on error), nested blocks join the same transaction.
+        """
+        conn = self._thread_connection()
+        self._local.depth += 1
         try:
             yield conn
-            conn.commit()
+            if self._local.depth == 1:
+                conn.commit()
         except Exception as e:
-            conn.rollback()
+            if self._local.depth == 1:
+                conn.rollback()
             raise e
         finally:
-            conn.close()
-    
+            self._local.depth -= 1
+
+    def close(self):
+        """Close all pooled connections (threads reopen on next use)"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+
     def execute_query(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
         """Execute SELECT query and return results"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
             return [dict(row) for row in cursor.fetchall()]
-    
+
     def execute_insert(self, query: str, params: tuple = ()) -> int:
         """Execute INSERT query and return last row ID"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
             return cursor.lastrowid
-    
+
     def execute_update(self, query: str, params: tuple = ()) -> int:
         """Execute UPDATE/DELETE query and return affected rows"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
             return cursor.rowcount
-    
+
+    def execute_many(self, query: str, params_seq: Iterable[tuple]) -> int:
+        """Execute one statement for many parameter rows in a single transaction, return affected rows"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(query, params_seq)
+            return cursor.rowcount
+
     def fetch_one(self, query: str, params: tuple = ()) -> Optional[Dict[str, Any]]:
         """Fetch single row"""
-        results = self.execute_query(query, params)
-        return results[0] if results else None
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+
+class AsyncDatabase:
+    """
+    Async facade over a Database: every call runs on one dedicated DB thread,
+    so the event loop never blocks on SQLite and writes are naturally serialized.
+    """
+
+    def __init__(self, database: Database):
+        self.database = database
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkout-db")
+        return self._executor
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a synchronous function on the DB thread.
+        Use for multi-statement work (e.g. `with db.get_connection()` blocks) or sync services.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), lambda: func(*args, **kwargs))
+
+    async def execute_query(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        return await self.run(self.database.execute_query, query, params)
+
+    async def execute_insert(self, query: str, params: tuple = ()) -> int:
+        return await self.run(self.database.execute_insert, query, params)
+
+    async def execute_update(self, query: str, params: tuple = ()) -> int:
+        return await self.run(self.database.execute_update, query, params)
+
+    async def execute_many(self, query: str, params_seq: Iterable[tuple]) -> int:
+        # Materialize here so generators are not consumed on another thread
+        return await self.run(self.database.execute_many, query, list(params_seq))
+
+    async def fetch_one(self, query: str, params: tuple = ()) -> Optional[Dict[str, Any]]:
+        return await self.run(self.database.fetch_one, query, params)
+
+    async def close(self):
+        """Close the DB thread's connection and stop the thread"""
+        if self._executor is None:
+            return
+        await self.run(self.database.close)
+        self._executor.shutdown(wait=False)
+        self._executor = None
 
 # Global database instance
 db = Database()
+
+# Async facade for the orchestrator and FastAPI handlers
+async_db = AsyncDatabase(db)
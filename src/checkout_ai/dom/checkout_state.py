@@ -0,0 +1,367 @@
+"""
+Checkout State Service
+One incrementally updated state per page instead of detectors that each run their
+own full-DOM evaluate and poll:
+
+    state = await get_checkout_state(page)
+    state.page_type, state.validation_errors, state.cart_count   # free reads
+    state = await get_checkout_state(page, fresh=True)            # reads that gate a decision
+    await state.until(page_type='payment', timeout=15)             # await a transition
+    mark = await state.mark(); ...click...; await state.changed(mark)
+
+- DOM: js_assets/checkout_state.js, installed as an init script so it survives
+  navigations. On checkout-flow pages (cart, checkout, payment, login) an in-page
+  MutationObserver rescans at most every 100 ms while the page mutates and pushes
+  the snapshot through an exposed binding - only when it changed. Other pages are
+  scanned on load/navigation events and on refresh()
+- Navigation, network responses and console errors arrive as Playwright page
+  events (the browser's own event stream; CDP on Chromium), so the URL history,
+  failed requests and script errors need no page calls at all
+- until() registers a predicate that is checked on every update, so waits end
+  on the push that satisfies them; the timeout only caps them
+- Without pushes (binding unavailable, page not observed) waits poll refresh()
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from collections import deque
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.checkout_ai.dom.service import JS_ASSETS_DIR
+
+logger = logging.getLogger(__name__)
+
+# Name of the binding the in-page observer pushes snapshots through
+STATE_BINDING = '__checkoutStatePush'
+
+HISTORY_SIZE = 20
+# Fallback polling interval when the push binding is unavailable
+POLL_INTERVAL = 0.25
+
+# changed(): quiet period after a change before it is confirmed against a fresh scan
+SETTLE_TIME = 0.3
+# Structures kept for marks handed out by mark()
+MAX_MARKS = 8
+
+
+@lru_cache(maxsize=1)
+def checkout_state_js() -> str:
+    return (JS_ASSETS_DIR / 'checkout_state.js').read_text(encoding='utf-8')
+
+
+def page_structure(snapshot: Dict[str, Any]) -> Tuple:
+    """
+    The part of a snapshot whose change counts as "the page changed" (not errors or
+    cart badge updates). Fields compare by their name|id key only - their text includes
+    the label, which may carry a validation message - and buttons by their text.
+    """
+    return (
+        snapshot.get('url'),
+        snapshot.get('title'),
+        tuple(field.get('key') for field in snapshot.get('fields', [])),
+        tuple(snapshot.get('buttons', [])),
+    )
+
+
+# Conditions until() and matches() accept as keyword arguments
+CONDITIONS: Dict[str, Callable[['CheckoutState', Any], bool]] = {
+    'page_type': lambda s, v: s.page_type == v if isinstance(v, str) else s.page_type in v,
+    'field': lambda s, v: s.fields_visible.get(v, False),
+    'field_keywords': lambda s, v: s.has_field(v),
+    'has_errors': lambda s, v: s.has_errors == v,
+    'url_contains': lambda s, v: v.lower() in s.url.lower(),
+    'cart_count_above': lambda s, v: s.cart_count > v,
+    'wrong_page': lambda s, v: s.wrong_page == v,
+    'changed_since': lambda s, v: s.structure_version > v,
+}
+
+
+class CheckoutState:
+    """Push-updated checkout state of one page; see get_checkout_state()"""
+
+    def __init__(self, page):
+        self.page = page
+        self.snapshot: Dict[str, Any] = {}
+        # Bumps on every pushed change / on changes of page_structure() only
+        self.version = 0
+        self.structure_version = 0
+        self.updated_at = 0.0
+        self.url_history: List[str] = []
+        self.network_errors: deque = deque(maxlen=HISTORY_SIZE)
+        self.console_errors: deque = deque(maxlen=HISTORY_SIZE)
+        self.live = False
+        self._waiters: List[Tuple[Callable[['CheckoutState'], bool], asyncio.Future]] = []
+        self._marks: Dict[int, Tuple] = {}
+        self._start_lock = asyncio.Lock()
+        self._started = False
+        self._handlers = {
+            'framenavigated': self._on_navigated,
+            'response': self._on_response,
+            'console': self._on_console,
+            'close': self._on_close,
+        }
+
+    # ---- lifecycle ----
+
+    async def start(self) -> 'CheckoutState':
+        async with self._start_lock:
+            if self._started:
+                return self
+            self._started = True
+            for event, handler in self._handlers.items():
+                self.page.on(event, handler)
+            self._record_url(self.page.url)
+
+            script = checkout_state_js()
+            try:
+                await self.page.expose_binding(STATE_BINDING, self._on_push)
+                await self.page.add_init_script(f"({script})()")
+                self.live = True
+            except Exception as e:
+                logger.warning(f"STATE: Push updates unavailable ({e}), state is read on demand")
+            await self.refresh()
+            logger.info(f"STATE: Tracking {self.page_type} page {self.url}" + ("" if self.live else " (on demand)"))
+            return self
+
+    def stop(self):
+        for event, handler in self._handlers.items():
+            try:
+                self.page.remove_listener(event, handler)
+            except Exception:
+                pass
+        for _, future in self._waiters:
+            if not future.done():
+                future.set_result(False)
+        self._waiters.clear()
+        _states.pop(self.page, None)
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Scan now (installs the observer on the current document if needed)"""
+        try:
+            snapshot = await self.page.evaluate(checkout_state_js())
+        except Exception as e:
+            # Document replaced mid-call; the new one pushes its own snapshot
+            logger.debug(f"STATE: Refresh failed: {e}")
+            return self.snapshot
+        if snapshot:
+            self._apply(snapshot)
+        return self.snapshot
+
+    @property
+    def observed(self) -> bool:
+        """Updates of the current document are pushed (else waits poll refresh())"""
+        return self.live and self.snapshot.get('observed', False)
+
+    # ---- free reads ----
+
+    @property
+    def url(self) -> str:
+        return self.page.url
+
+    @property
+    def title(self) -> str:
+        return self.snapshot.get('title', '')
+
+    @property
+    def page_type(self) -> str:
+        return self.snapshot.get('pageType', 'unknown')
+
+    @property
+    def fields_visible(self) -> Dict[str, bool]:
+        return self.snapshot.get('fieldsVisible', {})
+
+    @property
+    def visible_fields(self) -> List[str]:
+        return [name for name, visible in self.fields_visible.items() if visible]
+
+    @property
+    def buttons_visible(self) -> Dict[str, bool]:
+        return self.snapshot.get('buttonsVisible', {})
+
+    @property
+    def validation_errors(self) -> List[str]:
+        return self.snapshot.get('errors', [])
+
+    @property
+    def has_errors(self) -> bool:
+        return bool(self.validation_errors)
+
+    @property
+    def cart_count(self) -> int:
+        return self.snapshot.get('cartCount', -1)
+
+    @property
+    def wrong_page(self) -> bool:
+        return self.snapshot.get('wrongPage', False)
+
+    def has_field(self, keywords: List[str]) -> bool:
+        """Any visible field whose name/id/placeholder/label contains one of the keywords"""
+        keywords = [k.lower() for k in keywords]
+        return any(k in field['text'] for field in self.snapshot.get('fields', []) for k in keywords)
+
+    def matches(self, predicate: Optional[Callable[['CheckoutState'], bool]] = None, **conditions) -> bool:
+        return self._predicate(predicate, conditions)(self)
+
+    # ---- transitions ----
+
+    async def until(self, predicate: Optional[Callable[['CheckoutState'], bool]] = None,
+                    timeout: float = 10.0, **conditions) -> bool:
+        """
+        Wait until the state satisfies all conditions (and predicate, if given):
+        await state.until(page_type='payment'), until(field='address'),
+        until(changed_since=mark), until(cart_count_above=n).
+        Returns False on timeout.
+        """
+        check = self._predicate(predicate, conditions)
+        if check(self):
+            return True
+        if not self.observed:
+            return await self._poll(check, timeout)
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (check, future)
+        self._waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    async def mark(self) -> int:
+        """Current structure_version after a fresh scan: take it right before an action"""
+        await self.refresh()
+        self._marks[self.structure_version] = self._structure()
+        while len(self._marks) > MAX_MARKS:
+            del self._marks[next(iter(self._marks))]
+        return self.structure_version
+
+    async def changed(self, mark: int, timeout: float = 10.0, settle: float = SETTLE_TIME) -> bool:
+        """
+        True when url/title/field keys/buttons changed after mark and still differ once the
+        page settled (no update for `settle` seconds, then a fresh scan). Transient
+        changes that revert - spinners, overlays, re-renders - keep waiting.
+        """
+        baseline = self._marks.get(mark)
+        deadline = time.monotonic() + timeout
+        version = mark
+        while await self.until(changed_since=version, timeout=max(0.0, deadline - time.monotonic())):
+            if baseline is None:
+                return True
+            while time.monotonic() < deadline:
+                updates = self.version
+                if not await self.until(lambda s: s.version > updates, timeout=settle):
+                    break
+            await self.refresh()
+            if self._structure() != baseline:
+                return True
+            version = self.structure_version
+        return False
+
+    def _structure(self) -> Tuple:
+        return page_structure(self.snapshot)
+
+    async def _poll(self, check, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(POLL_INTERVAL)
+            await self.refresh()
+            if check(self):
+                return True
+        return False
+
+    def _predicate(self, predicate, conditions: Dict[str, Any]) -> Callable[['CheckoutState'], bool]:
+        unknown = set(conditions) - set(CONDITIONS)
+        if unknown:
+            raise ValueError(f"Unknown state conditions: {sorted(unknown)}")
+        checks = [(CONDITIONS[name], value) for name, value in conditions.items()]
+        return lambda state: all(test(state, value) for test, value in checks) and (predicate is None or predicate(state))
+
+    def _notify(self):
+        for check, future in list(self._waiters):
+            if future.done():
+                continue
+            try:
+                if check(self):
+                    future.set_result(True)
+            except Exception as e:
+                future.set_exception(e)
+
+    # ---- event handlers ----
+
+    def _apply(self, snapshot: Dict[str, Any]):
+        if snapshot == self.snapshot:
+            return
+        previous = self.snapshot
+        self.snapshot = snapshot
+        self.version += 1
+        self.updated_at = time.monotonic()
+        if page_structure(snapshot) != page_structure(previous):
+            self.structure_version += 1
+        self._record_url(snapshot.get('url'))
+
+        if previous and previous.get('pageType') != snapshot.get('pageType'):
+            logger.info(f"STATE: Page type {previous.get('pageType')} -> {snapshot.get('pageType')}")
+        if snapshot.get('errors') and snapshot.get('errors') != previous.get('errors'):
+            logger.warning(f"VALIDATION: Errors detected: {snapshot['errors']}")
+        self._notify()
+
+    def _on_push(self, source, snapshot):
+        self._apply(snapshot)
+
+    def _record_url(self, url: Optional[str]):
+        if url and (not self.url_history or self.url_history[-1] != url):
+            self.url_history.append(url)
+            del self.url_history[:-HISTORY_SIZE]
+
+    def _on_navigated(self, frame):
+        if frame == self.page.main_frame:
+            self._record_url(frame.url)
+            self._notify()
+
+    def _on_response(self, response):
+        try:
+            if response.status >= 400 and response.request.resource_type in ('document', 'xhr', 'fetch'):
+                self.network_errors.append({'status': response.status, 'method': response.request.method,
+                                            'url': response.url[:200]})
+                logger.info(f"STATE: {response.request.method} {response.url[:100]} -> {response.status}")
+        except Exception:
+            pass
+
+    def _on_console(self, message):
+        if message.type == 'error':
+            self.console_errors.append(message.text[:200])
+
+    def _on_close(self, *_):
+        self.stop()
+
+
+# Global instance per page
+_states: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+
+
+async def get_checkout_state(page, fresh: bool = False) -> CheckoutState:
+    """
+    The page's checkout state service, started on first use and current for page.url.
+    fresh=True is for reads that gate a decision: on observed pages the pushed snapshot
+    already is current, so only unobserved pages (scanned on load events) are rescanned.
+    """
+    state = _states.get(page)
+    if state is None:
+        state = CheckoutState(page)
+        _states[page] = state
+    if not state._started:
+        # start() scans once - that scan is the fresh read
+        return await state.start()
+    # Navigated and the new document has not pushed yet: one scan instead of a stale read
+    if state.snapshot.get('url') != page.url or (fresh and not state.observed):
+        await state.refresh()
+    return state
+
+
+# Export for use in other modules
+__all__ = ['CheckoutState', 'get_checkout_state', 'page_structure', 'CONDITIONS']
@@ -0,0 +1,192 @@
+() => {
+    // Push-based checkout state for the top document. Installed as an init script
+    // (every new document) and evaluated once for the current one. On checkout-flow
+    // pages (OBSERVED_PAGE_TYPES) a MutationObserver schedules a scan - at most one per
+    // THROTTLE_MS while mutations keep arriving - and the snapshot is pushed to Python
+    // (window.__checkoutStatePush, an exposed binding) only when it differs from the
+    // last one pushed. Other pages are scanned on load, navigation events and refresh only.
+    if (window.top !== window) return null;
+    if (window.__checkoutStateRefresh) return window.__checkoutStateRefresh();
+
+    const THROTTLE_MS = 100;
+    const OBSERVED_PAGE_TYPES = ['cart', 'checkout', 'payment', 'login', 'confirmation'];
+
+    const FIELD_PATTERNS = {
+        email: ['email', 'e-mail', 'mail'],
+        firstName: ['firstname', 'first name', 'first_name', 'fname', 'givenname'],
+        lastName: ['lastname', 'last name', 'last_name', 'lname', 'surname'],
+        phone: ['phone', 'telephone', 'mobile', 'tel'],
+        address: ['address', 'street', 'addr'],
+        city: ['city', 'town'],
+        state: ['state', 'province', 'region'],
+        zip: ['zip', 'postal', 'postcode'],
+        cardNumber: ['cardnumber', 'card number', 'cc-number']
+    };
+    const BUTTON_PATTERNS = {
+        checkout: ['checkout', 'check out', 'proceed to checkout'],
+        viewCart: ['view cart', 'go to cart', 'view bag'],
+        guestCheckout: ['guest', 'continue as guest', 'checkout as guest'],
+        continue: ['continue', 'next', 'proceed'],
+        placeOrder: ['place order', 'complete', 'pay now']
+    };
+    const ERROR_SELECTOR = [
+        '[class*="error"]:not([style*="display: none"])',
+        '[class*="invalid"]:not([style*="display: none"])',
+        '[role="alert"]',
+        '.error-message',
+        '.field-error',
+        '[aria-invalid="true"]',
+        'input:invalid',
+        'select:invalid'
+    ].join(', ');
+    // Same badge selectors as multi_item_cart.read_cart_count
+    const CART_SELECTORS = [
+        '[class*="cart-count"]', '[class*="cart-quantity"]',
+        '[class*="minicart-count"]', '[data-cart-count]',
+        '.cart-count', '.cart-quantity', '.minicart-quantity'
+    ];
+    const MAX_BUTTONS = 100;
+
+    const isVisible = (el) => !!(el.offsetParent || el.getClientRects().length);
+
+    const pageTypeOf = (url, title, fieldsVisible) => {
+        if (/thank[-_]?you|order[-_]?confirm|order[-_]?complete/.test(url) || /thank you|order confirmed/.test(title)) return 'confirmation';
+        // Before 'checkout': payment is usually a checkout sub-step (/checkout/payment, ?step=payment_method)
+        if (url.includes('/payment') || url.includes('step=payment') || title.includes('payment')) return 'payment';
+        if (url.includes('/cart') || title.includes('cart') || title.includes('bag')) return 'cart';
+        if (url.includes('/checkout') || title.includes('checkout')) {
+            return fieldsVisible.cardNumber && !fieldsVisible.address ? 'payment' : 'checkout';
+        }
+        if (url.includes('/login') || title.includes('login') || title.includes('sign in')) return 'login';
+        return 'unknown';
+    };
+
+    const describeField = (input) => [
+        input.name, input.id, input.placeholder, input.getAttribute('autocomplete'),
+        input.getAttribute('aria-label'), input.closest('label')?.textContent,
+        input.id && document.querySelector(`label[for="${CSS.escape(input.id)}"]`)?.textContent
+    ].filter(Boolean).join(' ').toLowerCase().replace(/\s+/g, ' ').trim().slice(0, 200);
+
+    const cartCount = () => {
+        for (const selector of CART_SELECTORS) {
+            const el = document.querySelector(selector);
+            if (el) {
+                const num = parseInt(el.textContent.trim());
+                if (!isNaN(num) && num >= 0) return num;
+            }
+        }
+        return -1;
+    };
+
+    // Home / product / category page; the text signals come from visible buttons, links
+    // and headings collected by the scan (no whole-body textContent read)
+    const wrongPage = (url, text) => {
+        const isHomePage = url === location.origin.toLowerCase() + '/' || url.endsWith('.com/') ||
+            text.shopNow || text.featuredProducts;
+        const isProductPage = url.includes('/product') || url.includes('/p/') || text.addToCart;
+        const isCategoryPage = url.includes('/collections') || url.includes('/categories') || url.includes('/shop');
+        return isHomePage || isProductPage || isCategoryPage;
+    };
+
+    const scan = () => {
+        const url = location.href.toLowerCase();
+        const title = document.title.toLowerCase();
+
+        const fields = [];
+        const fieldsVisible = Object.fromEntries(Object.keys(FIELD_PATTERNS).map(name => [name, false]));
+        for (const input of document.querySelectorAll('input:not([type="hidden"]), select, textarea')) {
+            if (!isVisible(input)) continue;
+            const text = describeField(input);
+            fields.push({ key: `${input.name || ''}|${input.id || ''}`, text });
+            for (const [name, patterns] of Object.entries(FIELD_PATTERNS)) {
+                if (!fieldsVisible[name] && patterns.some(p => text.includes(p))) fieldsVisible[name] = true;
+            }
+        }
+
+        const buttons = [];
+        const buttonsVisible = Object.fromEntries(Object.keys(BUTTON_PATTERNS).map(name => [name, false]));
+        const pageText = { shopNow: false, addToCart: false, featuredProducts: false };
+        for (const el of document.querySelectorAll('button, a, input[type="submit"], input[type="button"]')) {
+            if (!isVisible(el)) continue;
+            const text = (el.textContent || el.value || '').toLowerCase().replace(/\s+/g, ' ').trim();
+            const ariaLabel = (el.getAttribute('aria-label') || '').toLowerCase();
+            for (const [name, patterns] of Object.entries(BUTTON_PATTERNS)) {
+                if (!buttonsVisible[name] && patterns.some(p => text.includes(p) || ariaLabel.includes(p))) buttonsVisible[name] = true;
+            }
+            pageText.shopNow = pageText.shopNow || text.includes('shop now');
+            pageText.addToCart = pageText.addToCart || text.includes('add to cart');
+            if (el.tagName !== 'A' && text && buttons.length < MAX_BUTTONS) buttons.push(text.slice(0, 50));
+        }
+        for (const heading of document.querySelectorAll('h1, h2, h3')) {
+            if (heading.textContent.toLowerCase().includes('featured products')) {
+                pageText.featuredProducts = true;
+                break;
+            }
+        }
+
+        const errors = new Set();
+        for (const el of document.querySelectorAll(ERROR_SELECTOR)) {
+            if (errors.size >= 5) break;
+            const text = el.textContent?.trim();
+            if (text && el.offsetParent) errors.add(text.substring(0, 100));
+        }
+
+        return {
+            url: location.href,
+            title: document.title,
+            pageType: pageTypeOf(url, title, fieldsVisible),
+            fieldsVisible,
+            buttonsVisible,
+            fields,
+            buttons,
+            errors: [...errors],
+            cartCount: cartCount(),
+            wrongPage: wrongPage(url, pageText)
+        };
+    };
+
+    let last = '';
+    let lastScan = 0;
+    let timer = null;
+    let observer = null;
+
+    const push = (force) => {
+        timer = null;
+        lastScan = performance.now();
+        const snapshot = scan();
+        if (!observer && document.documentElement && OBSERVED_PAGE_TYPES.includes(snapshot.pageType)) observe();
+        snapshot.observed = !!observer;
+        const json = JSON.stringify(snapshot);
+        if (json !== last || force) {
+            last = json;
+            if (typeof window.__checkoutStatePush === 'function') {
+                Promise.resolve(window.__checkoutStatePush(snapshot)).catch(() => {});
+            }
+        }
+        return snapshot;
+    };
+    const schedule = () => {
+        if (timer) return;
+        timer = setTimeout(push, Math.max(0, THROTTLE_MS - (performance.now() - lastScan)));
+    };
+
+    const observe = () => {
+        observer = new MutationObserver(schedule);
+        observer.observe(document.documentElement, {
+            subtree: true, childList: true, characterData: true, attributes: true,
+            attributeFilter: ['class', 'style', 'hidden', 'disabled', 'open', 'aria-invalid', 'aria-hidden', 'aria-expanded']
+        });
+        // Validity changes without a DOM mutation
+        for (const event of ['change', 'invalid']) {
+            window.addEventListener(event, schedule, true);
+        }
+    };
+
+    window.__checkoutStateRefresh = () => push(true);
+    // Page type may only be known once the document (title, form) has loaded or the SPA routed
+    document.addEventListener('DOMContentLoaded', schedule, { once: true });
+    for (const event of ['load', 'popstate', 'hashchange']) {
+        window.addEventListener(event, schedule, true);
+    }
+    return document.documentElement ? push(true) : null;
+}
@@ -0,0 +1,107 @@
+async (args) => {
+    // Scan and plan for a coordinate click in one round trip: resolve the target,
+    // scroll it into view instantly, wait until its box is stable across two
+    // animation frames, then hit-test candidate points with elementFromPoint and
+    // return the first point that lands on the target (or what covers it).
+    const { targetIndex } = args;
+    // Frames to wait for a stable box before giving up (scroll snapping, lazy images, sticky headers)
+    const MAX_FRAMES = 12;
+    // Points tried inside the box, as fractions of width/height
+    const POINTS = [[0.5, 0.5], [0.3, 0.5], [0.7, 0.5], [0.5, 0.3], [0.5, 0.7], [0.2, 0.2], [0.8, 0.8]];
+
+    let element = null;
+    if (targetIndex !== null && targetIndex !== undefined) {
+        const overlay = document.querySelector(`[data-element-index="${targetIndex}"]`);
+        if (overlay) {
+            const rect = overlay.getBoundingClientRect();
+            element = document.elementFromPoint(rect.left + rect.width / 2, rect.top + rect.height / 2);
+        }
+    }
+    if (!element) element = document.querySelector('[data-dom-el]');
+    if (!element) return { found: false };
+
+    // rAF does not run in background tabs - a timeout stands in for the frame there
+    const nextFrame = () => new Promise(resolve => {
+        requestAnimationFrame(() => resolve());
+        setTimeout(resolve, 50);
+    });
+    const same = (a, b) => Math.abs(a.x - b.x) < 0.5 && Math.abs(a.y - b.y) < 0.5 &&
+        Math.abs(a.width - b.width) < 0.5 && Math.abs(a.height - b.height) < 0.5;
+
+    const stableRect = async () => {
+        let previous = element.getBoundingClientRect();
+        let stableFrames = 0;
+        for (let i = 0; i < MAX_FRAMES && stableFrames < 2; i++) {
+            await nextFrame();
+            const rect = element.getBoundingClientRect();
+            stableFrames = same(rect, previous) ? stableFrames + 1 : 0;
+            previous = rect;
+        }
+        return { rect: previous, stable: stableFrames >= 2 };
+    };
+
+    // Hit-test inside the element's own tree so shadow DOM targets are not reported as covered by their host
+    const root = element.getRootNode();
+    const hitRoot = typeof root.elementFromPoint === 'function' ? root : document;
+    const lands = (hit) => hit && (hit === element || element.contains(hit) || hit.contains(element) ||
+        hit.tagName === 'LABEL' || hit.classList.contains('overlay-wrapper'));
+
+    const clickPoint = (rect) => {
+        let occluder = null;
+        for (const [fx, fy] of POINTS) {
+            const x = rect.left + rect.width * fx;
+            const y = rect.top + rect.height * fy;
+            if (x < 0 || y < 0 || x >= window.innerWidth || y >= window.innerHeight) continue;
+            const hit = hitRoot.elementFromPoint(x, y);
+            if (lands(hit)) return { x, y };
+            occluder = occluder || hit;
+        }
+        return { occluder };
+    };
+
+    const describe = (el) => el ? {
+        tagName: el.tagName,
+        id: el.id || '',
+        className: typeof el.className === 'string' ? el.className.slice(0, 80) : '',
+        modal: !!el.closest('dialog, [role="dialog"], [role="alertdialog"], [aria-modal="true"]')
+    } : null;
+
+    const style = window.getComputedStyle(element);
+    const report = (rect, point, stable, scrolled, occluder) => ({
+        found: true,
+        tagName: element.tagName,
+        rect: {
+            x: rect.x, y: rect.y, width: rect.width, height: rect.height,
+            top: rect.top, bottom: rect.bottom, left: rect.left, right: rect.right
+        },
+        center: point ? { x: point.x, y: point.y } : { x: rect.left + rect.width / 2, y: rect.top + rect.height / 2 },
+        window: {
+            innerWidth: window.innerWidth,
+            innerHeight: window.innerHeight,
+            scrollX: window.scrollX,
+            scrollY: window.scrollY
+        },
+        isEnabled: !element.disabled && !element.classList.contains('disabled') && style.pointerEvents !== 'none',
+        isVisible: rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden',
+        isObscured: !point,
+        occluder: describe(occluder),
+        stable,
+        scrolled
+    });
+
+    const rect = element.getBoundingClientRect();
+    const inViewport = rect.top >= 0 && rect.left >= 0 && rect.bottom <= window.innerHeight && rect.right <= window.innerWidth;
+    // Already visible: try in place first. Covered (sticky header/footer, chat bubble): other scroll positions.
+    const positions = inViewport ? [null, 'center', 'start', 'end'] : ['center', 'start', 'end'];
+
+    let result = null;
+    for (const block of positions) {
+        if (block) element.scrollIntoView({ block, inline: 'nearest', behavior: 'instant' });
+        const { rect: settled, stable } = await stableRect();
+        if (!settled.width || !settled.height) return report(settled, null, stable, !!block, null);
+        const point = clickPoint(settled);
+        result = report(settled, point.x !== undefined ? point : null, stable, !!block, point.occluder);
+        if (!result.isObscured) return result;
+    }
+    return result;
+}
@@ -1,7 +1,14 @@
 (args) => {
     const { variantType, variantValue } = args;
-    const normalize = (text) => text ? text.toLowerCase().trim().replace(/[^a-z0-9]/g, '') : '';
+    // Candidates come from the shared in-page text index (text_index.js): only elements
+    // with a field equal to, containing or contained in the target are scored below
+    const textIndex = window.__checkoutTextIndex;
+    const normalize = textIndex.strict;
     const normalizedTarget = normalize(variantValue);
+    const candidates = new Set();
+    for (const mode of ['exact', 'contains', 'within']) {
+        for (const hit of textIndex.lookup(variantValue, mode)) candidates.add(hit.el);
+    }
 
     console.log('🔍 DISCOVERY: Looking for', variantType, '=', variantValue);
     console.log('🔍 Normalized target:', normalizedTarget);
@@ -15,6 +22,7 @@
 
     radios.forEach((radio, index) => {
         const label = document.querySelector(`label[for="${radio.id}"]`);
+        if (!candidates.has(radio) && !(label && candidates.has(label))) return;
         const labelText = label ? label.textContent?.trim() : '';
         const value = radio.value;
         const ariaLabel = radio.getAttribute('aria-label');
@@ -38,6 +46,7 @@
     console.log('🔘 Found', buttons.length, 'buttons/links');
 
     buttons.forEach((btn, index) => {
+        if (!candidates.has(btn)) return;
         const text = btn.textContent?.trim();
         const ariaLabel = btn.getAttribute('aria-label');
         const title = btn.getAttribute('title');
@@ -120,7 +129,9 @@
 
     if (!bestMatch) {
         console.log('❌ No matches found in discovery phase');
-        return { found: false, allOptions: potentialElements.slice(0, 20).map(e => e.texts) };
+        const allOptions = [...radios, ...buttons].slice(0, 20)
+            .map(el => [el.type === 'radio' ? el.value : el.textContent?.trim(), el.getAttribute('aria-label')].filter(t => t));
+        return { found: false, allOptions: allOptions };
     }
 
     // Log what we matched
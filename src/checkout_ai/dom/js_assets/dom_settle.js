@@ -0,0 +1,49 @@
+(args) => {
+    // Re-render detection between dependent actions.
+    // 'arm': start counting DOM mutations (before the action); returns a token.
+    // 'wait': for the armed token, resolve once no mutation arrived for quietMs, or after timeoutMs.
+    // 'disarm': drop the armed token without waiting (the action failed).
+    // Each arm gets its own observer under its token, so nested callers (a click inside a
+    // batch selection) do not reset or consume each other's state.
+    const { mode, token = null, quietMs = 250, timeoutMs = 3000 } = args;
+    const armed = window.__checkoutSettle || (window.__checkoutSettle = { next: 0, states: new Map() });
+
+    if (mode === 'arm') {
+        const state = { mutations: 0, last: performance.now(), armed: performance.now() };
+        state.observer = new MutationObserver((records) => {
+            state.mutations += records.length;
+            state.last = performance.now();
+        });
+        state.observer.observe(document.documentElement, {
+            subtree: true, childList: true, attributes: true, characterData: true
+        });
+        const id = ++armed.next;
+        armed.states.set(id, state);
+        return { armed: true, token: id };
+    }
+
+    const state = armed.states.get(token);
+    if (!state) return Promise.resolve({ settled: true, mutations: 0, waitedMs: 0 });
+
+    if (mode === 'disarm') {
+        state.observer.disconnect();
+        armed.states.delete(token);
+        return { disarmed: true, mutations: state.mutations };
+    }
+
+    const started = performance.now();
+    return new Promise((resolve) => {
+        const check = () => {
+            const now = performance.now();
+            const quiet = now - state.last >= quietMs;
+            if (quiet || now - started >= timeoutMs) {
+                state.observer.disconnect();
+                armed.states.delete(token);
+                resolve({ settled: quiet, mutations: state.mutations, waitedMs: Math.round(now - started) });
+                return;
+            }
+            setTimeout(check, Math.min(50, quietMs));
+        };
+        check();
+    });
+}
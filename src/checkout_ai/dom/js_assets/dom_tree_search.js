@@ -1,6 +1,7 @@
 (args) => {
     const { variantValue, containerSelector } = args;
-    const normalize = (text) => text ? text.toLowerCase().trim().replace(/[^a-z0-9]/g, '') : '';
+    const textIndex = window.__checkoutTextIndex;
+    const normalize = textIndex.strict;
     const target = normalize(variantValue);
 
     // Helper to check visibility
@@ -28,7 +29,16 @@
 
     // Selectors for common variant elements (buttons, list items, divs with text)
     // Added specific classes for Flipkart/Amazon/Myntra
-    const candidates = Array.from(container.querySelectorAll('button, li, div, ul > li, a, span, [role="button"], [class*="swatch"], [class*="variant"]'));
+    const candidateSelector = 'button, li, div, ul > li, a, span, [role="button"], [class*="swatch"], [class*="variant"]';
+
+    // Only elements the text index scores above zero (field equal to, containing or
+    // contained in the target) are checked, in document order. Containers whose text
+    // is too long to index are skipped: they only ever scored as a partial match.
+    const hits = ['exact', 'contains', 'within']
+        .flatMap(mode => textIndex.lookup(variantValue, mode, { root: container }))
+        .sort((a, b) => a.id - b.id);
+    const candidates = Array.from(new Set(hits.map(hit => hit.el)))
+        .filter(el => el.matches(candidateSelector));
 
     let bestMatch = null;
     let bestScore = 0;
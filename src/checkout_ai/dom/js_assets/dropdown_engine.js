@@ -0,0 +1,254 @@
+(args) => {
+    // Dropdown engine for native <select> and custom (ARIA listbox / div-ul) dropdowns.
+    //   'select'    - wait until a dropdown labelled with `keywords` offers one of `candidates`:
+    //                 native -> tagged select + option value, custom -> tagged trigger to open
+    //   'option'    - after a custom trigger was opened: wait for a visible matching option
+    //   'arm'       - before a selection: record the option lists of all selects and start counting
+    //                 mutations; returns a token for 'dependent' (or 'disarm' if the selection failed)
+    //   'dependent' - after a selection: wait until dependent selects repopulate and the DOM is quiet
+    // Waits are MutationObserver-driven: the check re-runs on every mutation batch and
+    // resolves the moment it holds; timeoutMs only caps how long a site may take.
+    const { mode, keywords = [], exclude = [], candidates = [], trigger = null, timeoutMs = 5000 } = args;
+
+    // Same rules as compact_text(): accents dropped, lowercase, alphanumerics only
+    const norm = (t) => t ? String(t).normalize('NFKD').replace(/\p{M}/gu, '').toLowerCase().replace(/[^\p{L}\p{N}]+/gu, '') : '';
+    const targets = [...new Set(candidates.map(norm).filter(Boolean))];
+    const words = keywords.map(k => String(k).toLowerCase());
+    const excluded = exclude.map(k => String(k).toLowerCase());
+
+    const isVisible = (el) => {
+        if (!el || !el.isConnected) return false;
+        const style = window.getComputedStyle(el);
+        if (style.display === 'none' || style.visibility === 'hidden') return false;
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    };
+
+    const labelText = (el) => {
+        const parts = [el.name, el.id, el.getAttribute('aria-label'), el.getAttribute('autocomplete'), el.getAttribute('placeholder')];
+        const label = el.closest('label') || (el.id && document.querySelector(`label[for="${CSS.escape(el.id)}"]`));
+        if (label) parts.push(label.textContent);
+        for (const id of (el.getAttribute('aria-labelledby') || '').split(/\s+/).filter(Boolean)) {
+            parts.push(document.getElementById(id)?.textContent);
+        }
+        return parts.filter(Boolean).join(' ').toLowerCase();
+    };
+    // Position of the first keyword in the label (earlier keywords are more specific), -1 when none
+    const keywordRank = (el) => {
+        const text = labelText(el);
+        if (excluded.some(w => text.includes(w))) return -1;
+        return words.findIndex(w => text.includes(w));
+    };
+
+    const tag = (el, attribute) => {
+        if (!el.hasAttribute(attribute)) {
+            window.__checkoutDropdownTags = (window.__checkoutDropdownTags || 0) + 1;
+            el.setAttribute(attribute, String(window.__checkoutDropdownTags));
+        }
+        return `[${attribute}="${el.getAttribute(attribute)}"]`;
+    };
+
+    // Normalized option index per <select>, reused while its option list is unchanged
+    const indexes = window.__checkoutDropdownIndex || (window.__checkoutDropdownIndex = new WeakMap());
+    const signature = (select) => {
+        const options = select.options;
+        return `${options.length}|${options[0]?.value}|${options[options.length - 1]?.value}|${options[options.length - 1]?.text}`;
+    };
+    const indexOf = (select) => {
+        const sig = signature(select);
+        let index = indexes.get(select);
+        if (!index || index.sig !== sig) {
+            const exact = new Map();
+            const entries = [];
+            for (const option of select.options) {
+                if (!option.value || option.disabled) continue;
+                const text = norm(option.textContent);
+                const value = norm(option.value);
+                for (const key of [text, value, norm(option.label)]) {
+                    if (key && !exact.has(key)) exact.set(key, option);
+                }
+                entries.push([text, value, option]);
+            }
+            index = { sig, exact, entries };
+            indexes.set(select, index);
+        }
+        return index;
+    };
+
+    // Exact text/value match for any candidate first (in candidate order), then containment
+    const bestMatch = (exact, entries) => {
+        for (const target of targets) if (exact.has(target)) return exact.get(target);
+        for (const target of targets) {
+            if (target.length <= 2) continue;
+            for (const [text, value, item] of entries) {
+                if (text.includes(target) || value.includes(target)) return item;
+            }
+        }
+        return null;
+    };
+
+    const waitFor = (check) => new Promise((resolve) => {
+        const first = check(false);
+        if (first) return resolve(first);
+        let done = false;
+        const finish = (result) => {
+            if (done) return;
+            done = true;
+            observer.disconnect();
+            clearTimeout(timer);
+            resolve(result);
+        };
+        const observer = new MutationObserver(() => {
+            const result = check(false);
+            if (result) finish(result);
+        });
+        observer.observe(document.documentElement, {
+            subtree: true, childList: true, characterData: true,
+            attributes: true, attributeFilter: ['disabled', 'class', 'style', 'hidden', 'aria-expanded', 'aria-hidden']
+        });
+        const timer = setTimeout(() => finish(check(true)), timeoutMs);
+    });
+
+    const customTrigger = () => {
+        for (const label of document.querySelectorAll('label')) {
+            const text = label.textContent.toLowerCase();
+            if (!words.some(w => text.includes(w)) || excluded.some(w => text.includes(w))) continue;
+            // Common patterns: div[role="combobox"], div.select, button[aria-haspopup]
+            const trigger = label.parentElement?.querySelector('[role="combobox"], [aria-haspopup], .select, .dropdown, .picker');
+            if (trigger && trigger.tagName !== 'SELECT' && isVisible(trigger)) return trigger;
+            if (label.htmlFor) {
+                const target = document.getElementById(label.htmlFor);
+                if (target && target.tagName !== 'SELECT' && target.tagName !== 'INPUT' && isVisible(target)) return target;
+            }
+        }
+        for (const el of document.querySelectorAll('[role="combobox"], [aria-haspopup="listbox"]')) {
+            if (el.tagName !== 'SELECT' && isVisible(el) && keywordRank(el) >= 0) return el;
+        }
+        for (const word of words) {
+            const el = document.querySelector(`[id*="${CSS.escape(word)}"], [class*="${CSS.escape(word)}"]`);
+            if (el && isVisible(el) && (el.getAttribute('role') === 'combobox' || el.classList.contains('select'))) return el;
+        }
+        return null;
+    };
+
+    if (mode === 'select') {
+        const check = (final) => {
+            const selects = [...document.querySelectorAll('select')].filter(isVisible);
+            // Only the selects labelled with the most specific keyword present
+            const ranked = selects.map(select => [keywordRank(select), select]).filter(([rank]) => rank >= 0);
+            const best = Math.min(...ranked.map(([rank]) => rank));
+            const matched = ranked.filter(([rank]) => rank === best).map(([, select]) => select);
+
+            for (const select of matched) {
+                if (select.disabled) continue;
+                const { exact, entries } = indexOf(select);
+                const option = bestMatch(exact, entries);
+                if (option) {
+                    return { found: true, kind: 'native', selector: tag(select, 'data-ck-dropdown'),
+                             value: option.value, text: option.textContent.trim() };
+                }
+            }
+            if (!matched.length) {
+                const trigger = customTrigger();
+                if (trigger) return { found: true, kind: 'custom', selector: tag(trigger, 'data-ck-dropdown') };
+            }
+            if (!final) return null;
+
+            if (matched.length) {
+                const options = [...matched[0].options].slice(0, 8).map(o => o.textContent.trim());
+                return { found: false, kind: 'native', reason: 'option not offered', optionCount: matched[0].options.length, options };
+            }
+            // No labelled dropdown: any visible select that offers the value
+            for (const select of selects) {
+                const { exact, entries } = indexOf(select);
+                const option = bestMatch(exact, entries);
+                if (option) {
+                    return { found: true, kind: 'native', fallback: true, selector: tag(select, 'data-ck-dropdown'),
+                             value: option.value, text: option.textContent.trim() };
+                }
+            }
+            return { found: false, reason: 'no dropdown' };
+        };
+        return waitFor(check);
+    }
+
+    if (mode === 'option') {
+        const triggerEl = trigger && document.querySelector(trigger);
+        const check = (final) => {
+            // Listbox the trigger controls, else anywhere (options often render in a portal)
+            const ids = triggerEl ? `${triggerEl.getAttribute('aria-controls') || ''} ${triggerEl.getAttribute('aria-owns') || ''}` : '';
+            const roots = ids.split(/\s+/).filter(Boolean).map(id => document.getElementById(id)).filter(Boolean);
+            for (const root of roots.length ? roots : [document]) {
+                const exact = new Map();
+                const entries = [];
+                for (const option of root.querySelectorAll('[role="option"], li, .item, .option')) {
+                    if (!isVisible(option) || option.getAttribute('aria-disabled') === 'true') continue;
+                    const text = norm(option.textContent);
+                    const value = norm(option.getAttribute('data-value'));
+                    for (const key of [text, value]) if (key && !exact.has(key)) exact.set(key, option);
+                    entries.push([text, value, option]);
+                }
+                const option = bestMatch(exact, entries);
+                if (option) return { found: true, selector: tag(option, 'data-ck-option'), text: option.textContent.trim() };
+            }
+            return final ? { found: false } : null;
+        };
+        return waitFor(check);
+    }
+
+    // Dependent-dropdown baselines per token, taken before the selection so its own
+    // re-render counts as a reaction instead of being folded into the baseline
+    const dependents = window.__checkoutDependent || (window.__checkoutDependent = { next: 0, states: new Map() });
+    const armDependent = () => {
+        const state = {
+            before: new Map([...document.querySelectorAll('select')].map(select => [select, signature(select)])),
+            last: null, changed: false, mutations: 0
+        };
+        const repopulated = () => [...document.querySelectorAll('select')].some(select =>
+            state.before.get(select) !== signature(select) && (!words.length || keywordRank(select) >= 0));
+        state.observer = new MutationObserver((records) => {
+            state.mutations += records.length;
+            state.last = performance.now();
+            state.changed = state.changed || repopulated();
+        });
+        state.observer.observe(document.documentElement, { subtree: true, childList: true, attributes: true, characterData: true });
+        const id = ++dependents.next;
+        dependents.states.set(id, state);
+        return id;
+    };
+
+    if (mode === 'arm') return { armed: true, token: armDependent() };
+
+    if (mode === 'disarm') {
+        const state = dependents.states.get(args.token);
+        if (state) state.observer.disconnect();
+        dependents.states.delete(args.token);
+        return { disarmed: true };
+    }
+
+    if (mode === 'dependent') {
+        const { quietMs = 150, idleMs = 800 } = args;
+        // Without a token the baseline is taken now (the selection already ran)
+        const token = dependents.states.has(args.token) ? args.token : armDependent();
+        const state = dependents.states.get(token);
+        const started = performance.now();
+
+        return new Promise((resolve) => {
+            const tick = () => {
+                const now = performance.now();
+                const { changed, last } = state;
+                // Repopulated and quiet | site never reacted | reacted without new options, then idle | cap
+                const done = (changed && now - last >= quietMs) ||
+                    (!changed && now - (last ?? started) >= idleMs) ||
+                    now - started >= timeoutMs;
+                if (!done) return setTimeout(tick, 25);
+                state.observer.disconnect();
+                dependents.states.delete(token);
+                resolve({ changed, mutations: state.mutations, waitedMs: Math.round(now - started) });
+            };
+            tick();
+        });
+    }
+
+    return { found: false, reason: `unknown mode ${mode}` };
+}
@@ -0,0 +1,137 @@
+// In-page copy of utils/keyword_matcher.py: Aho-Corasick automata over the registered
+// keyword table (all categories and languages), built once per page and cached on
+// window.__checkoutKeywords. Installed through with_keyword_matcher(); `data` is the
+// table from KeywordMatcher.to_js_data(). Normalization matches normalize_text().
+function installCheckoutKeywords(data) {
+    if (window.__checkoutKeywords && window.__checkoutKeywords.version === data.version) return;
+
+    const normalize = (text) => text ? String(text).normalize('NFKD').replace(/\p{M}/gu, '').toLowerCase()
+        .replace(/[^\p{L}\p{N}]+/gu, ' ').trim() : '';
+    const compactOf = (text) => normalize(text).replace(/ /g, '');
+
+    // goto: Map per state, fail: state, out: pattern ids ending in the state (fail chain merged)
+    const build = (patterns) => {
+        const goto = [new Map()], fail = [0], out = [[]];
+        patterns.forEach((pattern, id) => {
+            if (!pattern) return;
+            let state = 0;
+            for (const char of pattern) {
+                let next = goto[state].get(char);
+                if (next === undefined) {
+                    next = goto.length;
+                    goto.push(new Map());
+                    fail.push(0);
+                    out.push([]);
+                    goto[state].set(char, next);
+                }
+                state = next;
+            }
+            out[state].push(id);
+        });
+        const queue = [...goto[0].values()];
+        for (let head = 0; head < queue.length; head++) {
+            const state = queue[head];
+            for (const [char, next] of goto[state]) {
+                queue.push(next);
+                let fallback = fail[state];
+                while (fallback && !goto[fallback].has(char)) fallback = fail[fallback];
+                const target = goto[fallback].get(char) || 0;
+                fail[next] = target !== next ? target : 0;
+                if (out[fail[next]].length) out[next] = out[next].concat(out[fail[next]]);
+            }
+        }
+        // Calls onHit(id, end) for every occurrence in the already-normalized text
+        return (text, onHit) => {
+            let state = 0;
+            let position = 0;
+            for (const char of text) {
+                while (state && !goto[state].has(char)) state = fail[state];
+                state = goto[state].get(char) || 0;
+                position += char.length;
+                for (const id of out[state]) onHit(id, position);
+            }
+        };
+    };
+
+    const makeMatcher = (keywords) => {
+        const spaced = build(keywords);
+        const compact = build(keywords.map(k => k.replace(/ /g, '')));
+        return {
+            keywords,
+            // Set of keyword ids occurring in the text
+            ids(text, useCompact = false) {
+                const found = new Set();
+                (useCompact ? compact : spaced)(useCompact ? compactOf(text) : normalize(text), (id) => found.add(id));
+                return found;
+            },
+            // [{id, keyword, start, end, whole}] for every occurrence
+            occurrences(text, useCompact = false) {
+                const normalized = useCompact ? compactOf(text) : normalize(text);
+                const hits = [];
+                (useCompact ? compact : spaced)(normalized, (id, end) => {
+                    const keyword = keywords[id];
+                    const start = end - (useCompact ? keyword.replace(/ /g, '') : keyword).length;
+                    const whole = useCompact || ((start === 0 || normalized[start - 1] === ' ') &&
+                        (end === normalized.length || normalized[end] === ' '));
+                    hits.push({ id, keyword, start, end, whole });
+                });
+                return hits;
+            }
+        };
+    };
+
+    const registered = makeMatcher(data.keywords);
+    const compiled = new Map();
+
+    window.__checkoutKeywords = {
+        version: data.version,
+        normalize,
+        compact: compactOf,
+        categories: data.categories,
+
+        // Every (occurrence, category) hit: {keyword, id, category, priority, rank, start, end, whole}
+        scan(text, { compact = false, categories = null } = {}) {
+            const wanted = categories ? new Set(categories) : null;
+            const hits = [];
+            for (const hit of registered.occurrences(text, compact)) {
+                for (const [categoryIndex, priority, rank] of data.tags[hit.id]) {
+                    const category = data.categories[categoryIndex];
+                    if (!wanted || wanted.has(category)) hits.push({ ...hit, category, priority, rank });
+                }
+            }
+            return hits;
+        },
+
+        // Best hit per category: whole words first, then priority, rank, longest keyword
+        classify(text, options = {}) {
+            const best = {};
+            const key = (h) => [h.whole ? 0 : 1, h.priority, h.rank, -h.keyword.length];
+            const less = (a, b) => { for (let i = 0; i < a.length; i++) if (a[i] !== b[i]) return a[i] < b[i]; return false; };
+            for (const hit of this.scan(text, options)) {
+                const current = best[hit.category];
+                if (!current || less(key(hit), key(current))) best[hit.category] = hit;
+            }
+            return best;
+        },
+
+        // Matcher for an ad-hoc ordered keyword list (ids = positions in the list), cached per list
+        compile(keywords) {
+            const cacheKey = JSON.stringify(keywords);
+            if (!compiled.has(cacheKey)) {
+                const normalized = keywords.map(normalize);
+                const unique = [...new Set(normalized.filter(Boolean))];
+                const matcher = makeMatcher(unique);
+                const positions = unique.map(k => normalized.reduce((acc, n, i) => (n === k ? acc.concat(i) : acc), []));
+                compiled.set(cacheKey, {
+                    // Set of list positions whose keyword occurs in the text
+                    hits(text, useCompact = false) {
+                        const found = new Set();
+                        for (const id of matcher.ids(text, useCompact)) for (const i of positions[id]) found.add(i);
+                        return found;
+                    }
+                });
+            }
+            return compiled.get(cacheKey);
+        }
+    };
+}
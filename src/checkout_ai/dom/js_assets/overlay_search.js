@@ -1,34 +1,10 @@
 (args) => {
     const { val, containerSelector } = args;
-    const normalize = (text) => text ? text.toLowerCase().trim().replace(/[^a-z0-9\s]/g, '') : '';
-    const normalizedVal = normalize(val);
-
-    const match = (text) => {
-        if (!text) return false;
-        const t = normalize(text);
-
-        // Exact match
-        if (t === normalizedVal) return true;
-
-        // Multi-word match: check if all words from search value exist in text
-        const searchWords = normalizedVal.split(/\s+/).filter(w => w.length > 0);
-        const textWords = t.split(/\s+/).filter(w => w.length > 0);
-
-        if (searchWords.length >= 2) {
-            // First try exact phrase match
-            if (t.includes(normalizedVal)) {
-                return true;
-            }
-
-            // Then try all words present match
-            const hasAllWords = searchWords.every(word =>
-                textWords.some(textWord => textWord === word || textWord.includes(word) || word.includes(textWord))
-            );
-            if (hasAllWords) return true;
-        }
-
-        return false;
-    };
+    // Text matching is answered by the shared in-page index (text_index.js):
+    // exact match, or phrase / all-words match for multi-word values
+    const textIndex = window.__checkoutTextIndex;
+    const normalizedVal = textIndex.normalize(val);
+    const textMatches = textIndex.matcher(val);
 
     // Clear existing overlays
     document.querySelectorAll('.automation-overlay').forEach(el => el.remove());
@@ -230,28 +206,17 @@
                 isMatch = true;
             } else {
                 // Regular text matching for other elements
-                const texts = [
-                    element.textContent,
-                    element.value,
-                    element.getAttribute('aria-label'),
-                    element.getAttribute('title'),
-                    element.getAttribute('alt')
-                ];
+                const sources = [[element, 'text'], [element, 'value'], [element, 'aria'], [element, 'title'], [element, 'alt']];
 
                 // For radio buttons, also check associated label
                 if (element.type === 'radio') {
                     const label = document.querySelector(`label[for="${element.id}"]`);
-                    if (label) texts.push(label.textContent);
+                    if (label) sources.push([label, 'text']);
                 }
 
                 // Regular text matching (cart button already handled above)
                 if (!isMatch) {
-                    for (const text of texts) {
-                        if (match(text)) {
-                            isMatch = true;
-                            break;
-                        }
-                    }
+                    isMatch = sources.some(([el, field]) => textMatches(el, field));
                 }
             }
 
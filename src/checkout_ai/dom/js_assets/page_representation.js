@@ -0,0 +1,137 @@
+(refAttribute) => {
+    // DOM-based source for build_page_representation when CDP is unavailable: visible
+    // controls, landmarks, headings, alerts and short text blocks in document order,
+    // with their implicit/explicit role and an approximate accessible name. Kept elements
+    // are tagged with refAttribute (d<n>, reused across calls) so refs resolve directly.
+    const TAG_ROLES = {
+        BUTTON: 'button', TEXTAREA: 'textbox', OPTION: 'option', DIALOG: 'dialog', MAIN: 'main',
+        FORM: 'form', NAV: 'navigation', HEADER: 'banner', FOOTER: 'contentinfo', ASIDE: 'complementary',
+        H1: 'heading', H2: 'heading', H3: 'heading', H4: 'heading', H5: 'heading', H6: 'heading'
+    };
+    const INPUT_ROLES = {
+        checkbox: 'checkbox', radio: 'radio', button: 'button', submit: 'button', reset: 'button',
+        image: 'button', number: 'spinbutton', search: 'searchbox', range: 'slider'
+    };
+    const CONTEXT_ROLES = new Set(['dialog', 'alertdialog', 'main', 'form', 'navigation', 'banner',
+        'contentinfo', 'complementary', 'search', 'region']);
+    const CONTROL_ROLES = new Set(['button', 'link', 'textbox', 'searchbox', 'combobox', 'listbox',
+        'spinbutton', 'checkbox', 'radio', 'switch', 'option', 'menuitem', 'menuitemradio',
+        'menuitemcheckbox', 'tab', 'slider']);
+    const TEXT_LIMIT = 120;
+
+    const clean = (text) => (text || '').replace(/\s+/g, ' ').trim();
+
+    const roleOf = (el) => {
+        const explicit = (el.getAttribute('role') || '').trim().split(/\s+/)[0];
+        if (explicit) return explicit;
+        const tag = el.tagName;
+        if (tag === 'A') return el.hasAttribute('href') ? 'link' : '';
+        if (tag === 'INPUT') {
+            const type = (el.getAttribute('type') || 'text').toLowerCase();
+            return type === 'hidden' ? '' : (INPUT_ROLES[type] || 'textbox');
+        }
+        if (tag === 'SELECT') return el.multiple || el.size > 1 ? 'listbox' : 'combobox';
+        if (tag === 'SECTION') return el.hasAttribute('aria-label') || el.hasAttribute('aria-labelledby') ? 'region' : '';
+        return TAG_ROLES[tag] || '';
+    };
+
+    const nameOf = (el, role) => {
+        const labelledBy = (el.getAttribute('aria-labelledby') || '').split(/\s+/).filter(Boolean)
+            .map(id => document.getElementById(id)?.textContent).filter(Boolean).join(' ');
+        if (clean(labelledBy)) return clean(labelledBy);
+        if (clean(el.getAttribute('aria-label'))) return clean(el.getAttribute('aria-label'));
+        if (el.labels && el.labels.length) return clean([...el.labels].map(l => l.textContent).join(' '));
+        if (el.tagName === 'INPUT' && ['button', 'submit', 'reset'].includes(el.type)) return clean(el.value);
+        if (el.tagName === 'IMG' || el.type === 'image') return clean(el.alt);
+        if (!['textbox', 'searchbox', 'combobox', 'listbox', 'spinbutton'].includes(role) && !CONTEXT_ROLES.has(role)) {
+            const text = clean(el.textContent);
+            if (text) return text;
+        }
+        return clean(el.getAttribute('title'));
+    };
+
+    const visible = (el) => {
+        const rect = el.getBoundingClientRect();
+        if (rect.width <= 0 || rect.height <= 0) return false;
+        const style = getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.visibility !== 'collapse' && style.opacity !== '0';
+    };
+
+    const statesOf = (el) => {
+        const states = [];
+        if (document.activeElement === el) states.push('focused');
+        if (el.disabled || el.getAttribute('aria-disabled') === 'true') states.push('disabled');
+        if (el.required || el.getAttribute('aria-required') === 'true') states.push('required');
+        if (el.getAttribute('aria-invalid') === 'true') states.push('invalid');
+        const checked = el.getAttribute('aria-checked');
+        if (checked === 'mixed') states.push('checked=mixed');
+        else if (el.checked || checked === 'true') states.push('checked');
+        if (el.getAttribute('aria-pressed') === 'true') states.push('pressed');
+        if (el.getAttribute('aria-expanded') === 'true') states.push('expanded');
+        if (el.selected || el.getAttribute('aria-selected') === 'true') states.push('selected');
+        if (el.readOnly || el.getAttribute('aria-readonly') === 'true') states.push('readonly');
+        return states;
+    };
+
+    const valueOf = (el) => {
+        if (el.type === 'password') return '';
+        if (el.tagName === 'SELECT') return clean(el.selectedOptions[0]?.textContent);
+        if (el.tagName === 'INPUT' && !['checkbox', 'radio', 'button', 'submit', 'reset', 'image'].includes(el.type)) return el.value;
+        if (el.tagName === 'TEXTAREA') return el.value;
+        return el.getAttribute('aria-valuetext') || el.getAttribute('aria-valuenow') || '';
+    };
+
+    const refOf = (el) => {
+        if (!el.hasAttribute(refAttribute) || !el.getAttribute(refAttribute).startsWith('d')) {
+            window.__checkoutReprRefs = (window.__checkoutReprRefs || 0) + 1;
+            el.setAttribute(refAttribute, `d${window.__checkoutReprRefs}`);
+        }
+        return el.getAttribute(refAttribute);
+    };
+
+    const viewportWidth = window.innerWidth, viewportHeight = window.innerHeight;
+    const nodes = [];
+    // Walk with inherited context / hidden / covered state instead of per-node ancestor lookups
+    const walk = (el, context, covered) => {
+        const style = getComputedStyle(el);
+        if (style.display === 'none' || el.getAttribute('aria-hidden') === 'true' || el.hidden) return;
+
+        const role = roleOf(el);
+        let name = null;
+        if (role) {
+            name = nameOf(el, role);
+            if (role === 'heading' || role === 'alert' || role === 'status' || (CONTROL_ROLES.has(role) && !covered)) {
+                if (visible(el)) {
+                    const rect = el.getBoundingClientRect();
+                    const level = role === 'heading' ? (Number(el.getAttribute('aria-level')) || Number(el.tagName[1]) || null) : null;
+                    const attrs = { tag: el.tagName.toLowerCase() };
+                    for (const attribute of ['id', 'name', 'type', 'autocomplete', 'placeholder', 'href']) {
+                        const value = el.getAttribute(attribute);
+                        if (value) attrs[attribute] = value;
+                    }
+                    nodes.push({
+                        ref: refOf(el), role, name, value: valueOf(el), states: statesOf(el), level, context, attrs,
+                        inViewport: rect.x >= 0 && rect.y >= 0 && rect.right <= viewportWidth && rect.bottom <= viewportHeight
+                    });
+                    covered = covered || CONTROL_ROLES.has(role);
+                }
+            }
+            if (CONTEXT_ROLES.has(role) && (role !== 'region' || name)) {
+                context = [role, name.slice(0, 40), refOf(el)];
+            }
+        }
+
+        // Short text directly in a non-control element (prices, totals, stock and error messages)
+        if (!covered && !role && el.children.length === 0) {
+            const text = clean(el.textContent);
+            if (text && text.length <= TEXT_LIMIT && visible(el)) {
+                nodes.push({ ref: refOf(el), role: 'text', name: text, value: '', states: [], level: null, context,
+                             attrs: { tag: el.tagName.toLowerCase() }, inViewport: false });
+            }
+        }
+
+        for (const child of el.children) walk(child, context, covered);
+    };
+    if (document.body) walk(document.body, null, false);
+    return nodes;
+}
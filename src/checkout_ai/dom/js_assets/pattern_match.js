@@ -3,8 +3,12 @@
         const variantValue = typeof args === 'string' ? args : args.variantValue;
         const containerSelector = typeof args === 'object' ? args.containerSelector : null;
 
-        const normalize = (text) => text ? String(text).toLowerCase().trim().replace(/[^a-z0-9\s]/g, '') : '';
-        const normalizedVal = normalize(variantValue);
+        // Matching runs against the shared in-page text index (text_index.js): exact,
+        // then - for values of 3+ characters with several words - phrase or all-words
+        const textIndex = window.__checkoutTextIndex;
+        const normalizedVal = textIndex.normalize(variantValue);
+        const isMatch = textIndex.matcher(variantValue, { minLength: 3 });
+        const match = isMatch.text;
 
         // Helper to check visibility
         function isVisible(el) {
@@ -30,38 +34,6 @@
             }
         }
 
-        const match = (text) => {
-            if (!text) return false;
-            const t = normalize(text);
-
-            // Exact match
-            if (t === normalizedVal) return true;
-
-            // For short strings (like "M", "L", "XL"), enforce exact match only
-            if (normalizedVal.length < 3) {
-                return false;
-            }
-
-            // Multi-word match
-            const searchWords = normalizedVal.split(/\s+/).filter(w => w.length > 0);
-            const textWords = t.split(/\s+/).filter(w => w.length > 0);
-
-            if (searchWords.length >= 2) {
-                // First try exact phrase match
-                if (t.includes(normalizedVal)) {
-                    return true;
-                }
-
-                // Then try all words present match
-                const hasAllWords = searchWords.every(word =>
-                    textWords.some(textWord => textWord === word || textWord.includes(word) || word.includes(textWord))
-                );
-                if (hasAllWords) return true;
-            }
-
-            return false;
-        };
-
         // Clear markers
         document.querySelectorAll('[data-dom-el]').forEach(el => el.removeAttribute('data-dom-el'));
         const skipElements = new Set(document.querySelectorAll('[data-already-selected]'));
@@ -82,24 +54,24 @@
                     if (!input || (input.type !== 'radio' && input.type !== 'checkbox')) return false;
 
                     // Check label text content
-                    if (match(el.textContent)) return true;
+                    if (isMatch(el)) return true;
 
                     // Check label's title attribute
-                    if (match(el.getAttribute('title'))) return true;
+                    if (isMatch(el, 'title')) return true;
 
                     // Check all child elements' title attributes
                     const childrenWithTitle = el.querySelectorAll('[title]');
                     for (const child of childrenWithTitle) {
-                        if (match(child.getAttribute('title'))) return true;
+                        if (isMatch(child, 'title')) return true;
                     }
 
                     // Check the input value and attributes
-                    if (match(input.value) || match(input.getAttribute('aria-label'))) return true;
+                    if (isMatch(input, 'value') || isMatch(input, 'aria')) return true;
 
                     // Check associated images for color swatches
                     const parentSection = el.closest('section');
                     const img = parentSection?.querySelector('img');
-                    if (img && match(img.alt)) return true;
+                    if (img && isMatch(img, 'alt')) return true;
 
                     return false;
                 }
@@ -113,25 +85,25 @@
                     if (el.closest('label')) return false;
 
                     // Check input's own attributes first
-                    if (match(el.value) || match(el.getAttribute('aria-label'))) return true;
+                    if (isMatch(el, 'value') || isMatch(el, 'aria')) return true;
 
                     // Check associated label via 'for' attribute
                     const label = document.querySelector(`label[for="${el.id}"]`);
                     if (label) {
-                        if (match(label.textContent)) return true;
-                        if (match(label.getAttribute('title'))) return true;
+                        if (isMatch(label)) return true;
+                        if (isMatch(label, 'title')) return true;
 
                         // Check label's children with title
                         const childrenWithTitle = label.querySelectorAll('[title]');
                         for (const child of childrenWithTitle) {
-                            if (match(child.getAttribute('title'))) return true;
+                            if (isMatch(child, 'title')) return true;
                         }
                     }
 
                     // Check images in parent section
                     const parentSection = el.closest('section');
                     const img = parentSection?.querySelector('img');
-                    if (img && match(img.alt)) return true;
+                    if (img && isMatch(img, 'alt')) return true;
 
                     return false;
                 }
@@ -146,7 +118,7 @@
 
                     // Check if any option matches
                     for (const option of el.options) {
-                        if (match(option.text) || match(option.value)) {
+                        if (isMatch(option) || isMatch(option, 'value')) {
                             return true;
                         }
                     }
@@ -160,14 +132,14 @@
                 extraCheck: (el) => {
                     const label = document.querySelector(`label[for="${el.id}"]`);
                     const labelText = label?.querySelector('.sitg-label-text')?.textContent;
-                    if (match(labelText) || match(el.value) || match(el.getAttribute('aria-label'))) return true;
+                    if (match(labelText) || isMatch(el, 'value') || isMatch(el, 'aria')) return true;
 
                     // Check label's title and children's title
                     if (label) {
-                        if (match(label.getAttribute('title'))) return true;
+                        if (isMatch(label, 'title')) return true;
                         const childrenWithTitle = label.querySelectorAll('[title]');
                         for (const child of childrenWithTitle) {
-                            if (match(child.getAttribute('title'))) return true;
+                            if (isMatch(child, 'title')) return true;
                         }
                     }
                     return false;
@@ -188,13 +160,7 @@
                         return false;
                     }
                     // Only match if dropdown actually contains the search value
-                    const dropdownTexts = [
-                        el.textContent,
-                        el.value,
-                        el.getAttribute('aria-label'),
-                        el.getAttribute('title')
-                    ];
-                    return dropdownTexts.some(text => match(text));
+                    return ['text', 'value', 'aria', 'title'].some(field => isMatch(el, field));
                 }
             },
 
@@ -210,24 +176,24 @@
                     if (!input || (input.type !== 'radio' && input.type !== 'checkbox')) return false;
 
                     // Check label text content
-                    if (match(el.textContent)) return true;
+                    if (isMatch(el)) return true;
 
                     // Check label's title attribute
-                    if (match(el.getAttribute('title'))) return true;
+                    if (isMatch(el, 'title')) return true;
 
                     // Check all child elements' title attributes
                     const childrenWithTitle = el.querySelectorAll('[title]');
                     for (const child of childrenWithTitle) {
-                        if (match(child.getAttribute('title'))) return true;
+                        if (isMatch(child, 'title')) return true;
                     }
 
                     // Check the input value and attributes
-                    if (match(input.value) || match(input.getAttribute('aria-label'))) return true;
+                    if (isMatch(input, 'value') || isMatch(input, 'aria')) return true;
 
                     // Check associated images for color swatches
                     const parentSection = el.closest('section');
                     const img = parentSection?.querySelector('img');
-                    if (img && match(img.alt)) return true;
+                    if (img && isMatch(img, 'alt')) return true;
 
                     return false;
                 }
@@ -241,25 +207,25 @@
                     if (el.closest('label')) return false;
 
                     // Check input's own attributes first
-                    if (match(el.value) || match(el.getAttribute('aria-label'))) return true;
+                    if (isMatch(el, 'value') || isMatch(el, 'aria')) return true;
 
                     // Check associated label via 'for' attribute
                     const label = document.querySelector(`label[for="${el.id}"]`);
                     if (label) {
-                        if (match(label.textContent)) return true;
-                        if (match(label.getAttribute('title'))) return true;
+                        if (isMatch(label)) return true;
+                        if (isMatch(label, 'title')) return true;
 
                         // Check label's children with title
                         const childrenWithTitle = label.querySelectorAll('[title]');
                         for (const child of childrenWithTitle) {
-                            if (match(child.getAttribute('title'))) return true;
+                            if (isMatch(child, 'title')) return true;
                         }
                     }
 
                     // Check images in parent section
                     const parentSection = el.closest('section');
                     const img = parentSection?.querySelector('img');
-                    if (img && match(img.alt)) return true;
+                    if (img && isMatch(img, 'alt')) return true;
 
                     return false;
                 }
@@ -271,16 +237,7 @@
                 extraCheck: (el) => {
 
                     // Check if current element matches
-                    const elementTexts = [
-                        el.textContent?.trim(),
-                        el.alt,
-                        el.getAttribute('aria-label'),
-                        el.getAttribute('title'),
-                        el.getAttribute('data-value'),
-                        el.value
-                    ];
-
-                    const hasMatch = elementTexts.some(text => match(text));
+                    const hasMatch = ['text', 'alt', 'aria', 'title', 'data', 'value'].some(field => isMatch(el, field));
                     if (!hasMatch) return false;
 
                     // Universal traversal to find best clickable element
@@ -429,12 +386,12 @@
             {
                 selector: 'button, [role="button"]', action: 'click',
                 extraCheck: (el) => {
-                    if (match(el.textContent) || match(el.getAttribute('aria-label')) ||
-                        match(el.value) || match(el.getAttribute('title'))) return true;
+                    if (isMatch(el) || isMatch(el, 'aria') ||
+                        isMatch(el, 'value') || isMatch(el, 'title')) return true;
 
                     // Check child images (common for color swatches)
                     const img = el.querySelector('img');
-                    if (img && (match(img.alt) || match(img.getAttribute('title')))) return true;
+                    if (img && (isMatch(img, 'alt') || isMatch(img, 'title'))) return true;
 
                     return false;
                 }
@@ -457,7 +414,7 @@
             // Links and clickable elements
             {
                 selector: 'a, [onclick], [class*="clickable"], [class*="selectable"]', action: 'click',
-                extraCheck: (el) => match(el.textContent) || match(el.getAttribute('aria-label'))
+                extraCheck: (el) => isMatch(el) || isMatch(el, 'aria')
             },
 
             // Color swatches and images
@@ -467,17 +424,17 @@
 
 
                     // Check element itself
-                    if (match(el.alt) || match(el.getAttribute('title')) ||
-                        match(el.getAttribute('data-color')) || match(el.getAttribute('data-value')) ||
-                        match(el.getAttribute('aria-label'))) return true;
+                    if (isMatch(el, 'alt') || isMatch(el, 'title') ||
+                        match(el.getAttribute('data-color')) || isMatch(el, 'data') ||
+                        isMatch(el, 'aria')) return true;
 
                     // Check parent link for aria-label
                     const parentLink = el.closest('a');
-                    if (parentLink && match(parentLink.getAttribute('aria-label'))) return true;
+                    if (parentLink && isMatch(parentLink, 'aria')) return true;
 
                     // Check child images
                     const childImg = el.querySelector('img');
-                    if (childImg && (match(childImg.alt) || match(childImg.getAttribute('aria-label')))) return true;
+                    if (childImg && (isMatch(childImg, 'alt') || isMatch(childImg, 'aria'))) return true;
 
                     return false;
                 }
@@ -497,7 +454,7 @@
                 selector: 'span, div, label, li, td', action: 'click',
                 extraCheck: (el) => {
                     const text = el.textContent?.trim();
-                    return text && text.length < 100 && match(text) &&
+                    return text && text.length < 100 && isMatch(el) &&
                         (el.onclick || el.getAttribute('onclick') ||
                             el.style.cursor === 'pointer' ||
                             (el.classList && el.classList.contains('clickable')) ||
@@ -522,14 +479,14 @@
                     if (!isExplicitlyInteractive) continue;
                 }
 
-                let isMatch = false;
+                let matched = false;
                 if (pattern.extraCheck) {
-                    isMatch = pattern.extraCheck(el);
+                    matched = pattern.extraCheck(el);
                 } else {
-                    isMatch = match(el.textContent) || match(el.value) || match(el.getAttribute('aria-label'));
+                    matched = isMatch(el) || isMatch(el, 'value') || isMatch(el, 'aria');
                 }
 
-                if (isMatch) {
+                if (matched) {
                     el.setAttribute('data-dom-el', 'true');
                     const actionData = {
                         found: true,
@@ -545,7 +502,7 @@
 
                     if (pattern.action === 'dropdown' && el.tagName === 'SELECT') {
                         for (const option of el.options) {
-                            if (match(option.text)) {
+                            if (isMatch(option)) {
                                 actionData.value = option.value;
                                 actionData.action = 'select';
                                 break;
@@ -0,0 +1,361 @@
+// In-page text index shared by the DOM matchers.
+// Installs window.__checkoutTextIndex once per document. The index maps the normalized
+// text, aria-label, title, alt, value and data-value of every element to the element
+// through a token index (all-words queries) and trigram indexes over distinct strings
+// and tokens (phrase/contains/fuzzy queries). It is rebuilt lazily on the first query
+// after the DOM changes (MutationObserver version counter), so repeated matcher runs
+// against the same page reuse one build instead of re-normalizing every node.
+(function installCheckoutTextIndex() {
+    const SCHEMA = 1;
+    if (window.__checkoutTextIndex && window.__checkoutTextIndex.schema === SCHEMA) return;
+
+    const FIELDS = ['text', 'aria', 'title', 'alt', 'value', 'data'];
+    const ATTRIBUTES = { aria: 'aria-label', title: 'title', alt: 'alt', value: 'value', data: 'data-value' };
+    const SKIP_TAGS = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE']);
+    // Raw text longer than this is a container (whole sections, the body); those
+    // elements are matched on demand instead of being tokenized at every depth.
+    const MAX_TEXT = 400;
+    // Longest query substring enumerated for "query contains field" lookups
+    const MAX_WITHIN = 64;
+
+    // Same rules as the matchers: lowercase, ASCII alphanumerics and spaces only
+    const normalize = (text) => text ? String(text).toLowerCase().replace(/[^a-z0-9\s]/g, '').replace(/\s+/g, ' ').trim() : '';
+    const strict = (text) => normalize(text).replace(/ /g, '');
+
+    const gramsOf = (s) => {
+        const grams = new Set();
+        for (let i = 0; i + 3 <= s.length; i++) grams.add(s.substr(i, 3));
+        return grams;
+    };
+
+    const push = (map, key, value) => {
+        const list = map.get(key);
+        if (list) list.push(value);
+        else map.set(key, [value]);
+    };
+
+    const index = {
+        schema: SCHEMA,
+        version: 0,
+        builtVersion: -1,
+        stats: {},
+        normalize,
+        strict
+    };
+
+    let elements = [];          // id -> element (document order, shadow roots inline)
+    let ids = new Map();        // element -> id
+    let fieldText = [];         // id -> {field: normalized text}
+    let longText = new Set();   // ids whose text is over MAX_TEXT
+    let entries = new Map();    // normalized string -> [id * 8 + field index]
+    let strictToFuzzy = new Map();
+    let tokenStrings = new Map();
+    let strictGrams = new Map();
+    let tokenGrams = new Map();
+    let gramCount = new Map();
+
+    const OBSERVE = {
+        subtree: true, childList: true, characterData: true,
+        attributes: true, attributeFilter: Object.values(ATTRIBUTES)
+    };
+    // The overlay phase draws its markers into #automation-overlays; those mutations
+    // do not change what the page says and must not force a rebuild.
+    const isOverlay = (node) => {
+        const el = node && (node.nodeType === 1 ? node : node.parentElement);
+        return !!(el && el.closest && el.closest('#automation-overlays'));
+    };
+    const changesPage = (records) => records.some(record =>
+        !isOverlay(record.target) &&
+        !(record.type === 'childList' && [...record.addedNodes, ...record.removedNodes].every(isOverlay))
+    );
+    const observer = new MutationObserver((records) => { if (changesPage(records)) index.version++; });
+    observer.observe(document, OBSERVE);
+    const observedRoots = new WeakSet();
+
+    const addString = (n, id, fieldIdx) => {
+        const known = entries.get(n);
+        if (known) {
+            known.push(id * 8 + fieldIdx);
+            return;
+        }
+        entries.set(n, [id * 8 + fieldIdx]);
+
+        const s = n.replace(/ /g, '');
+        if (strictToFuzzy.has(s)) {
+            strictToFuzzy.get(s).push(n);
+        } else {
+            strictToFuzzy.set(s, [n]);
+            const grams = gramsOf(s);
+            gramCount.set(s, grams.size);
+            for (const gram of grams) push(strictGrams, gram, s);
+        }
+
+        for (const token of new Set(n.split(' '))) {
+            if (!tokenStrings.has(token)) {
+                for (const gram of gramsOf(token)) push(tokenGrams, gram, token);
+            }
+            push(tokenStrings, token, n);
+        }
+    };
+
+    const addField = (id, field, raw) => {
+        if (raw === null || raw === undefined || raw === '') return;
+        const n = normalize(raw);
+        if (!n) return;
+        (fieldText[id] || (fieldText[id] = {}))[field] = n;
+        addString(n, id, FIELDS.indexOf(field));
+    };
+
+    // Pre-order registration (ids follow document order), post-order text so every
+    // element's textContent is assembled from its children instead of re-read per node.
+    const walk = (el) => {
+        const skip = SKIP_TAGS.has(el.tagName);
+        const id = skip ? -1 : elements.length;
+        if (!skip) {
+            elements.push(el);
+            ids.set(el, id);
+        }
+
+        let text = '';
+        let long = false;
+        for (let child = el.firstChild; child; child = child.nextSibling) {
+            let part = null;
+            if (child.nodeType === 3 || child.nodeType === 4) part = child.data;
+            else if (child.nodeType === 1) part = walk(child);
+            else continue;
+
+            if (long) continue;
+            if (part === null) long = true;
+            else if ((text += part).length > MAX_TEXT) long = true;
+        }
+
+        if (el.shadowRoot) {
+            if (!observedRoots.has(el.shadowRoot)) {
+                observer.observe(el.shadowRoot, OBSERVE);
+                observedRoots.add(el.shadowRoot);
+            }
+            for (let child = el.shadowRoot.firstElementChild; child; child = child.nextElementSibling) walk(child);
+        }
+
+        if (!skip) {
+            if (long) longText.add(id);
+            else addField(id, 'text', text);
+            for (const field in ATTRIBUTES) addField(id, field, el.getAttribute(ATTRIBUTES[field]));
+        }
+        return long ? null : text;
+    };
+
+    index.ensure = () => {
+        if (changesPage(observer.takeRecords())) index.version++;
+        if (index.builtVersion === index.version) return index;
+
+        const started = performance.now();
+        elements = [];
+        ids = new Map();
+        fieldText = [];
+        longText = new Set();
+        entries = new Map();
+        strictToFuzzy = new Map();
+        tokenStrings = new Map();
+        strictGrams = new Map();
+        tokenGrams = new Map();
+        gramCount = new Map();
+
+        if (document.documentElement) walk(document.documentElement);
+
+        index.builtVersion = index.version;
+        index.stats = {
+            elements: elements.length,
+            strings: entries.size,
+            tokens: tokenStrings.size,
+            buildMs: +(performance.now() - started).toFixed(2)
+        };
+        return index;
+    };
+
+    // Normalized field of an element; read live for elements outside the index,
+    // container text and inputs whose value property has moved off the attribute.
+    const readField = (el, field) => {
+        const id = ids.get(el);
+        const live = id === undefined || (field === 'text' && longText.has(id)) ||
+            (field === 'value' && el.value !== undefined && String(el.value) !== (el.getAttribute('value') || ''));
+        if (!live) return { id, live, text: (fieldText[id] && fieldText[id][field]) || '' };
+        let raw;
+        if (field === 'text') raw = el.textContent;
+        else if (field === 'value') raw = el.value !== undefined ? el.value : el.getAttribute('value');
+        else raw = el.getAttribute(ATTRIBUTES[field]);
+        return { id, live, text: normalize(raw) };
+    };
+
+    index.field = (el, field = 'text') => {
+        index.ensure();
+        return readField(el, field).text;
+    };
+
+    // Candidates from the rarest trigram of `s`, verified with includes()
+    const containing = (s, gramIndex, vocabulary) => {
+        if (s.length < 3) return Array.from(vocabulary.keys()).filter(c => c.includes(s));
+        let rarest = null;
+        for (const gram of gramsOf(s)) {
+            const list = gramIndex.get(gram);
+            if (!list) return [];
+            if (!rarest || list.length < rarest.length) rarest = list;
+        }
+        return rarest.filter(c => c.includes(s));
+    };
+
+    const fuzzyOf = (strictStrings) => {
+        const out = new Set();
+        for (const s of strictStrings) for (const n of strictToFuzzy.get(s) || []) out.add(n);
+        return out;
+    };
+
+    // Each query returns the Set of matching normalized strings
+    const queries = {
+        exact(q) {
+            const out = fuzzyOf([strict(q)]);
+            const n = normalize(q);
+            if (entries.has(n)) out.add(n);
+            return out;
+        },
+        // Field contains the query as a phrase (word boundaries preserved)
+        phrase(q) {
+            const n = normalize(q);
+            if (!n) return new Set();
+            const out = new Set();
+            for (const c of fuzzyOf(containing(n.replace(/ /g, ''), strictGrams, strictToFuzzy))) {
+                if (c.includes(n)) out.add(c);
+            }
+            return out;
+        },
+        // Field contains the query once spaces are ignored ("navyblue" ~ "navy blue")
+        contains(q) {
+            const s = strict(q);
+            return s ? fuzzyOf(containing(s, strictGrams, strictToFuzzy)) : new Set();
+        },
+        // Query contains the field ("32" for "32 inch")
+        within(q) {
+            const s = strict(q).substr(0, MAX_WITHIN);
+            const found = new Set();
+            for (let i = 0; i < s.length; i++) {
+                for (let j = i + 1; j <= s.length; j++) {
+                    const part = s.substring(i, j);
+                    if (strictToFuzzy.has(part)) found.add(part);
+                }
+            }
+            return fuzzyOf(found);
+        },
+        // Every query word equals, contains or is contained in some field word
+        allWords(q) {
+            const words = normalize(q).split(' ').filter(Boolean);
+            if (!words.length) return new Set();
+            const perWord = words.map(word => {
+                const tokens = new Set(containing(word, tokenGrams, tokenStrings));
+                for (let i = 0; i < word.length; i++) {
+                    for (let j = i + 1; j <= word.length; j++) {
+                        const part = word.substring(i, j);
+                        if (tokenStrings.has(part)) tokens.add(part);
+                    }
+                }
+                const strings = new Set();
+                for (const token of tokens) for (const n of tokenStrings.get(token)) strings.add(n);
+                return strings;
+            }).sort((a, b) => a.size - b.size);
+            return new Set(Array.from(perWord[0]).filter(n => perWord.every(set => set.has(n))));
+        },
+        // Trigram (Dice) similarity of the space-free forms, for typos and spelling variants
+        fuzzy(q, threshold = 0.5) {
+            const s = strict(q);
+            const grams = gramsOf(s);
+            if (!grams.size) return queries.exact(q);
+            const shared = new Map();
+            for (const gram of grams) {
+                for (const c of strictGrams.get(gram) || []) shared.set(c, (shared.get(c) || 0) + 1);
+            }
+            const scored = [];
+            for (const [c, count] of shared) {
+                const score = 2 * count / (grams.size + gramCount.get(c));
+                if (score >= threshold) scored.push(c);
+            }
+            return fuzzyOf(scored);
+        }
+    };
+
+    /**
+     * Elements whose fields match a query, in document order.
+     * mode: exact | phrase | contains | within | allWords | fuzzy
+     * options: {fields: [...], root: Element, threshold: number (fuzzy)}
+     */
+    index.lookup = (query, mode = 'exact', options = {}) => {
+        index.ensure();
+        const strings = queries[mode](query, options.threshold);
+        const wanted = options.fields ? new Set(options.fields.map(f => FIELDS.indexOf(f))) : null;
+        const root = options.root && options.root !== document ? options.root : null;
+        const hits = [];
+        for (const n of strings) {
+            for (const packed of entries.get(n)) {
+                const fieldIdx = packed & 7;
+                if (wanted && !wanted.has(fieldIdx)) continue;
+                const el = elements[packed >> 3];
+                if (root && !root.contains(el)) continue;
+                hits.push({ id: packed >> 3, el, field: FIELDS[fieldIdx], text: n });
+            }
+        }
+        return hits.sort((a, b) => a.id - b.id);
+    };
+
+    /**
+     * Predicate with the matchers' shared rule: exact match, or - for queries of at
+     * least `minLength` characters with two or more words - a phrase or all-words match.
+     * With {contains: true} the second rule is "field contains the query, spaces ignored"
+     * (any word count), as used by selection verification.
+     * Returns fn(el, field) plus fn.text(rawString) for values that are not element fields.
+     */
+    index.matcher = (query, options = {}) => {
+        index.ensure();
+        const target = normalize(query);
+        const strictTarget = target.replace(/ /g, '');
+        const minLength = options.minLength || 0;
+        const contains = !!options.contains;
+        const extended = contains ? strictTarget.length >= minLength && strictTarget.length > 0
+            : target.length >= minLength && target.split(' ').length >= 2;
+
+        const matching = queries.exact(query);
+        if (extended && contains) {
+            for (const n of queries.contains(query)) matching.add(n);
+        } else if (extended) {
+            for (const n of queries.phrase(query)) matching.add(n);
+            for (const n of queries.allWords(query)) matching.add(n);
+        }
+
+        // Same rule on a string outside the index
+        const textMatches = (n) => {
+            if (!n) return false;
+            const s = n.replace(/ /g, '');
+            if (n === target || s === strictTarget) return true;
+            if (!extended) return false;
+            if (contains) return s.includes(strictTarget);
+            if (n.includes(target)) return true;
+            const textWords = n.split(' ');
+            return target.split(' ').every(word =>
+                textWords.some(t => t === word || t.includes(word) || word.includes(t))
+            );
+        };
+
+        // Live reads (containers, edited inputs) are memoized per element and field
+        const liveResults = new Map();
+        const check = (el, field = 'text') => {
+            if (!el) return false;
+            const { id, live, text } = readField(el, field);
+            if (!live) return text ? matching.has(text) : false;
+            if (id === undefined) return textMatches(text);
+            const key = field + ':' + id;
+            if (!liveResults.has(key)) liveResults.set(key, textMatches(text));
+            return liveResults.get(key);
+        };
+        check.text = (raw) => textMatches(normalize(raw));
+        return check;
+    };
+
+    window.__checkoutTextIndex = index;
+})();
@@ -0,0 +1,88 @@
+(args) => {
+    // One pass over the product area: for every requested variant type, the option
+    // group that carries it (select, radio group or swatch/button list), where it sits
+    // and how many of its options are currently disabled (waiting on another choice).
+    const { types, aliases, containerSelector } = args;
+    const root = (containerSelector && document.querySelector(containerSelector)) || document.body;
+    const normalize = window.__checkoutTextIndex.normalize;
+
+    const OPTION_SELECTOR = 'option, input[type="radio"], [role="radio"], [role="option"], button, li, [data-value]';
+    const GROUP_SELECTOR = [
+        'select', 'fieldset', '[role="radiogroup"]', '[role="listbox"]',
+        '[data-option-name]', '[data-option]', '[class*="option"]', '[class*="variant"]',
+        '[class*="swatch"]', '[class*="selector"]', '[class*="picker"]'
+    ].concat(types.flatMap(type => (aliases[type] || [type]).map(alias => `[class*="${alias}"], [id*="${alias}"], [name*="${alias}"]`))).join(', ');
+    // Lists bigger than this are page sections, not option groups
+    const MAX_OPTIONS = 120;
+
+    const isVisible = (el) => {
+        const style = window.getComputedStyle(el);
+        if (style.display === 'none' || style.visibility === 'hidden') return false;
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    };
+
+    const isDisabled = (el) => el.disabled || el.getAttribute('aria-disabled') === 'true' ||
+        /disabled|unavailable|sold-?out|out-?of-?stock/i.test(typeof el.className === 'string' ? el.className : '');
+
+    const describe = (el) => {
+        const parts = [
+            el.id, typeof el.className === 'string' ? el.className : '', el.getAttribute('name'),
+            el.getAttribute('aria-label'), el.getAttribute('data-option-name'), el.getAttribute('data-option')
+        ];
+        const legend = el.querySelector(':scope > legend, :scope > label, :scope > [class*="label"], :scope > [class*="title"]');
+        if (legend) parts.push(legend.textContent.slice(0, 60));
+        const labelledBy = el.getAttribute('aria-labelledby');
+        if (labelledBy) parts.push(...labelledBy.split(/\s+/).map(id => document.getElementById(id)?.textContent || ''));
+        if (el.tagName === 'SELECT' && el.id) parts.push(document.querySelector(`label[for="${el.id}"]`)?.textContent || '');
+        if (el.tagName === 'INPUT' && el.type === 'radio') parts.push(el.name);
+        return ' ' + normalize(parts.join(' ').replace(/[-_]/g, ' ')) + ' ';
+    };
+
+    const candidates = [];
+    const seenRadioNames = new Set();
+    for (const el of root.querySelectorAll(GROUP_SELECTOR)) {
+        if (!isVisible(el)) continue;
+        const options = el.tagName === 'SELECT'
+            ? [...el.options].filter(o => o.value !== '')
+            : [...el.querySelectorAll(OPTION_SELECTOR)];
+        if (!options.length || options.length > MAX_OPTIONS) continue;
+        candidates.push({ el, options, text: describe(el) });
+    }
+    // Radio inputs grouped by name (their container may carry no hint at all)
+    for (const radio of root.querySelectorAll('input[type="radio"][name]')) {
+        if (seenRadioNames.has(radio.name)) continue;
+        seenRadioNames.add(radio.name);
+        const options = [...root.querySelectorAll(`input[type="radio"][name="${CSS.escape(radio.name)}"]`)];
+        const anchor = radio.closest('fieldset, [role="radiogroup"]') || radio.parentElement;
+        candidates.push({ el: anchor, options, text: ' ' + normalize(radio.name.replace(/[-_]/g, ' ')) + ' ' + describe(anchor) });
+    }
+
+    const groups = {};
+    for (const type of types) {
+        const words = (aliases[type] || [type]).map(alias => ' ' + normalize(alias));
+        let best = null;
+        for (const candidate of candidates) {
+            if (!words.some(word => candidate.text.includes(word))) continue;
+            // Innermost group wins: it holds the fewest options
+            if (!best || candidate.options.length < best.options.length ||
+                (candidate.options.length === best.options.length && best.el.contains(candidate.el))) {
+                best = candidate;
+            }
+        }
+        if (!best) {
+            groups[type] = { found: false };
+            continue;
+        }
+        const rect = best.el.getBoundingClientRect();
+        groups[type] = {
+            found: true,
+            kind: best.el.tagName === 'SELECT' ? 'select' : best.options[0].matches('input[type="radio"], [role="radio"]') ? 'radio' : 'buttons',
+            options: best.options.length,
+            disabled: best.options.filter(isDisabled).length,
+            top: Math.round(rect.top + window.scrollY),
+            left: Math.round(rect.left + window.scrollX)
+        };
+    }
+    return groups;
+}
@@ -1,14 +1,13 @@
 (args) => {
     const { variantType, variantValue } = args;
 
-    // Strict normalization (removes spaces)
-    const normalizeStrict = (text) => text ? text.toLowerCase().trim().replace(/[^a-z0-9]/g, '') : '';
-
-    // Fuzzy normalization (keeps spaces, useful for multi-word matches)
-    const normalizeFuzzy = (text) => text ? text.toLowerCase().trim().replace(/[^a-z0-9\s]/g, '').replace(/\s+/g, ' ') : '';
-
-    const normalizedTargetStrict = normalizeStrict(variantValue);
-    const normalizedTargetFuzzy = normalizeFuzzy(variantValue);
+    // Matching runs against the shared in-page text index (text_index.js): exact match
+    // (with or without spaces), or containment for values of 3+ characters
+    const textIndex = window.__checkoutTextIndex;
+    const normalizedTargetStrict = textIndex.strict(variantValue);
+    const normalizedTargetFuzzy = textIndex.normalize(variantValue);
+    const fieldMatches = textIndex.matcher(variantValue, { contains: true, minLength: 3 });
+    const matches = fieldMatches.text;
 
     const isVisible = (el) => {
         if (!el) return false;
@@ -23,29 +22,6 @@
     console.log('🔍 Normalized target (strict):', normalizedTargetStrict);
     console.log('🔍 Normalized target (fuzzy):', normalizedTargetFuzzy);
 
-    // Helper to check if text matches (tries both strict and fuzzy)
-    const matches = (text) => {
-        if (!text) return false;
-        const textStrict = normalizeStrict(text);
-        const textFuzzy = normalizeFuzzy(text);
-
-        // Exact match (strict)
-        if (textStrict === normalizedTargetStrict) return true;
-
-        // Fuzzy match (keeps spaces)
-        if (textFuzzy === normalizedTargetFuzzy) return true;
-
-        // For short strings (like "M", "L", "XL", "10"), enforce exact match only
-        if (normalizedTargetStrict.length < 3) {
-            return false;
-        }
-
-        // Contains match (for longer text containing the variant)
-        if (textStrict.includes(normalizedTargetStrict) || textFuzzy.includes(normalizedTargetFuzzy)) return true;
-
-        return false;
-    };
-
     // Check 1: URL parameters (for sites that put variant in URL)
     const url = window.location.href;
     if (matches(url)) {
@@ -57,21 +33,21 @@
     const radios = document.querySelectorAll('input[type="radio"]:checked');
     for (const radio of radios) {
         // Check radio value
-        if (matches(radio.value)) {
+        if (fieldMatches(radio, 'value')) {
             console.log('✅ VERIFIED via radio value:', radio.value);
             return { verified: true, method: 'radio_value', actualValue: radio.value };
         }
 
         // Check label
         const label = document.querySelector(`label[for="${radio.id}"]`);
-        if (label && matches(label.textContent)) {
+        if (label && fieldMatches(label)) {
             console.log('✅ VERIFIED via radio label:', label.textContent.trim());
             return { verified: true, method: 'radio_label', actualValue: label.textContent.trim() };
         }
 
         // Check aria-label
         const ariaLabel = radio.getAttribute('aria-label');
-        if (ariaLabel && matches(ariaLabel)) {
+        if (ariaLabel && fieldMatches(radio, 'aria')) {
             console.log('✅ VERIFIED via aria-label:', ariaLabel);
             return { verified: true, method: 'aria_label', actualValue: ariaLabel };
         }
@@ -118,21 +94,21 @@
             }
 
             // Check text content
-            if (matches(el.textContent)) {
+            if (fieldMatches(el)) {
                 console.log('✅ VERIFIED via selected element text:', el.textContent.trim(), '(selector:', selector + ')');
                 return { verified: true, method: 'selected_element', actualValue: el.textContent.trim() };
             }
 
             // Check aria-label
             const ariaLabel = el.getAttribute('aria-label');
-            if (ariaLabel && matches(ariaLabel)) {
+            if (ariaLabel && fieldMatches(el, 'aria')) {
                 console.log('✅ VERIFIED via selected element aria-label:', ariaLabel, '(selector:', selector + ')');
                 return { verified: true, method: 'selected_aria_label', actualValue: ariaLabel };
             }
 
             // Check title
             const title = el.getAttribute('title');
-            if (title && matches(title)) {
+            if (title && fieldMatches(el, 'title')) {
                 console.log('✅ VERIFIED via selected element title:', title, '(selector:', selector + ')');
                 return { verified: true, method: 'selected_title', actualValue: title };
             }
@@ -153,7 +129,7 @@
     const displayElements = document.querySelectorAll('[class*="current"], [class*="chosen"], [class*="display"]');
     for (const el of displayElements) {
         if (!isVisible(el)) continue;
-        if (matches(el.textContent)) {
+        if (fieldMatches(el)) {
             console.log('✅ VERIFIED via display element:', el.textContent.trim());
             return { verified: true, method: 'display_element', actualValue: el.textContent.trim() };
         }
@@ -0,0 +1,376 @@
+"""
+Layout Snapshot Engine
+One CDP `DOMSnapshot.captureSnapshot` call returns the layout tree of the whole page
+(main document plus same-process iframes): node tree, computed display/visibility/
+opacity/z-index/pointer-events/position, layout bounds and paint order. The
+response is decoded into flat columns (one array per property, indexed by node) so
+finders can answer visibility, geometry, ordering and hit-test questions in Python
+instead of calling getComputedStyle/getBoundingClientRect element by element.
+
+- Chromium only; capture_layout() returns None on other engines, when the CDP
+  session cannot be opened or when DOM_LAYOUT_ENGINE=js - callers keep their
+  in-page path as fallback
+- Bounds are document coordinates; viewport coordinates subtract the scroll
+  offset of the element's document
+- Finders that need live elements tag their candidates with an attribute first
+  and look the tags up with nodes_with_attribute()
+"""
+
+import asyncio
+import logging
+import os
+import weakref
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# auto: use the snapshot when a CDP session is available | cdp: same, warn on failure | js: never
+LAYOUT_ENGINE_ENV = 'DOM_LAYOUT_ENGINE'
+
+SNAPSHOT_STYLES = ['display', 'visibility', 'opacity', 'z-index', 'pointer-events', 'position']
+
+ELEMENT_NODE = 1
+TEXT_NODE = 3
+DOCUMENT_FRAGMENT_NODE = 11
+
+# CDP session per page, reused across captures
+_sessions: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+
+
+def layout_engine() -> str:
+    """Configured engine: 'auto' (default), 'cdp' or 'js'"""
+    engine = os.getenv(LAYOUT_ENGINE_ENV, 'auto').strip().lower()
+    return engine if engine in ('auto', 'cdp', 'js') else 'auto'
+
+
+class LayoutSnapshot:
+    """Columnar view of a DOMSnapshot.captureSnapshot response.
+
+    Nodes are addressed by a global index (documents concatenated in response
+    order); node columns cover every node, layout columns only nodes with a box.
+    """
+
+    def __init__(self, response: Dict[str, Any], viewport: Optional[Dict[str, float]] = None):
+        self.strings: List[str] = response.get('strings', [])
+        self.viewport = viewport or {}
+
+        # Node columns
+        self.document = array('i')
+        self.parent = array('i')
+        self.node_type = array('b')
+        self.node_name = array('i')
+        self.node_value = array('i')
+        self.backend_node_id = array('i')
+        self.attributes: List[Tuple[int, ...]] = []
+        self.layout_row = array('i')
+        self.input_value: Dict[int, int] = {}
+
+        # Layout columns
+        self.layout_node = array('i')
+        self.x = array('d')
+        self.y = array('d')
+        self.width = array('d')
+        self.height = array('d')
+        self.paint_order = array('i')
+        self.styles: Dict[str, array] = {name: array('i') for name in SNAPSHOT_STYLES}
+
+        self.documents: List[Dict[str, Any]] = []
+        self._children: Optional[List[List[int]]] = None
+        # Inherited per-node flags (see _inherited_flags)
+        self._transparent: Optional[array] = None
+        self._in_shadow: Optional[array] = None
+        self._attribute_index: Dict[str, Dict[str, List[int]]] = {}
+
+        for doc_index, doc in enumerate(response.get('documents', [])):
+            self._decode_document(doc_index, doc)
+
+    def _decode_document(self, doc_index: int, doc: Dict[str, Any]):
+        offset = len(self.parent)
+        nodes = doc.get('nodes', {})
+        parents = nodes.get('parentIndex', [])
+        count = len(parents)
+
+        self.documents.append({
+            'url': self._string(doc.get('documentURL', -1)),
+            'frame_id': self._string(doc.get('frameId', -1)),
+            'scroll_x': doc.get('scrollOffsetX', 0) or 0,
+            'scroll_y': doc.get('scrollOffsetY', 0) or 0,
+            'offset': offset,
+            'count': count,
+        })
+
+        self.document.extend([doc_index] * count)
+        self.parent.extend(p + offset if p >= 0 else -1 for p in parents)
+        self.node_type.extend(nodes.get('nodeType', [0] * count))
+        self.node_name.extend(nodes.get('nodeName', [-1] * count))
+        self.node_value.extend(nodes.get('nodeValue', [-1] * count))
+        self.backend_node_id.extend(nodes.get('backendNodeId', [0] * count))
+        attributes = nodes.get('attributes', [])
+        self.attributes.extend(tuple(attributes[i]) if i < len(attributes) else () for i in range(count))
+        self.layout_row.extend([-1] * count)
+
+        rare_values = nodes.get('inputValue', {})
+        for node, value in zip(rare_values.get('index', []), rare_values.get('value', [])):
+            self.input_value[node + offset] = value
+
+        layout = doc.get('layout', {})
+        styles = layout.get('styles', [])
+        bounds = layout.get('bounds', [])
+        paint_orders = layout.get('paintOrders', [])
+        for row, node in enumerate(layout.get('nodeIndex', [])):
+            node += offset
+            self.layout_row[node] = len(self.layout_node)
+            self.layout_node.append(node)
+
+            x, y, width, height = (list(bounds[row]) + [0, 0, 0, 0])[:4] if row < len(bounds) else (0, 0, 0, 0)
+            self.x.append(x)
+            self.y.append(y)
+            self.width.append(width)
+            self.height.append(height)
+            self.paint_order.append(paint_orders[row] if row < len(paint_orders) else 0)
+
+            row_styles = styles[row] if row < len(styles) else []
+            for i, name in enumerate(SNAPSHOT_STYLES):
+                self.styles[name].append(row_styles[i] if i < len(row_styles) else -1)
+
+    def _string(self, index: int) -> Optional[str]:
+        return self.strings[index] if 0 <= index < len(self.strings) else None
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    # Node data
+
+    def tag(self, node: int) -> str:
+        """Lowercase node name ('input', '#text', ...)"""
+        return (self._string(self.node_name[node]) or '').lower()
+
+    def is_element(self, node: int) -> bool:
+        return self.node_type[node] == ELEMENT_NODE
+
+    def attribute(self, node: int, name: str) -> Optional[str]:
+        pairs = self.attributes[node]
+        for i in range(0, len(pairs) - 1, 2):
+            if self.strings[pairs[i]] == name:
+                return self._string(pairs[i + 1])
+        return None
+
+    def attributes_of(self, node: int) -> Dict[str, str]:
+        pairs = self.attributes[node]
+        return {self.strings[pairs[i]]: self._string(pairs[i + 1]) or '' for i in range(0, len(pairs) - 1, 2)}
+
+    def value(self, node: int) -> Optional[str]:
+        """Current value of input/textarea/select elements (not just the attribute)"""
+        index = self.input_value.get(node)
+        return self._string(index) if index is not None else None
+
+    def nodes_with_attribute(self, name: str) -> Dict[str, List[int]]:
+        """attribute value -> nodes carrying it (built once per attribute name)"""
+        if name not in self._attribute_index:
+            by_value: Dict[str, List[int]] = {}
+            for node, pairs in enumerate(self.attributes):
+                for i in range(0, len(pairs) - 1, 2):
+                    if self.strings[pairs[i]] == name:
+                        by_value.setdefault(self._string(pairs[i + 1]) or '', []).append(node)
+                        break
+            self._attribute_index[name] = by_value
+        return self._attribute_index[name]
+
+    def children(self, node: int) -> List[int]:
+        if self._children is None:
+            self._children = [[] for _ in range(len(self.parent))]
+            for child, parent in enumerate(self.parent):
+                if parent >= 0:
+                    self._children[parent].append(child)
+        return self._children[node]
+
+    def ancestors(self, node: int):
+        parent = self.parent[node]
+        while parent >= 0:
+            yield parent
+            parent = self.parent[parent]
+
+    def _inherited_flags(self):
+        """Flags that depend on ancestors, for all nodes in one top-down pass:
+        transparent (own or ancestor opacity 0) and in_shadow (below a shadow root)"""
+        count = len(self.parent)
+        self._transparent = array('b', bytes(count))
+        self._in_shadow = array('b', bytes(count))
+        stack = [node for node in range(count) if self.parent[node] < 0]
+        while stack:
+            node = stack.pop()
+            parent = self.parent[node]
+            if parent >= 0:
+                self._transparent[node] = self._transparent[parent]
+                self._in_shadow[node] = self._in_shadow[parent] or self.node_type[parent] == DOCUMENT_FRAGMENT_NODE
+            if self.style(node, 'opacity') == '0':
+                self._transparent[node] = 1
+            stack.extend(self.children(node))
+
+    def in_light_dom(self, node: int) -> bool:
+        """Not inside a shadow tree (querySelectorAll on the document reaches it)"""
+        if self._in_shadow is None:
+            self._inherited_flags()
+        return not self._in_shadow[node]
+
+    def contains(self, ancestor: int, node: int) -> bool:
+        return node == ancestor or any(parent == ancestor for parent in self.ancestors(node))
+
+    def text_content(self, node: int, limit: int = 2000) -> str:
+        """Concatenated descendant text (light DOM only, like textContent)"""
+        parts: List[str] = []
+        size = 0
+        stack = [node]
+        while stack and size < limit:
+            current = stack.pop()
+            if self.node_type[current] == TEXT_NODE:
+                text = self._string(self.node_value[current]) or ''
+                parts.append(text)
+                size += len(text)
+            elif current == node or self.node_type[current] != DOCUMENT_FRAGMENT_NODE:
+                stack.extend(reversed(self.children(current)))
+        return ''.join(parts)[:limit]
+
+    # Layout data
+
+    def style(self, node: int, name: str) -> Optional[str]:
+        row = self.layout_row[node]
+        if row < 0:
+            return None
+        return self._string(self.styles[name][row])
+
+    def z_index(self, node: int) -> int:
+        try:
+            return int(self.style(node, 'z-index') or 0)
+        except ValueError:
+            return 0  # 'auto'
+
+    def bounds(self, node: int, viewport: bool = True) -> Optional[Tuple[float, float, float, float]]:
+        """(x, y, width, height); viewport-relative unless viewport=False"""
+        row = self.layout_row[node]
+        if row < 0:
+            return None
+        x, y = self.x[row], self.y[row]
+        if viewport:
+            doc = self.documents[self.document[node]]
+            x -= doc['scroll_x']
+            y -= doc['scroll_y']
+        return x, y, self.width[row], self.height[row]
+
+    def has_box(self, node: int) -> bool:
+        """Rendered with a non-empty box (display:none subtrees have no layout node)"""
+        row = self.layout_row[node]
+        return row >= 0 and self.width[row] > 0 and self.height[row] > 0
+
+    def is_visible(self, node: int) -> bool:
+        """Box, not visibility:hidden, not transparent (own or ancestor opacity)"""
+        if not self.has_box(node):
+            return False
+        if self.style(node, 'display') == 'none' or self.style(node, 'visibility') in ('hidden', 'collapse'):
+            return False
+        if self._transparent is None:
+            self._inherited_flags()
+        return not self._transparent[node]
+
+    def in_viewport(self, node: int) -> bool:
+        box = self.bounds(node)
+        width, height = self.viewport.get('width'), self.viewport.get('height')
+        if not box or width is None or height is None:
+            return False
+        x, y, w, h = box
+        return x >= 0 and y >= 0 and x + w <= width and y + h <= height
+
+    def element_at(self, x: float, y: float, document: int = 0, exclude: Optional[int] = None) -> Optional[int]:
+        """Topmost element at a viewport point (elementFromPoint by paint order).
+
+        Boxes with pointer-events:none are skipped like in the browser; text boxes
+        resolve to their parent element. `exclude` skips one subtree (the probe).
+        """
+        doc = self.documents[document]
+        px, py = x + doc['scroll_x'], y + doc['scroll_y']
+        best, best_order = None, -1
+        for row, node in enumerate(self.layout_node):
+            if self.document[node] != document or self.paint_order[row] < best_order:
+                continue
+            if not (self.x[row] <= px < self.x[row] + self.width[row] and self.y[row] <= py < self.y[row] + self.height[row]):
+                continue
+            element = node if self.node_type[node] == ELEMENT_NODE else self.parent[node]
+            if element < 0 or (exclude is not None and self.contains(exclude, element)):
+                continue
+            if self.style(element, 'pointer-events') == 'none' or self.style(element, 'visibility') == 'hidden':
+                continue
+            best, best_order = element, self.paint_order[row]
+        return best
+
+    def summary(self) -> Dict[str, int]:
+        return {'documents': len(self.documents), 'nodes': len(self), 'layout_nodes': len(self.layout_node)}
+
+
+async def cdp_session(page):
+    """Cached CDP session for the page; None when the browser has no CDP (Firefox, WebKit)"""
+    try:
+        session = _sessions.get(page)
+    except TypeError:
+        session = None
+    if session is None:
+        try:
+            session = await page.context.new_cdp_session(page)
+        except Exception as e:
+            logger.debug(f"LAYOUT: No CDP session for page: {e}")
+            session = False
+        try:
+            _sessions[page] = session
+        except TypeError:
+            pass
+    return session or None
+
+
+def forget_session(page):
+    try:
+        _sessions.pop(page, None)
+    except TypeError:
+        pass
+
+
+async def capture_layout(page) -> Optional[LayoutSnapshot]:
+    """Capture the page's layout tree in one protocol round trip; None when unavailable"""
+    engine = layout_engine()
+    if engine == 'js':
+        return None
+
+    log_level = logging.WARNING if engine == 'cdp' else logging.DEBUG
+    for attempt in range(2):
+        session = await cdp_session(page)
+        if session is None:
+            logger.log(log_level, "LAYOUT: DOMSnapshot needs a Chromium CDP session, using in-page layout reads")
+            return None
+        try:
+            response, metrics = await asyncio.gather(
+                session.send('DOMSnapshot.captureSnapshot', {
+                    'computedStyles': SNAPSHOT_STYLES,
+                    'includePaintOrder': True,
+                    'includeDOMRects': True,
+                }),
+                session.send('Page.getLayoutMetrics'),
+            )
+        except Exception as e:
+            # Stale session after a navigation/target swap - reopen once
+            forget_session(page)
+            if attempt == 0 and not page.is_closed():
+                continue
+            logger.log(log_level, f"LAYOUT: DOMSnapshot failed, using in-page layout reads: {e}")
+            return None
+
+        viewport = (metrics or {}).get('cssLayoutViewport') or {}
+        snapshot = LayoutSnapshot(response, viewport={
+            'width': viewport.get('clientWidth'),
+            'height': viewport.get('clientHeight'),
+        })
+        logger.debug(f"LAYOUT: Captured snapshot {snapshot.summary()}")
+        return snapshot
+    return None
+
+
+# Export for use in other modules
+__all__ = ['LayoutSnapshot', 'capture_layout', 'layout_engine', 'cdp_session', 'forget_session', 'SNAPSHOT_STYLES']
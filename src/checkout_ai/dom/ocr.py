@@ -0,0 +1,234 @@
+"""
+OCR Verification
+Reads the text of the product area from a screenshot, for checking variant
+selections the DOM does not expose (canvas swatches, shadow widgets, text drawn
+from images).
+
+- Only the product container is captured (viewport when there is none), as
+  in-memory PNG bytes - nothing is written to disk unless a debug_dir is given
+- Preprocessing (grayscale, autocontrast, downscale, threshold) and tesseract run
+  in a process pool, so the event loop never waits on OCR
+- Results are cached per DOM version: an in-page MutationObserver counter says
+  whether anything changed since the last read; an unchanged page reuses the text
+  without a new screenshot, an identical screenshot reuses it without a new OCR run
+- pytesseract/PIL are optional and imported only inside the worker
+"""
+
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Optional OCR dependencies - only probed here, imported in the worker process
+OCR_AVAILABLE = all(importlib.util.find_spec(name) for name in ('pytesseract', 'PIL'))
+
+# Set to false to skip the OCR verification tier
+OCR_VERIFICATION_ENV = 'OCR_VERIFICATION'
+
+# Wider captures are downscaled before OCR (product text stays well above tesseract's minimum size)
+OCR_MAX_WIDTH = 1600
+OCR_THRESHOLD = 150
+OCR_TIMEOUT = 20
+CACHE_SIZE = 64
+
+# Words that introduce the current choice when the option type itself is not printed
+SELECTION_LABELS = ['selected', 'chosen', 'current']
+
+# In-page DOM version: token identifies the document, version counts mutation batches
+DOM_VERSION_JS = """
+() => {
+    if (!window.__checkoutDomVersion) {
+        const state = { token: Math.random().toString(36).slice(2), version: 0 };
+        new MutationObserver(() => { state.version++; }).observe(document.documentElement, {
+            subtree: true, childList: true, attributes: true, characterData: true
+        });
+        window.__checkoutDomVersion = state;
+    }
+    return [window.__checkoutDomVersion.token, window.__checkoutDomVersion.version];
+}
+"""
+
+# (url, selector, token, version) or ('png', digest) -> OCR text
+_cache: 'OrderedDict[Tuple, str]' = OrderedDict()
+
+
+def ocr_enabled() -> bool:
+    return OCR_AVAILABLE and os.getenv(OCR_VERIFICATION_ENV, 'true').strip().lower() not in ('0', 'false', 'no')
+
+
+def _ocr_worker(png: bytes, max_width: int = OCR_MAX_WIDTH, threshold: int = OCR_THRESHOLD) -> str:
+    """Preprocess and OCR one capture (runs in the pool process)"""
+    import io
+    import pytesseract
+    from PIL import Image, ImageOps
+
+    image = ImageOps.autocontrast(Image.open(io.BytesIO(png)).convert('L'))
+    if image.width > max_width:
+        image = image.resize((max_width, round(image.height * max_width / image.width)), Image.LANCZOS)
+    # Tesseract wants dark text on light background: mostly-dark captures are inverted
+    if sum(image.histogram()[:128]) > image.width * image.height / 2:
+        image = ImageOps.invert(image)
+    image = image.point(lambda p: 255 if p > threshold else 0)
+    # psm 11: sparse text - product panels are labels and buttons, not paragraphs
+    return pytesseract.image_to_string(image, config='--psm 11')
+
+
+# Global instance
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_ocr_pool() -> ProcessPoolExecutor:
+    """Process pool for OCR; spawn context so workers never fork the browser driver's threads"""
+    global _pool
+    if _pool is None:
+        workers = max(1, min(2, (os.cpu_count() or 2) - 1))
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+
+def shutdown_ocr_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def _run_ocr(png: bytes) -> str:
+    loop = asyncio.get_running_loop()
+    try:
+        return await asyncio.wait_for(loop.run_in_executor(get_ocr_pool(), _ocr_worker, png), OCR_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise
+    except Exception as e:
+        # Broken pool (worker killed, spawn unavailable): drop it and use a thread this time
+        logger.warning(f"OCR: Process pool failed ({type(e).__name__}: {e}), running in a thread")
+        shutdown_ocr_pool()
+        return await asyncio.wait_for(loop.run_in_executor(None, _ocr_worker, png), OCR_TIMEOUT)
+
+
+def _remember(key: Tuple, text: str):
+    _cache[key] = text
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+async def dom_version(page) -> Optional[Tuple[str, int]]:
+    try:
+        token, version = await page.evaluate(DOM_VERSION_JS)
+        return token, version
+    except Exception:
+        return None
+
+
+async def capture_region(page, selector: Optional[str] = None) -> Tuple[bytes, str]:
+    """PNG bytes of the container (first match of selector), else of the viewport"""
+    if selector:
+        try:
+            png = await page.locator(selector).first.screenshot(type='png', timeout=5000, animations='disabled')
+            return png, selector
+        except Exception as e:
+            logger.info(f"OCR: Container capture failed ({e}), using viewport")
+    return await page.screenshot(type='png', animations='disabled'), 'viewport'
+
+
+async def ocr_region(page, selector: Optional[str] = None, debug_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    OCR text of the product region.
+    Returns {'success', 'text', 'region', 'cached', 'ms'}.
+    """
+    if not OCR_AVAILABLE:
+        return {'success': False, 'text': '', 'error': 'pytesseract not installed'}
+
+    started = time.perf_counter()
+    version = await dom_version(page)
+    version_key = (page.url, selector, *version) if version else None
+    if version_key and version_key in _cache:
+        _cache.move_to_end(version_key)
+        return {'success': True, 'text': _cache[version_key], 'region': selector or 'viewport', 'cached': 'dom',
+                'ms': round((time.perf_counter() - started) * 1000)}
+
+    try:
+        png, region = await capture_region(page, selector)
+    except Exception as e:
+        return {'success': False, 'text': '', 'error': f'capture failed: {e}'}
+
+    digest_key = ('png', hashlib.sha1(png).hexdigest())
+    cached = 'image' if digest_key in _cache else None
+    if cached:
+        text = _cache[digest_key]
+    else:
+        try:
+            text = await _run_ocr(png)
+        except Exception as e:
+            return {'success': False, 'text': '', 'error': f'OCR failed: {type(e).__name__}: {e}'}
+        _remember(digest_key, text)
+    if version_key:
+        _remember(version_key, text)
+
+    if debug_dir:
+        stem = f"ocr_{int(time.time() * 1000)}"
+        (debug_dir / f'{stem}.png').write_bytes(png)
+        (debug_dir / f'{stem}.txt').write_text(text, encoding='utf-8')
+
+    ms = round((time.perf_counter() - started) * 1000)
+    logger.info(f"OCR: Read {region} in {ms} ms" + (" (same image, cached text)" if cached else ""))
+    return {'success': True, 'text': text, 'region': region, 'cached': cached, 'ms': ms}
+
+
+def _fuzzy(text: str) -> str:
+    return ' '.join(''.join(c.lower() if c.isalnum() else ' ' for c in text).split())
+
+
+def _strict(text: str) -> str:
+    return ''.join(c.lower() for c in text if c.isalnum())
+
+
+def match_selection(text: str, labels: List[str], variant_value: str) -> Dict[str, Any]:
+    """
+    A selection counts as verified when one OCR line shows an option label
+    followed directly by the value ("Color: Slate Grey", "Size - M", "Selected: Blue").
+    The value alone is not enough - every option of the group is printed too - and
+    so is a value further down the line, after the first option ("Size: S M L XL").
+
+        >>> match_selection("Color: Slate Grey", ['color'], 'Slate Grey')['verified']
+        True
+        >>> match_selection("Size: S M L XL", ['size'], 'M')['verified']
+        False
+        >>> match_selection("Color: Blue  Red  Green", ['color'], 'Red')['verified']
+        False
+    """
+    value_fuzzy = _fuzzy(variant_value)
+    value_strict = _strict(variant_value)
+    if not value_strict:
+        return {'verified': False, 'matched_text': None, 'method': 'OCR: empty value'}
+
+    label_words = [_fuzzy(label) for label in list(labels) + SELECTION_LABELS if _fuzzy(label)]
+    for line in text.splitlines():
+        line_fuzzy = f" {_fuzzy(line)} "
+        for label in label_words:
+            position = line_fuzzy.find(f" {label} ")
+            if position < 0:
+                continue
+            # _fuzzy already dropped the ':' / '-' separator, so the value must open the rest
+            rest = line_fuzzy[position + len(label) + 1:]
+            if rest.startswith(f" {value_fuzzy} ") or (len(value_strict) >= 3 and _strict(rest).startswith(value_strict)):
+                return {'verified': True, 'matched_text': line.strip(), 'method': 'OCR label match'}
+
+    return {'verified': False, 'matched_text': None, 'method': 'OCR: value not shown as selected'}
+
+
+# Export for use in other modules
+__all__ = [
+    'OCR_AVAILABLE', 'ocr_enabled', 'ocr_region', 'capture_region', 'dom_version', 'match_selection',
+    'get_ocr_pool', 'shutdown_ocr_pool'
+]
@@ -0,0 +1,430 @@
+"""
+Page Representation for LLM Context
+Builds a pruned accessibility-tree view of the page (role, accessible name, state,
+value and a stable element ref), ranks it by checkout relevance and serializes it
+to a compact, token-budgeted text block the agents can act on by ref:
+
+    Page: Checkout - Acme | https://acme.test/checkout
+    ## dialog "Get 10% off"
+    [e812] button "Close"
+    ## main
+    [e97] textbox "Email" required
+    [e103] combobox "Country" value="United States"
+    [e131] button "Continue to shipping"
+    (+41 lower-ranked elements omitted)
+
+- Source: CDP Accessibility.getFullAXTree joined with the layout snapshot
+  (visibility, tag and form attributes by backend node id); a DOM walk
+  (js_assets/page_representation.js) when CDP is unavailable
+- Refs: e<backendNodeId> for CDP nodes (stable for the node's lifetime),
+  d<n> for the DOM fallback (the element is tagged with the ref)
+- resolve_ref() turns a ref into a Playwright locator for click/fill tools
+"""
+
+import asyncio
+import logging
+import re
+import weakref
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.checkout_ai.dom.layout_snapshot import capture_layout, cdp_session, forget_session
+from src.checkout_ai.dom.service import JS_ASSETS_DIR
+from src.checkout_ai.utils.checkout_keywords import (
+    CHECKOUT_BUTTONS, GUEST_CHECKOUT_BUTTONS, CONTINUE_BUTTONS, PAYMENT_BUTTONS, AVOID_BUTTONS,
+    EMAIL_LABELS, FIRST_NAME_LABELS, LAST_NAME_LABELS, PHONE_LABELS, CITY_LABELS, STATE_LABELS,
+    POSTAL_CODE_LABELS, COUNTRY_LABELS,
+)
+from src.checkout_ai.utils.keyword_matcher import KeywordMatcher, PRIMARY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = 1200
+
+# Attribute resolved refs are tagged with so locators can find them
+REF_ATTRIBUTE = 'data-ck-ref'
+
+# Base relevance per role; roles not listed are dropped (dialogs render as group headers)
+ROLE_WEIGHTS = {
+    'alert': 8,
+    'textbox': 6, 'combobox': 6, 'searchbox': 2, 'spinbutton': 5, 'listbox': 5,
+    'checkbox': 4, 'radio': 4, 'switch': 4, 'button': 4,
+    'status': 3, 'heading': 3, 'text': 2,
+    'option': 2, 'menuitem': 2, 'menuitemradio': 2, 'menuitemcheckbox': 2, 'tab': 2,
+    'link': 1,
+}
+
+FIELD_ROLES = {'textbox', 'searchbox', 'combobox', 'listbox', 'spinbutton'}
+BUTTON_ROLES = {'button', 'link', 'menuitem', 'tab'}
+
+# Ancestors rendered as "## role name" group headers
+CONTEXT_ROLES = {'dialog', 'alertdialog', 'main', 'form', 'navigation', 'banner', 'contentinfo',
+                 'complementary', 'search', 'region'}
+
+# Boolean/tristate AX properties worth showing; value 'false' is never shown
+STATE_PROPERTIES = ('focused', 'disabled', 'required', 'invalid', 'checked', 'pressed',
+                    'expanded', 'selected', 'readonly')
+
+CHECKOUT_TERMS = tuple(dict.fromkeys(
+    CHECKOUT_BUTTONS + GUEST_CHECKOUT_BUTTONS + CONTINUE_BUTTONS + PAYMENT_BUTTONS +
+    ['add to cart', 'add to bag', 'buy now', 'size', 'color', 'colour', 'quantity', 'qty',
+     'shipping', 'delivery', 'billing', 'card', 'sign in', 'log in', 'guest', 'promo', 'coupon']
+))
+FIELD_TERMS = tuple(dict.fromkeys(
+    EMAIL_LABELS + FIRST_NAME_LABELS + LAST_NAME_LABELS + PHONE_LABELS + CITY_LABELS + STATE_LABELS +
+    POSTAL_CODE_LABELS + COUNTRY_LABELS + ['address', 'apartment', 'suite']
+))
+NOISE_TERMS = ('newsletter', 'subscribe', 'privacy', 'terms', 'cookie', 'facebook', 'instagram',
+               'twitter', 'youtube', 'pinterest', 'tiktok', 'careers', 'blog', 'gift card')
+
+# Static text is kept only when it carries prices, totals or stock/error messages
+TEXT_SIGNAL = re.compile(r'[$€£₹¥]\s?\d|\d\s?(usd|eur|gbp|inr)\b|subtotal|total|in (your )?(cart|bag)|'
+                         r'out of stock|sold out|unavailable|required|invalid|error|please (enter|select)', re.I)
+
+# One automaton over all three term lists, tagged by list
+_RELEVANCE_MATCHER = KeywordMatcher(
+    [(term, 'checkout', PRIMARY) for term in CHECKOUT_TERMS] +
+    [(term, 'field', PRIMARY) for term in FIELD_TERMS] +
+    [(term, 'noise', PRIMARY) for term in NOISE_TERMS]
+)
+
+NAME_LIMIT = 80
+VALUE_LIMIT = 40
+
+# ref -> how to find the element again, per page
+_refs: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+
+
+def _clean(text: Any, limit: int) -> str:
+    text = re.sub(r'\s+', ' ', str(text or '')).strip()
+    return text if len(text) <= limit else text[:limit - 1] + '…'
+
+
+def _ax_value(field: Optional[Dict[str, Any]]) -> Any:
+    return (field or {}).get('value')
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _score(node: Dict[str, Any]) -> float:
+    """Checkout relevance: role weight, keyword hits, actionable state, position"""
+    score = ROLE_WEIGHTS.get(node['role'], 0)
+    text = f"{node['name']} {node['attrs'].get('name', '')} {node['attrs'].get('autocomplete', '')}"
+    categories = {hit['category'] for hit in _RELEVANCE_MATCHER.scan(text)}
+
+    if 'checkout' in categories:
+        score += 4
+    if node['role'] in FIELD_ROLES and 'field' in categories:
+        score += 3
+    if 'noise' in categories:
+        score -= 3
+    if node['role'] in BUTTON_ROLES and node['name'].strip().lower() in AVOID_BUTTONS:
+        score -= 2
+
+    states = node['states']
+    if 'invalid' in states:
+        score += 3
+    if 'required' in states and not node['value']:
+        score += 2
+    if 'focused' in states or 'expanded' in states:
+        score += 1
+    if 'disabled' in states:
+        score -= 2
+
+    context = node['context'][0] if node['context'] else None
+    if context in ('dialog', 'alertdialog'):
+        score += 3
+    elif context in ('contentinfo', 'navigation', 'banner') and node['role'] in ('link', 'menuitem'):
+        score -= 2
+    if node.get('in_viewport'):
+        score += 1
+    return score
+
+
+def _make_node(role: str, name: str, value: Any, states: List[str], level: Any, context) -> Dict[str, Any]:
+    return {
+        'ref': None,
+        'role': role,
+        'name': _clean(name, NAME_LIMIT),
+        'value': _clean(value, VALUE_LIMIT) if value not in (None, '') else '',
+        'states': states,
+        'level': level,
+        'context': context,
+        'attrs': {},
+        'in_viewport': False,
+        'order': 0,
+        'score': 0,
+    }
+
+
+def _keep(node: Dict[str, Any]) -> bool:
+    role = node['role']
+    if role not in ROLE_WEIGHTS:
+        return False
+    if role == 'text':
+        return bool(TEXT_SIGNAL.search(node['name']))
+    if role in FIELD_ROLES or role in ('checkbox', 'radio', 'switch', 'alert', 'status'):
+        return True
+    return bool(node['name'])
+
+
+# ============= CDP SOURCE =============
+
+def _ax_states(ax_node: Dict[str, Any]) -> Tuple[List[str], Any]:
+    states, level = [], None
+    for prop in ax_node.get('properties', []):
+        name, value = prop.get('name'), _ax_value(prop.get('value'))
+        if name == 'level':
+            level = value
+        elif name in STATE_PROPERTIES and value not in (None, False, 'false', ''):
+            states.append(name if value in (True, 'true') else f"{name}={value}")
+    return states, level
+
+
+def _nodes_from_ax_tree(ax_nodes: List[Dict[str, Any]], snapshot) -> List[Dict[str, Any]]:
+    """Walk the AX tree in document order, keep relevant nodes, join layout data"""
+    by_id = {n['nodeId']: n for n in ax_nodes}
+    backend_index = {}
+    if snapshot:
+        backend_index = {backend: node for node, backend in enumerate(snapshot.backend_node_id) if backend}
+
+    roots = [n['nodeId'] for n in ax_nodes if not n.get('parentId') or n['parentId'] not in by_id]
+    # covered: inside a kept control whose name already carries its text
+    stack = [(node_id, None, False) for node_id in reversed(roots)]
+    kept = []
+    while stack:
+        node_id, context, covered = stack.pop()
+        ax_node = by_id.get(node_id)
+        if ax_node is None:
+            continue
+        role = _ax_value(ax_node.get('role')) or ''
+        role = 'text' if role == 'StaticText' else role
+        name = _ax_value(ax_node.get('name')) or ''
+
+        if not ax_node.get('ignored'):
+            states, level = _ax_states(ax_node)
+            node = _make_node(role, name, _ax_value(ax_node.get('value')), states, level, context)
+            backend_id = ax_node.get('backendDOMNodeId')
+            layout_node = backend_index.get(backend_id)
+            visible = True
+            if layout_node is not None:
+                visible = snapshot.is_visible(layout_node)
+                node['in_viewport'] = snapshot.in_viewport(layout_node)
+                node['attrs'] = {'tag': snapshot.tag(layout_node)}
+                for attribute in ('id', 'name', 'type', 'autocomplete', 'placeholder', 'href'):
+                    attribute_value = snapshot.attribute(layout_node, attribute)
+                    if attribute_value:
+                        node['attrs'][attribute] = attribute_value
+            if visible and backend_id and _keep(node) and not (covered and role == 'text'):
+                node['ref'] = f"e{backend_id}"
+                node['locate'] = {'backend_id': backend_id, 'role': role, 'name': name}
+                kept.append(node)
+                covered = covered or role != 'text'
+            if role in CONTEXT_ROLES and (role != 'region' or name):
+                context = (role, _clean(name, 40), node_id)
+
+        stack.extend((child, context, covered) for child in reversed(ax_node.get('childIds', [])))
+    return kept
+
+
+async def _capture_cdp(page) -> Optional[List[Dict[str, Any]]]:
+    session = await cdp_session(page)
+    if session is None:
+        return None
+    try:
+        tree, snapshot = await asyncio.gather(session.send('Accessibility.getFullAXTree'), capture_layout(page))
+    except Exception as e:
+        forget_session(page)
+        logger.debug(f"PAGE REPR: getFullAXTree failed: {e}")
+        return None
+    return _nodes_from_ax_tree(tree.get('nodes', []), snapshot)
+
+
+# ============= DOM FALLBACK =============
+
+@lru_cache(maxsize=1)
+def page_representation_js() -> str:
+    return (JS_ASSETS_DIR / 'page_representation.js').read_text(encoding='utf-8')
+
+
+def _nodes_from_dom(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    kept = []
+    for item in items:
+        context = tuple(item['context']) if item.get('context') else None
+        node = _make_node(item['role'], item['name'], item.get('value'), item.get('states', []),
+                          item.get('level'), context)
+        if not _keep(node):
+            continue
+        node['ref'] = item['ref']
+        node['attrs'] = item.get('attrs', {})
+        node['in_viewport'] = item.get('inViewport', False)
+        node['locate'] = {'dom_ref': True, 'role': item['role'], 'name': item['name']}
+        kept.append(node)
+    return kept
+
+
+async def _capture_dom(page) -> List[Dict[str, Any]]:
+    try:
+        items = await page.evaluate(page_representation_js(), REF_ATTRIBUTE)
+    except Exception as e:
+        logger.warning(f"PAGE REPR: DOM representation failed: {e}")
+        return []
+    return _nodes_from_dom(items or [])
+
+
+# ============= SERIALIZATION =============
+
+def _line(node: Dict[str, Any]) -> str:
+    parts = [f"[{node['ref']}] {node['role']}"]
+    name = node['name'] or node['attrs'].get('placeholder', '')
+    if name:
+        parts.append(f'"{name}"')
+    if node['level']:
+        parts.append(f"level={node['level']}")
+    if node['value'] and node['value'] != node['name']:
+        parts.append(f'value="{node["value"]}"')
+    parts.extend(node['states'])
+    return ' '.join(parts)
+
+
+def _context_header(context) -> str:
+    role, name, _ = context
+    return f'## {role} "{name}"' if name else f"## {role}"
+
+
+def _serialize(url: str, title: str, nodes: List[Dict[str, Any]], budget: int):
+    """Pick the highest-scoring nodes that fit the budget, render them in document order"""
+    header = f"Page: {_clean(title, 80)} | {_clean(url, 120)}"
+    used = _estimate_tokens(header)
+    ranked = sorted(nodes, key=lambda n: (-n['score'], n['order']))
+
+    selected, contexts = [], set()
+    for node in ranked:
+        cost = _estimate_tokens(_line(node))
+        if node['context'] and node['context'][2] not in contexts:
+            cost += _estimate_tokens(_context_header(node['context']))
+        if used + cost > budget:
+            continue
+        used += cost
+        selected.append(node)
+        if node['context']:
+            contexts.add(node['context'][2])
+
+    selected.sort(key=lambda n: n['order'])
+    lines, current = [header], None
+    for node in selected:
+        context_id = node['context'][2] if node['context'] else None
+        if context_id != current and node['context']:
+            lines.append(_context_header(node['context']))
+        current = context_id
+        lines.append(_line(node))
+    omitted = len(nodes) - len(selected)
+    if omitted:
+        lines.append(f"(+{omitted} lower-ranked elements omitted)")
+    return '\n'.join(lines), selected, omitted
+
+
+async def build_page_representation(page, token_budget: int = DEFAULT_TOKEN_BUDGET) -> Dict[str, Any]:
+    """
+    Pruned, ranked accessibility view of the page for LLM prompts
+    Returns: {success, url, title, source, text, tokens, nodes (selected, document order),
+              elements (all kept, by relevance), omitted}
+    """
+    try:
+        url, title = page.url, await page.title()
+        source = 'cdp'
+        nodes = await _capture_cdp(page)
+        if nodes is None:
+            source = 'dom'
+            nodes = await _capture_dom(page)
+
+        for order, node in enumerate(nodes):
+            node['order'] = order
+            node['score'] = _score(node)
+
+        registry = _refs.setdefault(page, {})
+        if len(registry) > 5000:
+            registry.clear()
+        registry.update({node['ref']: node.pop('locate') for node in nodes})
+
+        text, selected, omitted = _serialize(url, title, nodes, token_budget)
+        logger.info(f"PAGE REPR: {len(selected)}/{len(nodes)} elements via {source}, ~{_estimate_tokens(text)} tokens")
+        return {
+            'success': True,
+            'url': url,
+            'title': title,
+            'source': source,
+            'text': text,
+            'tokens': _estimate_tokens(text),
+            'nodes': selected,
+            'elements': sorted(nodes, key=lambda n: (-n['score'], n['order'])),
+            'omitted': omitted,
+        }
+    except Exception as e:
+        logger.error(f"PAGE REPR: Failed to build page representation: {e}")
+        return {'success': False, 'error': str(e), 'url': page.url, 'title': '', 'text': '',
+                'nodes': [], 'elements': [], 'omitted': 0}
+
+
+def page_state_lists(representation: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Legacy buttons/fields lists (most relevant first) for callers of get_page_state"""
+    buttons, fields = [], []
+    for node in representation.get('elements', []):
+        attrs = node['attrs']
+        if node['role'] in FIELD_ROLES:
+            fields.append({
+                'ref': node['ref'],
+                'type': attrs.get('type') or attrs.get('tag') or node['role'],
+                'name': attrs.get('name', ''),
+                'id': attrs.get('id', ''),
+                'placeholder': attrs.get('placeholder', ''),
+                'label': node['name'],
+                'autocomplete': attrs.get('autocomplete', ''),
+                'value': node['value'],
+                'required': 'required' in node['states'],
+            })
+        elif node['role'] in BUTTON_ROLES:
+            buttons.append({
+                'ref': node['ref'],
+                'tag': attrs.get('tag') or ('a' if node['role'] == 'link' else 'button'),
+                'text': node['name'],
+                'ariaLabel': '',
+                'id': attrs.get('id', ''),
+                'href': attrs.get('href', ''),
+            })
+    return {'buttons': buttons, 'fields': fields}
+
+
+async def resolve_ref(page, ref: str):
+    """Locator for a ref from build_page_representation(); None when unknown"""
+    locate = _refs.get(page, {}).get(ref)
+    if not locate:
+        return None
+
+    if locate.get('dom_ref'):
+        return page.locator(f'[{REF_ATTRIBUTE}="{ref}"]').first
+
+    backend_id = locate.get('backend_id')
+    if backend_id:
+        session = await cdp_session(page)
+        if session is not None:
+            try:
+                resolved = await session.send('DOM.resolveNode', {'backendNodeId': backend_id})
+                await session.send('Runtime.callFunctionOn', {
+                    'objectId': resolved['object']['objectId'],
+                    'functionDeclaration': 'function(attr, ref) { this.setAttribute(attr, ref); }',
+                    'arguments': [{'value': REF_ATTRIBUTE}, {'value': ref}],
+                })
+                return page.locator(f'[{REF_ATTRIBUTE}="{ref}"]').first
+            except Exception as e:
+                logger.debug(f"PAGE REPR: Could not resolve {ref} by node id, using role lookup: {e}")
+
+    if not locate.get('name') or locate['role'] == 'text':
+        return None
+    return page.get_by_role(locate['role'], name=locate['name'], exact=True).nth(locate.get('nth', 0))
+
+
+# Export for use in other modules
+__all__ = ['build_page_representation', 'page_state_lists', 'resolve_ref', 'DEFAULT_TOKEN_BUDGET']
@@ -6,26 +6,88 @@ import sys
 from pathlib import Path
 import asyncio
 import logging
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 from playwright.async_api import Page
+from src.checkout_ai.dom.ocr import OCR_AVAILABLE, ocr_enabled, ocr_region, match_selection
 
-# Optional OCR imports
-try:
-    import pytesseract
-    from PIL import Image
-    OCR_AVAILABLE = True
-except ImportError:
-    OCR_AVAILABLE = False
+if not OCR_AVAILABLE:
     logging.getLogger(__name__).warning("pytesseract not installed. OCR verification disabled. Install with: pip install pytesseract")
 
 logger = logging.getLogger(__name__)
 
+JS_ASSETS_DIR = Path(__file__).parent / 'js_assets'
+
+# Post-click waits: quiet window with no DOM mutation, cap on waiting for effects
+CLICK_QUIET_MS = 150
+CLICK_EFFECT_TIMEOUT_MS = 3000
+
+# Selection order for batch variant selection: options that re-render the others
+# (color/style swap the size list on most stores) go first, quantity always last.
+# Types not listed rank between length and size.
+VARIANT_DEPENDENCY_RANK = {
+    'color': 0, 'colour': 0, 'style': 0, 'pattern': 0, 'finish': 0, 'flavor': 0, 'model': 0,
+    'material': 1, 'edition': 1, 'storage': 1, 'capacity': 1,
+    'fit': 2, 'length': 3, 'inseam': 3, 'width': 3, 'cup': 3,
+    'size': 5,
+    'quantity': 9, 'qty': 9
+}
+DEFAULT_DEPENDENCY_RANK = 4
+
+# Words that name the same option group on the page
+VARIANT_TYPE_ALIASES = {
+    'color': ['color', 'colour', 'shade', 'swatch'],
+    'colour': ['colour', 'color', 'shade', 'swatch'],
+    'size': ['size', 'sizing'],
+    'quantity': ['quantity', 'qty'],
+    'storage': ['storage', 'capacity', 'memory'],
+    'flavor': ['flavor', 'flavour']
+}
+
+
+def variant_dependency_rank(variant_type: str) -> int:
+    """Rank of a variant type in the selection order ('Shoe Size' ranks as 'size')"""
+    words = variant_type.lower().replace('_', ' ').replace('-', ' ').split()
+    ranks = [VARIANT_DEPENDENCY_RANK[word] for word in words if word in VARIANT_DEPENDENCY_RANK]
+    return min(ranks) if ranks else DEFAULT_DEPENDENCY_RANK
+
+
+def _variant_aliases(variant_type: str) -> List[str]:
+    """Words the option group of this type may be labelled with"""
+    words = variant_type.lower().replace('_', ' ').replace('-', ' ').split()
+    aliases = [alias for word in words for alias in VARIANT_TYPE_ALIASES.get(word, [])]
+    return aliases or [' '.join(words)]
+
+
+@lru_cache(maxsize=1)
+def text_index_js() -> str:
+    """Installer for the in-page text index (window.__checkoutTextIndex) the matchers query."""
+    return (JS_ASSETS_DIR / 'text_index.js').read_text(encoding='utf-8')
+
+
+def with_text_index(js_code: str) -> str:
+    """Wrap an `(args) => {...}` script so the text index is installed before it runs.
+
+    The installer is a no-op when the page already has the index; the index itself
+    only rebuilds after the DOM changed.
+    """
+    return f"""
+        (args) => {{
+            {text_index_js()}
+            return ({js_code})(args);
+        }}
+        """
+
 class UniversalDOMFinder:
-    def __init__(self, page: Page, debug_dir: str = '/Users/abcom/Documents/Checkout_ai/variant_debug'):
+    def __init__(self, page: Page, debug_dir: Optional[str] = None):
         self.page = page
-        self.debug_dir = Path(debug_dir)
-        self.js_assets_dir = Path(__file__).parent / 'js_assets'
-        self.debug_dir.mkdir(parents=True, exist_ok=True)
+        # OCR captures are only written to disk when a debug dir is configured
+        debug_dir = debug_dir or os.getenv('VARIANT_DEBUG_DIR')
+        self.debug_dir = Path(debug_dir) if debug_dir else None
+        self.js_assets_dir = JS_ASSETS_DIR
+        if self.debug_dir:
+            self.debug_dir.mkdir(parents=True, exist_ok=True)
+        self._container_selector: Optional[str] = None
 
     def _load_js(self, filename: str) -> str:
         """Load JavaScript content from assets directory."""
@@ -37,81 +99,38 @@ class UniversalDOMFinder:
             raise
 
     async def verify_selection_with_ocr(self, variant_type: str, variant_value: str) -> Dict[str, Any]:
-        """Verify variant selection using OCR."""
-        if not OCR_AVAILABLE:
+        """Verify variant selection using OCR of the product container."""
+        if not ocr_enabled():
             return {
                 'verified': False,
+                'read': False,
                 'matched_text': None,
-                'method': 'OCR unavailable - pytesseract not installed'
+                'method': 'OCR unavailable - pytesseract not installed' if not OCR_AVAILABLE else 'OCR disabled'
             }
-        
-        try:
-            logger.info(f"VARIANT SELECTION: Trying OCR verification as fallback...")
-            screenshot_path = self.debug_dir / f'screenshot_{variant_type}_{variant_value}.png'
-            await self.page.screenshot(path=str(screenshot_path), full_page=True)
-            
-            image = Image.open(screenshot_path)
-            extracted_text = pytesseract.image_to_string(image)
-            
-            ocr_text_path = self.debug_dir / f'ocr_{variant_type}_{variant_value}.txt'
-            ocr_text_path.write_text(extracted_text, encoding='utf-8')
-            
-            # Normalization helpers
-            def normalize_strict(text):
-                return ''.join(c.lower() for c in text if c.isalnum())
-            
-            def normalize_fuzzy(text):
-                return ''.join(c.lower() if c.isalnum() or c.isspace() else ' ' for c in text).strip()
-            
-            normalized_value_strict = normalize_strict(variant_value)
-            normalized_value_fuzzy = normalize_fuzzy(variant_value)
-            normalized_extracted_strict = normalize_strict(extracted_text)
-            normalized_extracted_fuzzy = normalize_fuzzy(extracted_text)
-            
-            verified = False
-            matched_text = None
-            method = None
-            
-            if normalized_value_strict in normalized_extracted_strict:
-                verified = True
-                method = "OCR strict match"
-                for line in extracted_text.split('\n'):
-                    if normalize_strict(line) and normalized_value_strict in normalize_strict(line):
-                        matched_text = line.strip()
-                        break
-            elif normalized_value_fuzzy in normalized_extracted_fuzzy:
-                verified = True
-                method = "OCR fuzzy match"
-                for line in extracted_text.split('\n'):
-                    if normalize_fuzzy(line) and normalized_value_fuzzy in normalize_fuzzy(line):
-                        matched_text = line.strip()
-                        break
-            else:
-                words = normalized_value_fuzzy.split()
-                all_words_found = all(word in normalized_extracted_fuzzy for word in words if len(word) > 2)
-                if all_words_found and len(words) > 0:
-                    verified = True
-                    method = "OCR word match"
-                    matched_text = variant_value
-            
-            if verified:
-                logger.info(f"VARIANT SELECTION: VERIFICATION PASSED via OCR ({method})")
-                return {'verified': True, 'matched_text': matched_text or variant_value, 'method': method}
-            else:
-                return {'verified': False, 'matched_text': None, 'method': 'OCR failed'}
-                
-        except Exception as e:
-            logger.error(f"VARIANT SELECTION: OCR verification error: {e}")
-            return {'verified': False, 'matched_text': None, 'method': f'OCR error: {str(e)}'}
+
+        logger.info(f"VARIANT SELECTION: Trying OCR verification as fallback...")
+        if self._container_selector is None:
+            self._container_selector = await self._detect_product_container() or ''
+        read = await ocr_region(self.page, self._container_selector or None, debug_dir=self.debug_dir)
+        if not read['success']:
+            logger.error(f"VARIANT SELECTION: OCR verification error: {read.get('error')}")
+            return {'verified': False, 'read': False, 'matched_text': None, 'method': f"OCR error: {read.get('error')}"}
+
+        # read: the product area was OCR'd, so verified=False means the value is not shown as selected
+        result = dict(match_selection(read['text'], _variant_aliases(variant_type), variant_value), read=True)
+        if result['verified']:
+            logger.info(f"VARIANT SELECTION: VERIFICATION PASSED via OCR ({result['method']}: '{result['matched_text']}')")
+        return result
 
     def _wrap_js_with_sanitization(self, js_code: str) -> str:
-        """Wraps JS code to sanitize return values and inject exclusion helper."""
+        """Wraps JS code to sanitize return values and inject exclusion helper and text index."""
         # Use hardcoded helper to prevent syntax errors from file injection
         exclusion_helper = "function isInExcludedSection() { return false; }"
         
         return f"""
         (args) => {{
             {exclusion_helper}
+            {text_index_js()}
             
             const originalFunc = {js_code};
             const result = originalFunc(args);
@@ -202,8 +221,13 @@ class UniversalDOMFinder:
             logger.warning(f"Container detection failed: {e}")
             return None
 
-    async def find_variant(self, variant_type: str, variant_value: str, frame: Optional[Any] = None) -> Dict[str, Any]:
-        """Main entry point for finding and selecting a variant. Supports iFrames."""
+    async def find_variant(self, variant_type: str, variant_value: str, frame: Optional[Any] = None,
+                           verify: bool = True) -> Dict[str, Any]:
+        """Main entry point for finding and selecting a variant. Supports iFrames.
+
+        verify=False skips the per-variant verification read (select_variants
+        verifies all selections together at the end).
+        """
         target_frame = frame or self.page.main_frame
         logger.info(f"VARIANT SELECTION: SELECTING: {variant_type} = {variant_value} (Frame: {target_frame.name or 'main'})")
         
@@ -247,6 +271,7 @@ class UniversalDOMFinder:
         container_selector = None
         if not frame:
              container_selector = await self._detect_product_container()
+             self._container_selector = container_selector or ''
              if container_selector:
                  logger.info(f"Search restricted to container: {container_selector}")
 
@@ -362,30 +387,48 @@ class UniversalDOMFinder:
         if result['found']:
             # Execute action in the correct frame
             action_success = await self._execute_action(result, variant_type, variant_value, frame=target_frame)
+            if action_success and not verify:
+                return {
+                    'success': True,
+                    'content': f"Selected {variant_type}={variant_value}",
+                    'action': result['action']
+                }
             if action_success:
                 # Verification
                 verified = await self._verify_selection(variant_type, variant_value, frame=target_frame)
                 if verified['success']:
                     return verified
                 
+                # If DOM verification failed, read the product container with OCR
+                # ("Color: Blue" next to the options - the value alone does not count)
+                ocr_result = await self.verify_selection_with_ocr(variant_type, variant_value)
+                if ocr_result['verified']:
+                    return {
+                        'success': True,
+                        'verified': True,
+                        'content': f"VERIFIED via OCR: {variant_type}={variant_value}",
+                        'action': result['action']
+                    }
+                if ocr_result.get('read'):
+                    # The product area does not show the value as selected - report it, do not assume
+                    logger.warning(f"VARIANT SELECTION: OCR does not show {variant_type}={variant_value} as selected")
+                    return {
+                        'success': True,
+                        'verified': False,
+                        'content': f"Clicked {variant_type}={variant_value} but the page does not show it as selected - check the selection",
+                        'action': result['action'],
+                        'warning': 'Selection not confirmed by DOM or OCR'
+                    }
+
                 # FALLBACK: If verification failed but click succeeded, return success with warning
                 logger.warning(f"VARIANT SELECTION: Action succeeded but verification failed. Assuming success for {variant_type}={variant_value}")
                 return {
                     'success': True,
+                    'verified': False,
                     'content': f"Selected {variant_type}={variant_value} (Verification skipped)",
                     'action': result['action'],
                     'warning': 'Verification failed'
                 }
-
-                # If verification failed, try OCR (only works on main page screenshot usually)
-                # DISABLED: OCR causes false positives for selection verification.
-                # ocr_result = await self.verify_selection_with_ocr(variant_type, variant_value)
-                # if ocr_result['verified']:
-                #     return {
-                #         'success': True,
-                #         'content': f"VERIFIED via OCR: {variant_type}={variant_value}",
-                #         'action': result['action']
-                #     }
         
         # Discovery Phase (only on main frame for now)
         if not frame:
@@ -460,87 +503,141 @@ class UniversalDOMFinder:
         
         return False
 
+    async def _click_and_wait(self, frame: Any, click) -> Dict[str, Any]:
+        """
+        Run a click and wait for what it causes instead of a fixed delay:
+        a main-frame navigation waits for the new document, fetch/XHR requests it
+        started wait until they finish, DOM updates wait until mutations go quiet.
+        Returns the click's own result plus what was observed.
+        """
+        page = frame.page if hasattr(frame, 'page') else frame
+        loop = asyncio.get_running_loop()
+        settle_js = self._load_js('dom_settle.js')
+        pending = set()
+        observed = {'requests': 0, 'navigated': False, 'mutations': 0}
+
+        def on_request(request):
+            if request.resource_type in ('document', 'xhr', 'fetch'):
+                pending.add(request)
+                observed['requests'] += 1
+                if request.is_navigation_request() and request.frame in (page.main_frame, frame):
+                    observed['navigated'] = True
+
+        def on_done(request):
+            pending.discard(request)
+
+        async def arm():
+            try:
+                return (await frame.evaluate(settle_js, {'mode': 'arm'})).get('token')
+            except Exception:
+                return None
+
+        async def settle(token, timeout_ms):
+            try:
+                result = await frame.evaluate(settle_js, {'mode': 'wait', 'token': token,
+                                                          'quietMs': CLICK_QUIET_MS, 'timeoutMs': timeout_ms})
+                observed['mutations'] += result.get('mutations', 0)
+            except Exception:
+                # Context destroyed: the click navigated
+                observed['navigated'] = True
+
+        async def disarm(token):
+            # The click raised: detach the observer armed for it
+            if token is not None:
+                try:
+                    await frame.evaluate(settle_js, {'mode': 'disarm', 'token': token})
+                except Exception:
+                    pass
+
+        page.on('request', on_request)
+        page.on('requestfinished', on_done)
+        page.on('requestfailed', on_done)
+        started = loop.time()
+        deadline = started + CLICK_EFFECT_TIMEOUT_MS / 1000
+        try:
+            token = await arm()
+            try:
+                observed['result'] = await click()
+            except Exception:
+                await disarm(token)
+                raise
+            await settle(token, CLICK_EFFECT_TIMEOUT_MS)
+
+            if observed['navigated']:
+                try:
+                    await page.wait_for_load_state('domcontentloaded', timeout=max(1, deadline - loop.time()) * 1000)
+                except Exception:
+                    pass
+            elif pending:
+                # Requests started by the click: wait for them, then for the re-render of their results
+                token = await arm()
+                while pending and loop.time() < deadline:
+                    await asyncio.sleep(0.05)
+                await settle(token, max(CLICK_QUIET_MS, int((deadline - loop.time()) * 1000)))
+        finally:
+            page.remove_listener('request', on_request)
+            page.remove_listener('requestfinished', on_done)
+            page.remove_listener('requestfailed', on_done)
+
+        observed['waitedMs'] = round((loop.time() - started) * 1000)
+        return observed
+
     async def _safe_scroll_and_click(self, frame: Any, element_index: int) -> bool:
         """
         Implements the 'Scan, Plan, Act' logic:
-        1. Inspect element state (Scan)
-        2. Calculate safe scroll if needed (Plan)
-        3. Click using coordinates (Act)
+        1. Scan + Plan in one evaluate (click_prepare.js): instant scroll into view,
+           box stable across two animation frames, elementFromPoint hit-test for a
+           point that is not covered (other scroll positions if it is)
+        2. Act: coordinate click, then wait for its observed effects
         """
         try:
-            js_inspect = self._load_js('inspect_element.js')
-            
-            # 1. Scan & Plan Loop (max 3 attempts to stabilize)
-            for attempt in range(3):
-                info = await frame.evaluate(js_inspect, {'targetIndex': element_index})
-                
-                if not info.get('found'):
-                    logger.warning("Safe Click: Element not found during inspection")
+            info = await frame.evaluate(self._load_js('click_prepare.js'), {'targetIndex': element_index})
+
+            if not info.get('found'):
+                logger.warning("Safe Click: Element not found during inspection")
+                return False
+
+            if not info['isVisible']:
+                logger.warning(f"Safe Click: Element has no visible box (y={info['rect']['y']})")
+                return False
+
+            # Check enabled state
+            if not info['isEnabled']:
+                logger.warning("Safe Click: Element is disabled or not interactive")
+                # We might want to wait here or just try anyway if it's a false negative
+                # For now, let's log and proceed with caution
+
+            if not info['stable']:
+                logger.info("Safe Click: Element box still moving after scroll, clicking latest position")
+
+            js_click = self._load_js('action_click.js')
+            page = frame.page if hasattr(frame, 'page') else frame
+
+            if info['isObscured']:
+                occluder = info.get('occluder') or {}
+                logger.warning(f"Safe Click: Element covered by {occluder.get('tagName')}#{occluder.get('id')}.{occluder.get('className')} at every point")
+                if occluder.get('modal'):
+                    # A dialog is in front - let the popup handling deal with it rather than clicking through
                     return False
-                
-                # Check visibility
-                if not info['isVisible']:
-                    logger.info(f"Safe Click: Element off-screen (y={info['rect']['y']}), calculating safe scroll...")
-                    
-                    # Calculate delta to bring to center
-                    viewport_height = info['window']['innerHeight']
-                    element_y = info['rect']['y']
-                    element_height = info['rect']['height']
-                    
-                    # Target y is center of viewport
-                    target_y_in_viewport = viewport_height / 2
-                    current_y_center = element_y + (element_height / 2)
-                    
-                    delta_y = current_y_center - target_y_in_viewport
-                    
-                    # Execute scroll
-                    await frame.evaluate(f"window.scrollBy({{top: {delta_y}, behavior: 'smooth'}})")
-                    
-                    # Wait for scroll to settle
-                    await asyncio.sleep(1.2)
-                    
-                    # CRITICAL: Re-inspect to get NEW coordinates after scroll
-                    logger.info("Safe Click: Re-inspecting after scroll to get updated coordinates")
-                    continue # This will re-run the inspect at the top of the loop
-                
-                # Check enabled state
-                if not info['isEnabled']:
-                    logger.warning("Safe Click: Element is disabled or not interactive")
-                    # We might want to wait here or just try anyway if it's a false negative
-                    # For now, let's log and proceed with caution
-                
-                # Check obscuration
-                if info['isObscured']:
-                    logger.warning("Safe Click: Element appears to be obscured by another element")
-                    # Attempt to scroll slightly to clear it?
-                    await frame.evaluate("window.scrollBy({top: 50, behavior: 'smooth'})")
-                    await asyncio.sleep(0.5)
-                    continue
-
-                # 2. Act: Coordinate-based click
-                # At this point, element is visible and coordinates are fresh
-                center_x = info['center']['x']
-                center_y = info['center']['y']
-                
-                logger.info(f"Safe Click: Element is visible and ready at ({center_x}, {center_y})")
-                
-                # Use Playwright's mouse API for precise interaction
-                page = frame.page if hasattr(frame, 'page') else frame
-                
-                if frame == page or frame == page.main_frame:
-                    logger.info(f"Safe Click: Using mouse.click at ({center_x}, {center_y})")
-                    await page.mouse.click(center_x, center_y)
-                else:
-                    # For iframes, fall back to JS click
-                    logger.info("Safe Click: Inside iframe, falling back to JS click for safety")
-                    js_click = self._load_js('action_click.js')
-                    await frame.evaluate(js_click, element_index)
-                
-                await asyncio.sleep(0.5)
-                return True
-            
-            logger.error("Safe Click: Failed to stabilize element after 3 attempts")
-            return False
+                logger.info("Safe Click: Falling back to JS click")
+                effects = await self._click_and_wait(frame, lambda: frame.evaluate(js_click, element_index))
+                return bool(effects.get('result'))
+
+            # Coordinates are fresh: taken after the box stopped moving
+            center_x = info['center']['x']
+            center_y = info['center']['y']
+
+            if frame == page or frame == page.main_frame:
+                logger.info(f"Safe Click: Using mouse.click at ({center_x:.0f}, {center_y:.0f})")
+                effects = await self._click_and_wait(frame, lambda: page.mouse.click(center_x, center_y))
+            else:
+                # For iframes, fall back to JS click for safety
+                logger.info("Safe Click: Inside iframe, falling back to JS click for safety")
+                effects = await self._click_and_wait(frame, lambda: frame.evaluate(js_click, element_index))
+
+            logger.info(f"Safe Click: Settled in {effects['waitedMs']} ms "
+                        f"(navigated={effects['navigated']}, requests={effects['requests']}, mutations={effects['mutations']})")
+            return True
 
         except Exception as e:
             logger.error(f"Safe Click Error: {e}")
@@ -551,7 +648,7 @@ class UniversalDOMFinder:
     async def _verify_selection(self, variant_type: str, variant_value: str, frame: Optional[Any] = None) -> Dict[str, Any]:
         """Verify the selection."""
         target_frame = frame or self.page
-        js_verify = self._load_js('verification.js')
+        js_verify = with_text_index(self._load_js('verification.js'))
         result = await target_frame.evaluate(js_verify, {'variantType': variant_type, 'variantValue': variant_value})
         
         if result.get('verified'):
@@ -568,7 +665,7 @@ class UniversalDOMFinder:
         if any(nav in variant_type.lower() for nav in navigation_types):
             return {'success': False, 'error': 'Navigation element not found'}
 
-        js_discovery = self._load_js('discovery.js')
+        js_discovery = with_text_index(self._load_js('discovery.js'))
         result = await self.page.evaluate(js_discovery, {'variantType': variant_type, 'variantValue': variant_value})
         
         if result.get('found') and result.get('clicked'):
@@ -580,11 +677,153 @@ class UniversalDOMFinder:
         
         return {'success': False, 'error': 'Discovery failed'}
 
+    async def select_variants(self, variants: Dict[str, str]) -> Dict[str, Any]:
+        """Select several variants in one call.
+
+        One scan locates the option groups, selections run in dependency order
+        (color/style before size, quantity last) with a wait for the re-render
+        after each one, and a single read verifies all of them at the end.
+        """
+        variants = {str(t).strip(): str(v).strip() for t, v in (variants or {}).items()
+                    if t and v and str(v).strip().lower() != 'none'}
+        if not variants:
+            return {'success': True, 'content': 'No variants to select', 'order': [], 'results': {}, 'verified': {}, 'failed': []}
+
+        container_selector = await self._detect_product_container()
+        self._container_selector = container_selector or ''
+        groups = await self._scan_variant_groups(list(variants), container_selector)
+        order = self._order_variants(variants, groups)
+        logger.info(f"VARIANT SELECTION: Batch order: {', '.join(f'{t}={v}' for t, v in order)}")
+
+        results = {}
+        for position, (variant_type, variant_value) in enumerate(order):
+            dependent = position < len(order) - 1
+            token = await self._arm_settle() if dependent else None
+            try:
+                results[variant_type] = await self.find_variant(variant_type, variant_value, verify=False)
+            except Exception:
+                await self._disarm_settle(token)
+                raise
+            if not results[variant_type].get('success'):
+                logger.warning(f"VARIANT SELECTION: Could not select {variant_type}={variant_value}")
+            if dependent:
+                settle = await self._wait_for_settle(token)
+                logger.info(f"VARIANT SELECTION: Page settled after {variant_type} "
+                            f"({settle.get('mutations', 0)} mutations, {settle.get('waitedMs', 0)} ms)")
+
+        selected = [(t, v) for t, v in order if results[t].get('success')]
+        failed = [t for t, _ in order if not results[t].get('success')]
+        verified = await self._verify_selections(selected) if selected else {}
+
+        summary = ', '.join(f"{t}={v}" + ('' if verified.get(t) else ' (unverified)') for t, v in selected)
+        content = f"Selected {summary}" if selected else 'No variant selected'
+        if failed:
+            content += f"; could not select {', '.join(f'{t}={variants[t]}' for t in failed)}"
+
+        result = {
+            'success': not failed,
+            'content': content,
+            'order': [t for t, _ in order],
+            'results': results,
+            'verified': verified,
+            'failed': failed
+        }
+        if any(not verified.get(t) for t, _ in selected):
+            result['warning'] = 'Verification failed for some selections'
+        return result
+
+    async def _scan_variant_groups(self, variant_types: List[str], container_selector: Optional[str]) -> Dict[str, Any]:
+        """Option group per variant type (position, option and disabled counts) in one page read"""
+        try:
+            js_groups = with_text_index(self._load_js('variant_groups.js'))
+            groups = await self.page.evaluate(js_groups, {
+                'types': variant_types,
+                'aliases': {t: _variant_aliases(t) for t in variant_types},
+                'containerSelector': container_selector
+            })
+            return groups if isinstance(groups, dict) else {}
+        except Exception as e:
+            logger.warning(f"VARIANT SELECTION: Option group scan failed: {e}")
+            return {}
+
+    def _order_variants(self, variants: Dict[str, str], groups: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """
+        Selection order: groups whose options are all disabled (waiting on another
+        choice) last, then dependency rank, then page position, then request order.
+        """
+        def key(entry):
+            index, (variant_type, _) = entry
+            group = groups.get(variant_type) or {}
+            blocked = bool(group.get('found') and group.get('options') and group.get('disabled') == group.get('options'))
+            top = group.get('top', float('inf')) if group.get('found') else float('inf')
+            return (blocked, variant_dependency_rank(variant_type), top, index)
+
+        return [item for _, item in sorted(enumerate(variants.items()), key=key)]
+
+    async def _arm_settle(self) -> Optional[int]:
+        """Start counting DOM mutations before a selection that others depend on; returns the settle token"""
+        try:
+            return (await self.page.evaluate(self._load_js('dom_settle.js'), {'mode': 'arm'})).get('token')
+        except Exception as e:
+            logger.debug(f"VARIANT SELECTION: Could not arm re-render observer: {e}")
+            return None
+
+    async def _disarm_settle(self, token: Optional[int]):
+        """Drop an armed settle token whose selection raised, so its observer is detached"""
+        if token is None:
+            return
+        try:
+            await self.page.evaluate(self._load_js('dom_settle.js'), {'mode': 'disarm', 'token': token})
+        except Exception:
+            pass
+
+    async def _wait_for_settle(self, token: Optional[int], quiet_ms: int = 250, timeout_ms: int = 3000) -> Dict[str, Any]:
+        """Wait until the re-render triggered by the selection armed with token is over"""
+        try:
+            return await self.page.evaluate(self._load_js('dom_settle.js'),
+                                            {'mode': 'wait', 'token': token, 'quietMs': quiet_ms, 'timeoutMs': timeout_ms})
+        except Exception as e:
+            # Selection navigated to a variant URL - wait for the new document instead
+            logger.info(f"VARIANT SELECTION: Page changed during selection ({e}), waiting for load")
+            try:
+                await self.page.wait_for_load_state('domcontentloaded', timeout=timeout_ms)
+            except Exception:
+                pass
+            return {'settled': False, 'navigated': True}
+
+    async def _verify_selections(self, selections: List[Tuple[str, str]]) -> Dict[str, bool]:
+        """verification.js for every selection in one evaluate"""
+        js_verify = with_text_index(
+            f"(args) => args.variants.map(v => ({self._load_js('verification.js')})"
+            f"({{ variantType: v.type, variantValue: v.value }}))"
+        )
+        try:
+            checks = await self.page.evaluate(js_verify, {'variants': [{'type': t, 'value': v} for t, v in selections]})
+        except Exception as e:
+            logger.warning(f"VARIANT SELECTION: Batch verification failed: {e}")
+            return {t: False for t, _ in selections}
+
+        verified = {t: bool(check.get('verified')) for (t, _), check in zip(selections, checks)}
+        # OCR tier for the rest: one capture and OCR run serves all of them (cached per DOM version)
+        for variant_type, variant_value in selections:
+            if not verified[variant_type] and ocr_enabled():
+                verified[variant_type] = (await self.verify_selection_with_ocr(variant_type, variant_value))['verified']
+        for variant_type, ok in verified.items():
+            if ok:
+                logger.info(f"VARIANT SELECTION: VERIFIED {variant_type}")
+            else:
+                logger.warning(f"VARIANT SELECTION: Could not verify {variant_type}, assuming selected")
+        return verified
+
 # Backward compatibility wrapper
 async def find_variant_dom(page: Page, variant_type: str, variant_value: str) -> Dict[str, Any]:
     finder = UniversalDOMFinder(page)
     return await finder.find_variant(variant_type, variant_value)
 
+async def select_variants_dom(page: Page, variants: Dict[str, str]) -> Dict[str, Any]:
+    finder = UniversalDOMFinder(page)
+    return await finder.select_variants(variants)
+
 async def verify_selection_with_ocr(page: Page, variant_type: str, variant_value: str, debug_dir: str) -> Dict[str, Any]:
     finder = UniversalDOMFinder(page, debug_dir)
     return await finder.verify_selection_with_ocr(variant_type, variant_value)
\ No newline at end of file
@@ -6,11 +6,15 @@ Complete implementation of product variant selection, verification, and cart add
 from src.checkout_ai.dom.service import UniversalDOMFinder as find_variant_dom
 from src.checkout_ai.legacy.phase1.add_to_cart_robust import add_to_cart_robust
 from src.checkout_ai.legacy.phase1.cart_navigator import navigate_to_cart
+from src.checkout_ai.legacy.phase1.multi_item_cart import build_multi_item_cart
+from src.checkout_ai.legacy.phase1.cart_validator import validate_cart
 
 __all__ = [
     'find_variant_dom',
     'add_to_cart_robust',
-    'navigate_to_cart'
+    'navigate_to_cart',
+    'build_multi_item_cart',
+    'validate_cart'
 ]
 
 __version__ = '1.0.0'
@@ -7,15 +7,20 @@ Uses comprehensive keyword matching from shared.ecommerce_keywords
 
 import asyncio
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from src.checkout_ai.dom.service import UniversalDOMFinder
+from src.checkout_ai.platforms import add_to_cart_via_platform
 from src.checkout_ai.utils.ecommerce_keywords import ADD_TO_CART_KEYWORDS
+from src.checkout_ai.utils.keyword_matcher import with_keyword_matcher
 import re
 from playwright.async_api import Page
 
 logger = logging.getLogger(__name__)
 
-async def add_to_cart_robust(page: Page, container_selector: str = None) -> Dict[str, Any]:
+async def add_to_cart_robust(page: Page, container_selector: str = None,
+                             variants: Optional[Dict[str, str]] = None,
+                             quantity: Optional[int] = None,
+                             use_platform_api: bool = True) -> Dict[str, Any]:
     """
     Robust add to cart that tries multiple strategies with all known keywords
     Site-specific prioritization for conflicting buttons (e.g., Ulta)
@@ -23,6 +28,9 @@ async def add_to_cart_robust(page: Page, container_selector: str = None) -> Dict
     Args:
         page: Playwright page object
         container_selector: Optional selector for the product container to restrict search
+        variants: Optional selectedVariant dict for the platform API (None = variant selected in page)
+        quantity: Optional quantity for the platform API (None = quantity in page form)
+        use_platform_api: Try the Shopify/WooCommerce/Magento storefront API before the UI flow
         
     Returns:
         Dict with 'success': bool, 'content': str, 'method': str
@@ -37,7 +45,7 @@ async def add_to_cart_robust(page: Page, container_selector: str = None) -> Dict
     is_ulta = 'ulta.com' in current_url.lower()
     
     # Get all keywords (primary + secondary)
-    all_keywords = ADD_TO_CART_KEYWORDS.all_keywords()
+    all_keywords = list(ADD_TO_CART_KEYWORDS.all_keywords())
     
     # SITE-SPECIFIC PRIORITIZATION
     # Ulta has both "Add to bag" and "Add for ship" - prioritize shipping
@@ -56,6 +64,16 @@ async def add_to_cart_robust(page: Page, container_selector: str = None) -> Dict
     if is_ulta:
         logger.info(f"ADD TO CART: Priority keywords - {all_keywords[:3]}")
     
+    # Strategy -1: Storefront API (Shopify/WooCommerce/Magento) - one request, no UI clicks
+    if use_platform_api:
+        try:
+            platform_result = await add_to_cart_via_platform(page, variants=variants, quantity=quantity)
+            if platform_result.get('success'):
+                logger.info(f"ADD TO CART: ✅ {platform_result.get('content')}")
+                return platform_result
+        except Exception as e:
+            logger.debug(f"ADD TO CART: Platform API failed: {e}")
+    
     # Strategy 0: Playwright Native Locators (Most Robust)
     logger.info("ADD TO CART: Strategy 0 - Trying Playwright native locators")
     try:
@@ -109,21 +127,20 @@ async def add_to_cart_robust(page: Page, container_selector: str = None) -> Dict
     # Strategy 1: Try to find button by comprehensive keyword search
     logger.info("ADD TO CART: Strategy 1 - Searching for Add to Cart button using keywords")
     
-    for keyword in all_keywords:
-        logger.info(f"ADD TO CART: Trying keyword - {keyword}")
-        
-        # Try to find button with this keyword
-        result = await page.evaluate("""
+    # One scan classifies every button against all keywords; the best (keyword priority,
+    # selector, document order) wins. If its click fails the scan resumes after that keyword.
+    first_keyword = 0
+    while first_keyword < len(all_keywords):
+        result = await page.evaluate(with_keyword_matcher("""
             (args) => {
-                const keyword = args.keyword;
-                const isUlta = args.isUlta;
+                const { keywords, firstKeyword, isUlta } = args;
+                const matcher = window.__checkoutKeywords.compile(keywords);
                 
                 const normalize = (text) => {
                     if (!text) return '';
                     if (typeof text !== 'string') text = String(text);
                     return text.toLowerCase().trim();
                 };
-                const keywordNorm = normalize(keyword);
                 
                 // STRICT: Only search actual buttons, not links or divs
                 const selectors = [
@@ -133,86 +150,90 @@ async def add_to_cart_robust(page: Page, container_selector: str = None) -> Dict
                     'input[type="button"]'
                 ];
                 
-                for (const selector of selectors) {
-                    const elements = document.querySelectorAll(selector);
-                    
-                    for (const el of elements) {
-                        // Check multiple text sources - safely handle non-strings
+                document.querySelectorAll('[data-cart-button]').forEach(el => el.removeAttribute('data-cart-button'));
+                
+                let best = null;
+                selectors.forEach((selector, selectorIndex) => {
+                    for (const el of document.querySelectorAll(selector)) {
+                        // STRICT: Must match in visible text, aria-label, title or value ONLY
+                        // Don't match on className, id, or name to avoid false positives
+                        const hits = new Set();
+                        for (const source of [el.textContent, el.getAttribute('aria-label'), el.getAttribute('title'), el.getAttribute('value')]) {
+                            for (const i of matcher.hits(source)) if (i >= firstKeyword) hits.add(i);
+                        }
+                        if (!hits.size) continue;
+                        
                         const text = normalize(el.textContent);
                         const ariaLabel = normalize(el.getAttribute('aria-label'));
-                        const title = normalize(el.getAttribute('title'));
-                        const value = normalize(el.getAttribute('value'));
-                        
-                        // STRICT: Must match in visible text or aria-label ONLY
-                        // Don't match on className, id, or name to avoid false positives
-                        const primarySources = [text, ariaLabel, title, value];
                         
-                        for (const source of primarySources) {
-                            if (source && source.includes(keywordNorm)) {
-                                // Additional validation: make sure it's visible and reasonable size
-                                const rect = el.getBoundingClientRect();
-                                const isReasonableSize = rect.width >= 80 && rect.height >= 30;
-                                const isVisible = rect.width > 0 && rect.height > 0;
-                                
-                                if (isVisible && isReasonableSize) {
-                                    // STRICT: Verify this is likely a cart button by checking context
-                                    // Reject navigation buttons, close buttons, etc.
-                                    const className = normalize(el.className);
-                                    const rejectPatterns = ['close', 'dismiss', 'cancel', 'back', 'prev', 'next', 'nav'];
-                                    const isRejected = rejectPatterns.some(pattern => 
-                                        className.includes(pattern) || text.includes(pattern)
-                                    );
-                                    
-                                    // ULTA-SPECIFIC: If searching for "add for ship", reject "add to bag"
-                                    if (isUlta && keywordNorm === 'add for ship') {
-                                        if (text.includes('bag') || text.includes('pickup')) {
-                                            console.log(`Skipping button "${text}" - looking for "add for ship"`);
-                                            continue;
-                                        }
-                                    }
-                                    
-                                    if (!isRejected) {
-                                        // Mark element
-                                        el.setAttribute('data-cart-button', 'true');
-                                        
-                                        return {
-                                            found: true,
-                                            keyword: keyword,
-                                            matchedText: el.textContent?.trim() || ariaLabel,
-                                            tagName: el.tagName,
-                                            selector: selector
-                                        };
-                                    }
-                                }
-                            }
+                        // ULTA-SPECIFIC: If searching for "add for ship", reject "add to bag"
+                        if (isUlta && (text.includes('bag') || text.includes('pickup'))) {
+                            for (const i of hits) if (normalize(keywords[i]) === 'add for ship') hits.delete(i);
                         }
+                        if (!hits.size) continue;
+                        
+                        const keywordIndex = Math.min(...hits);
+                        if (best && (best.keywordIndex < keywordIndex ||
+                            (best.keywordIndex === keywordIndex && best.selectorIndex <= selectorIndex))) continue;
+                        
+                        // Additional validation: make sure it's visible and reasonable size
+                        const rect = el.getBoundingClientRect();
+                        const isReasonableSize = rect.width >= 80 && rect.height >= 30;
+                        const isVisible = rect.width > 0 && rect.height > 0;
+                        if (!isVisible || !isReasonableSize) continue;
+                        
+                        // STRICT: Verify this is likely a cart button by checking context
+                        // Reject navigation buttons, close buttons, etc.
+                        const className = normalize(el.className);
+                        const rejectPatterns = ['close', 'dismiss', 'cancel', 'back', 'prev', 'next', 'nav'];
+                        const isRejected = rejectPatterns.some(pattern => 
+                            className.includes(pattern) || text.includes(pattern)
+                        );
+                        if (isRejected) continue;
+                        
+                        best = { el, keywordIndex, selectorIndex, ariaLabel, selector };
                     }
-                }
+                });
                 
-                return { found: false };
+                if (!best) return { found: false };
+                
+                // Mark element
+                best.el.setAttribute('data-cart-button', 'true');
+                return {
+                    found: true,
+                    keyword: keywords[best.keywordIndex],
+                    keywordIndex: best.keywordIndex,
+                    matchedText: best.el.textContent?.trim() || best.ariaLabel,
+                    tagName: best.el.tagName,
+                    selector: best.selector
+                };
             }
-        """, {'keyword': keyword, 'isUlta': is_ulta})
+        """), {'keywords': all_keywords, 'firstKeyword': first_keyword, 'isUlta': is_ulta})
+        
+        if not result.get('found'):
+            break
+        
+        keyword = result['keyword']
+        first_keyword = result['keywordIndex'] + 1
+        logger.info(f"ADD TO CART: Found - {result.get('matchedText')} ({result.get('tagName')}) via keyword '{keyword}'")
         
-        if result.get('found'):
-            logger.info(f"ADD TO CART: Found - {result.get('matchedText')} ({result.get('tagName')})")
+        # Try to click it
+        click_success = await _click_cart_button(page)
+        
+        if click_success:
+            logger.info("ADD TO CART: Successfully added to cart")
+            logger.info(f"ADD TO CART: Keyword - {keyword}")
+            logger.info(f"ADD TO CART: Button - {result.get('matchedText')}")
             
-            # Try to click it
-            click_success = await _click_cart_button(page)
+            # Dismiss any protection/warranty modals that may appear
+            await _dismiss_protection_modal(page)
             
-            if click_success:
-                logger.info("ADD TO CART: Successfully added to cart")
-                logger.info(f"ADD TO CART: Keyword - {keyword}")
-                logger.info(f"ADD TO CART: Button - {result.get('matchedText')}")
-                
-                # Dismiss any protection/warranty modals that may appear
-                await _dismiss_protection_modal(page)
-                
-                return {
-                    'success': True,
-                    'content': f"Added to cart using keyword '{keyword}'",
-                    'method': 'keyword_search',
-                    'keyword': keyword
-                }
+            return {
+                'success': True,
+                'content': f"Added to cart using keyword '{keyword}'",
+                'method': 'keyword_search',
+                'keyword': keyword
+            }
     
     # Strategy 2: Try pattern matching with common button patterns
     logger.info("ADD TO CART: Strategy 2 - Trying pattern matching")
@@ -18,6 +18,7 @@ async def navigate_to_cart(page: Page) -> Dict[str, Any]:
     """
     Navigate to shopping cart after items have been added
     Handles different cart access patterns with priority order:
+    0. Cart URL learned on an earlier run for this domain (no waits)
     1. Try clicking mini cart icon in header (PRIORITY for Indian sites)
     2. Try cart modal/drawer with "View Cart" button
     3. URL fallback navigation (last resort)
@@ -27,7 +28,14 @@ async def navigate_to_cart(page: Page) -> Dict[str, Any]:
     """
     
     logger.info("CART NAVIGATION: Starting enhanced cart navigation")
-    logger.info("CART NAVIGATION: Strategy order: Mini Cart Icon → Modal Button → URL Fallback")
+    logger.info("CART NAVIGATION: Strategy order: Learned URL → Mini Cart Icon → Modal Button → URL Fallback")
+    
+    # STRATEGY 0: Cart URL that worked before on this domain - skips the icon/modal sleeps
+    learned_result = await _navigate_via_learned_cart_url(page)
+    if learned_result.get('success'):
+        logger.info(f"✅ CART NAVIGATION: Success via learned cart URL!")
+        logger.info(f"   Cart URL: {learned_result.get('cart_url')}")
+        return learned_result
     
     # STRATEGY 1: Click mini cart icon in header (PRIORITY - works on Myntra, Flipkart, Ajio)
     logger.info("CART NAVIGATION: [Strategy 1] Trying mini cart icon in header...")
@@ -346,7 +354,7 @@ async def _click_view_cart_in_modal(page: Page) -> bool:
                 logger.info(f"CART NAVIGATION: Button {i+1} - Text: {btn.get('text')}, Aria: {btn.get('ariaLabel')}, Href: {btn.get('href')}")
         
         # Get all possible keywords
-        all_keywords = VIEW_CART_KEYWORDS.all_keywords()
+        all_keywords = list(VIEW_CART_KEYWORDS.all_keywords())
         
         # Add common variations - CHECKOUT FIRST (most common after add-to-cart)
         additional_keywords = [
@@ -713,10 +721,154 @@ async def _click_view_cart_in_modal(page: Page) -> bool:
         return False
 
 
+# JS to probe candidate cart URLs in parallel with same-origin fetch (cookies included)
+# and score each response: status, final URL after redirects, cart markers in the HTML
+_PROBE_CART_URLS_JS = """
+    async ({ paths, timeoutMs }) => {
+        const cartMarkers = [
+            'cart-item', 'cart__item', 'cart_item', 'line-item', 'lineitem',
+            'shopping-cart', 'shopping cart', 'your cart', 'your bag', 'shopping bag',
+            'proceed to checkout', 'continue shopping', 'subtotal', 'order summary', 'is empty'
+        ];
+        const notFoundMarkers = ['page not found', '404 not found', 'error 404', "can't be found", 'cannot be found'];
+
+        const probe = async (path) => {
+            const controller = new AbortController();
+            const timer = setTimeout(() => controller.abort(), timeoutMs);
+            try {
+                const res = await fetch(path, {
+                    method: 'GET',
+                    credentials: 'same-origin',
+                    redirect: 'follow',
+                    signal: controller.signal,
+                    headers: { 'Accept': 'text/html' }
+                });
+                const finalUrl = res.url || path;
+                const finalPath = new URL(finalUrl, location.origin).pathname.toLowerCase();
+                const html = (await res.text()).slice(0, 300000).toLowerCase();
+                const title = (html.match(/<title[^>]*>([^<]*)</) || [])[1] || '';
+
+                let score = 0;
+                if (res.status === 404 || res.status === 410 || res.status >= 500) {
+                    return { path, status: res.status, finalUrl, score: -10 };
+                }
+                if (res.ok) score += 2;
+                if (/cart|bag|basket/.test(finalPath)) score += 2;
+                if (res.redirected && (finalPath === '/' || finalPath === '')) score -= 3;
+                if (/login|signin|sign-in|account/.test(finalPath)) score -= 1;
+                if (notFoundMarkers.some(m => title.includes(m) || html.includes(m))) score -= 4;
+
+                let markers = 0;
+                for (const m of cartMarkers) {
+                    if (html.includes(m)) markers++;
+                    if (markers >= 4) break;
+                }
+                score += markers;
+
+                return { path, status: res.status, finalUrl, score };
+            } catch (e) {
+                return { path, status: 0, finalUrl: null, score: -10, error: String(e) };
+            } finally {
+                clearTimeout(timer);
+            }
+        };
+
+        return await Promise.all(paths.map(probe));
+    }
+"""
+
+# Minimum probe score to navigate to a candidate (e.g. 200 + cart path + a cart marker)
+_MIN_PROBE_SCORE = 4
+
+
+async def _navigate_via_learned_cart_url(page: Page) -> Dict[str, Any]:
+    """
+    Navigate straight to the cart URL learned for this domain, if there is one.
+    Fails (so the other strategies run) when the page errors or redirects away from the cart.
+    """
+    try:
+        from src.checkout_ai.utils.cart_urls import get_learned_cart_url
+        from urllib.parse import urlparse
+        
+        parsed = urlparse(page.url)
+        cart_path = get_learned_cart_url(parsed.netloc)
+        if not cart_path:
+            return {'success': False, 'reason': 'No learned cart URL'}
+        
+        logger.info(f"CART NAVIGATION: [Strategy 0] Trying learned cart URL: {cart_path}")
+        response = await page.goto(f"{parsed.scheme}://{parsed.netloc}{cart_path}",
+                                   wait_until='domcontentloaded', timeout=10000)
+        final_path = urlparse(page.url).path.lower()
+        if (response is None or response.ok) and any(k in final_path for k in ('cart', 'bag', 'basket')):
+            return {'success': True, 'cart_url': page.url, 'method': 'learned_url'}
+        
+        logger.warning(f"   ❌ Learned cart URL did not land on a cart page: {page.url}")
+        return {'success': False, 'reason': 'Learned cart URL no longer works'}
+        
+    except Exception as e:
+        logger.warning(f"   Learned cart URL failed: {e}")
+        return {'success': False, 'reason': str(e)}
+
+
 async def _navigate_via_cart_url(page: Page) -> Dict[str, Any]:
     """
     Navigate to cart via URL fallback (last resort)
-    Tries site-specific cart URLs and common cart URL patterns
+    Probes all candidate cart URLs in parallel with in-page fetch, then navigates
+    once to the best-scoring one. The winner is persisted per domain.
+    Falls back to sequential navigation when probing is not possible (e.g. CSP).
+    """
+    try:
+        from src.checkout_ai.utils.cart_urls import get_cart_url_candidates, save_learned_cart_url
+        from urllib.parse import urlparse
+        
+        parsed = urlparse(page.url)
+        domain = parsed.netloc
+        candidates = get_cart_url_candidates(domain)
+        
+        logger.info(f"   Probing {len(candidates)} cart URLs in parallel for domain: {domain}")
+        
+        try:
+            results = await page.evaluate(_PROBE_CART_URLS_JS, {'paths': candidates, 'timeoutMs': 8000})
+        except Exception as e:
+            logger.warning(f"   Cart URL probing failed: {e}")
+            results = []
+        
+        reachable = [r for r in results if r.get('status')]
+        if not reachable:
+            logger.info("   No probe responses - falling back to sequential cart URLs")
+            return await _navigate_via_cart_url_sequential(page)
+        
+        # Highest score wins; ties go to the earlier (learned / site-specific) candidate
+        best = max(results, key=lambda r: (r.get('score', -10), -candidates.index(r['path'])))
+        logger.info(f"   Best probe: {best['path']} (status {best.get('status')}, score {best.get('score')})")
+        
+        if best.get('score', -10) < _MIN_PROBE_SCORE:
+            logger.warning("   ❌ URL fallback failed: No cart URL scored high enough")
+            return {'success': False, 'reason': 'No cart URL patterns worked'}
+        
+        target = best.get('finalUrl') or f"{parsed.scheme}://{domain}{best['path']}"
+        await page.goto(target, wait_until='domcontentloaded', timeout=10000)
+        
+        final = urlparse(page.url)
+        cart_path = final.path + (f"?{final.query}" if final.query else '')
+        save_learned_cart_url(domain, cart_path or best['path'])
+        
+        logger.info(f"   ✅ Success! Cart URL: {page.url}")
+        return {
+            'success': True,
+            'cart_url': page.url,
+            'method': 'probed_url'
+        }
+        
+    except Exception as e:
+        logger.error(f"Error in URL fallback: {e}")
+        return {'success': False, 'reason': str(e)}
+
+
+async def _navigate_via_cart_url_sequential(page: Page) -> Dict[str, Any]:
+    """
+    Navigate to cart by trying cart URLs one at a time
+    Used when in-page probing is blocked
     """
     try:
         from src.checkout_ai.utils.cart_urls import get_cart_url_from_domain, CART_URL_PATTERNS
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Cart Validator - Deterministic check that cart line items match the requested variants
+Extracts line items (title, variant attributes, quantity, price) from the platform
+cart API (/cart.js), JSON-LD, microdata or the DOM, then matches them against
+selectedVariant using the color-code normalization from color_code_mapper.
+Part of Phase 1 completion
+"""
+
+import logging
+import re
+from typing import Dict, Any, List
+from playwright.async_api import Page
+
+from src.checkout_ai.legacy.phase1.color_code_mapper import matches_color, COLOR_CODE_MAP
+
+logger = logging.getLogger(__name__)
+
+# Confidence of each extraction source (how much the item attributes can be trusted)
+SOURCE_CONFIDENCE = {
+    'platform_api': 1.0,
+    'json_ld': 0.9,
+    'microdata': 0.9,
+    'dom': 0.85,
+    'none': 0.0,
+}
+
+# Results below this confidence should be double-checked (e.g. by the LLM)
+MIN_CONFIDENCE = 0.8
+
+# Size abbreviations seen in cart line items
+SIZE_ALIASES = {
+    'xs': 'extrasmall', 's': 'small', 'm': 'medium', 'l': 'large',
+    'xl': 'extralarge', 'xxl': '2xl', 'xxxl': '3xl',
+}
+
+_EXTRACT_CART_JS = """
+    async () => {
+        const toNumber = (v) => {
+            const n = parseFloat(String(v || '').replace(/[^0-9.]/g, ''));
+            return isNaN(n) ? null : n;
+        };
+
+        // 1. Platform cart API (Shopify)
+        if (window.Shopify) {
+            try {
+                const root = (window.Shopify.routes && window.Shopify.routes.root) || '/';
+                const res = await fetch(`${root}cart.js`, { credentials: 'same-origin', headers: { 'Accept': 'application/json' } });
+                if (res.ok) {
+                    const cart = await res.json();
+                    return {
+                        source: 'platform_api',
+                        items: (cart.items || []).map(item => {
+                            const attributes = {};
+                            (item.options_with_values || []).forEach(o => { attributes[o.name] = o.value; });
+                            return {
+                                title: item.product_title || item.title || '',
+                                attributes: attributes,
+                                text: [item.title, item.variant_title].filter(Boolean).join(' '),
+                                quantity: item.quantity,
+                                price: item.final_price != null ? item.final_price / 100 : null
+                            };
+                        })
+                    };
+                }
+            } catch (e) {}
+        }
+
+        // 2. JSON-LD (Order line items only - bare Products on a cart page are usually recommendations)
+        const ldItems = [];
+        const visit = (node) => {
+            if (!node || typeof node !== 'object') return;
+            if (Array.isArray(node)) { node.forEach(visit); return; }
+            const type = String(node['@type'] || '');
+            if (type === 'OrderItem' && node.orderedItem) {
+                ldItems.push({ product: node.orderedItem, quantity: node.orderQuantity });
+            } else if (type === 'Offer' && node.itemOffered) {
+                ldItems.push({ product: node.itemOffered, quantity: node.eligibleQuantity && node.eligibleQuantity.value });
+            }
+            ['@graph', 'orderedItem', 'acceptedOffer'].forEach(k => {
+                if (node[k] && !(k === 'orderedItem' && type === 'OrderItem')) visit(node[k]);
+            });
+        };
+        document.querySelectorAll('script[type="application/ld+json"]').forEach(s => {
+            try { visit(JSON.parse(s.textContent)); } catch (e) {}
+        });
+        if (ldItems.length) {
+            return {
+                source: 'json_ld',
+                items: ldItems.map(({ product, quantity }) => {
+                    const attributes = {};
+                    ['color', 'size', 'material', 'pattern'].forEach(k => { if (product[k]) attributes[k] = String(product[k]); });
+                    const offer = Array.isArray(product.offers) ? product.offers[0] : product.offers;
+                    return {
+                        title: product.name || '',
+                        attributes: attributes,
+                        text: [product.name, product.sku, product.description].filter(Boolean).join(' '),
+                        quantity: quantity != null ? toNumber(quantity) : null,
+                        price: offer ? toNumber(offer.price) : null
+                    };
+                })
+            };
+        }
+
+        // 3. Microdata (order line items)
+        const microItems = Array.from(document.querySelectorAll('[itemtype*="schema.org/OrderItem"], [itemtype*="schema.org/Order"] [itemtype*="schema.org/Product"]'));
+        if (microItems.length) {
+            const prop = (el, name) => {
+                const p = el.querySelector(`[itemprop="${name}"]`);
+                return p ? (p.getAttribute('content') || p.textContent || '').trim() : '';
+            };
+            return {
+                source: 'microdata',
+                items: microItems.map(el => {
+                    const attributes = {};
+                    ['color', 'size', 'material', 'pattern'].forEach(k => { const v = prop(el, k); if (v) attributes[k] = v; });
+                    return {
+                        title: prop(el, 'name'),
+                        attributes: attributes,
+                        text: (el.innerText || '').slice(0, 500),
+                        quantity: toNumber(prop(el, 'orderQuantity')),
+                        price: toNumber(prop(el, 'price'))
+                    };
+                })
+            };
+        }
+
+        // 4. DOM line items (outermost matches only)
+        const rowSelector = '[class*="cart-item"], [class*="cart__item"], [class*="CartItem"], [class*="line-item"], ' +
+                            '[class*="lineItem"], tr.cart_item, [data-cart-item], [data-line-item]';
+        const rows = Array.from(document.querySelectorAll(rowSelector))
+            .filter(el => !el.parentElement || !el.parentElement.closest(rowSelector))
+            .filter(el => el.offsetParent !== null && (el.innerText || '').trim().length > 0);
+
+        return {
+            source: rows.length ? 'dom' : 'none',
+            items: rows.map(el => {
+                const text = (el.innerText || '').slice(0, 800);
+                const titleEl = el.querySelector('[class*="title"] a, [class*="name"] a, a[href*="/product"], a[href*="/products/"], h2, h3, h4, [class*="title"], [class*="name"]');
+                const attributes = {};
+                const re = /([A-Za-z][A-Za-z ]{1,20})\\s*[:：]\\s*([^\\n|:]{1,40})/g;
+                let m;
+                while ((m = re.exec(text)) !== null) {
+                    const key = m[1].trim().toLowerCase();
+                    if (!/price|total|qty|quantity|subtotal|delivery|ship/.test(key)) attributes[key] = m[2].trim();
+                }
+                const qtyInput = el.querySelector('input[name*="qty" i], input[name*="quantity" i], select[name*="qty" i], select[name*="quantity" i]');
+                const qtyText = text.match(/(?:qty|quantity)\\s*[:：]?\\s*(\\d+)/i);
+                const priceText = text.match(/(?:[$€£₹]|rs\\.?|inr)\\s*([0-9][0-9,]*(?:\\.[0-9]{1,2})?)/i);
+                return {
+                    title: titleEl ? titleEl.textContent.trim().slice(0, 200) : '',
+                    attributes: attributes,
+                    text: text,
+                    quantity: qtyInput ? toNumber(qtyInput.value) : (qtyText ? toNumber(qtyText[1]) : null),
+                    price: priceText ? toNumber(priceText[1]) : null
+                };
+            })
+        };
+    }
+"""
+
+
+def _norm(text: Any) -> str:
+    """Lowercase alphanumeric form for comparisons"""
+    return re.sub(r'[^a-z0-9]', '', str(text or '').lower())
+
+
+def _tokens(text: str) -> List[str]:
+    return [t for t in re.split(r'[^a-z0-9]+', str(text or '').lower()) if t]
+
+
+def _is_color(variant_type: str) -> bool:
+    return 'color' in variant_type.lower() or 'colour' in variant_type.lower()
+
+
+def value_matches(variant_type: str, expected: str, actual: str) -> bool:
+    """Compare one requested variant value with a cart attribute value"""
+    if _is_color(variant_type) and matches_color(str(expected), str(actual)):
+        return True
+    expected_n, actual_n = _norm(expected), _norm(actual)
+    if not expected_n or not actual_n:
+        return False
+    if expected_n == actual_n:
+        return True
+    return SIZE_ALIASES.get(expected_n, expected_n) == SIZE_ALIASES.get(actual_n, actual_n)
+
+
+def _text_contains_value(variant_type: str, expected: str, text: str) -> bool:
+    """Look for a requested value in free text (title / line item text)"""
+    tokens = _tokens(text)
+    expected_tokens = _tokens(expected)
+    if not expected_tokens:
+        return False
+    if len(expected_tokens) == 1:
+        if expected_tokens[0] in tokens:
+            return True
+    elif _norm(expected) in _norm(text):
+        return True
+    if _is_color(variant_type):
+        # Cart may show the color code instead of the name
+        codes = [code.lower() for code, name in COLOR_CODE_MAP.items() if matches_color(str(expected), name)]
+        return any(code in tokens for code in codes)
+    return False
+
+
+def _key_matches(variant_type: str, key: str) -> bool:
+    type_n, key_n = _norm(variant_type).replace('colour', 'color'), _norm(key).replace('colour', 'color')
+    return bool(type_n) and bool(key_n) and (type_n == key_n or type_n in key_n or key_n in type_n)
+
+
+def _expected_variants(task: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        k: str(v) for k, v in (task.get('selectedVariant') or {}).items()
+        if v and str(v).lower() != 'none' and k.lower() not in ('quantity', 'qty')
+    }
+
+
+def _match_item(item: Dict[str, Any], expected: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Match one cart item against expected variants.
+    Each variant is 'attribute' (matched a structured attribute), 'text' (found in
+    free text only), 'mismatch' (structured attribute with a different value) or 'missing'.
+    """
+    attributes = item.get('attributes') or {}
+    full_text = f"{item.get('title', '')} {item.get('text', '')} {' '.join(map(str, attributes.values()))}"
+    checks = {}
+    for variant_type, value in expected.items():
+        keys = [k for k in attributes if _key_matches(variant_type, k)]
+        if keys:
+            if any(value_matches(variant_type, value, attributes[k]) for k in keys):
+                checks[variant_type] = 'attribute'
+            elif _text_contains_value(variant_type, value, full_text):
+                checks[variant_type] = 'text'
+            else:
+                checks[variant_type] = 'mismatch'
+        elif any(value_matches(variant_type, value, v) for v in attributes.values()):
+            checks[variant_type] = 'attribute'
+        elif _text_contains_value(variant_type, value, full_text):
+            checks[variant_type] = 'text'
+        else:
+            checks[variant_type] = 'missing'
+    return checks
+
+
+def _product_hint_score(task: Dict[str, Any], item: Dict[str, Any]) -> int:
+    """Overlap between product URL slug words and the item title (tie-breaker)"""
+    slug_words = set(t for t in _tokens(task.get('url', '').split('?')[0]) if len(t) > 2 and not t.isdigit())
+    return len(slug_words & set(_tokens(item.get('title', ''))))
+
+
+def match_cart_items(items: List[Dict[str, Any]], tasks: List[Dict[str, Any]], source: str = 'dom') -> Dict[str, Any]:
+    """
+    Match extracted cart items to tasks.
+
+    Returns:
+        Dict with 'valid': bool, 'confidence': float, 'reason': str, 'matches': per-task results
+    """
+    base_confidence = SOURCE_CONFIDENCE.get(source, 0.5)
+    if not items:
+        return {'valid': False, 'confidence': 0.0, 'reason': 'No cart items extracted', 'matches': []}
+
+    used = set()
+    matches = []
+    confidence = base_confidence
+
+    for index, task in enumerate(tasks):
+        expected = _expected_variants(task)
+        best = None
+        for item_index, item in enumerate(items):
+            if item_index in used:
+                continue
+            checks = _match_item(item, expected)
+            matched = sum(1 for c in checks.values() if c in ('attribute', 'text'))
+            key = (matched, sum(1 for c in checks.values() if c == 'attribute'), _product_hint_score(task, item))
+            if best is None or key > best['key']:
+                best = {'key': key, 'item_index': item_index, 'checks': checks}
+
+        if best is None:
+            matches.append({'task_index': index, 'matched': False, 'reason': 'No unmatched cart item left'})
+            continue
+
+        used.add(best['item_index'])
+        item = items[best['item_index']]
+        checks = best['checks']
+        mismatched = [k for k, c in checks.items() if c in ('mismatch', 'missing')]
+
+        expected_qty = int(task.get('quantity', 1) or 1)
+        qty = item.get('quantity')
+        qty_ok = qty is None or int(qty) >= expected_qty
+
+        # Free-text matches and missing attributes lower confidence; structured mismatches do not
+        for variant_type, check in checks.items():
+            if check == 'text':
+                # Short values ('M', 'L') found in free text are weak evidence
+                penalty = 0.05 if len(_norm(expected[variant_type])) >= 3 else 0.15
+                confidence = min(confidence, base_confidence - penalty)
+        if any(c == 'missing' for c in checks.values()):
+            confidence = min(confidence, base_confidence - 0.3)
+
+        matches.append({
+            'task_index': index,
+            'matched': not mismatched and qty_ok,
+            'item': item.get('title'),
+            'checks': checks,
+            'quantity': qty,
+            'reason': f"Mismatched: {mismatched}" if mismatched else ('' if qty_ok else f"Quantity {qty} < {expected_qty}")
+        })
+
+    valid = all(m['matched'] for m in matches)
+    reasons = [f"item {m['task_index'] + 1}: {m['reason']}" for m in matches if not m['matched']]
+    return {
+        'valid': valid,
+        'confidence': round(max(confidence, 0.0), 2),
+        'reason': 'All items match' if valid else '; '.join(reasons),
+        'matches': matches
+    }
+
+
+async def extract_cart_items(page: Page) -> Dict[str, Any]:
+    """
+    Extract cart line items from the current cart page.
+
+    Returns:
+        Dict with 'source': str ('platform_api', 'json_ld', 'microdata', 'dom', 'none'), 'items': list
+    """
+    try:
+        return await page.evaluate(_EXTRACT_CART_JS)
+    except Exception as e:
+        logger.warning(f"CART VALIDATION: Extraction failed: {e}")
+        return {'source': 'none', 'items': []}
+
+
+async def validate_cart(page: Page, tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Extract cart items and match them against the requested variants.
+
+    Returns:
+        Dict with 'valid': bool, 'confidence': float, 'source': str, 'reason': str, 'matches': list
+    """
+    extracted = await extract_cart_items(page)
+    source = extracted.get('source', 'none')
+    items = extracted.get('items', [])
+    result = match_cart_items(items, tasks, source=source)
+    result['source'] = source
+
+    logger.info(f"CART VALIDATION: {len(items)} item(s) from {source} - "
+                f"valid: {result['valid']}, confidence: {result['confidence']}, {result['reason']}")
+    return result
+
+
+# Export for use in other modules
+__all__ = ['validate_cart', 'extract_cart_items', 'match_cart_items', 'value_matches', 'MIN_CONFIDENCE']
@@ -10,6 +10,8 @@ import logging
 from playwright.async_api import Page
 from typing import Dict, Any
 
+from src.checkout_ai.dom.checkout_state import get_checkout_state
+
 logger = logging.getLogger(__name__)
 
 async def recover_checkout_page(page: Page, expected_step: str = "") -> Dict[str, Any]:
@@ -120,31 +122,10 @@ async def recover_checkout_page(page: Page, expected_step: str = "") -> Dict[str
 
 
 async def is_on_wrong_page(page: Page) -> bool:
-    """Check if page navigated to wrong place (home, product, etc.)"""
+    """Check if page navigated to wrong place (home, product, etc.) - a read of the checkout state"""
     try:
-        result = await page.evaluate("""
-            () => {
-                const url = window.location.href.toLowerCase();
-                const text = document.body.textContent.toLowerCase();
-                
-                // Check if on wrong page
-                const isHomePage = url === window.location.origin + '/' || 
-                                  url.endsWith('.com/') || 
-                                  text.includes('shop now') ||
-                                  text.includes('featured products');
-                
-                const isProductPage = url.includes('/product') || 
-                                     url.includes('/p/') ||
-                                     text.includes('add to cart');
-                
-                const isCategoryPage = url.includes('/collections') ||
-                                      url.includes('/categories') ||
-                                      url.includes('/shop');
-                
-                return isHomePage || isProductPage || isCategoryPage;
-            }
-        """)
-        return result
+        state = await get_checkout_state(page, fresh=True)
+        return state.wrong_page
     except:
         return False
 
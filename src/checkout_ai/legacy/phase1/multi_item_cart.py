@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Multi-Item Cart Builder - Build a multi-product cart in parallel tabs
+Each item (navigate → select variants → add to cart) runs in its own tab of the
+shared browser context, so all tabs share the same cart cookie. Checkout then
+runs once on the main page.
+Part of Phase 1 completion
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse
+from playwright.async_api import Page, BrowserContext
+
+from src.checkout_ai.dom.service import UniversalDOMFinder
+from src.checkout_ai.legacy.phase1.add_to_cart_robust import add_to_cart_robust
+from src.checkout_ai.platforms import add_to_cart_via_platform, item_in_cart
+
+logger = logging.getLogger(__name__)
+
+# Default number of product tabs open at the same time
+DEFAULT_MAX_TABS = 3
+
+# Longest time the cart lock waits for the header badge to show an added item
+CART_ACK_TIMEOUT = 3.0
+
+# Sites whose cart endpoints reject concurrent mutations (session lock / CSRF rotation).
+# Add-to-cart on these always runs one tab at a time.
+SERIALIZED_CART_SITES = [
+    'amazon.',
+    'farfetch.com',
+    'karllagerfeld.com',
+    'myntra.com',
+    'flipkart.com',
+]
+
+# JS to read the header cart badge (same selectors as main_orchestrator.run_phase1)
+_CART_COUNT_JS = """
+    () => {
+        const cartSelectors = [
+            '[class*="cart-count"]', '[class*="cart-quantity"]',
+            '[class*="minicart-count"]', '[data-cart-count]',
+            '.cart-count', '.cart-quantity', '.minicart-quantity'
+        ];
+
+        for (const selector of cartSelectors) {
+            const el = document.querySelector(selector);
+            if (el) {
+                const num = parseInt(el.textContent.trim());
+                if (!isNaN(num) && num >= 0) {
+                    return num;
+                }
+            }
+        }
+        return -1;
+    }
+"""
+
+# JS to look for a cart line of one product in the rendered cart rows / mini-cart drawer
+_CART_ROW_JS = """
+    (productPath) => {
+        const rowSelectors = [
+            '[class*="cart-item"]', '[class*="cart__item"]', '[class*="line-item"]',
+            '[class*="minicart"] li', '[class*="mini-cart"] li', '.cart_item', 'tr.cart-item'
+        ];
+        const samePath = (href) => {
+            try {
+                return new URL(href, location.href).pathname.replace(/\\/+$/, '').toLowerCase() === productPath;
+            } catch (e) {
+                return false;
+            }
+        };
+        return rowSelectors.some(selector =>
+            Array.from(document.querySelectorAll(selector)).some(row =>
+                Array.from(row.querySelectorAll('a[href]')).some(a => samePath(a.getAttribute('href')))));
+    }
+"""
+
+
+def needs_serialized_cart(url: str) -> bool:
+    """Check if site serializes cart mutations (add-to-cart must not run concurrently)"""
+    url_lower = url.lower()
+    return any(domain in url_lower for domain in SERIALIZED_CART_SITES)
+
+
+async def read_cart_count(page: Page) -> int:
+    """Read cart badge count from header. Returns -1 if no badge is found."""
+    try:
+        return await page.evaluate(_CART_COUNT_JS)
+    except Exception as e:
+        logger.debug(f"MULTI-ITEM CART: Could not read cart count: {e}")
+        return -1
+
+
+async def wait_for_cart_count_above(page: Page, count: int, timeout: float) -> bool:
+    """
+    Wait until the header badge shows more than count items.
+    Product pages are not observed by the checkout state service, so the badge is
+    watched in-page: the check re-runs on DOM mutations only, with no page calls per poll.
+    """
+    try:
+        await page.wait_for_function(f"(count) => ({_CART_COUNT_JS.strip()})() > count",
+                                     arg=count, polling='mutation', timeout=timeout * 1000)
+        return True
+    except Exception as e:
+        logger.debug(f"MULTI-ITEM CART: Cart badge did not increase: {e}")
+        return False
+
+
+def store_key(url: str) -> str:
+    """Store a task URL belongs to (hostname without 'www.'); tabs only share a cart within one store"""
+    host = (urlparse(url or '').hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+async def find_item_in_cart(page: Page, task: Dict[str, Any]) -> Optional[bool]:
+    """
+    Check whether this task's own line item is in the cart.
+
+    Reads the platform cart API (product URL + variant values) and falls back to the
+    rendered cart rows. Returns None when neither source can tell.
+    """
+    found = await item_in_cart(page, task['url'], task.get('selectedVariant'))
+    if found is not None:
+        return found
+    try:
+        path = urlparse(task['url']).path.rstrip('/').lower()
+        if path and await page.evaluate(_CART_ROW_JS, path):
+            return True
+    except Exception as e:
+        logger.debug(f"MULTI-ITEM CART: Could not read cart rows: {e}")
+    return None
+
+
+class MultiItemCartBuilder:
+    """
+    Adds several products to one cart using parallel tabs of a shared context.
+
+    Concurrency is bounded by max_tabs. Add-to-cart clicks are serialized with a
+    lock when the store serializes cart mutations, and an item whose concurrent
+    add fails is retried once under the lock before being reported as failed.
+    """
+
+    def __init__(self, context: BrowserContext, max_tabs: int = DEFAULT_MAX_TABS,
+                 serialize_cart: Optional[bool] = None):
+        self.context = context
+        self.max_tabs = max(1, int(max_tabs or 1))
+        self.serialize_cart = serialize_cart
+        self._tab_slots = asyncio.Semaphore(self.max_tabs)
+        self._cart_lock = asyncio.Lock()
+
+    async def build_cart(self, tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Add all tasks to the cart concurrently.
+
+        Returns:
+            Dict with 'success': bool, 'items': per-task results, 'failed': failed task indices
+        """
+        if self.serialize_cart is None:
+            self.serialize_cart = any(needs_serialized_cart(t.get('url', '')) for t in tasks)
+
+        logger.info(f"MULTI-ITEM CART: Building cart with {len(tasks)} items, "
+                    f"{self.max_tabs} tab(s), serialized cart={self.serialize_cart}")
+
+        results = await asyncio.gather(
+            *[self._run_item(i, task) for i, task in enumerate(tasks)],
+            return_exceptions=True
+        )
+
+        items = []
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                logger.error(f"MULTI-ITEM CART: Item {i + 1} crashed: {result}")
+                result = {'success': False, 'task_index': i, 'error': str(result)}
+            items.append(result)
+
+        failed = [item['task_index'] for item in items if not item.get('success')]
+        if failed:
+            logger.warning(f"MULTI-ITEM CART: {len(failed)} item(s) failed: {failed}")
+        else:
+            logger.info("MULTI-ITEM CART: All items added to cart")
+
+        return {'success': not failed, 'items': items, 'failed': failed}
+
+    async def _run_item(self, index: int, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one item in its own tab, bounded by the tab semaphore"""
+        async with self._tab_slots:
+            page = await self.context.new_page()
+            try:
+                return await self._add_item(page, index, task)
+            finally:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+
+    async def _add_item(self, page: Page, index: int, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Navigate, select variants and add one item to cart"""
+        url = task['url']
+        tag = f"MULTI-ITEM CART: [item {index + 1}]"
+        logger.info(f"{tag} Opening {url}")
+
+        await page.goto(url, wait_until='domcontentloaded', timeout=30000)
+
+        from src.checkout_ai.utils.popup_dismisser import dismiss_popups
+        await dismiss_popups(page)
+
+        variants = task.get('selectedVariant', {}) or {}
+        quantity = int(task.get('quantity', 1) or 1)
+
+        # Storefront API first: variant resolution + cart mutation in one request
+        if self.serialize_cart:
+            async with self._cart_lock:
+                api_result = await add_to_cart_via_platform(page, variants=variants, quantity=quantity)
+        else:
+            api_result = await add_to_cart_via_platform(page, variants=variants, quantity=quantity)
+        if api_result.get('success'):
+            logger.info(f"{tag} Added to cart via {api_result.get('method')}")
+            return {'success': True, 'task_index': index, 'method': api_result.get('method')}
+
+        # Select variants (one batch: dependency order, single verification read)
+        finder = UniversalDOMFinder(page)
+        result = await finder.select_variants(variants)
+        if not result.get('success'):
+            failed = ', '.join(f"{t}={variants.get(t)}" for t in result.get('failed', []))
+            logger.warning(f"{tag} Variants not selected: {failed}")
+            return {
+                'success': False,
+                'task_index': index,
+                'error': f"Could not select {failed}"
+            }
+
+        if quantity > 1:
+            qty_result = await finder.find_variant('quantity', str(quantity))
+            if not qty_result.get('success'):
+                logger.warning(f"{tag} Could not set quantity {quantity}, continuing with default")
+
+        # Add to cart (the only step that mutates shared cart state)
+        cart_result = await self._add_to_cart(page, serialized=self.serialize_cart)
+        if not cart_result.get('success') and not self.serialize_cart:
+            # Conflict handling: store may have rejected a concurrent mutation - retry alone,
+            # unless this item's own cart line shows the add landed despite the reported failure
+            # (the header badge is shared by all tabs, so it cannot tell which add landed)
+            async with self._cart_lock:
+                landed = await find_item_in_cart(page, task)
+            if landed:
+                logger.info(f"{tag} Add reported failure but the item is in the cart, not retrying")
+                cart_result = {'success': True, 'method': 'cart_lookup'}
+            else:
+                logger.info(f"{tag} Concurrent add failed, retrying under cart lock")
+                cart_result = await self._add_to_cart(page, serialized=True)
+
+        if not cart_result.get('success'):
+            return {'success': False, 'task_index': index, 'error': 'Failed to add to cart'}
+
+        logger.info(f"{tag} Added to cart via {cart_result.get('method')}")
+        return {'success': True, 'task_index': index, 'method': cart_result.get('method')}
+
+    async def _add_to_cart(self, page: Page, serialized: bool) -> Dict[str, Any]:
+        """Add to cart, optionally holding the shared cart lock"""
+        # Platform API was already tried in _add_item - go straight to the UI flow
+        if not serialized:
+            return await add_to_cart_robust(page, use_platform_api=False)
+
+        async with self._cart_lock:
+            before = await read_cart_count(page)
+            result = await add_to_cart_robust(page, use_platform_api=False)
+            if result.get('success') and before >= 0:
+                # Hold the lock until the store acknowledges the mutation
+                await wait_for_cart_count_above(page, before, CART_ACK_TIMEOUT)
+            return result
+
+
+async def reconcile_cart(page: Page, tasks: List[Dict[str, Any]], build_result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Final reconciliation after a parallel cart build.
+    Retries failed items sequentially on the main page (skipping items whose own
+    line is already in the cart), then compares the cart badge against the
+    expected total quantity.
+
+    Returns:
+        Dict with 'success': bool, 'expected': int, 'cart_count': int, 'failed': list, 'error': str
+        (a badge below the expected total quantity is a failure too)
+    """
+    failed = list(build_result.get('failed', []))
+    expected = sum(int(t.get('quantity', 1) or 1) for t in tasks)
+
+    if failed:
+        logger.info(f"MULTI-ITEM CART: Reconciling {len(failed)} failed item(s) sequentially")
+        finder = UniversalDOMFinder(page)
+        still_failed = []
+        for index in failed:
+            task = tasks[index]
+            quantity = int(task.get('quantity', 1) or 1)
+            try:
+                await page.goto(task['url'], wait_until='domcontentloaded', timeout=30000)
+                # An add that reported failure may have landed: do not add the item twice
+                if await find_item_in_cart(page, task):
+                    logger.info(f"MULTI-ITEM CART: Item {index + 1} is already in the cart, skipping re-add")
+                    continue
+                api_result = await add_to_cart_via_platform(
+                    page, variants=task.get('selectedVariant'), quantity=quantity
+                )
+                if api_result.get('success'):
+                    continue
+                await finder.select_variants(task.get('selectedVariant', {}) or {})
+                if quantity > 1:
+                    qty_result = await finder.find_variant('quantity', str(quantity))
+                    if not qty_result.get('success'):
+                        logger.warning(f"MULTI-ITEM CART: Could not set quantity {quantity} for item {index + 1}")
+                        still_failed.append(index)
+                        continue
+                result = await add_to_cart_robust(page, use_platform_api=False)
+                if not result.get('success'):
+                    still_failed.append(index)
+            except Exception as e:
+                logger.error(f"MULTI-ITEM CART: Reconcile of item {index + 1} failed: {e}")
+                still_failed.append(index)
+        failed = still_failed
+
+    cart_count = await read_cart_count(page)
+    error = None
+
+    if cart_count >= 0 and cart_count < expected:
+        logger.warning(f"MULTI-ITEM CART: Cart shows {cart_count} item(s), expected {expected}")
+        error = f"Cart shows {cart_count} item(s), expected {expected}"
+    elif cart_count >= 0:
+        logger.info(f"MULTI-ITEM CART: Cart count verified: {cart_count}/{expected}")
+    else:
+        logger.info("MULTI-ITEM CART: Cart badge not found - skipping count check")
+
+    if failed and not error:
+        error = f"Items not added: {failed}"
+
+    return {
+        'success': not error,
+        'expected': expected,
+        'cart_count': cart_count,
+        'failed': failed,
+        'error': error
+    }
+
+
+async def build_multi_item_cart(context: BrowserContext, page: Page, tasks: List[Dict[str, Any]],
+                                max_tabs: int = DEFAULT_MAX_TABS,
+                                serialize_cart: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    Build the cart for all tasks in parallel tabs, then reconcile on the main page.
+
+    Args:
+        context: Shared browser context (tabs share the cart cookie)
+        page: Main page, used for reconciliation and the following checkout
+        tasks: Task dicts with 'url', 'selectedVariant' and 'quantity'
+        max_tabs: Maximum number of product tabs open at once
+        serialize_cart: Force (True) or disable (False) serialized add-to-cart; None = auto-detect
+
+    Returns:
+        Dict with 'success': bool, 'items': list, 'reconciliation': dict
+        (tasks spanning several stores are rejected before anything is added)
+    """
+    stores = sorted({store_key(t.get('url', '')) for t in tasks})
+    if len(stores) > 1:
+        error = f"Tasks span several stores ({', '.join(stores)}); one checkout needs a single store"
+        logger.error(f"MULTI-ITEM CART: {error}")
+        return {
+            'success': False,
+            'items': [],
+            'reconciliation': {
+                'success': False,
+                'expected': sum(int(t.get('quantity', 1) or 1) for t in tasks),
+                'cart_count': -1,
+                'failed': list(range(len(tasks))),
+                'error': error
+            },
+            'error': error
+        }
+
+    builder = MultiItemCartBuilder(context, max_tabs=max_tabs, serialize_cart=serialize_cart)
+    build_result = await builder.build_cart(tasks)
+    reconciliation = await reconcile_cart(page, tasks, build_result)
+
+    return {
+        'success': reconciliation['success'],
+        'items': build_result['items'],
+        'reconciliation': reconciliation,
+        'error': reconciliation['error']
+    }
+
+
+# Export for use in other modules
+__all__ = ['build_multi_item_cart', 'MultiItemCartBuilder', 'reconcile_cart', 'needs_serialized_cart',
+           'find_item_in_cart', 'store_key']
@@ -13,10 +13,15 @@ from src.checkout_ai.core.utils.openai_client import get_client
 from src.checkout_ai.legacy.phase2.smart_form_filler import SmartFormFiller
 from src.checkout_ai.legacy.phase2.checkout_dom_finder import CheckoutDOMFinder
 from src.checkout_ai.core.llm_client import LLMClient
+from src.checkout_ai.dom.page_representation import build_page_representation, page_state_lists
+from src.checkout_ai.dom.checkout_state import get_checkout_state
 
 
 logger = setup_logger('ai_checkout')
 
+# Longest wait for a click to change the page (returns as soon as it does)
+PAGE_CHANGE_TIMEOUT = 5.0
+
 
 # Tool definitions for LLM
 CHECKOUT_TOOLS = {
@@ -36,9 +41,9 @@ CHECKOUT_TOOLS = {
         "returns": {"success": "bool", "error": "str"}
     },
     "get_page_state": {
-        "description": "Get current page state including URL, visible buttons, and form fields",
+        "description": "Get current page state including URL, visible buttons, and form fields ranked by checkout relevance",
         "parameters": {},
-        "returns": {"url": "str", "buttons": "list", "fields": "list"}
+        "returns": {"url": "str", "page": "str", "buttons": "list", "fields": "list"}
     }
 }
 
@@ -46,58 +51,20 @@ CHECKOUT_TOOLS = {
 async def get_page_state(page):
     """Extract current page state for LLM analysis"""
     try:
-        state = await page.evaluate("""
-            () => {
-                // Get all visible buttons and links
-                const buttons = Array.from(document.querySelectorAll('button, a, input[type="submit"], input[type="button"], [role="button"]'))
-                    .filter(el => {
-                        if (!el.offsetParent) return false;
-                        const rect = el.getBoundingClientRect();
-                        return rect.width > 0 && rect.height > 0;
-                    })
-                    .slice(0, 30)
-                    .map(el => ({
-                        tag: el.tagName.toLowerCase(),
-                        text: (el.textContent?.trim() || el.value || '').substring(0, 100),
-                        ariaLabel: el.getAttribute('aria-label') || '',
-                        className: el.className || '',
-                        id: el.id || '',
-                        href: el.href || ''
-                    }));
-                
-                // Get all visible form fields
-                const fields = Array.from(document.querySelectorAll('input:not([type="hidden"]):not([type="checkbox"]):not([type="radio"]), select, textarea'))
-                    .filter(el => el.offsetParent && el.getBoundingClientRect().width > 0)
-                    .slice(0, 15)
-                    .map(el => {
-                        const label = el.closest('label') || document.querySelector(`label[for="${el.id}"]`);
-                        return {
-                            type: el.type || el.tagName.toLowerCase(),
-                            name: el.name || '',
-                            id: el.id || '',
-                            placeholder: el.placeholder || '',
-                            label: label?.textContent?.trim() || '',
-                            autocomplete: el.autocomplete || '',
-                            value: el.value || '',
-                            required: el.required
-                        };
-                    });
-                
-                console.log(`Found ${buttons.length} buttons, ${fields.length} fields`);
-                
-                return {
-                    url: window.location.href,
-                    title: document.title,
-                    buttons: buttons,
-                    fields: fields
-                };
-            }
-        """)
-        
-        return state
+        representation = await build_page_representation(page)
+        lists = page_state_lists(representation)
+        log(logger, 'info', f"Found {len(lists['buttons'])} buttons, {len(lists['fields'])} fields ({representation.get('source')})", 'CHECKOUT', 'DOM')
+        
+        return {
+            "url": representation['url'],
+            "title": representation['title'],
+            "page": representation['text'],
+            "buttons": lists['buttons'],
+            "fields": lists['fields']
+        }
     except Exception as e:
         log(logger, 'error', f"Error getting page state: {e}", 'CHECKOUT', 'DOM')
-        return {"url": page.url, "buttons": [], "fields": []}
+        return {"url": page.url, "page": "", "buttons": [], "fields": []}
 
 
 async def _find_minicart_with_ai(page, llm_client):
@@ -351,24 +318,15 @@ async def ai_proceed_to_checkout(page, llm_client, retry_count=0, max_retries=3)
     # Debug: Log what buttons we found
     log(logger, 'info', f"Found {len(state['buttons'])} buttons on page", 'CHECKOUT', 'DOM')
     for i, btn in enumerate(state['buttons'][:10]):
-        log(logger, 'info', f"Button {i+1}: text='{btn['text'][:50]}' class='{btn['className'][:30]}'", 'CHECKOUT', 'DOM')
-    
-    # Filter and simplify buttons for LLM
-    simplified_buttons = []
-    for btn in state['buttons'][:15]:
-        simplified_buttons.append({
-            'text': btn.get('text', '')[:80],
-            'aria': btn.get('ariaLabel', '')[:50],
-            'class': btn.get('className', '')[:50]
-        })
+        log(logger, 'info', f"Button {i+1}: [{btn['ref']}] text='{btn['text'][:50]}'", 'CHECKOUT', 'DOM')
     
     # Build compact prompt
     prompt = f"""Find checkout button on cart page.
 
-BUTTONS:
-{json.dumps(simplified_buttons)}
+PAGE:
+{state['page']}
 
-TASK: Find button with "checkout", "proceed to checkout", or "secure checkout" in text/aria/class.
+TASK: Find button with "checkout", "proceed to checkout", or "secure checkout" in its name.
 AVOID: "add to cart", "continue shopping", "update cart"
 
 RESPONSE:
@@ -876,15 +834,10 @@ async def _ai_determine_next_action(page, llm_client, current_stage):
     """Use AI to determine next action when stuck"""
     try:
         state = await get_page_state(page)
-        simple_btns = [{"text": b.get('text','')[:60], "class": b.get('className','')[:40]} for b in state['buttons'][:20]]
-        simple_fields = [{"type": f.get('type',''), "name": f.get('name','')[:30], "label": f.get('label','')[:40]} for f in state['fields'][:15]]
-        
         prompt = f"""Determine next action after filling {current_stage}.
 
 CURRENT STATE:
-- URL: {state['url']}
-- Buttons: {simple_btns[:10]}
-- Fields: {simple_fields[:10]}
+{state['page']}
 
 TASK: What should we do next?
 Options:
@@ -929,63 +882,24 @@ async def _check_for_password_field(page):
         return False
 
 
-async def _validate_page_changed(page, initial_url, initial_state, action_description):
-    """Validate that page changed after an action"""
-    await asyncio.sleep(2)  # Wait for changes to take effect
-    
-    new_url = page.url
-    new_state = await get_page_state(page)
-    
-    # Log initial vs new state
-    log(logger, 'info', f'Validation check: Initial URL={initial_url}, New URL={new_url}', 'CHECKOUT', 'VALIDATION')
-    log(logger, 'info', f'Validation check: Initial fields={len(initial_state["fields"])}, New fields={len(new_state["fields"])}', 'CHECKOUT', 'VALIDATION')
-    log(logger, 'info', f'Validation check: Initial buttons={len(initial_state["buttons"])}, New buttons={len(new_state["buttons"])}', 'CHECKOUT', 'VALIDATION')
-    
-    # Check multiple indicators of change
-    url_changed = new_url != initial_url
-    field_count_changed = len(new_state['fields']) != len(initial_state['fields'])
-    button_count_changed = len(new_state['buttons']) != len(initial_state['buttons'])
-    
-    # Check if field names changed (only if counts are same)
-    fields_changed = False
-    if len(initial_state['fields']) == len(new_state['fields']):
-        initial_field_names = set((f.get('name','') + '|' + f.get('id','')) for f in initial_state['fields'] if f.get('name') or f.get('id'))
-        new_field_names = set((f.get('name','') + '|' + f.get('id','')) for f in new_state['fields'] if f.get('name') or f.get('id'))
-        fields_changed = len(initial_field_names) > 0 and initial_field_names != new_field_names
-    
-    # Check if button text changed (only if counts are same)
-    buttons_changed = False
-    if len(initial_state['buttons']) == len(new_state['buttons']):
-        initial_button_texts = set(b.get('text','').strip()[:50] for b in initial_state['buttons'] if b.get('text','').strip())
-        new_button_texts = set(b.get('text','').strip()[:50] for b in new_state['buttons'] if b.get('text','').strip())
-        buttons_changed = len(initial_button_texts) > 0 and initial_button_texts != new_button_texts
-    
-    # Check if page title changed
-    title_changed = initial_state.get('title','') != new_state.get('title','')
-    
-    # Any change is valid
-    page_changed = url_changed or field_count_changed or button_count_changed or fields_changed or buttons_changed or title_changed
-    
-    # Log detailed comparison
-    log(logger, 'info', f'Change detection: URL={url_changed}, FieldCount={field_count_changed}, ButtonCount={button_count_changed}, FieldNames={fields_changed}, ButtonTexts={buttons_changed}, Title={title_changed}', 'CHECKOUT', 'VALIDATION')
+async def _validate_page_changed(page, mark, action_description, timeout=PAGE_CHANGE_TIMEOUT):
+    """
+    Validate that page changed after an action: URL, title, visible field names or
+    button texts differ from the checkout state at `mark` (await state.mark() taken
+    right before the action) and still differ once the page settled.
+    """
+    state = await get_checkout_state(page)
     
-    if page_changed:
-        changes = []
-        if url_changed: changes.append(f'URL: {initial_url} → {new_url}')
-        if field_count_changed: changes.append(f'Fields: {len(initial_state["fields"])} → {len(new_state["fields"])}')
-        if button_count_changed: changes.append(f'Buttons: {len(initial_state["buttons"])} → {len(new_state["buttons"])}')
-        if fields_changed: changes.append('Field names changed')
-        if buttons_changed: changes.append('Button texts changed')
-        if title_changed: changes.append(f'Title changed')
-        
-        log(logger, 'info', f'✓ Page changed after {action_description}: {" | ".join(changes)}', 'CHECKOUT', 'VALIDATION')
+    if await state.changed(mark, timeout=timeout):
+        log(logger, 'info', f'✓ Page changed after {action_description}: {state.page_type} page, '
+            f'{len(state.snapshot.get("fields", []))} fields, {len(state.snapshot.get("buttons", []))} buttons | {state.url}', 'CHECKOUT', 'VALIDATION')
         return True
-    else:
-        log(logger, 'error', f'✗ VALIDATION FAILED: No page change detected after {action_description}', 'CHECKOUT', 'VALIDATION')
-        log(logger, 'error', f'  URL unchanged: {initial_url}', 'CHECKOUT', 'VALIDATION')
-        log(logger, 'error', f'  Fields unchanged: {len(initial_state["fields"])} fields', 'CHECKOUT', 'VALIDATION')
-        log(logger, 'error', f'  Buttons unchanged: {len(initial_state["buttons"])} buttons', 'CHECKOUT', 'VALIDATION')
-        return False
+    
+    log(logger, 'error', f'✗ VALIDATION FAILED: No page change detected after {action_description}', 'CHECKOUT', 'VALIDATION')
+    log(logger, 'error', f'  URL unchanged: {state.url}', 'CHECKOUT', 'VALIDATION')
+    if state.has_errors:
+        log(logger, 'error', f'  Validation errors: {state.validation_errors}', 'CHECKOUT', 'VALIDATION')
+    return False
 
 
 async def _prompt_user_for_password():
@@ -1282,10 +1196,10 @@ async def run_ai_checkout_flow(page, customer_data, user_prompt_callback=None):
             ['save', 'submit']
         ]
         continue_clicked = False
-        initial_url = page.url
-        initial_state = await get_page_state(page)
+        checkout_state = await get_checkout_state(page)
         
         for keywords in continue_keywords:
+            mark = await checkout_state.mark()
             result = await execute_tool(page, 'find_and_click_button', {
                 'keywords': keywords,
                 'max_retries': 1
@@ -1294,7 +1208,7 @@ async def run_ai_checkout_flow(page, customer_data, user_prompt_callback=None):
                 log(logger, 'info', f'Clicked button with keywords: {keywords}', 'CHECKOUT', 'CORE')
                 
                 # Validate: Check if ANY change happened on page
-                if await _validate_page_changed(page, initial_url, initial_state, f'clicking {keywords}'):
+                if await _validate_page_changed(page, mark, f'clicking {keywords}'):
                     continue_clicked = True
                     await asyncio.sleep(1)
                     break
@@ -1329,10 +1243,10 @@ async def run_ai_checkout_flow(page, customer_data, user_prompt_callback=None):
         ]
         
         payment_clicked = False
-        initial_url = page.url
         
         for attempt, keywords in enumerate(payment_keywords):
             log(logger, 'info', f'Attempt {attempt + 1}/{len(payment_keywords)}: Trying keywords {keywords}', 'CHECKOUT', 'CORE')
+            mark = await checkout_state.mark()
             result = await execute_tool(page, 'find_and_click_button', {
                 'keywords': keywords,
                 'max_retries': 2
@@ -1340,23 +1254,13 @@ async def run_ai_checkout_flow(page, customer_data, user_prompt_callback=None):
             
             if result.get('success'):
                 log(logger, 'info', f'✓ Clicked button with keywords: {keywords}', 'CHECKOUT', 'CORE')
-                await asyncio.sleep(3)
                 
-                # Validate page change
-                current_url = page.url
-                if current_url != initial_url:
-                    log(logger, 'info', f'✓ Page changed: {initial_url} -> {current_url}', 'CHECKOUT', 'CORE')
+                # Validate page change (URL, fields or buttons - some sites don't change URL)
+                if await _validate_page_changed(page, mark, f'clicking {keywords}'):
                     payment_clicked = True
                     break
                 else:
-                    # Check if form fields changed (some sites don't change URL)
-                    new_state = await get_page_state(page)
-                    if len(new_state.get('buttons', [])) != len(initial_state.get('buttons', [])):
-                        log(logger, 'info', '✓ Page state changed (different buttons)', 'CHECKOUT', 'CORE')
-                        payment_clicked = True
-                        break
-                    else:
-                        log(logger, 'warning', f'Button clicked but no page change detected, trying next keywords...', 'CHECKOUT', 'CORE')
+                    log(logger, 'warning', f'Button clicked but no page change detected, trying next keywords...', 'CHECKOUT', 'CORE')
         
         if not payment_clicked:
             log(logger, 'error', 'CRITICAL: Failed to click Continue to Payment button', 'CHECKOUT', 'CORE')
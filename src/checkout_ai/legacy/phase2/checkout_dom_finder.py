@@ -5,10 +5,14 @@ Handles buttons, form inputs, and dropdowns
 """
 
 import asyncio
-import time
 from datetime import datetime
-from src.checkout_ai.dom.service import UniversalDOMFinder
-from src.checkout_ai.legacy.phase2.smart_form_filler import SmartFormFiller
+from functools import lru_cache
+from src.checkout_ai.dom.service import UniversalDOMFinder, JS_ASSETS_DIR
+from src.checkout_ai.dom.layout_snapshot import capture_layout
+from src.checkout_ai.utils.keyword_matcher import with_keyword_matcher
+from src.checkout_ai.legacy.phase2.smart_form_filler import SmartFormFiller, get_state_aliases
+from src.checkout_ai.utils.checkout_keywords import COUNTRY_LABELS
+from src.checkout_ai.utils.country_detector import get_all_countries
 from src.checkout_ai.utils.logger_config import setup_logger, log
 
 logger = setup_logger('checkout_dom')
@@ -154,40 +158,6 @@ async def interact_with_stripe_iframe(page, label_keywords, value):
         return {'success': False, 'error': str(e)}
 
 
-async def wait_for_dependent_dropdown(page, parent_selector=None, timeout=3000):
-    """
-    Wait for a new <select> element that appears after interacting with a parent element.
-    Returns True if a dependent dropdown is found/ready, otherwise False.
-    """
-    try:
-        # If we have a specific parent selector, look for siblings/descendants
-        if parent_selector:
-            # Try finding a select that is a sibling or inside a common container
-            has_dependent = await page.evaluate("""
-                (selector) => {
-                    const parent = document.querySelector(selector);
-                    if (!parent) return false;
-                    
-                    // Look for a form or container
-                    const container = parent.closest('form') || parent.closest('.form-group') || parent.parentElement?.parentElement;
-                    if (!container) return false;
-                    
-                    // Check if there's another select in the container that wasn't there or is now visible
-                    const selects = container.querySelectorAll('select');
-                    return selects.length > 0;
-                }
-            """, parent_selector)
-            
-            if has_dependent:
-                return True
-
-        # Generic wait for any select to be visible and stable
-        await page.wait_for_selector('select:visible', timeout=timeout)
-        return True
-    except Exception:
-        return False
-
-
 async def find_and_click_button(page, keywords, max_retries=3):
     """
     Find and click button by keyword matching with scoring system
@@ -475,6 +445,54 @@ async def get_all_form_fields(page):
         return []
 
 
+# Attribute the layout pass tags candidate fields with ("<marker>-<frame>-<n>")
+LAYOUT_TAG_ATTRIBUTE = 'data-ck-layout'
+
+# Tags every fillable field (Shadow DOM included) without touching style or layout
+TAG_FIELDS_JS = """
+    (args) => {
+        const { prefix, attribute } = args;
+        const selectors = 'input:not([type="checkbox"]):not([type="radio"]):not([type="hidden"]), select, textarea';
+        let count = 0;
+        const visit = (root) => {
+            root.querySelectorAll(selectors).forEach(el => el.setAttribute(attribute, `${prefix}-${count++}`));
+            root.querySelectorAll('*').forEach(el => { if (el.shadowRoot) visit(el.shadowRoot); });
+        };
+        visit(document);
+        return count;
+    }
+"""
+
+
+async def _visible_field_order(page, frames, marker):
+    """
+    Visible fields per frame, top to bottom, from one DOMSnapshot capture
+    Returns: {frame index: [tag, ...]} - frames missing from the snapshot
+    (out-of-process iframes) are left out and measure in-page instead
+    """
+    counts = await asyncio.gather(*[
+        frame.evaluate(TAG_FIELDS_JS, {'prefix': f"{marker}-{i}", 'attribute': LAYOUT_TAG_ATTRIBUTE})
+        for i, frame in enumerate(frames)
+    ], return_exceptions=True)
+    if not any(isinstance(count, int) and count > 0 for count in counts):
+        return {}
+
+    snapshot = await capture_layout(page)
+    if not snapshot:
+        return {}
+
+    placed = {}
+    for tag, nodes in snapshot.nodes_with_attribute(LAYOUT_TAG_ATTRIBUTE).items():
+        if not tag.startswith(f"{marker}-"):
+            continue
+        frame_index = int(tag.split('-')[-2])
+        node = nodes[0]
+        placed.setdefault(frame_index, [])
+        if snapshot.has_box(node):
+            placed[frame_index].append((snapshot.bounds(node)[1], tag))
+    return {i: [tag for _, tag in sorted(fields)] for i, fields in placed.items()}
+
+
 async def find_input_by_label(page, label_keywords, retry_count=0):
     """
     IMPROVED: Find input using enhanced strategies with better filtering
@@ -499,20 +517,21 @@ async def find_input_by_label(page, label_keywords, retry_count=0):
         best_global_element = None
         best_global_method = None
         
-        frames = page.frames
-        for frame in frames:
+        frames = [frame for frame in page.frames if not frame.is_detached()]
+        
+        # Visibility and top-to-bottom order for all frames from one layout snapshot
+        layout_order = await _visible_field_order(page, frames, marker)
+        
+        for frame_index, frame in enumerate(frames):
             try:
                 if frame.is_detached():
                     continue
 
-                result = await frame.evaluate("""
+                result = await frame.evaluate(with_keyword_matcher("""
                     (args) => {
-                        const { keywords, marker } = args;
-                        
-                        function normalize(text) {
-                            if (!text) return '';
-                            return text.toLowerCase().trim().replace(/[-_\\s]/g, '');
-                        }
+                        const { keywords, marker, layout, layoutAttribute } = args;
+                        const matcher = window.__checkoutKeywords.compile(keywords);
+                        const normalize = window.__checkoutKeywords.compact;
                         
                         // Recursive function to collect inputs from Shadow DOMs
                         function collectInputs(root) {
@@ -537,35 +556,51 @@ async def find_input_by_label(page, label_keywords, retry_count=0):
                         const fields = collectInputs(document);
                         
                         // Filter visible and enabled fields
-                        const visibleFields = fields.filter(f => {
-                            if (!f.offsetParent) return false;
-                            if (f.disabled) return false;
-                            const rect = f.getBoundingClientRect();
-                            return rect.width > 0 && rect.height > 0;
-                        }).sort((a, b) => {
-                            const rectA = a.getBoundingClientRect();
-                            const rectB = b.getBoundingClientRect();
-                            return rectA.top - rectB.top;
-                        });
+                        let visibleFields;
+                        if (layout) {
+                            // Already measured and ordered from the page's layout snapshot
+                            const byTag = new Map(fields.map(f => [f.getAttribute(layoutAttribute), f]));
+                            visibleFields = layout.map(tag => byTag.get(tag)).filter(f => f && !f.disabled);
+                        } else {
+                            visibleFields = fields.filter(f => {
+                                if (!f.offsetParent) return false;
+                                if (f.disabled) return false;
+                                const rect = f.getBoundingClientRect();
+                                return rect.width > 0 && rect.height > 0;
+                            }).sort((a, b) => {
+                                const rectA = a.getBoundingClientRect();
+                                const rectB = b.getBoundingClientRect();
+                                return rectA.top - rectB.top;
+                            });
+                        }
                         
                         console.log(`Searching ${visibleFields.length} visible fields for: ${keywords[0]}`);
                         
-                        for (const keyword of keywords) {
-                            const normKeyword = normalize(keyword);
-                            
-                            for (const field of visibleFields) {
-                                // Skip if already filled with non-empty value
-                                if (field.value && field.value.trim().length > 0) {
-                                    continue;
-                                }
-                                
+                        // Each empty field's label/attributes are read, normalized and scanned for
+                        // all keywords once; the keyword loop below only checks the hit sets
+                        const candidates = visibleFields
+                            .filter(field => !(field.value && field.value.trim().length > 0))
+                            .map(field => {
                                 const label = field.closest('label') || document.querySelector(`label[for="${field.id}"]`);
-                                const labelText = normalize(label?.textContent || '');
-                                const fieldName = normalize(field.name || '');
-                                const fieldId = normalize(field.id || '');
-                                const placeholder = normalize(field.placeholder || '');
-                                const autocomplete = normalize(field.getAttribute('autocomplete') || '');
-                                const dataTestId = normalize(field.getAttribute('data-testid') || '');
+                                const texts = {
+                                    label: normalize(label?.textContent || ''),
+                                    name: normalize(field.name || ''),
+                                    id: normalize(field.id || ''),
+                                    placeholder: normalize(field.placeholder || ''),
+                                    autocomplete: normalize(field.getAttribute('autocomplete') || ''),
+                                    testid: normalize(field.getAttribute('data-testid') || '')
+                                };
+                                const hits = {};
+                                for (const [source, text] of Object.entries(texts)) hits[source] = matcher.hits(text, true);
+                                return { field, label, texts, hits };
+                            });
+                        
+                        for (let k = 0; k < keywords.length; k++) {
+                            const normKeyword = normalize(keywords[k]);
+                            
+                            for (const { field, label, texts, hits } of candidates) {
+                                const { label: labelText, name: fieldName, id: fieldId, placeholder, autocomplete } = texts;
+                                const longKeyword = normKeyword.length > 2;
                                 
                                 let matched = false;
                                 let matchMethod = '';
@@ -574,28 +609,22 @@ async def find_input_by_label(page, label_keywords, retry_count=0):
                                 if ((normKeyword.includes('zip') || normKeyword.includes('postal') || normKeyword.includes('postcode')) && (autocomplete.includes('postal') || autocomplete.includes('zip'))) {
                                     matched = true;
                                     matchMethod = 'autocomplete-postal';
-                                } else if (fieldId.includes(normKeyword) && normKeyword.length > 2) {
+                                } else if (hits.id.has(k) && longKeyword) {
                                     matched = true;
                                     matchMethod = 'id';
-                                } else if (fieldName.includes(normKeyword) && normKeyword.length > 2) {
+                                } else if (hits.name.has(k) && longKeyword) {
                                     matched = true;
                                     matchMethod = 'name';
-                                } else if (dataTestId.includes(normKeyword) && normKeyword.length > 2) {
+                                } else if (hits.testid.has(k) && longKeyword) {
                                     matched = true;
                                     matchMethod = 'data-testid';
-                                } else if (autocomplete && autocomplete.includes(normKeyword)) {
+                                } else if (autocomplete && hits.autocomplete.has(k)) {
                                     matched = true;
                                     matchMethod = 'autocomplete';
-                                } else if (labelText.includes(normKeyword) && normKeyword.length > 2) {
+                                } else if (hits.label.has(k) && longKeyword) {
                                     matched = true;
                                     matchMethod = 'label';
-                                } else if (fieldName.includes(normKeyword) && normKeyword.length > 2) {
-                                    matched = true;
-                                    matchMethod = 'name';
-                                } else if (fieldId.includes(normKeyword) && normKeyword.length > 2) {
-                                    matched = true;
-                                    matchMethod = 'id';
-                                } else if (placeholder.includes(normKeyword) && normKeyword.length > 2) {
+                                } else if (hits.placeholder.has(k) && longKeyword) {
                                     matched = true;
                                     matchMethod = 'placeholder';
                                 }
@@ -730,7 +759,8 @@ async def find_input_by_label(page, label_keywords, retry_count=0):
                         
                         return { found: false };
                     }
-                """, {'keywords': label_keywords, 'marker': marker})
+                """), {'keywords': label_keywords, 'marker': marker,
+                      'layout': layout_order.get(frame_index), 'layoutAttribute': LAYOUT_TAG_ATTRIBUTE})
 
                 if result.get('found'):
                     best_global_element = await frame.query_selector(f"[data-checkout-marker='{result['marker']}']")
@@ -1020,130 +1050,163 @@ async def select_address_autocomplete(page):
         log(logger, 'warning', f'Autocomplete selection error: {e}', 'ADDRESS_FILL', 'DOM')
         return {'success': False}
 
-async def wait_for_dependent_dropdown(page, timeout=5.0):
+# Dropdowns wait for the option they need instead of sleeping: the in-page engine
+# (js_assets/dropdown_engine.js) re-checks on every DOM mutation and resolves as soon
+# as the option is offered. The timeouts below only cap how long a site may take.
+DROPDOWN_TIMEOUT_MS = 5000
+CUSTOM_OPTION_TIMEOUT_MS = 1500
+
+# Spellings sites use for a country besides its name and ISO code
+COUNTRY_ALIASES = {
+    'US': ['USA', 'United States of America', 'America'],
+    'GB': ['UK', 'Great Britain', 'England'],
+    'IN': ['IND'],
+    'CA': ['CAN'],
+    'AU': ['AUS'],
+}
+
+
+@lru_cache(maxsize=1)
+def dropdown_engine_js() -> str:
+    return (JS_ASSETS_DIR / 'dropdown_engine.js').read_text(encoding='utf-8')
+
+
+def is_country_dropdown(label_keywords):
+    return any(k in label_keywords[0].lower() for k in ['country', 'nation'])
+
+
+def country_aliases(value):
+    """'US' -> ['US', 'United States', 'USA', ...]; unknown countries are returned as given"""
+    value_upper = value.upper().strip()
+    for code, config in get_all_countries().items():
+        names = [code, config['name'], *COUNTRY_ALIASES.get(code, [])]
+        if value_upper in (name.upper() for name in names):
+            return [value] + [name for name in names if name.upper() != value_upper]
+    return [value]
+
+
+def dropdown_candidates(label_keywords, option_value):
+    """Option texts/values that count as the requested one, most specific first"""
+    if is_country_dropdown(label_keywords):
+        return country_aliases(option_value)
+    return [option_value] + get_state_aliases(option_value)
+
+
+async def select_dropdown_option(page, label_keywords, option_value, timeout_ms=DROPDOWN_TIMEOUT_MS):
     """
-    Waits for a dependent dropdown to appear or update after a selection.
-    This is a heuristic approach, checking for changes in the number of options
-    or the visibility of a new select element.
+    Select an option in a native <select> or a custom (ARIA listbox / div-ul) dropdown.
+    Waits - event-driven - until a dropdown labelled with label_keywords offers the
+    option, so freshly repopulated dependent dropdowns need no sleep.
+    Returns: {'success': bool, 'text': str, 'error': str}
     """
-    start_time = time.time()
-    initial_select_count = len(await page.query_selector_all('select'))
-    
-    log(logger, 'info', f"Waiting for dependent dropdowns (initial count: {initial_select_count})...", 'ADDRESS_FILL', 'DOM')
+    candidates = dropdown_candidates(label_keywords, option_value)
+    engine = dropdown_engine_js()
+    # "Country/region" selects must not match the state keywords ('region')
+    exclude = [] if is_country_dropdown(label_keywords) else COUNTRY_LABELS
+    found = await page.evaluate(engine, {
+        'mode': 'select', 'keywords': label_keywords, 'exclude': exclude,
+        'candidates': candidates, 'timeoutMs': timeout_ms
+    })
 
-    while time.time() - start_time < timeout:
-        await asyncio.sleep(0.5) # Check every 0.5 seconds
-        current_select_count = len(await page.query_selector_all('select'))
-        
-        if current_select_count > initial_select_count:
-            log(logger, 'info', f"New dropdown detected (count: {current_select_count}). Dependent dropdown likely updated.", 'ADDRESS_FILL', 'DOM')
-            return True
-        
-        # Also check if existing dropdowns have changed their options (e.g., state list updated)
-        # This is more complex to implement robustly without knowing the specific dropdown.
-        # For now, rely on new dropdowns or a general stability wait.
-        
-    log(logger, 'info', "Dependent dropdown wait timed out or no changes detected.", 'ADDRESS_FILL', 'DOM')
-    return False
+    if not found.get('found'):
+        detail = f" (first options: {found.get('options')})" if found.get('options') else ''
+        log(logger, 'warning', f"No dropdown offers {label_keywords[0]}='{option_value}': {found.get('reason')}{detail}", 'ADDRESS_FILL', 'DOM')
+        return {'success': False, 'error': f"Dropdown option not found: {label_keywords[0]} = {option_value}"}
 
-    return {'success': False, 'error': 'Max retries exceeded'}
+    if found['kind'] == 'native':
+        if found.get('fallback'):
+            log(logger, 'warning', f"No dropdown matched keywords {label_keywords}, using the visible dropdown that offers '{option_value}'", 'ADDRESS_FILL', 'DOM')
+        select = page.locator(found['selector'])
+        await select.scroll_into_view_if_needed()
+        # select_option dispatches input/change itself
+        await select.select_option(value=found['value'])
+        log(logger, 'info', f"✓ Selected '{found['text']}' (value='{found['value']}')", 'ADDRESS_FILL', 'DOM')
+        return {'success': True, 'text': found['text']}
+
+    # Custom dropdown: open it, then wait for the option to render
+    log(logger, 'info', f"Using custom dropdown for {label_keywords[0]}='{option_value}'", 'ADDRESS_FILL', 'DOM')
+    trigger = page.locator(found['selector'])
+    await trigger.scroll_into_view_if_needed()
+    await trigger.click()
+
+    option_args = {'mode': 'option', 'candidates': candidates, 'trigger': found['selector'],
+                   'timeoutMs': CUSTOM_OPTION_TIMEOUT_MS}
+    option = await page.evaluate(engine, option_args)
+    if not option.get('found'):
+        # Searchable comboboxes only render options matching the typed text
+        await page.keyboard.type(option_value[:3])
+        option = await page.evaluate(engine, option_args)
+
+    if option.get('found'):
+        element = page.locator(option['selector'])
+        await element.scroll_into_view_if_needed()
+        await element.click()
+        log(logger, 'info', f"✓ Selected custom option '{option['text']}'", 'ADDRESS_FILL', 'DOM')
+        return {'success': True, 'text': option['text']}
+
+    log(logger, 'warning', f"Custom option '{option_value}' not found in list", 'ADDRESS_FILL', 'DOM')
+    # Click outside to close
+    await page.mouse.click(0, 0)
+    return {'success': False, 'error': 'Option not found'}
+
+
+async def arm_dependent_dropdown(page, label_keywords=None):
+    """
+    Record the option lists of all selects before a selection that others depend on.
+    Returns the token for wait_for_dependent_dropdown (None if arming failed).
+    """
+    try:
+        result = await page.evaluate(dropdown_engine_js(), {'mode': 'arm', 'keywords': label_keywords or []})
+        return result.get('token')
+    except Exception as e:
+        log(logger, 'debug', f"Could not arm dependent dropdown wait: {e}", 'ADDRESS_FILL', 'DOM')
+        return None
+
+
+async def disarm_dependent_dropdown(page, token):
+    """Drop an armed baseline when the selection it was armed for did not happen"""
+    if token is None:
+        return
+    try:
+        await page.evaluate(dropdown_engine_js(), {'mode': 'disarm', 'token': token})
+    except Exception:
+        pass
+
+
+async def wait_for_dependent_dropdown(page, label_keywords=None, timeout=5.0, token=None):
+    """
+    Wait for dropdowns that depend on the last selection (country -> state list).
+    Returns as soon as a select (labelled with label_keywords, if given) changed its
+    options and the DOM went quiet, or when the page shows no reaction at all.
+    Pass the token of arm_dependent_dropdown (armed before the selection) so a
+    repopulation that already happened during the selection is seen.
+    Returns True if a dependent dropdown was repopulated.
+    """
+    try:
+        result = await page.evaluate(dropdown_engine_js(), {
+            'mode': 'dependent', 'keywords': label_keywords or [], 'token': token,
+            'timeoutMs': int(timeout * 1000)
+        })
+    except Exception as e:
+        # Selection navigated or re-rendered the frame
+        log(logger, 'info', f"Dependent dropdown wait interrupted: {e}", 'ADDRESS_FILL', 'DOM')
+        return False
+
+    if result['changed']:
+        log(logger, 'info', f"Dependent dropdown updated after {result['waitedMs']}ms", 'ADDRESS_FILL', 'DOM')
+    else:
+        log(logger, 'info', f"No dependent dropdown changes ({result['mutations']} mutations, {result['waitedMs']}ms)", 'ADDRESS_FILL', 'DOM')
+    return result['changed']
 
 
 async def interact_with_custom_dropdown(page, label_keywords, option_value):
     """
-    Handle custom dropdowns (div/ul based) that require:
-    1. Click trigger to open
-    2. Scroll to find option
-    3. Click option
+    Handle custom dropdowns (div/ul based): open the trigger, wait for the
+    option to render, click it. Native selects with the same label are used too.
     """
     try:
         log(logger, 'info', f"Attempting custom dropdown interaction for {label_keywords[0]}='{option_value}'", 'ADDRESS_FILL', 'DOM')
-        
-        # 1. Find the trigger element
-        # Look for something that looks like a dropdown trigger near the label
-        trigger = await page.evaluate_handle("""
-            (keywords) => {
-                const labels = Array.from(document.querySelectorAll('label'));
-                for (const label of labels) {
-                    if (keywords.some(k => label.textContent.toLowerCase().includes(k.toLowerCase()))) {
-                        // Look for a sibling or child that acts as a trigger
-                        // Common patterns: div[role="combobox"], div.select, button[aria-haspopup]
-                        const container = label.parentElement;
-                        const trigger = container.querySelector('[role="combobox"], [aria-haspopup], .select, .dropdown, .picker');
-                        if (trigger) return trigger;
-                        
-                        // Or maybe the label target itself is a custom div
-                        if (label.htmlFor) {
-                            const target = document.getElementById(label.htmlFor);
-                            if (target && target.tagName !== 'SELECT' && target.tagName !== 'INPUT') return target;
-                        }
-                    }
-                }
-                
-                // Fallback: Look for any element with 'country' or keywords in class/id
-                for (const kw of keywords) {
-                    const el = document.querySelector(`[id*="${kw}"], [class*="${kw}"]`);
-                    if (el && (el.getAttribute('role') === 'combobox' || el.classList.contains('select'))) return el;
-                }
-                return null;
-            }
-        """, label_keywords)
-        
-        if not trigger:
-            log(logger, 'warning', "Could not find custom dropdown trigger", 'ADDRESS_FILL', 'DOM')
-            return {'success': False}
-
-        # 2. Click to open
-        await trigger.scroll_into_view_if_needed()
-        await trigger.click()
-        await asyncio.sleep(0.5) # Wait for animation/render
-        
-        # 3. Find and select option
-        # We look for the option text in the entire document (since it might be in a portal/overlay)
-        # and ensure it's visible.
-        
-        # Try to type to filter if it's a combobox
-        try:
-            await page.keyboard.type(option_value[:3])
-            await asyncio.sleep(0.5)
-        except:
-            pass
-
-        # Find option element
-        option_element = await page.evaluate_handle("""
-            (text) => {
-                // Helper to normalize
-                const norm = t => t.toLowerCase().trim().replace(/[^a-z0-9]/g, '');
-                const target = norm(text);
-                
-                // Look in common list containers
-                const options = Array.from(document.querySelectorAll('[role="option"], li, .item, .option'));
-                
-                for (const opt of options) {
-                    if (!opt.offsetParent) continue; // Skip invisible
-                    
-                    const optText = norm(opt.textContent);
-                    if (optText === target || optText.includes(target)) {
-                        return opt;
-                    }
-                }
-                return null;
-            }
-        """, option_value)
-        
-        if option_element:
-            # Scroll and click
-            await option_element.scroll_into_view_if_needed()
-            await option_element.click()
-            log(logger, 'info', f"✓ Selected custom option '{option_value}'", 'ADDRESS_FILL', 'DOM')
-            return {'success': True}
-            
-        log(logger, 'warning', f"Custom option '{option_value}' not found in list", 'ADDRESS_FILL', 'DOM')
-        
-        # Try clicking outside to close
-        await page.mouse.click(0, 0)
-        return {'success': False, 'error': 'Option not found'}
-        
+        return await select_dropdown_option(page, label_keywords, option_value)
     except Exception as e:
         log(logger, 'error', f"Custom dropdown error: {e}", 'ADDRESS_FILL', 'DOM')
         return {'success': False, 'error': str(e)}
@@ -1151,163 +1214,36 @@ async def interact_with_custom_dropdown(page, label_keywords, option_value):
 
 async def find_and_select_dropdown(page, label_keywords, option_value, max_retries=2):
     """
-    IMPROVED: Find and select dropdown with better matching
+    Find and select dropdown (native or custom) by label keywords.
+    A missing option is final - the engine already waited for it; only errors
+    (element re-rendered mid-action) are retried.
     Returns: {'success': bool, 'error': str}
     """
     for attempt in range(max_retries):
         try:
             log(logger, 'info', f"Finding dropdown: {label_keywords[0]} = {option_value} (attempt {attempt+1})", 'ADDRESS_FILL', 'DOM')
-            
-            await wait_for_page_stability(page)
-            
-            all_selects = await page.query_selector_all('select')
-            log(logger, 'info', f"Found {len(all_selects)} total select elements", 'ADDRESS_FILL', 'DOM')
-            
-            target_select = None
+            # Country selections repopulate dependent fields: take their baseline before selecting
+            country = is_country_dropdown(label_keywords)
+            token = await arm_dependent_dropdown(page) if country else None
+            try:
+                result = await select_dropdown_option(page, label_keywords, option_value)
+            except Exception:
+                await disarm_dependent_dropdown(page, token)
+                raise
+
+            # If this was a country selection, wait for dependent fields
+            if result['success'] and country:
+                log(logger, 'info', "Country selected, waiting for dependent fields...", 'ADDRESS_FILL', 'DOM')
+                await wait_for_dependent_dropdown(page, token=token)
+            else:
+                await disarm_dependent_dropdown(page, token)
+            return result
 
-            # First pass: Try to match by keywords
-            for select in all_selects:
-                # Check if visible
-                is_visible = await select.is_visible()
-                if not is_visible:
-                    continue
-                    
-                # Check if this is the right select by label/name
-                select_info = await select.evaluate('''el => {
-                    const label = el.closest('label') || document.querySelector(`label[for="${el.id}"]`);
-                    return {
-                        name: el.name || '',
-                        id: el.id || '',
-                        label: label?.textContent?.trim() || ''
-                    };
-                }''')
-                
-                # Check if this select matches our keywords
-                select_text = f"{select_info['name']} {select_info['id']} {select_info['label']}".lower()
-                if any(keyword.lower() in select_text for keyword in label_keywords):
-                    target_select = select
-                    log(logger, 'info', f"Matched select by keywords: {select_info['label'] or select_info['name'] or select_info['id']}", 'ADDRESS_FILL', 'DOM')
-                    break
-            
-            # Fallback: If no keyword match, try the first visible select
-            if not target_select:
-                log(logger, 'warning', f"No dropdown matched keywords {label_keywords}, trying first visible dropdown", 'ADDRESS_FILL', 'DOM')
-                for select in all_selects:
-                    is_visible = await select.is_visible()
-                    if is_visible:
-                        target_select = select
-                        log(logger, 'info', f"Using first visible select: {await select.evaluate('el => el.name || el.id || el.outerHTML.substring(0, 50)')}", 'ADDRESS_FILL', 'DOM')
-                        break
-            
-            # If standard select found, use it
-            if target_select:
-                # Check if this is a country field
-                is_country = any(k in label_keywords[0].lower() for k in ['country', 'nation', 'region'])
-                
-                # Scroll into view
-                await target_select.scroll_into_view_if_needed()
-                
-                # Get all options to find the best match
-                options = await target_select.query_selector_all('option')
-                
-                # Map for common country codes/names if needed
-                country_map = {
-                    'US': ['United States', 'USA', 'US'],
-                    'IN': ['India', 'IND', 'IN'],
-                    'CA': ['Canada', 'CAN', 'CA'],
-                    'GB': ['United Kingdom', 'UK', 'GB', 'Great Britain'],
-                    'AU': ['Australia', 'AUS', 'AU']
-                }
-                
-                option_norm = normalize_text(option_value)
-                values_to_try = [option_value]
-                
-                # Try direct selection first (fastest)
-                found_option = False
-                for val in values_to_try:
-                    try:
-                        await target_select.select_option(value=val)
-                        found_option = True
-                        log(logger, 'info', f"✓ Selected by value: '{val}'", 'ADDRESS_FILL', 'DOM')
-                        break
-                    except:
-                        try:
-                            await target_select.select_option(label=val)
-                            found_option = True
-                            log(logger, 'info', f"✓ Selected by label: '{val}'", 'ADDRESS_FILL', 'DOM')
-                            break
-                        except:
-                            pass
-                
-                # Fallback: Iterate options to find fuzzy match if direct selection failed
-                if not found_option:
-                    for option in options:
-                        text = await option.text_content()
-                        value = await option.get_attribute('value')
-                        
-                        if not value or value.strip() == '':
-                            continue
-                            
-                        text_norm = normalize_text(text or '')
-                        value_norm = normalize_text(value or '')
-                        
-                        matched_val = None
-                        for try_value in values_to_try:
-                            try_norm = normalize_text(try_value)
-                            
-                            # Exact match (case insensitive)
-                            if (text.upper() == try_value.upper() or value.upper() == try_value.upper() or
-                                text_norm == try_norm or value_norm == try_norm):
-                                matched_val = value
-                                break
-                                
-                            # Partial match
-                            if len(try_norm) > 2 and (try_norm in text_norm or try_norm in value_norm):
-                                matched_val = value
-                                break
-                        
-                        if matched_val:
-                            try:
-                                await target_select.select_option(value=matched_val)
-                                found_option = True
-                                log(logger, 'info', f"✓ Selected by fuzzy match: '{text}' (value='{matched_val}')", 'ADDRESS_FILL', 'DOM')
-                                break
-                            except Exception as e:
-                                log(logger, 'warning', f"Failed to select matched option: {e}", 'ADDRESS_FILL', 'DOM')
-
-                if found_option:
-                    # Trigger events to ensure page reacts
-                    await asyncio.sleep(0.3)
-                    await target_select.evaluate('el => el.dispatchEvent(new Event("change", {bubbles: true}))')
-                    
-                    # If this was a country selection, wait for dependent fields
-                    if is_country:
-                        log(logger, 'info', "Country selected, waiting for dependent fields...", 'ADDRESS_FILL', 'DOM')
-                        await asyncio.sleep(1.0) # Give AJAX time to fire
-                        await wait_for_dependent_dropdown(page)
-                        await wait_for_page_stability(page)
-                        
-                    return {'success': True}
-            
-            # Fallback to Custom Dropdown Strategy if no select found or select failed
-            log(logger, 'info', "Standard select failed or not found, trying custom dropdown strategy...", 'ADDRESS_FILL', 'DOM')
-            custom_result = await interact_with_custom_dropdown(page, label_keywords, option_value)
-            if custom_result['success']:
-                return custom_result
-            
-            if attempt < max_retries - 1:
-                await asyncio.sleep(1.5)
-                continue
-            
-            return {'success': False, 'error': f'Dropdown option not found: {label_keywords[0]} = {option_value}'}
-            
         except Exception as e:
             log(logger, 'error', f"Dropdown error (attempt {attempt+1}): {e}", 'ADDRESS_FILL', 'DOM')
-            if attempt < max_retries - 1:
-                await asyncio.sleep(1.5)
-            else:
+            if attempt == max_retries - 1:
                 return {'success': False, 'error': str(e)}
-    
+
     return {'success': False, 'error': 'Max retries exceeded'}
 
 
@@ -751,15 +751,12 @@ async def run_checkout_flow(page, customer_data, agent_coordinator=None, user_pr
                 logger.info(f"CHECKOUT FLOW: AI agent succeeded: {agent_result.get('action_taken')}")
                 result = {'success': True}
         
-        await asyncio.sleep(2)
-        
-        # Step 3.5: Adaptive navigation - check if address fields are visible
+        # Step 3.5: Adaptive navigation - check if address fields are visible (waits for them to render)
         address_visible = await detect_field_visibility(page, ['address', 'street', 'addr'])
         
         if not address_visible:
             logger.info(f"CHECKOUT FLOW: Address fields not visible, looking for continue button...")
             await click_continue_if_needed(page)
-            await asyncio.sleep(2)
             
             # Re-check after clicking continue
             address_visible = await detect_field_visibility(page, ['address', 'street', 'addr'])
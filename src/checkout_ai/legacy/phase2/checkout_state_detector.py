@@ -4,8 +4,11 @@ Detects current page state and available fields to enable adaptive flow
 """
 
 import logging
+import time
 from datetime import datetime
 
+from src.checkout_ai.dom.checkout_state import get_checkout_state
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,164 +27,38 @@ async def wait_for_network_idle(page, timeout=3):
 
 async def detect_page_state(page):
     """
-    Detect current checkout page state
+    Detect current checkout page state (a read of the page's checkout state service)
     Returns: {
-        'page_type': 'cart'|'checkout'|'login'|'payment',
-        'fields_visible': {'email': bool, 'firstName': bool, ...},
-        'buttons_visible': {'checkout': bool, 'continue': bool, ...}
+        'pageType': 'cart'|'checkout'|'login'|'payment'|'confirmation'|'unknown',
+        'fieldsVisible': {'email': bool, 'firstName': bool, ...},
+        'buttonsVisible': {'checkout': bool, 'continue': bool, ...},
+        ...the rest of the CheckoutState snapshot
     }
     """
-    state = await page.evaluate("""
-        () => {
-            // Detect page type from URL and title
-            const url = window.location.href.toLowerCase();
-            const title = document.title.toLowerCase();
-            let pageType = 'unknown';
-            
-            if (url.includes('/cart') || title.includes('cart') || title.includes('bag')) {
-                pageType = 'cart';
-            } else if (url.includes('/checkout') || title.includes('checkout')) {
-                pageType = 'checkout';
-            } else if (url.includes('/login') || title.includes('login') || title.includes('sign in')) {
-                pageType = 'login';
-            } else if (url.includes('/payment') || title.includes('payment')) {
-                pageType = 'payment';
-            }
-            
-            // Detect visible fields
-            const fields = {};
-            const fieldPatterns = {
-                email: ['email', 'e-mail', 'mail'],
-                firstName: ['firstname', 'first name', 'first_name', 'fname', 'givenname'],
-                lastName: ['lastname', 'last name', 'last_name', 'lname', 'surname'],
-                phone: ['phone', 'telephone', 'mobile', 'tel'],
-                address: ['address', 'street', 'addr'],
-                city: ['city', 'town'],
-                state: ['state', 'province', 'region'],
-                zip: ['zip', 'postal', 'postcode']
-            };
-            
-            for (const [fieldName, patterns] of Object.entries(fieldPatterns)) {
-                fields[fieldName] = false;
-                const inputs = document.querySelectorAll('input:not([type="hidden"]), select, textarea');
-                
-                for (const input of inputs) {
-                    if (!input.offsetParent) continue;
-                    
-                    const name = (input.name || '').toLowerCase();
-                    const id = (input.id || '').toLowerCase();
-                    const placeholder = (input.placeholder || '').toLowerCase();
-                    const label = input.closest('label')?.textContent?.toLowerCase() || '';
-                    const ariaLabel = (input.getAttribute('aria-label') || '').toLowerCase();
-                    
-                    const allText = name + id + placeholder + label + ariaLabel;
-                    
-                    if (patterns.some(p => allText.includes(p))) {
-                        fields[fieldName] = true;
-                        break;
-                    }
-                }
-            }
-            
-            // Detect visible buttons
-            const buttons = {};
-            const buttonPatterns = {
-                checkout: ['checkout', 'check out', 'proceed to checkout'],
-                viewCart: ['view cart', 'go to cart', 'view bag'],
-                guestCheckout: ['guest', 'continue as guest', 'checkout as guest'],
-                continue: ['continue', 'next', 'proceed'],
-                placeOrder: ['place order', 'complete', 'pay now']
-            };
-            
-            for (const [buttonName, patterns] of Object.entries(buttonPatterns)) {
-                buttons[buttonName] = false;
-                const elements = document.querySelectorAll('button, a, input[type="submit"], input[type="button"]');
-                
-                for (const el of elements) {
-                    if (!el.offsetParent) continue;
-                    
-                    const text = (el.textContent || el.value || '').toLowerCase();
-                    const ariaLabel = (el.getAttribute('aria-label') || '').toLowerCase();
-                    
-                    if (patterns.some(p => text.includes(p) || ariaLabel.includes(p))) {
-                        buttons[buttonName] = true;
-                        break;
-                    }
-                }
-            }
-            
-            return {
-                pageType: pageType,
-                fieldsVisible: fields,
-                buttonsVisible: buttons
-            };
-        }
-    """)
+    state = await get_checkout_state(page, fresh=True)
     
-    logger.info(f"STATE: Page type: {state['pageType']}")
-    logger.info(f"STATE: Fields visible: {[k for k, v in state['fieldsVisible'].items() if v]}")
-    logger.info(f"STATE: Buttons visible: {[k for k, v in state['buttonsVisible'].items() if v]}")
+    logger.info(f"STATE: Page type: {state.page_type}")
+    logger.info(f"STATE: Fields visible: {state.visible_fields}")
+    logger.info(f"STATE: Buttons visible: {[k for k, v in state.buttons_visible.items() if v]}")
     
-    return state
+    return state.snapshot
 
 
 async def detect_field_visibility(page, field_keywords, max_wait=5):
     """
-    Check if specific field is visible on page with retry logic
+    Check if specific field is visible on page, waiting up to max_wait seconds
+    for lazy-loaded content (returns on the first DOM update that shows it)
     Returns: bool
     """
-    import asyncio
-    
-    # Try immediate detection first
-    result = await page.evaluate("""
-        (keywords) => {
-            const inputs = document.querySelectorAll('input:not([type="hidden"]), select, textarea');
-            
-            for (const input of inputs) {
-                if (!input.offsetParent) continue;
-                
-                const name = (input.name || '').toLowerCase();
-                const id = (input.id || '').toLowerCase();
-                const placeholder = (input.placeholder || '').toLowerCase();
-                const label = input.closest('label')?.textContent?.toLowerCase() || '';
-                
-                const allText = name + id + placeholder + label;
-                
-                if (keywords.some(k => allText.includes(k.toLowerCase()))) {
-                    return true;
-                }
-            }
-            return false;
-        }
-    """, field_keywords)
-    
-    if result:
+    state = await get_checkout_state(page, fresh=True)
+    if state.has_field(field_keywords):
         return True
     
-    # Retry with progressive delays for lazy-loaded content
     logger.info(f"STATE: Field not found immediately, waiting for dynamic content...")
-    for attempt in range(3):
-        await asyncio.sleep(max_wait / 3)
-        result = await page.evaluate("""
-            (keywords) => {
-                const inputs = document.querySelectorAll('input:not([type="hidden"]), select, textarea');
-                for (const input of inputs) {
-                    if (!input.offsetParent) continue;
-                    const name = (input.name || '').toLowerCase();
-                    const id = (input.id || '').toLowerCase();
-                    const placeholder = (input.placeholder || '').toLowerCase();
-                    const label = input.closest('label')?.textContent?.toLowerCase() || '';
-                    const allText = name + id + placeholder + label;
-                    if (keywords.some(k => allText.includes(k.toLowerCase()))) {
-                        return true;
-                    }
-                }
-                return false;
-            }
-        """, field_keywords)
-        if result:
-            logger.info(f"STATE: Field found after {attempt + 1} retries")
-            return True
+    started = time.monotonic()
+    if await state.until(field_keywords=field_keywords, timeout=max_wait):
+        logger.info(f"STATE: Field found after {time.monotonic() - started:.1f}s")
+        return True
     
     return False
 
@@ -189,42 +66,13 @@ async def detect_field_visibility(page, field_keywords, max_wait=5):
 async def detect_validation_errors(page):
     """
     Detect form validation errors on page
-    Returns: {'has_errors': bool, 'error_messages': [str]}
+    Returns: {'hasErrors': bool, 'errorMessages': [str]}
     """
-    result = await page.evaluate("""
-        () => {
-            const errorSelectors = [
-                '[class*="error"]:not([style*="display: none"])',
-                '[class*="invalid"]:not([style*="display: none"])',
-                '[role="alert"]',
-                '.error-message',
-                '.field-error',
-                '[aria-invalid="true"]',
-                'input:invalid',
-                'select:invalid'
-            ];
-            
-            const errors = [];
-            for (const selector of errorSelectors) {
-                const elements = document.querySelectorAll(selector);
-                for (const el of elements) {
-                    if (el.offsetParent && el.textContent?.trim()) {
-                        errors.push(el.textContent.trim().substring(0, 100));
-                    }
-                }
-            }
-            
-            return {
-                hasErrors: errors.length > 0,
-                errorMessages: [...new Set(errors)].slice(0, 5)
-            };
-        }
-    """)
-    
-    if result['hasErrors']:
-        logger.warning(f"VALIDATION: Errors detected: {result['errorMessages']}")
-    
-    return result
+    state = await get_checkout_state(page, fresh=True)
+    return {
+        'hasErrors': state.has_errors,
+        'errorMessages': state.validation_errors
+    }
 
 
 async def get_field_dependencies(page):
@@ -1,4 +1,5 @@
 # Payments package
 from .automation_service import PaymentAutomationService
+from .field_resolver import resolve_payment_fields, fill_payment_fields, fill_card_fields
 
-__all__ = ['PaymentAutomationService']
+__all__ = ['PaymentAutomationService', 'resolve_payment_fields', 'fill_payment_fields', 'fill_card_fields']
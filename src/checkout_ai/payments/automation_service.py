@@ -9,13 +9,23 @@ import asyncio
 import re
 from datetime import datetime
 
-from ..db import db
+from ..db import db, async_db
 from ..legacy.phase2.checkout_dom_finder import detect_stripe_iframe, interact_with_stripe_iframe
+from .field_resolver import resolve_payment_fields, fill_payment_fields, fill_card_fields
 from ..utils.logger_config import log
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def _payment_value(payment, key: str):
+    """Optional column of a wallet row (sqlite3.Row or dict)"""
+    try:
+        return payment[key]
+    except (KeyError, IndexError):
+        return None
+
+
 class PaymentAutomationService:
     
     @staticmethod
@@ -34,13 +44,13 @@ class PaymentAutomationService:
         try:
             # 1. Get payment method from wallet
             if payment_method_id:
-                payment = db.fetch_one(
+                payment = await async_db.fetch_one(
                     "SELECT * FROM payment_methods WHERE id = ? AND user_id = ?",
                     (payment_method_id, user_id)
                 )
             else:
                 # Use default payment method
-                payment = db.fetch_one(
+                payment = await async_db.fetch_one(
                     "SELECT * FROM payment_methods WHERE user_id = ? AND is_default = 1 LIMIT 1",
                     (user_id,)
                 )
@@ -62,7 +72,7 @@ class PaymentAutomationService:
             
             # Update last_used_at
             if result.get('success'):
-                db.execute_update(
+                await async_db.execute_update(
                     "UPDATE payment_methods SET last_used_at = CURRENT_TIMESTAMP WHERE id = ?",
                     (payment['id'],)
                 )
@@ -75,113 +85,43 @@ class PaymentAutomationService:
     
     @staticmethod
     async def _fill_card_details(page, payment: dict) -> Dict:
-        """Fill credit/debit card details (handles iframes)"""
+        """Fill credit/debit card details (main page and payment iframes in one pass)"""
         try:
-            log(logger, 'info', "Detecting payment form type...", 'PAYMENT', 'CARD')
+            log(logger, 'info', "Resolving payment fields...", 'PAYMENT', 'CARD')
+            
+            result = await fill_card_fields(
+                page,
+                card_number=payment['card_number'],
+                expiry_month=payment['card_expiry_month'],
+                expiry_year=payment['card_expiry_year'],
+                cvv=payment['card_cvv'],
+                holder_name=_payment_value(payment, 'card_holder_name')
+            )
+            
+            if result['success']:
+                log(logger, 'info', f"Card details filled ({', '.join(result['filled'])}) in {result['elapsed_ms']} ms", 'PAYMENT', 'CARD')
+                return {'success': True, 'method': 'field_resolver'}
+            
+            log(logger, 'warning', f"Field resolver could not fill card: {result.get('error')}", 'PAYMENT', 'CARD')
             
-            # Check if Stripe iframe is present
+            # Fallback: Stripe Elements whose inputs are not reachable as frames (focus + keyboard)
             card_iframe = await detect_stripe_iframe(page, ['card number', 'cardnumber', 'number'])
+            if not card_iframe.get('is_stripe'):
+                return {'success': False, 'error': result.get('error', 'Could not fill card details')}
             
-            if card_iframe.get('is_stripe'):
-                # === STRIPE IFRAME HANDLING ===
-                log(logger, 'info', "Detected Stripe Elements iframe", 'PAYMENT', 'STRIPE')
-                
-                # Fill card number
-                result = await interact_with_stripe_iframe(
-                    page, 
-                    ['card number', 'cardnumber', 'number'],
-                    payment['card_number']
-                )
-                if not result['success']:
-                    return result
-                
-                await asyncio.sleep(0.3)
-                
-                # Fill expiry (format: MM/YY)
-                expiry = f"{payment['card_expiry_month']:02d}/{str(payment['card_expiry_year'])[-2:]}"
-                result = await interact_with_stripe_iframe(
-                    page,
-                    ['expiry', 'expiration', 'exp'],
-                    expiry
-                )
-                if not result['success']:
-                    return result
-                
-                await asyncio.sleep(0.3)
-                
-                # Fill CVV
-                result = await interact_with_stripe_iframe(
-                    page,
-                    ['cvc', 'cvv', 'security', 'code'],
-                    payment['card_cvv']
-                )
-                
-                log(logger, 'info', "Stripe card details filled successfully", 'PAYMENT', 'STRIPE')
-                return {'success': True, 'method': 'stripe_iframe'}
-                
-            else:
-                # === REGULAR FORM HANDLING ===
-                log(logger, 'info', "Using regular form field detection", 'PAYMENT', 'CARD')
-                
-                # Try common card number selectors
-                card_selectors = [
-                    'input[name*="card"][name*="number"]',
-                    'input[placeholder*="card number"]',
-                    'input[autocomplete="cc-number"]',
-                    'input[id*="cardnumber"]',
-                    '#card-number',
-                    '.card-number'
-                ]
-                
-                card_filled = False
-                for selector in card_selectors:
-                    try:
-                        element = await page.wait_for_selector(selector, timeout=2000)
-                        if element:
-                            await element.fill(payment['card_number'])
-                            card_filled = True
-                            log(logger, 'info', f"Card number filled using: {selector}", 'PAYMENT', 'CARD')
-                            break
-                    except:
-                        continue
-                
-                if not card_filled:
-                    return {'success': False, 'error': 'Could not find card number field'}
-                
-                # Fill expiry
-                expiry_selectors = [
-                    'input[name*="expiry"]',
-                    'input[placeholder*="MM"]',
-                    'input[autocomplete="cc-exp"]'
-                ]
-                expiry = f"{payment['card_expiry_month']:02d}/{str(payment['card_expiry_year'])[-2:]}"
-                for selector in expiry_selectors:
-                    try:
-                        element = await page.wait_for_selector(selector, timeout=2000)
-                        if element:
-                            await element.fill(expiry)
-                            break
-                    except:
-                        continue
-                
-                # Fill CVV
-                cvv_selectors = [
-                    'input[name*="cvv"]',
-                    'input[name*="cvc"]',
-                    'input[placeholder*="CVV"]',
-                    'input[autocomplete="cc-csc"]'
-                ]
-                for selector in cvv_selectors:
-                    try:
-                        element = await page.wait_for_selector(selector, timeout=2000)
-                        if element:
-                            await element.fill(payment['card_cvv'])
-                            break
-                    except:
-                        continue
-                
-                log(logger, 'info', "Card details filled successfully (regular form)", 'PAYMENT', 'CARD')
-                return {'success': True, 'method': 'regular_form'}
+            log(logger, 'info', "Falling back to Stripe iframe keyboard input", 'PAYMENT', 'STRIPE')
+            expiry = f"{payment['card_expiry_month']:02d}/{str(payment['card_expiry_year'])[-2:]}"
+            for keywords, value in (
+                (['card number', 'cardnumber', 'number'], payment['card_number']),
+                (['expiry', 'expiration', 'exp'], expiry),
+                (['cvc', 'cvv', 'security', 'code'], payment['card_cvv']),
+            ):
+                stripe_result = await interact_with_stripe_iframe(page, keywords, value)
+                if not stripe_result['success']:
+                    return stripe_result
+            
+            log(logger, 'info', "Stripe card details filled successfully", 'PAYMENT', 'STRIPE')
+            return {'success': True, 'method': 'stripe_iframe'}
                 
         except Exception as e:
             log(logger, 'error', f"Card filling failed: {e}", 'PAYMENT', 'CARD')
@@ -193,27 +133,16 @@ class PaymentAutomationService:
         try:
             log(logger, 'info', f"Filling UPI ID: {payment['upi_id']}", 'PAYMENT', 'UPI')
             
-            # UPI field selectors
-            upi_selectors = [
-                'input[name*="upi"]',
-                'input[placeholder*="UPI"]',
-                'input[placeholder*="upi"]',
-                'input[id*="upi"]',
-                '#upi-id',
-                '.upi-input'
-            ]
+            matches = await resolve_payment_fields(page, ['upi_id'], required=['upi_id'])
+            if 'upi_id' not in matches:
+                return {'success': False, 'error': 'Could not find UPI input field'}
             
-            for selector in upi_selectors:
-                try:
-                    element = await page.wait_for_selector(selector, timeout=2000)
-                    if element:
-                        await element.fill(payment['upi_id'])
-                        log(logger, 'info', f"UPI ID filled using: {selector}", 'PAYMENT', 'UPI')
-                        return {'success': True, 'method': 'upi'}
-                except:
-                    continue
+            result = await fill_payment_fields(matches, {'upi_id': payment['upi_id']})
+            if not result['success']:
+                return {'success': False, 'error': 'UPI input field did not accept the UPI ID'}
             
-            return {'success': False, 'error': 'Could not find UPI input field'}
+            log(logger, 'info', "UPI ID filled", 'PAYMENT', 'UPI')
+            return {'success': True, 'method': 'upi'}
             
         except Exception as e:
             log(logger, 'error', f"UPI filling failed: {e}", 'PAYMENT', 'UPI')
@@ -385,14 +314,7 @@ class PaymentAutomationService:
             total_amount = 0.0
             currency = checkout_json.get('currency', 'USD')
             
-            # Save to database
-            order_id = db.execute_insert("""
-                INSERT INTO orders (
-                    user_id, order_number, site_domain, order_url,
-                    total_amount, currency, status, payment_status,
-                    automation_data, ordered_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """, (
+            order_row = (
                 user_id,
                 order_data.get('order_number'),
                 site_domain,
@@ -402,7 +324,20 @@ class PaymentAutomationService:
                 'completed',
                 'paid',
                 json.dumps(checkout_json)
-            ))
+            )
+            item_rows = [
+                (
+                    item.get('name') or item.get('url', '').rstrip('/').split('/')[-1] or None,
+                    item.get('url'),
+                    item.get('image_url'),
+                    int(item.get('quantity') or 1),
+                    json.dumps(item.get('selectedVariant') or {})
+                )
+                for item in checkout_json.get('tasks', [])
+            ]
+
+            # Order + items in one transaction on the DB thread (never blocks the event loop)
+            order_id = await async_db.run(PaymentAutomationService._insert_order, order_row, item_rows)
             
             log(logger, 'info', f"Order saved to history: ID={order_id}", 'ORDER', 'SAVE')
             return order_id
@@ -410,3 +345,24 @@ class PaymentAutomationService:
         except Exception as e:
             log(logger, 'error', f"Failed to save order: {e}", 'ORDER', 'SAVE')
             return None
+
+    @staticmethod
+    def _insert_order(order_row: tuple, item_rows: list) -> int:
+        """Insert an order and its order_items (bulk) atomically. Runs on the DB thread."""
+        with db.get_connection() as conn:
+            cursor = conn.execute("""
+                INSERT INTO orders (
+                    user_id, order_number, site_domain, order_url,
+                    total_amount, currency, status, payment_status,
+                    automation_data, ordered_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """, order_row)
+            order_id = cursor.lastrowid
+            if item_rows:
+                conn.executemany("""
+                    INSERT INTO order_items (
+                        order_id, product_name, product_url, product_image_url,
+                        quantity, variant_details
+                    ) VALUES (?, ?, ?, ?, ?, ?)
+                """, [(order_id, *row) for row in item_rows])
+            return order_id
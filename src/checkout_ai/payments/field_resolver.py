@@ -0,0 +1,358 @@
+"""
+Payment Field Resolver
+Finds card/UPI inputs for every payment role in one pass and fills them as a batch
+- All frames (main page + payment iframes, cross-origin included) are scanned
+  concurrently; each scan scores every visible input against every role
+  (autocomplete=cc-* first, then known selectors, then name/label keywords)
+- Scans repeat every POLL_INTERVAL until the required roles resolve, so a slow
+  iframe costs only its own load time instead of a timeout per selector
+- Fills run per frame in parallel and every value is read back; a field that
+  rejects fill() (masked inputs) is retyped key by key
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..utils.logger_config import log
+
+logger = logging.getLogger(__name__)
+
+# Marker the scan leaves on the winning element of each role (per frame)
+ROLE_ATTRIBUTE = 'data-pay-role'
+
+RESOLVE_TIMEOUT = 3.0
+POLL_INTERVAL = 0.1
+FILL_TIMEOUT = 2000
+
+# role -> autocomplete tokens, candidate selectors (best first), keywords, exclusions
+PAYMENT_ROLES = {
+    'card_number': {
+        'autocomplete': ['cc-number'],
+        'selectors': [
+            'input[name="cardnumber"]', 'input[name*="card"][name*="number"]', 'input[id*="cardnumber"]',
+            '#card-number', '.card-number input, input.card-number', 'input[placeholder*="card number" i]',
+            'input[data-elements-stable-field-name="cardNumber"]',
+        ],
+        'keywords': ['card number', 'cardnumber', 'card-number', 'card_number', 'ccnumber', 'cc-number', '1234 1234'],
+        'exclude': ['cvc', 'cvv', 'exp', 'name', 'zip', 'postal'],
+    },
+    'card_expiry': {
+        'autocomplete': ['cc-exp'],
+        'selectors': [
+            'input[name="exp-date"]', 'input[name*="expiry"]', 'input[name*="expiration"]',
+            'input[placeholder*="MM / YY"]', 'input[placeholder*="MM/YY"]',
+            'input[data-elements-stable-field-name="cardExpiry"]',
+        ],
+        'keywords': ['expiry', 'expiration', 'exp-date', 'exp date', 'mm / yy', 'mm/yy', 'valid thru'],
+        'exclude': ['month', 'year', 'cvc', 'cvv'],
+    },
+    'card_exp_month': {
+        'autocomplete': ['cc-exp-month'],
+        'selectors': ['select[name*="month" i]', 'input[name*="exp"][name*="month" i]', 'input[placeholder="MM"]'],
+        'keywords': ['exp month', 'expiry month', 'expiration month', 'exp_month', 'expmonth'],
+        'exclude': ['year'],
+    },
+    'card_exp_year': {
+        'autocomplete': ['cc-exp-year'],
+        'selectors': ['select[name*="year" i]', 'input[name*="exp"][name*="year" i]', 'input[placeholder="YY"]', 'input[placeholder="YYYY"]'],
+        'keywords': ['exp year', 'expiry year', 'expiration year', 'exp_year', 'expyear'],
+        'exclude': ['month'],
+    },
+    'card_cvv': {
+        'autocomplete': ['cc-csc'],
+        'selectors': [
+            'input[name="cvc"]', 'input[name*="cvv"]', 'input[name*="cvc"]', 'input[placeholder*="CVV"]',
+            'input[placeholder*="CVC"]', 'input[data-elements-stable-field-name="cardCvc"]',
+        ],
+        'keywords': ['cvv', 'cvc', 'security code', 'card code', 'csc'],
+        'exclude': [],
+    },
+    'card_name': {
+        'autocomplete': ['cc-name'],
+        'selectors': ['input[name*="card"][name*="name"]', 'input[name="ccname"]', 'input[placeholder*="name on card" i]'],
+        'keywords': ['name on card', 'cardholder', 'card holder', 'nameoncard'],
+        'exclude': ['number'],
+    },
+    'upi_id': {
+        'autocomplete': [],
+        'selectors': ['#upi-id', '.upi-input', 'input[name*="upi"]', 'input[id*="upi"]', 'input[placeholder*="UPI"]', 'input[placeholder*="upi"]'],
+        'keywords': ['upi', 'vpa', '@ybl', '@okaxis', '@paytm'],
+        'exclude': [],
+    },
+}
+
+CARD_ROLES = ['card_number', 'card_expiry', 'card_exp_month', 'card_exp_year', 'card_cvv', 'card_name']
+REQUIRED_CARD_ROLES = ['card_number', 'card_expiry', 'card_cvv']
+
+# Roles compared digit by digit on read-back (inputs reformat them: '4242 4242 ...')
+_NUMERIC_ROLES = {'card_number', 'card_expiry', 'card_exp_month', 'card_exp_year', 'card_cvv'}
+
+_SCAN_JS = """
+    ({ roles, marker }) => {
+        const elements = [];
+        const collect = (root) => {
+            for (const el of root.querySelectorAll('*')) {
+                if (el.tagName === 'INPUT' || el.tagName === 'SELECT') elements.push(el);
+                if (el.shadowRoot) collect(el.shadowRoot);
+            }
+        };
+        collect(document);
+
+        const skipTypes = new Set(['hidden', 'checkbox', 'radio', 'submit', 'button', 'image', 'file', 'reset']);
+        const visible = (el) => {
+            const rect = el.getBoundingClientRect();
+            if (rect.width === 0 || rect.height === 0) return false;
+            const style = getComputedStyle(el);
+            return style.visibility !== 'hidden' && style.display !== 'none';
+        };
+
+        const candidates = [];
+        elements.forEach((el, index) => {
+            el.removeAttribute(marker);
+            if (skipTypes.has((el.type || '').toLowerCase()) || el.disabled || el.readOnly || !visible(el)) return;
+            const label = el.labels && el.labels[0] ? el.labels[0].textContent : '';
+            const text = [el.name, el.id, el.placeholder, el.getAttribute('aria-label'), el.title,
+                          el.getAttribute('data-elements-stable-field-name'), label]
+                .filter(Boolean).join(' ').toLowerCase();
+            const autocomplete = (el.getAttribute('autocomplete') || '').toLowerCase().split(/\\s+/);
+
+            for (const [role, spec] of Object.entries(roles)) {
+                let score = 0;
+                if (spec.autocomplete.some(token => autocomplete.includes(token))) score = 100;
+                spec.selectors.forEach((selector, i) => {
+                    try { if (el.matches(selector)) score = Math.max(score, 80 - i); } catch (e) {}
+                });
+                if (score < 50 && spec.keywords.some(kw => text.includes(kw))) score = 50;
+                if (score && score < 100 && spec.exclude.some(kw => text.includes(kw))) score = 0;
+                if (score) candidates.push({ role, score, index, el });
+            }
+        });
+
+        // Greedy assignment: best score first, one role per element
+        candidates.sort((a, b) => b.score - a.score || a.index - b.index);
+        const taken = new Set();
+        const result = {};
+        for (const c of candidates) {
+            if (result[c.role] || taken.has(c.el)) continue;
+            taken.add(c.el);
+            c.el.setAttribute(marker, c.role);
+            result[c.role] = {
+                score: c.score,
+                tag: c.el.tagName.toLowerCase(),
+                maxLength: c.el.maxLength > 0 ? c.el.maxLength : null,
+                options: c.el.tagName === 'SELECT'
+                    ? Array.from(c.el.options).map(o => ({ value: o.value, text: o.textContent.trim() }))
+                    : null
+            };
+        }
+        return result;
+    }
+"""
+
+
+class FieldMatch:
+    """Best element for one payment role, located by its marker in a frame"""
+
+    def __init__(self, role: str, frame, info: Dict[str, Any]):
+        self.role = role
+        self.frame = frame
+        self.score = info['score']
+        self.tag = info['tag']
+        self.max_length = info.get('maxLength')
+        self.options = info.get('options') or []
+
+    @property
+    def locator(self):
+        return self.frame.locator(f'[{ROLE_ATTRIBUTE}="{self.role}"]').first
+
+    def __repr__(self):
+        return f"FieldMatch({self.role}, score={self.score}, frame={self.frame.url[:60]!r})"
+
+
+def _digits(value: Any) -> str:
+    return re.sub(r'\D', '', str(value or ''))
+
+
+def _covers(matches: Dict[str, FieldMatch], role: str) -> bool:
+    if role == 'card_expiry':
+        return 'card_expiry' in matches or ('card_exp_month' in matches and 'card_exp_year' in matches)
+    return role in matches
+
+
+async def _scan_frame(frame, roles: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    try:
+        return await frame.evaluate(_SCAN_JS, {'roles': roles, 'marker': ROLE_ATTRIBUTE})
+    except Exception:
+        # Detached or navigating frame - picked up by the next poll
+        return {}
+
+
+async def resolve_payment_fields(page, roles: Iterable[str], required: Iterable[str] = (),
+                                 timeout: float = RESOLVE_TIMEOUT) -> Dict[str, FieldMatch]:
+    """
+    Best match per payment role across the main frame and all iframes.
+
+    Args:
+        page: Playwright page
+        roles: Roles to look for (keys of PAYMENT_ROLES)
+        required: Roles that must resolve before returning early ('card_expiry' is also
+                  satisfied by split month/year fields)
+        timeout: Seconds to keep polling for required roles (iframes still loading)
+
+    Returns:
+        Dict role -> FieldMatch (roles that were not found are missing)
+    """
+    specs = {role: PAYMENT_ROLES[role] for role in roles}
+    required = list(required)
+    deadline = time.monotonic() + timeout
+    main_frame = page.main_frame
+
+    while True:
+        frames = list(page.frames)
+        scans = await asyncio.gather(*(_scan_frame(frame, specs) for frame in frames))
+
+        matches: Dict[str, FieldMatch] = {}
+        for frame, found in zip(frames, scans):
+            for role, info in found.items():
+                current = matches.get(role)
+                # Higher score wins; on ties prefer the main frame, then document order of frames
+                if current is None or info['score'] > current.score or (
+                        info['score'] == current.score and frame is main_frame and current.frame is not main_frame):
+                    matches[role] = FieldMatch(role, frame, info)
+
+        # Combined expiry beats split fields when both exist
+        if 'card_expiry' in matches:
+            matches.pop('card_exp_month', None)
+            matches.pop('card_exp_year', None)
+
+        if all(_covers(matches, role) for role in required) or time.monotonic() >= deadline:
+            return matches
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+def _option_for(match: FieldMatch, value: str) -> Optional[str]:
+    """Option value of a <select> matching a month/year value ('3' ~ '03' ~ 'March' by position, '27' ~ '2027')"""
+    wanted = _digits(value)
+    for option in match.options:
+        for candidate in (option['value'], option['text']):
+            digits = _digits(candidate)
+            if digits and (digits == wanted or digits.lstrip('0') == wanted.lstrip('0') or
+                           (len(digits) == 4 and len(wanted) == 2 and digits.endswith(wanted)) or
+                           (len(digits) == 2 and len(wanted) == 4 and wanted.endswith(digits))):
+                return option['value']
+    return None
+
+
+def _value_matches(role: str, actual: str, expected: str) -> bool:
+    if role in _NUMERIC_ROLES:
+        got, want = _digits(actual), _digits(expected)
+        if role == 'card_expiry' and len(want) == 4 and len(got) == 6:
+            # MM/YYYY field for an MM/YY value
+            return got[:2] == want[:2] and got[-2:] == want[-2:]
+        return bool(got) and got.lstrip('0') == want.lstrip('0')
+    return (actual or '').strip().lower() == (expected or '').strip().lower()
+
+
+def _value_for(match: FieldMatch, month: int = None, year: int = None, value: str = None) -> str:
+    """Format expiry parts for the matched field (MM/YY vs MM/YYYY, 2 vs 4 digit year)"""
+    if match.role == 'card_exp_month':
+        return f"{int(month):02d}"
+    if match.role == 'card_exp_year':
+        return str(year)[-2:] if match.max_length == 2 else f"20{str(year)[-2:]}"
+    if match.role == 'card_expiry' and month is not None:
+        if match.max_length and match.max_length >= 7:
+            return f"{int(month):02d}/20{str(year)[-2:]}"
+        return f"{int(month):02d}/{str(year)[-2:]}"
+    return value
+
+
+async def _fill_field(match: FieldMatch, value: str) -> bool:
+    """Fill one field and read it back; retype key by key if the input rejected fill()"""
+    locator = match.locator
+    if match.tag == 'select':
+        option = _option_for(match, value)
+        if option is None:
+            return False
+        await locator.select_option(value=option, timeout=FILL_TIMEOUT)
+        return (await locator.input_value(timeout=FILL_TIMEOUT)) == option
+
+    await locator.fill(value, timeout=FILL_TIMEOUT)
+    if _value_matches(match.role, await locator.input_value(timeout=FILL_TIMEOUT), value):
+        return True
+
+    # Masked/formatted inputs: type like a user
+    await locator.fill('', timeout=FILL_TIMEOUT)
+    await locator.press_sequentially(value, timeout=FILL_TIMEOUT)
+    return _value_matches(match.role, await locator.input_value(timeout=FILL_TIMEOUT), value)
+
+
+async def fill_payment_fields(matches: Dict[str, FieldMatch], values: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Fill resolved fields in one batch: frames in parallel, fields in order within a frame.
+
+    Returns:
+        {'success': bool, 'filled': [roles], 'failed': [roles]}
+    """
+    by_frame: Dict[Any, List[FieldMatch]] = {}
+    for role, match in matches.items():
+        if values.get(role):
+            by_frame.setdefault(match.frame, []).append(match)
+
+    async def fill_frame(frame_matches: List[FieldMatch]):
+        outcome = []
+        for match in frame_matches:
+            try:
+                ok = await _fill_field(match, values[match.role])
+            except Exception as e:
+                log(logger, 'debug', f"Fill failed for {match.role}: {e}", 'PAYMENT', 'FIELDS')
+                ok = False
+            outcome.append((match.role, ok))
+        return outcome
+
+    results = await asyncio.gather(*(fill_frame(frame_matches) for frame_matches in by_frame.values()))
+    filled = [role for outcome in results for role, ok in outcome if ok]
+    failed = [role for outcome in results for role, ok in outcome if not ok]
+    return {'success': not failed, 'filled': filled, 'failed': failed}
+
+
+async def fill_card_fields(page, card_number: str, expiry_month: int, expiry_year: int, cvv: str,
+                           holder_name: Optional[str] = None, timeout: float = RESOLVE_TIMEOUT) -> Dict[str, Any]:
+    """
+    Resolve and fill all card roles on the page (any frame).
+
+    Returns:
+        {'success': bool, 'filled': [roles], 'failed': [roles], 'missing': [roles], 'elapsed_ms': int}
+    """
+    start = time.perf_counter()
+    matches = await resolve_payment_fields(page, CARD_ROLES, required=REQUIRED_CARD_ROLES, timeout=timeout)
+    missing = [role for role in REQUIRED_CARD_ROLES if not _covers(matches, role)]
+    if 'card_number' in missing:
+        return {'success': False, 'error': 'Could not find card number field', 'filled': [], 'failed': [],
+                'missing': missing, 'elapsed_ms': int((time.perf_counter() - start) * 1000)}
+
+    values = {'card_number': card_number, 'card_cvv': cvv, 'card_name': holder_name}
+    for role in ('card_expiry', 'card_exp_month', 'card_exp_year'):
+        if role in matches:
+            values[role] = _value_for(matches[role], month=expiry_month, year=expiry_year)
+
+    result = await fill_payment_fields(matches, values)
+    # An optional cardholder-name field that refuses input should not fail the payment
+    result['failed'] = [role for role in result['failed'] if role != 'card_name']
+    result['success'] = not result['failed'] and not missing
+    result['missing'] = missing
+    result['elapsed_ms'] = int((time.perf_counter() - start) * 1000)
+    if missing:
+        result['error'] = f"Payment fields not found: {', '.join(missing)}"
+    elif result['failed']:
+        result['error'] = f"Payment fields did not accept input: {', '.join(result['failed'])}"
+    return result
+
+
+# Export for use in other modules
+__all__ = [
+    'resolve_payment_fields', 'fill_payment_fields', 'fill_card_fields', 'FieldMatch',
+    'PAYMENT_ROLES', 'CARD_ROLES', 'REQUIRED_CARD_ROLES', 'ROLE_ATTRIBUTE'
+]
@@ -0,0 +1,40 @@
+"""
+E-commerce platform support
+Platform detection and storefront API adapters (Shopify, WooCommerce, Magento)
+"""
+
+from src.checkout_ai.platforms.detector import (
+    detect_platform,
+    detect_platform_cached,
+    get_platform,
+    SHOPIFY,
+    WOOCOMMERCE,
+    MAGENTO,
+    SUPPORTED_PLATFORMS,
+)
+from src.checkout_ai.platforms.adapters import (
+    PlatformAdapter,
+    ShopifyAdapter,
+    WooCommerceAdapter,
+    MagentoAdapter,
+    get_adapter,
+    add_to_cart_via_platform,
+    item_in_cart,
+)
+
+__all__ = [
+    'detect_platform',
+    'detect_platform_cached',
+    'get_platform',
+    'SHOPIFY',
+    'WOOCOMMERCE',
+    'MAGENTO',
+    'SUPPORTED_PLATFORMS',
+    'PlatformAdapter',
+    'ShopifyAdapter',
+    'WooCommerceAdapter',
+    'MagentoAdapter',
+    'get_adapter',
+    'add_to_cart_via_platform',
+    'item_in_cart',
+]
@@ -0,0 +1,560 @@
+"""
+Platform Adapters
+Add-to-cart through in-page storefront APIs (Shopify, WooCommerce, Magento)
+Requests run as in-page fetch() calls so they keep the session cookies of the page
+"""
+
+import logging
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse
+from playwright.async_api import Page
+
+from .detector import SHOPIFY, WOOCOMMERCE, MAGENTO, detect_platform_cached
+
+logger = logging.getLogger(__name__)
+
+# selectedVariant keys that are not product options
+_NON_OPTION_KEYS = {'quantity', 'qty'}
+
+
+def _norm(text: Any) -> str:
+    """Lowercase alphanumeric form used for option/value matching"""
+    return re.sub(r'[^a-z0-9]', '', str(text or '').lower())
+
+
+def _name_matches(key: str, name: str) -> bool:
+    """Check if a selectedVariant key refers to an option name (e.g. 'color' vs 'attribute_pa_colour')"""
+    key_n, name_n = _norm(key), _norm(name)
+    if not key_n or not name_n:
+        return False
+    return key_n == name_n or key_n in name_n or name_n in key_n or \
+        (key_n == 'color' and 'colour' in name_n) or (key_n == 'colour' and 'color' in name_n)
+
+
+def _value_matches(wanted: str, actual: str) -> bool:
+    """Check if a requested variant value matches an option value"""
+    wanted_n, actual_n = _norm(wanted), _norm(actual)
+    return bool(wanted_n) and wanted_n == actual_n
+
+
+def _product_path(url: str) -> str:
+    """Path of a product URL for comparison ('/products/tee/' and '/products/tee?x=1' match)"""
+    return urlparse(url or '').path.rstrip('/').lower()
+
+
+def _line_matches(product_url: str, line_url: str, line_values: List[str], options: Dict[str, str]) -> bool:
+    """A cart line is the item when it is the same product page and carries every requested option value"""
+    line_path = _product_path(line_url)
+    if not line_path or line_path != _product_path(product_url):
+        return False
+    return all(any(_value_matches(wanted, value) for value in line_values) for wanted in options.values())
+
+
+def _option_variants(variants: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Drop empty/'none' values and non-option keys from selectedVariant"""
+    return {
+        k: str(v) for k, v in (variants or {}).items()
+        if v and str(v).lower() != 'none' and _norm(k) not in _NON_OPTION_KEYS
+    }
+
+
+class PlatformAdapter(ABC):
+    """Base adapter: resolve selectedVariant to a platform variant and add it to the cart"""
+
+    name: str = None
+
+    @abstractmethod
+    async def add_to_cart(self, page: Page, variants: Optional[Dict[str, str]] = None,
+                          quantity: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Add the current product to cart through the storefront API.
+
+        Args:
+            page: Playwright page on the product page
+            variants: selectedVariant dict; None = use the variant currently selected in the page form
+            quantity: Quantity to add; None = quantity in the page form (default 1)
+
+        Returns:
+            Dict with 'success': bool, 'method': str, 'content'/'error': str
+        """
+
+    async def cart_contains(self, page: Page, product_url: str,
+                            variants: Optional[Dict[str, str]] = None) -> Optional[bool]:
+        """
+        Check the store's cart for this product/variant line.
+
+        Returns:
+            True/False when the cart could be read, None when the platform offers no cart read
+        """
+        return None
+
+    async def _form_quantity(self, page: Page) -> int:
+        """Read quantity from the product form, default 1"""
+        try:
+            value = await page.evaluate("""
+                () => {
+                    const input = document.querySelector('form [name="quantity"], form [name="qty"]');
+                    return input ? input.value : null;
+                }
+            """)
+            return max(1, int(value)) if value else 1
+        except Exception:
+            return 1
+
+    def _success(self, detail: str) -> Dict[str, Any]:
+        return {
+            'success': True,
+            'method': f'platform_api_{self.name}',
+            'content': f"Added to cart via {self.name} storefront API ({detail})"
+        }
+
+    def _failure(self, error: str) -> Dict[str, Any]:
+        return {'success': False, 'method': f'platform_api_{self.name}', 'error': error}
+
+
+class ShopifyAdapter(PlatformAdapter):
+    """Shopify: /products/<handle>.js for variants, /cart/add.js for cart mutation"""
+
+    name = SHOPIFY
+
+    async def add_to_cart(self, page, variants=None, quantity=None):
+        options = _option_variants(variants)
+
+        if options:
+            product = await page.evaluate("""
+                async () => {
+                    const root = (window.Shopify && window.Shopify.routes && window.Shopify.routes.root) || '/';
+                    const match = window.location.pathname.match(/\\/products\\/([^\\/?#]+)/);
+                    if (!match) return null;
+                    const res = await fetch(`${root}products/${match[1]}.js`, {
+                        credentials: 'same-origin',
+                        headers: { 'Accept': 'application/json' }
+                    });
+                    return res.ok ? await res.json() : null;
+                }
+            """)
+            if not product:
+                return self._failure('Product JSON not available')
+            variant_id = self.resolve_variant(product, options)
+        else:
+            variant_id = await page.evaluate("""
+                () => {
+                    const input = document.querySelector('form[action*="/cart/add"] [name="id"]');
+                    return input && input.value ? input.value : null;
+                }
+            """)
+
+        if not variant_id:
+            return self._failure(f'No variant matches {options}')
+
+        qty = quantity or await self._form_quantity(page)
+        result = await page.evaluate("""
+            async ({ id, quantity }) => {
+                const root = (window.Shopify && window.Shopify.routes && window.Shopify.routes.root) || '/';
+                const res = await fetch(`${root}cart/add.js`, {
+                    method: 'POST',
+                    credentials: 'same-origin',
+                    headers: {
+                        'Content-Type': 'application/json',
+                        'Accept': 'application/json',
+                        'X-Requested-With': 'XMLHttpRequest'
+                    },
+                    body: JSON.stringify({ items: [{ id: Number(id), quantity: quantity }] })
+                });
+                const body = await res.json().catch(() => ({}));
+                if (!res.ok) {
+                    return { success: false, status: res.status, error: body.description || body.message || 'Add failed' };
+                }
+                const cart = await fetch(`${root}cart.js`, { credentials: 'same-origin' })
+                    .then(r => r.json()).catch(() => null);
+                // Let themes refresh their cart drawer / badge
+                try { document.dispatchEvent(new CustomEvent('cart:refresh', { bubbles: true })); } catch (e) {}
+                return { success: true, status: res.status, itemCount: cart ? cart.item_count : null };
+            }
+        """, {'id': variant_id, 'quantity': qty})
+
+        if not result.get('success'):
+            return self._failure(f"cart/add.js {result.get('status')}: {result.get('error')}")
+        return self._success(f"variant {variant_id}, cart items: {result.get('itemCount')}")
+
+    async def cart_contains(self, page, product_url, variants=None):
+        items = await page.evaluate("""
+            async () => {
+                const root = (window.Shopify && window.Shopify.routes && window.Shopify.routes.root) || '/';
+                const res = await fetch(`${root}cart.js`, { credentials: 'same-origin', headers: { 'Accept': 'application/json' } });
+                return res.ok ? (await res.json()).items : null;
+            }
+        """)
+        if items is None:
+            return None
+        options = _option_variants(variants)
+        return any(_line_matches(product_url, item.get('url', ''), item.get('variant_options') or [], options)
+                   for item in items)
+
+    @staticmethod
+    def resolve_variant(product: Dict[str, Any], options: Dict[str, str]) -> Optional[int]:
+        """Map selectedVariant to a Shopify variant id using the product JSON"""
+        option_names = [o.get('name') if isinstance(o, dict) else o for o in product.get('options', [])]
+        candidates = []
+
+        for variant in product.get('variants', []):
+            values = variant.get('options') or [variant.get(f'option{i}') for i in (1, 2, 3)]
+            matched = True
+            for key, wanted in options.items():
+                index = next((i for i, name in enumerate(option_names) if _name_matches(key, name)), None)
+                if index is not None and index < len(values):
+                    ok = _value_matches(wanted, values[index])
+                else:
+                    # Unknown option name - accept the value in any position
+                    ok = any(_value_matches(wanted, v) for v in values if v)
+                if not ok:
+                    matched = False
+                    break
+            if matched:
+                candidates.append(variant)
+
+        if not candidates:
+            return None
+        available = [v for v in candidates if v.get('available', True)]
+        return (available or candidates)[0].get('id')
+
+
+class WooCommerceAdapter(PlatformAdapter):
+    """WooCommerce: data-product_variations on the product form, ?wc-ajax=add_to_cart for cart mutation"""
+
+    name = WOOCOMMERCE
+
+    async def add_to_cart(self, page, variants=None, quantity=None):
+        info = await page.evaluate("""
+            () => {
+                const form = document.querySelector('form.variations_form, form.cart');
+                if (!form) return null;
+
+                let variations = null;
+                const raw = form.getAttribute('data-product_variations');
+                if (raw && raw !== 'false') {
+                    try { variations = JSON.parse(raw); } catch (e) {}
+                }
+
+                const attributes = [];
+                const selectedAttributes = {};
+                form.querySelectorAll('select[name^="attribute_"]').forEach(sel => {
+                    const label = (sel.id && form.querySelector(`label[for="${sel.id}"]`)?.textContent?.trim()) || sel.name;
+                    attributes.push({
+                        name: sel.name,
+                        label: label,
+                        options: Array.from(sel.options).filter(o => o.value).map(o => ({ value: o.value, text: o.textContent.trim() }))
+                    });
+                    if (sel.value) selectedAttributes[sel.name] = sel.value;
+                });
+
+                return {
+                    productId: form.getAttribute('data-product_id') ||
+                               form.querySelector('[name="add-to-cart"]')?.value ||
+                               form.querySelector('[name="product_id"]')?.value || null,
+                    variations: variations,
+                    attributes: attributes,
+                    selectedVariationId: form.querySelector('[name="variation_id"]')?.value || null,
+                    selectedAttributes: selectedAttributes
+                };
+            }
+        """)
+        if not info or not info.get('productId'):
+            return self._failure('WooCommerce product form not found')
+
+        options = _option_variants(variants)
+        variation_id, attributes = None, {}
+
+        if info.get('attributes'):
+            if options:
+                variation_id, attributes = self.resolve_variation(info, options)
+            else:
+                variation_id = info.get('selectedVariationId') or None
+                attributes = info.get('selectedAttributes', {})
+            if not variation_id or variation_id == '0':
+                return self._failure(f'No variation matches {options or attributes}')
+
+        qty = quantity or await self._form_quantity(page)
+        result = await page.evaluate("""
+            async ({ productId, variationId, attributes, quantity }) => {
+                const body = new URLSearchParams();
+                body.append('product_id', variationId || productId);
+                body.append('quantity', quantity);
+                if (variationId) body.append('variation_id', variationId);
+                for (const [name, value] of Object.entries(attributes || {})) body.append(name, value);
+
+                const params = window.wc_add_to_cart_params;
+                const url = params && params.wc_ajax_url
+                    ? params.wc_ajax_url.toString().replace('%%endpoint%%', 'add_to_cart')
+                    : '/?wc-ajax=add_to_cart';
+
+                const res = await fetch(url, {
+                    method: 'POST',
+                    credentials: 'same-origin',
+                    headers: {
+                        'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
+                        'X-Requested-With': 'XMLHttpRequest'
+                    },
+                    body: body
+                });
+                const data = await res.json().catch(() => null);
+                if (!res.ok || !data || data.error) {
+                    return { success: false, status: res.status, error: 'Rejected by store' };
+                }
+                // Refresh mini-cart fragments the same way the theme would
+                try {
+                    if (window.jQuery) window.jQuery(document.body).trigger('added_to_cart', [data.fragments, data.cart_hash]);
+                } catch (e) {}
+                return { success: true, status: res.status };
+            }
+        """, {'productId': info['productId'], 'variationId': variation_id,
+              'attributes': attributes, 'quantity': qty})
+
+        if not result.get('success'):
+            return self._failure(f"wc-ajax add_to_cart {result.get('status')}: {result.get('error')}")
+        return self._success(f"product {info['productId']}" + (f", variation {variation_id}" if variation_id else ''))
+
+    async def cart_contains(self, page, product_url, variants=None):
+        # Store API cart (WooCommerce 5.x+ / Blocks); older stores have no JSON cart read
+        items = await page.evaluate("""
+            async () => {
+                const res = await fetch('/wp-json/wc/store/v1/cart', { credentials: 'same-origin', headers: { 'Accept': 'application/json' } });
+                return res.ok ? (await res.json()).items : null;
+            }
+        """)
+        if items is None:
+            return None
+        options = _option_variants(variants)
+        return any(_line_matches(product_url, item.get('permalink', ''),
+                                 [v.get('value', '') for v in item.get('variation') or []], options)
+                   for item in items)
+
+    @staticmethod
+    def resolve_variation(info: Dict[str, Any], options: Dict[str, str]):
+        """Map selectedVariant to (variation_id, attributes) using the form's variation data"""
+        attributes = {}
+        for key, wanted in options.items():
+            attr = next((a for a in info['attributes']
+                         if _name_matches(key, a['label']) or _name_matches(key, a['name'].replace('attribute_pa_', '').replace('attribute_', ''))), None)
+            search = [attr] if attr else info['attributes']
+            for candidate in search:
+                option = next((o for o in candidate['options']
+                               if _value_matches(wanted, o['text']) or _value_matches(wanted, o['value'])), None)
+                if option:
+                    attributes[candidate['name']] = option['value']
+                    break
+            else:
+                return None, {}
+
+        for variation in info.get('variations') or []:
+            var_attrs = variation.get('attributes', {})
+            # Empty attribute value in a variation means "any"
+            if all(var_attrs.get(name, '') in ('', value) for name, value in attributes.items()):
+                if variation.get('is_in_stock', True) and variation.get('is_purchasable', True):
+                    return str(variation.get('variation_id')), attributes
+
+        return None, attributes
+
+
+class MagentoAdapter(PlatformAdapter):
+    """Magento 2: configurable jsonConfig for options, product form action (checkout/cart/add) for cart mutation"""
+
+    name = MAGENTO
+
+    async def add_to_cart(self, page, variants=None, quantity=None):
+        info = await page.evaluate("""
+            () => {
+                const form = document.querySelector('#product_addtocart_form, form[action*="checkout/cart/add"]');
+                if (!form) return null;
+
+                const cookieKey = (document.cookie.match(/form_key=([^;]+)/) || [])[1] || null;
+                const formKey = form.querySelector('[name="form_key"]')?.value ||
+                                document.querySelector('input[name="form_key"]')?.value || cookieKey;
+
+                const findConfig = (obj) => {
+                    if (!obj || typeof obj !== 'object') return null;
+                    if (obj.jsonConfig && obj.jsonConfig.attributes) return obj.jsonConfig;
+                    if (obj.spConfig && obj.spConfig.attributes) return obj.spConfig;
+                    for (const value of Object.values(obj)) {
+                        const found = findConfig(value);
+                        if (found) return found;
+                    }
+                    return null;
+                };
+
+                let config = null;
+                for (const script of document.querySelectorAll('script[type="text/x-magento-init"]')) {
+                    const text = script.textContent || '';
+                    if (!text.includes('jsonConfig') && !text.includes('spConfig')) continue;
+                    try {
+                        config = findConfig(JSON.parse(text));
+                        if (config) break;
+                    } catch (e) {}
+                }
+
+                const attributes = config ? Object.entries(config.attributes).map(([id, a]) => ({
+                    id: id,
+                    code: a.code,
+                    label: a.label,
+                    options: (a.options || []).map(o => ({ id: o.id, label: o.label }))
+                })) : [];
+
+                const selected = {};
+                form.querySelectorAll('[name^="super_attribute"]').forEach(input => {
+                    if (input.value) selected[input.name] = input.value;
+                });
+
+                return {
+                    action: form.action,
+                    formKey: formKey,
+                    productId: form.querySelector('[name="product"]')?.value || null,
+                    attributes: attributes,
+                    selected: selected
+                };
+            }
+        """)
+        if not info or not info.get('productId') or not info.get('formKey'):
+            return self._failure('Magento product form not found')
+
+        options = _option_variants(variants)
+        if info.get('attributes'):
+            super_attributes = self.resolve_super_attributes(info, options) if options else info.get('selected', {})
+            if super_attributes is None or len(super_attributes) < len(info['attributes']):
+                return self._failure(f'No configurable option matches {options}')
+        else:
+            super_attributes = {}
+
+        qty = quantity or await self._form_quantity(page)
+        result = await page.evaluate("""
+            async ({ action, formKey, productId, superAttributes, quantity }) => {
+                const body = new FormData();
+                body.append('form_key', formKey);
+                body.append('product', productId);
+                body.append('qty', quantity);
+                for (const [name, value] of Object.entries(superAttributes || {})) body.append(name, value);
+
+                const res = await fetch(action, {
+                    method: 'POST',
+                    credentials: 'same-origin',
+                    headers: { 'X-Requested-With': 'XMLHttpRequest' },
+                    body: body
+                });
+                let data = null;
+                try { data = await res.json(); } catch (e) {}
+                // Magento answers {backUrl: ...} when the add was rejected (missing options, stock)
+                if (!res.ok || (data && data.backUrl)) {
+                    return { success: false, status: res.status, error: 'Rejected by store' };
+                }
+                // Invalidate the private content cache so the minicart refreshes
+                try {
+                    if (window.require) {
+                        window.require(['Magento_Customer/js/customer-data'], cd => cd.reload(['cart'], true));
+                    }
+                } catch (e) {}
+                return { success: true, status: res.status };
+            }
+        """, {'action': info['action'], 'formKey': info['formKey'], 'productId': info['productId'],
+              'superAttributes': super_attributes, 'quantity': qty})
+
+        if not result.get('success'):
+            return self._failure(f"checkout/cart/add {result.get('status')}: {result.get('error')}")
+        return self._success(f"product {info['productId']}")
+
+    async def cart_contains(self, page, product_url, variants=None):
+        # Customer-data cart section (what the minicart renders from)
+        items = await page.evaluate("""
+            async () => {
+                const res = await fetch('/customer/section/load/?sections=cart&force_new_section_timestamp=true',
+                                        { credentials: 'same-origin', headers: { 'X-Requested-With': 'XMLHttpRequest' } });
+                if (!res.ok) return null;
+                const data = await res.json().catch(() => null);
+                return data && data.cart ? data.cart.items || [] : null;
+            }
+        """)
+        if items is None:
+            return None
+        options = _option_variants(variants)
+        return any(_line_matches(product_url, item.get('product_url', ''),
+                                 [o.get('value', '') for o in item.get('options') or []], options)
+                   for item in items)
+
+    @staticmethod
+    def resolve_super_attributes(info: Dict[str, Any], options: Dict[str, str]) -> Optional[Dict[str, str]]:
+        """Map selectedVariant to super_attribute[<id>] = <option id> pairs"""
+        resolved = {}
+        for key, wanted in options.items():
+            attr = next((a for a in info['attributes']
+                         if _name_matches(key, a['code']) or _name_matches(key, a['label'])), None)
+            search = [attr] if attr else info['attributes']
+            for candidate in search:
+                option = next((o for o in candidate['options'] if _value_matches(wanted, o['label'])), None)
+                if option:
+                    resolved[f"super_attribute[{candidate['id']}]"] = str(option['id'])
+                    break
+            else:
+                return None
+        return resolved
+
+
+ADAPTERS = {
+    SHOPIFY: ShopifyAdapter,
+    WOOCOMMERCE: WooCommerceAdapter,
+    MAGENTO: MagentoAdapter,
+}
+
+
+def get_adapter(platform: Optional[str]) -> Optional[PlatformAdapter]:
+    """Return an adapter instance for a detected platform, or None"""
+    adapter_class = ADAPTERS.get(platform)
+    return adapter_class() if adapter_class else None
+
+
+async def add_to_cart_via_platform(page: Page, variants: Optional[Dict[str, str]] = None,
+                                   quantity: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Detect the storefront platform and add to cart through its API.
+    Callers should fall back to the UI flow when this does not succeed.
+
+    Returns:
+        Dict with 'success': bool, 'method': str, 'content'/'error': str
+    """
+    detection = await detect_platform_cached(page)
+    adapter = get_adapter(detection.get('platform'))
+    if not adapter:
+        return {'success': False, 'method': 'platform_api', 'error': 'No supported platform detected'}
+
+    try:
+        result = await adapter.add_to_cart(page, variants=variants, quantity=quantity)
+    except Exception as e:
+        logger.warning(f"PLATFORM: {adapter.name} adapter error: {e}")
+        return {'success': False, 'method': f'platform_api_{adapter.name}', 'error': str(e)}
+
+    if result.get('success'):
+        logger.info(f"PLATFORM: {result.get('content')}")
+    else:
+        logger.info(f"PLATFORM: {adapter.name} adapter did not add to cart: {result.get('error')}")
+    return result
+
+
+async def item_in_cart(page: Page, product_url: str,
+                       variants: Optional[Dict[str, str]] = None) -> Optional[bool]:
+    """
+    Whether the cart holds this product/variant, read through the storefront API of
+    the page's platform. None when the platform is unknown or its cart cannot be read.
+    """
+    detection = await detect_platform_cached(page)
+    adapter = get_adapter(detection.get('platform'))
+    if not adapter:
+        return None
+    try:
+        return await adapter.cart_contains(page, product_url, variants)
+    except Exception as e:
+        logger.debug(f"PLATFORM: {adapter.name} cart read failed: {e}")
+        return None
+
+
+def supported_platforms() -> List[str]:
+    """Platforms that have an add-to-cart adapter"""
+    return list(ADAPTERS.keys())
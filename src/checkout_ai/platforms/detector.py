@@ -0,0 +1,121 @@
+"""
+Platform Detector
+Identifies the e-commerce platform behind a storefront (Shopify, WooCommerce, Magento)
+from meta generator tags, global JS objects and known asset paths
+"""
+
+import logging
+from typing import Optional, Dict, Any
+from urllib.parse import urlparse
+from playwright.async_api import Page
+
+logger = logging.getLogger(__name__)
+
+SHOPIFY = 'shopify'
+WOOCOMMERCE = 'woocommerce'
+MAGENTO = 'magento'
+
+SUPPORTED_PLATFORMS = [SHOPIFY, WOOCOMMERCE, MAGENTO]
+
+# Detection results per origin - a store does not change platform between pages
+_origin_platforms: Dict[str, Dict[str, Any]] = {}
+
+# Each signal adds to its platform's score; the best score >= 2 wins
+_DETECT_JS = """
+    () => {
+        const scores = { shopify: 0, woocommerce: 0, magento: 0 };
+        const signals = [];
+        const hit = (platform, weight, signal) => {
+            scores[platform] += weight;
+            signals.push(signal);
+        };
+
+        // 1. Meta generator
+        const generator = (document.querySelector('meta[name="generator"]')?.content || '').toLowerCase();
+        if (generator.includes('shopify')) hit('shopify', 2, 'meta:shopify');
+        if (generator.includes('woocommerce')) hit('woocommerce', 2, 'meta:woocommerce');
+        if (generator.includes('magento')) hit('magento', 2, 'meta:magento');
+
+        // 2. Global JS objects
+        if (window.Shopify && window.Shopify.shop) hit('shopify', 2, 'global:Shopify');
+        if (window.ShopifyAnalytics) hit('shopify', 1, 'global:ShopifyAnalytics');
+        if (window.wc_add_to_cart_params || window.woocommerce_params) hit('woocommerce', 2, 'global:wc_params');
+        if (window.wc_cart_fragments_params) hit('woocommerce', 1, 'global:wc_cart_fragments');
+        if (window.require && window.require.s && window.require.s.contexts &&
+            window.require.s.contexts._ && String(JSON.stringify(window.require.s.contexts._.config || {})).includes('Magento_')) {
+            hit('magento', 2, 'global:requirejs-magento');
+        }
+
+        // 3. Known asset paths and markup
+        const srcs = Array.from(document.querySelectorAll('script[src], link[href]'))
+            .map(el => (el.getAttribute('src') || el.getAttribute('href') || '').toLowerCase());
+        if (srcs.some(s => s.includes('cdn.shopify.com') || s.includes('/cdn/shop/'))) hit('shopify', 1, 'asset:cdn.shopify');
+        if (srcs.some(s => s.includes('/wp-content/plugins/woocommerce/'))) hit('woocommerce', 2, 'asset:woocommerce');
+        if (srcs.some(s => s.includes('/static/version') || s.includes('/mage/'))) hit('magento', 1, 'asset:static-version');
+        if (document.querySelector('script[type="text/x-magento-init"]')) hit('magento', 2, 'markup:x-magento-init');
+        if (document.querySelector('input[name="form_key"]')) hit('magento', 1, 'markup:form_key');
+        if (document.body && document.body.classList.contains('woocommerce')) hit('woocommerce', 1, 'markup:body.woocommerce');
+        if (document.querySelector('form[action*="/cart/add"]')) hit('shopify', 1, 'markup:cart-add-form');
+
+        let best = null;
+        let bestScore = 0;
+        for (const [platform, score] of Object.entries(scores)) {
+            if (score > bestScore) {
+                best = platform;
+                bestScore = score;
+            }
+        }
+
+        return {
+            platform: bestScore >= 2 ? best : null,
+            score: bestScore,
+            signals: signals
+        };
+    }
+"""
+
+
+async def detect_platform(page: Page) -> Dict[str, Any]:
+    """
+    Detect the storefront platform of the current page.
+
+    Returns:
+        Dict with 'platform': str or None, 'score': int, 'signals': list
+    """
+    try:
+        result = await page.evaluate(_DETECT_JS)
+        if result.get('platform'):
+            logger.info(f"PLATFORM: Detected {result['platform']} (signals: {', '.join(result.get('signals', []))})")
+        return result
+    except Exception as e:
+        logger.debug(f"PLATFORM: Detection failed: {e}")
+        return {'platform': None, 'score': 0, 'signals': []}
+
+
+async def detect_platform_cached(page: Page) -> Dict[str, Any]:
+    """
+    detect_platform(), run once per origin.
+    Failed detections (page not ready, evaluate error) are not cached.
+    """
+    parsed = urlparse(page.url or '')
+    origin = f"{parsed.scheme}://{parsed.netloc}" if parsed.netloc else None
+    if origin and origin in _origin_platforms:
+        return _origin_platforms[origin]
+
+    try:
+        result = await page.evaluate(_DETECT_JS)
+    except Exception as e:
+        logger.debug(f"PLATFORM: Detection failed: {e}")
+        return {'platform': None, 'score': 0, 'signals': []}
+
+    if result.get('platform'):
+        logger.info(f"PLATFORM: Detected {result['platform']} (signals: {', '.join(result.get('signals', []))})")
+    if origin:
+        _origin_platforms[origin] = result
+    return result
+
+
+async def get_platform(page: Page) -> Optional[str]:
+    """Return the detected platform name or None"""
+    result = await detect_platform(page)
+    return result.get('platform')
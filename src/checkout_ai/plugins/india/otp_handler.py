@@ -55,13 +55,15 @@ class IndiaOTPHandler:
             logger.error(f"⏱️ OTP timeout for {site} after {timeout}s")
             return None
     
-    async def enter_otp(self, page: Page, otp: str) -> bool:
+    async def enter_otp(self, page: Page, otp: str, user_id: Optional[str] = None) -> bool:
         """
         Enter OTP in the page
         
         Args:
             page: Playwright page
             otp: OTP string
+            user_id: Session owner - when given, the logged-in state is stored so
+                     the next checkout on this site skips login and OTP
             
         Returns:
             True if OTP entered successfully
@@ -94,6 +96,10 @@ class IndiaOTPHandler:
                     # Try to click verify/submit button
                     await self._click_verify_button(page)
                     
+                    if user_id:
+                        from .smart_login import SmartLoginHandler
+                        await SmartLoginHandler(page, user_id=user_id).capture_session()
+                    
                     return True
             except Exception as e:
                 logger.debug(f"Selector {selector} failed: {e}")
@@ -9,11 +9,60 @@ from typing import Optional, Dict, Any
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for the logged-in state: after a password login / while the user enters an OTP
+PASSWORD_LOGIN_TIMEOUT = 15
+OTP_LOGIN_TIMEOUT = 180
+# Seconds a re-seeded session gets to show the logged-in state after reload
+SESSION_CHECK_TIMEOUT = 5
+
+# Positive logged-in signal: an account/logout element, and no password or OTP input on screen
+LOGGED_IN_JS = """
+    () => {
+        const visible = (el) => {
+            const rect = el.getBoundingClientRect();
+            return rect.width > 0 && rect.height > 0;
+        };
+        const loginInputs = 'input[type="password"], input[autocomplete="one-time-code"], ' +
+            'input[name*="otp" i], input[id*="otp" i], input[placeholder*="otp" i]';
+        if ([...document.querySelectorAll(loginInputs)].some(visible)) return false;
+
+        const loggedIn = /log[ -]?out|sign[ -]?out|my account|my profile|my orders|your account|your orders/;
+        const loggedOut = /sign[ -]?in|log[ -]?in|sign[ -]?up|register/;
+        for (const el of document.querySelectorAll('a, button, [role="button"], [role="menuitem"]')) {
+            const text = `${el.textContent || ''} ${el.getAttribute('aria-label') || ''} ${el.getAttribute('href') || ''}`
+                .toLowerCase().replace(/\s+/g, ' ').slice(0, 200);
+            if (loggedIn.test(text) && !loggedOut.test(text)) return true;
+        }
+        return false;
+    }
+"""
+
+# Session captures waiting for an OTP login to complete (strong refs for the running tasks)
+_pending_captures = set()
+
+
+async def wait_for_logged_in(page: Page, timeout: float) -> bool:
+    """Wait until the page shows the user logged in; False on timeout or a closed page"""
+    try:
+        await page.wait_for_function(LOGGED_IN_JS, timeout=timeout * 1000, polling=500)
+        return True
+    except Exception:
+        return False
+
+
 class SmartLoginHandler:
     """Handles intelligent login flow with field detection"""
     
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, user_id: Optional[str] = None, site: Optional[str] = None):
+        """
+        Args:
+            page: Playwright page
+            user_id: Session owner (customer email/phone) - enables session reuse
+            site: Site key (defaults to the page's domain)
+        """
         self.page = page
+        self.user_id = user_id
+        self.site = site
     
     async def login(self, email: str, phone: str, password: str) -> Dict[str, Any]:
         """
@@ -29,6 +78,11 @@ class SmartLoginHandler:
         """
         logger.info("🔐 Starting smart login flow...")
         
+        # Step 0: Reuse a stored session - no login form, no OTP
+        if await self._session_active():
+            logger.info("✅ Valid stored session - skipping login and OTP")
+            return {'success': True, 'method': 'session', 'skipped_login': True}
+        
         # Step 1: Detect what type of field is present
         field_type = await self._detect_login_field_type()
         
@@ -86,6 +140,53 @@ class SmartLoginHandler:
             'method': 'smart_login'
         }
     
+    async def _session_active(self) -> bool:
+        """
+        True when a stored session for this user/site is in effect (the page shows a
+        logged-in signal). Contexts are normally seeded before the first navigation;
+        otherwise seed the running context once and reload before giving up.
+        """
+        if not self.user_id:
+            return False
+        from src.checkout_ai.auth.session_pool import get_session_pool
+        pool = get_session_pool()
+        site = self.site or self.page.url
+        if not pool.has_session(self.user_id, site):
+            return False
+        
+        try:
+            if await self.page.evaluate(LOGGED_IN_JS):
+                return True
+            if await pool.seed_context(self.page.context, None, self.user_id, site):
+                await self.page.reload(wait_until='domcontentloaded')
+                if await wait_for_logged_in(self.page, SESSION_CHECK_TIMEOUT):
+                    return True
+            # A login form despite the seeded session: it no longer logs in - drop it
+            if await self._detect_login_field_type():
+                pool.delete(self.user_id, site)
+        except Exception as e:
+            logger.debug(f"Session check failed: {e}")
+        return False
+    
+    async def capture_session(self, timeout: float = PASSWORD_LOGIN_TIMEOUT) -> bool:
+        """Store the logged-in state for next time, once the page shows the user logged in"""
+        if not self.user_id:
+            return False
+        if not await wait_for_logged_in(self.page, timeout):
+            logger.info("Login not confirmed - session not stored")
+            return False
+        from src.checkout_ai.auth.session_pool import get_session_pool
+        return await get_session_pool().capture(self.page.context, self.user_id, self.site or self.page.url)
+    
+    def capture_session_after_otp(self):
+        """Capture in the background: the OTP is entered while the checkout continues"""
+        if not self.user_id:
+            return None
+        task = asyncio.create_task(self.capture_session(timeout=OTP_LOGIN_TIMEOUT))
+        _pending_captures.add(task)
+        task.add_done_callback(_pending_captures.discard)
+        return task
+    
     async def _detect_login_field_type(self) -> Optional[str]:
         """
         Detect what type of login field is present
@@ -3,6 +3,21 @@ Cart & Checkout URL Patterns for Fallback Navigation
 Comprehensive URL patterns for all major e-commerce platforms
 """
 
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cart URLs that won a probe, persisted per domain
+LEARNED_CART_URLS_FILE = Path.home() / '.checkout_ai' / 'cart_urls.json'
+
+# Serializes read-modify-write of the learned cart URL file
+_learned_lock = threading.Lock()
+
 # ========================================
 # CART PAGE URLS
 # ========================================
@@ -238,6 +253,83 @@ def get_cart_url_from_domain(domain: str) -> str:
     return '/cart'
 
 
+def _normalize_domain(domain: str) -> str:
+    """Strip port and leading www. so www/non-www share one learned entry"""
+    domain = domain.lower().split(':')[0]
+    return domain[4:] if domain.startswith('www.') else domain
+
+
+def load_learned_cart_urls() -> dict:
+    """Load domain -> cart path map of previously successful cart URLs"""
+    try:
+        if LEARNED_CART_URLS_FILE.exists():
+            return json.loads(LEARNED_CART_URLS_FILE.read_text(encoding='utf-8'))
+    except Exception as e:
+        logger.debug(f"Could not read learned cart URLs: {e}")
+    return {}
+
+
+def get_learned_cart_url(domain: str) -> Optional[str]:
+    """Get the cart path that last worked for a domain, if any"""
+    return load_learned_cart_urls().get(_normalize_domain(domain))
+
+
+def save_learned_cart_url(domain: str, cart_path: str) -> bool:
+    """
+    Persist the cart path that worked for a domain
+    
+    Args:
+        domain: Domain name (e.g., 'www.example.com')
+        cart_path: Cart path including query (e.g., '/checkout/cart')
+        
+    Returns:
+        True if saved successfully
+    """
+    try:
+        with _learned_lock:
+            learned = load_learned_cart_urls()
+            key = _normalize_domain(domain)
+            if learned.get(key) == cart_path:
+                return True
+            learned[key] = cart_path
+            LEARNED_CART_URLS_FILE.parent.mkdir(parents=True, exist_ok=True)
+            # Write a temp file and swap it in so readers never see a partial file
+            tmp_file = LEARNED_CART_URLS_FILE.with_name(f"{LEARNED_CART_URLS_FILE.name}.{os.getpid()}.tmp")
+            tmp_file.write_text(json.dumps(learned, indent=2), encoding='utf-8')
+            os.replace(tmp_file, LEARNED_CART_URLS_FILE)
+        return True
+    except Exception as e:
+        logger.debug(f"Could not save learned cart URL for {domain}: {e}")
+        return False
+
+
+def get_cart_url_candidates(domain: str) -> List[str]:
+    """
+    Ordered, de-duplicated cart path candidates for a domain:
+    learned winner → site-specific URL → common patterns
+    
+    Args:
+        domain: Domain name (e.g., 'myntra.com')
+        
+    Returns:
+        List of cart URL paths
+    """
+    candidates = []
+    learned = get_learned_cart_url(domain)
+    if learned:
+        candidates.append(learned)
+    candidates.append(get_cart_url_from_domain(domain))
+    candidates.extend(CART_URL_PATTERNS)
+
+    seen = set()
+    unique = []
+    for path in candidates:
+        if path not in seen:
+            seen.add(path)
+            unique.append(path)
+    return unique
+
+
 def detect_checkout_stage_from_url(url: str) -> str:
     """
     Detect checkout stage from current URL
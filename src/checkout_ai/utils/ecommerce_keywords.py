@@ -4,7 +4,8 @@ Comprehensive E-commerce Keyword Library
 Centralized keyword definitions for all e-commerce automation stages
 """
 
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
 from dataclasses import dataclass
 
 @dataclass
@@ -14,9 +15,12 @@ class KeywordSet:
     secondary: List[str]  # Fallback keywords
     patterns: List[str]  # Regex patterns for flexible matching
     
-    def all_keywords(self) -> List[str]:
-        """Get all keywords combined"""
-        return self.primary + self.secondary
+    def __post_init__(self):
+        self._all = tuple(self.primary + self.secondary)
+    
+    def all_keywords(self) -> Tuple[str, ...]:
+        """Get all keywords combined (built once - copy with list() before modifying)"""
+        return self._all
 
 
 # ============================================
@@ -558,11 +562,59 @@ NEWSLETTER_SIGNUP = KeywordSet(
 )
 
 
+# ============================================
+# KEYWORD REGISTRY
+# ============================================
+
+# Categories with per-field subcategories
+KEYWORD_GROUPS = {
+    'product_variants': PRODUCT_VARIANTS,
+    'address': ADDRESS_FIELDS,
+    'card': CREDIT_CARD_FIELDS
+}
+
+# Direct keyword sets
+KEYWORD_SETS = {
+    'add_to_cart': ADD_TO_CART_KEYWORDS,
+    'view_cart': VIEW_CART_KEYWORDS,
+    'checkout': CHECKOUT_KEYWORDS,
+    'guest_checkout': GUEST_CHECKOUT,
+    'login_checkout': LOGIN_CHECKOUT,
+    'continue': CONTINUE_BUTTON,
+    'shipping_method': SHIPPING_METHOD,
+    'payment_method': PAYMENT_METHOD,
+    'place_order': PLACE_ORDER,
+    'promo_code': PROMO_CODE,
+    'apply_promo': APPLY_PROMO,
+    'remove_from_cart': REMOVE_FROM_CART,
+    'terms': TERMS_AND_CONDITIONS,
+    'newsletter': NEWSLETTER_SIGNUP,
+    'paypal': PAYPAL_KEYWORDS,
+    'apple_pay': APPLE_PAY,
+    'google_pay': GOOGLE_PAY
+}
+
+# Sets get_primary_keywords() answers for
+PRIMARY_KEYWORD_CATEGORIES = (
+    'add_to_cart', 'view_cart', 'checkout', 'guest_checkout', 'login_checkout', 'continue',
+    'shipping_method', 'payment_method', 'place_order', 'promo_code', 'apply_promo'
+)
+
+
+def iter_keyword_sets():
+    """(category, KeywordSet) for every set; grouped sets are named 'group.subcategory'"""
+    for category, keyword_set in KEYWORD_SETS.items():
+        yield category, keyword_set
+    for group, subsets in KEYWORD_GROUPS.items():
+        for subcategory, keyword_set in subsets.items():
+            yield f"{group}.{subcategory}", keyword_set
+
+
 # ============================================
 # UTILITY FUNCTIONS
 # ============================================
 
-def get_keywords(category: str, subcategory: str = None) -> List[str]:
+def get_keywords(category: str, subcategory: str = None) -> Sequence[str]:
     """
     Get keywords for a specific category or subcategory
     
@@ -573,81 +625,33 @@ def get_keywords(category: str, subcategory: str = None) -> List[str]:
     Returns:
         List of all keywords for the specified category/subcategory
     """
-    category_map = {
-        'product_variants': PRODUCT_VARIANTS,
-        'address': ADDRESS_FIELDS,
-        'card': CREDIT_CARD_FIELDS
-    }
-    
-    if category in category_map and subcategory:
-        keyword_set = category_map[category].get(subcategory)
+    if category in KEYWORD_GROUPS and subcategory:
+        keyword_set = KEYWORD_GROUPS[category].get(subcategory)
         if keyword_set:
             return keyword_set.all_keywords()
     
-    # Direct keyword sets
-    keyword_sets = {
-        'add_to_cart': ADD_TO_CART_KEYWORDS,
-        'view_cart': VIEW_CART_KEYWORDS,
-        'checkout': CHECKOUT_KEYWORDS,
-        'guest_checkout': GUEST_CHECKOUT,
-        'login_checkout': LOGIN_CHECKOUT,
-        'continue': CONTINUE_BUTTON,
-        'shipping_method': SHIPPING_METHOD,
-        'payment_method': PAYMENT_METHOD,
-        'place_order': PLACE_ORDER,
-        'promo_code': PROMO_CODE,
-        'apply_promo': APPLY_PROMO,
-        'remove_from_cart': REMOVE_FROM_CART,
-        'terms': TERMS_AND_CONDITIONS,
-        'newsletter': NEWSLETTER_SIGNUP,
-        'paypal': PAYPAL_KEYWORDS,
-        'apple_pay': APPLE_PAY,
-        'google_pay': GOOGLE_PAY
-    }
-    
-    keyword_set = keyword_sets.get(category)
+    keyword_set = KEYWORD_SETS.get(category)
     if keyword_set:
         return keyword_set.all_keywords()
     
-    return []
+    return ()
 
 
-def get_primary_keywords(category: str, subcategory: str = None) -> List[str]:
+def get_primary_keywords(category: str, subcategory: str = None) -> Sequence[str]:
     """Get only primary keywords for faster matching"""
-    category_map = {
-        'product_variants': PRODUCT_VARIANTS,
-        'address': ADDRESS_FIELDS,
-        'card': CREDIT_CARD_FIELDS
-    }
-    
-    if category in category_map and subcategory:
-        keyword_set = category_map[category].get(subcategory)
+    if category in KEYWORD_GROUPS and subcategory:
+        keyword_set = KEYWORD_GROUPS[category].get(subcategory)
         if keyword_set:
             return keyword_set.primary
     
-    # Direct keyword sets
-    keyword_sets = {
-        'add_to_cart': ADD_TO_CART_KEYWORDS,
-        'view_cart': VIEW_CART_KEYWORDS,
-        'checkout': CHECKOUT_KEYWORDS,
-        'guest_checkout': GUEST_CHECKOUT,
-        'login_checkout': LOGIN_CHECKOUT,
-        'continue': CONTINUE_BUTTON,
-        'shipping_method': SHIPPING_METHOD,
-        'payment_method': PAYMENT_METHOD,
-        'place_order': PLACE_ORDER,
-        'promo_code': PROMO_CODE,
-        'apply_promo': APPLY_PROMO
-    }
-    
-    keyword_set = keyword_sets.get(category)
-    if keyword_set:
-        return keyword_set.primary
+    if category in PRIMARY_KEYWORD_CATEGORIES:
+        return KEYWORD_SETS[category].primary
     
     return []
 
 
-def get_all_stage_keywords() -> Dict[str, List[str]]:
+@lru_cache(maxsize=1)
+def get_all_stage_keywords() -> Dict[str, Sequence[str]]:
     """
     Get all keywords organized by stage for comprehensive matching
     
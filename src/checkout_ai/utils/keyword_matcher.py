@@ -0,0 +1,223 @@
+"""
+Compiled Keyword Matcher
+Merges every keyword set from ecommerce_keywords and checkout_keywords (all
+languages) into one Aho-Corasick automaton with category/priority tags, so any
+text is classified against all keywords in a single left-to-right scan.
+
+- Normalization (shared with the in-page copy): Unicode NFKD, accents dropped,
+  lowercase, every run of non-alphanumerics becomes one space.
+  "Añadir a la Bolsa" -> "anadir a la bolsa"
+- Two automata over the same keywords: spaced ("add to cart", for visible text)
+  and compact ("addtocart", for ids/names/autocomplete tokens)
+- Matches are substring matches like the `includes` checks they replace;
+  `whole` tells whether the hit sits on word boundaries
+- The in-page copy (js_assets/keyword_matcher.js, window.__checkoutKeywords) is
+  installed by with_keyword_matcher() and builds its automaton once per page
+"""
+
+import hashlib
+import json
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.checkout_ai.utils import checkout_keywords
+from src.checkout_ai.utils.ecommerce_keywords import iter_keyword_sets
+
+JS_ASSET = Path(__file__).parent.parent / 'dom' / 'js_assets' / 'keyword_matcher.js'
+
+PRIMARY = 0
+SECONDARY = 1
+
+
+def normalize_text(text: Any) -> str:
+    """Lowercase, accent-free, single-spaced alphanumeric words"""
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    chars = [c for c in decomposed if not unicodedata.category(c).startswith('M')]
+    return ' '.join(''.join(c if c.isalnum() else ' ' for c in ''.join(chars).lower()).split())
+
+
+def compact_text(text: Any) -> str:
+    """normalize_text() without separators ("shipping_first-name" -> "shippingfirstname")"""
+    return normalize_text(text).replace(' ', '')
+
+
+class _Automaton:
+    """Character-level Aho-Corasick automaton over normalized patterns"""
+
+    def __init__(self, patterns: Sequence[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[int]] = [[]]
+
+        for pattern_id, pattern in enumerate(patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                nxt = self.goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[state][char] = nxt
+                state = nxt
+            self.out[state].append(pattern_id)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def search(self, text: str):
+        """Yields (pattern_id, end) for every occurrence, overlapping ones included"""
+        state = 0
+        goto, fail, out = self.goto, self.fail, self.out
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in out[state]:
+                yield pattern_id, position + 1
+
+
+class KeywordMatcher:
+    """One-pass keyword classification with category/priority/rank tags.
+
+    entries: (keyword, category, priority) in priority order; rank is the
+    keyword's position within its category.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str, int]]):
+        self.keywords: List[str] = []
+        self.tags: List[List[Tuple[str, int, int]]] = []
+        ids: Dict[str, int] = {}
+        ranks: Dict[str, int] = {}
+
+        for keyword, category, priority in entries:
+            normalized = normalize_text(keyword)
+            if not normalized:
+                continue
+            if normalized not in ids:
+                ids[normalized] = len(self.keywords)
+                self.keywords.append(normalized)
+                self.tags.append([])
+            rank = ranks.get(category, 0)
+            ranks[category] = rank + 1
+            self.tags[ids[normalized]].append((category, priority, rank))
+
+        self.categories = list(ranks)
+        self._spaced = _Automaton(self.keywords)
+        self._compact = _Automaton([keyword.replace(' ', '') for keyword in self.keywords])
+
+    def keyword_ids(self, text: Any, compact: bool = False) -> set:
+        """Ids of all keywords occurring in the text"""
+        normalized = compact_text(text) if compact else normalize_text(text)
+        automaton = self._compact if compact else self._spaced
+        return {keyword_id for keyword_id, _ in automaton.search(normalized)}
+
+    def scan(self, text: Any, compact: bool = False, categories: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Every (occurrence, category) hit in the text"""
+        normalized = compact_text(text) if compact else normalize_text(text)
+        automaton = self._compact if compact else self._spaced
+        wanted = set(categories) if categories is not None else None
+
+        hits = []
+        for keyword_id, end in automaton.search(normalized):
+            keyword = self.keywords[keyword_id]
+            start = end - len(keyword.replace(' ', '') if compact else keyword)
+            whole = compact or ((start == 0 or normalized[start - 1] == ' ') and
+                                (end == len(normalized) or normalized[end] == ' '))
+            for category, priority, rank in self.tags[keyword_id]:
+                if wanted is None or category in wanted:
+                    hits.append({'keyword': keyword, 'id': keyword_id, 'category': category, 'priority': priority,
+                                 'rank': rank, 'start': start, 'end': end, 'whole': whole})
+        return hits
+
+    def classify(self, text: Any, compact: bool = False, categories: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Best hit per category: whole words first, then priority, rank, longest keyword"""
+        best: Dict[str, Dict[str, Any]] = {}
+        for hit in self.scan(text, compact=compact, categories=categories):
+            key = (not hit['whole'], hit['priority'], hit['rank'], -len(hit['keyword']))
+            current = best.get(hit['category'])
+            if current is None or key < current['_key']:
+                best[hit['category']] = dict(hit, _key=key)
+        for hit in best.values():
+            hit.pop('_key')
+        return best
+
+    def matches(self, text: Any, category: str, compact: bool = False) -> bool:
+        return bool(self.scan(text, compact=compact, categories=[category]))
+
+    def to_js_data(self) -> Dict[str, Any]:
+        """Keyword table the in-page matcher builds its automaton from"""
+        category_index = {category: i for i, category in enumerate(self.categories)}
+        tags = [[[category_index[c], priority, rank] for c, priority, rank in keyword_tags] for keyword_tags in self.tags]
+        digest = hashlib.sha1(json.dumps([self.keywords, tags]).encode('utf-8')).hexdigest()[:12]
+        return {'version': digest, 'keywords': self.keywords, 'categories': self.categories, 'tags': tags}
+
+
+def _registered_entries():
+    for category, keyword_set in iter_keyword_sets():
+        for keyword in keyword_set.primary:
+            yield keyword, category, PRIMARY
+        for keyword in keyword_set.secondary:
+            yield keyword, category, SECONDARY
+    for name, value in vars(checkout_keywords).items():
+        if name.isupper() and isinstance(value, list):
+            for keyword in value:
+                yield keyword, name.lower(), PRIMARY
+
+
+# Global instance
+_keyword_matcher: Optional[KeywordMatcher] = None
+
+
+def get_keyword_matcher() -> KeywordMatcher:
+    """Matcher over every registered keyword set (built on first use)"""
+    global _keyword_matcher
+    if _keyword_matcher is None:
+        _keyword_matcher = KeywordMatcher(_registered_entries())
+    return _keyword_matcher
+
+
+@lru_cache(maxsize=256)
+def compile_keywords(keywords: Tuple[str, ...], category: str = 'query') -> KeywordMatcher:
+    """Matcher for an ad-hoc ordered keyword list; rank = position in the list"""
+    return KeywordMatcher((keyword, category, PRIMARY) for keyword in keywords)
+
+
+@lru_cache(maxsize=1)
+def keyword_matcher_js() -> str:
+    """Installer for window.__checkoutKeywords with the registered keyword table"""
+    data = json.dumps(get_keyword_matcher().to_js_data(), ensure_ascii=False)
+    return f"({JS_ASSET.read_text(encoding='utf-8')})({data});"
+
+
+def with_keyword_matcher(js_code: str) -> str:
+    """Wrap an `(args) => {...}` script so window.__checkoutKeywords is installed before it runs"""
+    return f"""
+        (args) => {{
+            {keyword_matcher_js()}
+            return ({js_code})(args);
+        }}
+        """
+
+
+# Export for use in other modules
+__all__ = [
+    'KeywordMatcher', 'get_keyword_matcher', 'compile_keywords', 'normalize_text', 'compact_text',
+    'keyword_matcher_js', 'with_keyword_matcher', 'PRIMARY', 'SECONDARY'
+]
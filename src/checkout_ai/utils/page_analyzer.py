@@ -5,8 +5,104 @@ Page Content Analyzer - Detects page type and available actions
 import asyncio
 import logging
 
+from src.checkout_ai.dom.layout_snapshot import capture_layout
+
 logger = logging.getLogger(__name__)
 
+OVERLAY_CLASS_HINTS = ('modal', 'drawer', 'overlay', 'popup')
+VARIANT_CLASS_HINTS = ('variant', 'option')
+
+
+def _page_type(url):
+    url = (url or '').lower()
+    if '/cart' in url or '/basket' in url:
+        return 'cart'
+    if '/checkout' in url or '/payment' in url:
+        return 'checkout'
+    if '/product' in url or '/item' in url:
+        return 'product'
+    return 'unknown'
+
+
+def _analysis_from_layout(snapshot, url):
+    """Same result as the in-page analysis, computed from one DOMSnapshot capture"""
+    main = snapshot.documents[0]
+    nodes = range(main['offset'], main['offset'] + main['count'])
+
+    elements = [
+        node for node in nodes
+        if snapshot.is_element(node) and snapshot.is_visible(node) and snapshot.in_light_dom(node)
+    ]
+
+    def classes(node):
+        return snapshot.attribute(node, 'class') or ''
+
+    def text(node, limit):
+        return snapshot.text_content(node).strip()[:limit]
+
+    def aria_label(node):
+        label = snapshot.attribute(node, 'aria-label')
+        return label[:40] if label is not None else None
+
+    def input_type(node):
+        tag = snapshot.tag(node)
+        if tag == 'select':
+            return 'select-one' if snapshot.attribute(node, 'multiple') is None else 'select-multiple'
+        if tag == 'textarea':
+            return 'textarea'
+        return (snapshot.attribute(node, 'type') or 'text').lower()
+
+    overlays = [
+        node for node in elements
+        if (any(hint in classes(node) for hint in OVERLAY_CLASS_HINTS) or snapshot.attribute(node, 'role') == 'dialog')
+        and snapshot.z_index(node) > 100
+    ]
+
+    buttons = [
+        node for node in elements
+        if snapshot.tag(node) == 'button'
+        or (snapshot.tag(node) == 'a' and snapshot.attribute(node, 'role') == 'button')
+        or (snapshot.tag(node) == 'input' and input_type(node) in ('submit', 'button'))
+    ]
+
+    inputs = [
+        node for node in elements
+        if (snapshot.tag(node) == 'input' and input_type(node) != 'hidden') or snapshot.tag(node) in ('select', 'textarea')
+    ]
+
+    variant_selectors = [
+        node for node in elements
+        if snapshot.tag(node) == 'select' or snapshot.attribute(node, 'role') == 'radiogroup'
+        or any(hint in classes(node) for hint in VARIANT_CLASS_HINTS)
+    ]
+
+    has_add_to_cart = any(
+        'add to cart' in text(node, 200).lower() or 'add to bag' in text(node, 200).lower()
+        for node in buttons if snapshot.tag(node) == 'button' or input_type(node) == 'submit'
+    )
+
+    return {
+        'pageType': _page_type(url),
+        'hasBlockingOverlay': bool(overlays),
+        'overlayInfo': [
+            {'classes': classes(node), 'zIndex': snapshot.style(node, 'z-index'), 'text': text(node, 100)}
+            for node in overlays
+        ],
+        'buttons': [{'text': text(node, 40), 'ariaLabel': aria_label(node)} for node in buttons[:10]],
+        'inputs': [
+            {
+                'type': input_type(node),
+                'name': snapshot.attribute(node, 'name') or '',
+                'id': snapshot.attribute(node, 'id') or '',
+                'placeholder': (snapshot.attribute(node, 'placeholder') or '')[:30] or None,
+            }
+            for node in inputs[:10]
+        ],
+        'hasVariantSelectors': bool(variant_selectors),
+        'hasAddToCart': has_add_to_cart,
+        'url': url,
+    }
+
 
 async def analyze_page_content(page):
     """
@@ -14,6 +110,13 @@ async def analyze_page_content(page):
     Returns: dict with page type, visible elements, and blocking overlays
     """
     try:
+        # One DOMSnapshot call instead of a style/layout read per element
+        snapshot = await capture_layout(page)
+        if snapshot and snapshot.documents:
+            analysis = _analysis_from_layout(snapshot, page.url)
+            logger.info(f"PAGE ANALYZER: Type={analysis['pageType']}, Overlay={analysis['hasBlockingOverlay']}, Buttons={len(analysis['buttons'])}, Inputs={len(analysis['inputs'])} (layout snapshot)")
+            return analysis
+
         analysis = await page.evaluate("""
             () => {
                 const isVisible = (el) => {